@@ -218,6 +218,41 @@ class API:
         else:
             return self.session.post(f'model-versions/{model_version_id}/data', json=samples)
 
+    def upload_samples_columnar(
+            self,
+            model_version_id: int,
+            batch: bytes,
+            content_type: str = 'application/vnd.apache.arrow.stream',
+            raise_on_status: bool = True,
+    ) -> t.Optional[httpx.Response]:
+        """Upload production samples in a columnar format.
+
+        Parameters
+        ----------
+        model_version_id : int
+            The model version ID.
+        batch : bytes
+            The samples serialized as an Arrow IPC stream or as a Parquet file.
+        content_type : str, default 'application/vnd.apache.arrow.stream'
+            The batch format, either 'application/vnd.apache.arrow.stream' or 'application/vnd.apache.parquet'.
+        raise_on_status : bool
+            Raise exception if status code is not 200.
+
+        Returns
+        -------
+         httpx.Response
+            The response object.
+        """
+        response = self.session.post(
+            f'model-versions/{model_version_id}/data/columnar',
+            content=batch,
+            headers={'Content-Type': content_type}
+        )
+        if raise_on_status:
+            maybe_raise(response, msg='Samples upload failure.\n{error}')
+        else:
+            return response
+
     def log_labels(
             self,
             model_id: int,
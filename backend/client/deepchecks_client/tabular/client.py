@@ -292,6 +292,74 @@ class DeepchecksModelVersionClient(core_client.DeepchecksModelVersionClient):
         pretty_print('Upload finished successfully but might take time to ingest into the system, see'
                      f' {self.api.original_host.join("/configuration/models")} for status.')
 
+    def log_batch_columnar(
+            self,
+            sample_ids: np.ndarray,
+            data: 'pd.DataFrame',
+            predictions: t.Union[pd.Series, np.ndarray, t.List[t.Any]],
+            prediction_probas: t.Union[np.ndarray, pd.Series, t.List[t.Any], None] = None,
+            timestamps: t.Union[np.ndarray, pd.Series, t.List[int], None] = None,
+            samples_per_send: int = 100_000
+    ):
+        """Log batch of samples in a columnar format (Apache Arrow).
+
+        Same as 'log_batch' but the batch is sent column by column instead of sample by sample,
+        which is considerably faster for large batches. Requires the 'pyarrow' package.
+
+        Parameters
+        ==========
+        sample_ids : numpy.ndarray
+            set of sample ids
+        data : pandas.DataFrame
+            set of features and optionally of non-features.
+        predictions : Union[pd.Series, np.ndarray, t.List]
+            set of predictions
+        prediction_probas : Optional[numpy.ndarray] , default None
+            set of predictions probabilities
+        timestamps : Union[numpy.ndarray, pandas.Series, List[int], None] , default None
+            set of numerical timestamps that represent second-based epoch time.
+            If not provided then current time will be used.
+        samples_per_send : int , default 100_000
+            how many samples to send by one request
+        """
+        try:
+            import pyarrow as pa  # pylint: disable=import-outside-toplevel
+        except ImportError as e:
+            raise ImportError(
+                'log_batch_columnar requires the "pyarrow" package, '
+                'install it by running:\n>> pip install pyarrow'
+            ) from e
+
+        if samples_per_send < 1:
+            raise ValueError('"samples_per_send" must be ">=" than 1')
+
+        if timestamps is None:
+            warnings.warn('log_batch_columnar was called without timestamps, using current time instead')
+            timestamps = np.full(len(sample_ids), pdl.now().int_timestamp)
+
+        data_batch = process_batch_columnar(
+            data_columns=self.all_columns,
+            task_type=TaskType(self.model['task_type']),
+            sample_ids=sample_ids,
+            data=data,
+            timestamps=timestamps,
+            predictions=predictions,
+            prediction_probas=prediction_probas,
+            model_classes=self.model_classes,
+        )
+
+        self.send()
+
+        table = pa.Table.from_pandas(data_batch, preserve_index=False)
+        for batch in table.to_batches(max_chunksize=samples_per_send):
+            sink = pa.BufferOutputStream()
+            with pa.ipc.new_stream(sink, batch.schema) as writer:
+                writer.write_batch(batch)
+            self.api.upload_samples_columnar(self.model_version_id, sink.getvalue().to_pybytes())
+
+        pretty_print('Upload finished successfully but might take time to ingest into the system, see'
+                     f' {self.api.original_host.join("/configuration/models")} for status.')
+
     def log_sample(
             self,
             values: t.Dict[str, t.Any],
@@ -721,6 +789,103 @@ def process_batch(
         ]
 
 
+def process_batch_columnar(
+    *,
+    task_type: TaskType,
+    data_columns: t.Dict[str, str],
+    sample_ids: np.ndarray,
+    data: pd.DataFrame,
+    timestamps: np.ndarray,
+    predictions: t.Union[pd.Series, np.ndarray, t.List],
+    model_classes: t.Optional[t.Sequence[str]] = None,
+    prediction_probas: t.Optional[np.ndarray] = None,
+) -> pd.DataFrame:
+    """Prepare and validate batch of samples column by column.
+
+    Unlike 'process_batch' values are not validated against the version schema,
+    the server validates the whole batch at once.
+    """
+    sample_ids = standardize_input(sample_ids, 'sample_ids')
+    if len(sample_ids) == 0:
+        raise ValueError('"sample_ids" cannot be empty')
+    if len(sample_ids) != len(np.unique(sample_ids)):
+        raise ValueError('"sample_ids" must contain only unique items')
+    if not pd.notna(sample_ids).all():
+        raise ValueError('"sample_ids" must not contain None/Nan')
+
+    error_template = '"{}" and "sample_ids" must contain same number of items'
+    timestamps = standardize_input(timestamps, 'timestamps')
+    predictions = standardize_input(predictions, 'predictions')
+
+    if len(timestamps) != len(sample_ids):
+        raise ValueError(error_template.format('timestamps'))
+    if not pd.api.types.is_integer_dtype(timestamps):
+        raise ValueError('Only integer timestamps are allowed that represent second-based epoch time')
+    if len(predictions) != len(sample_ids):
+        raise ValueError(error_template.format('predictions'))
+    if data.shape[0] != len(sample_ids):
+        raise ValueError(error_template.format('data'))
+
+    missing_columns = set(data_columns.keys()).difference(data.columns)
+    if missing_columns:
+        raise ValueError(f'The following schema columns are missing: {list(missing_columns)}')
+    additional_columns = set(data.columns).difference(data_columns.keys())
+    if additional_columns:
+        warnings.warn(
+            'The following columns were not defined in schema '
+            f'and will be ignored: {list(additional_columns)}'
+        )
+
+    batch = pd.DataFrame({
+        DeepchecksColumns.SAMPLE_ID_COL.value: pd.Series(sample_ids).astype(str).to_numpy(),
+        DeepchecksColumns.SAMPLE_TS_COL.value: pd.to_datetime(timestamps, unit='s', utc=True),
+    })
+
+    if task_type in {TaskType.MULTICLASS, TaskType.BINARY}:
+        batch[DeepchecksColumns.SAMPLE_PRED_COL.value] = [
+            _classification_prediction_formatter(it, model_classes) for it in predictions
+        ]
+        if prediction_probas is not None:
+            if len(prediction_probas) != len(sample_ids):
+                raise ValueError(error_template.format('prediction_probas'))
+            if model_classes is None:
+                raise ValueError('Can\'t pass prediction_probas if version was not configured with model classes.')
+            prediction_probas = np.asarray(prediction_probas, dtype='float64')
+            if prediction_probas.ndim != 2:
+                raise ValueError('"prediction_probas" must be a two-dimensional array')
+            if prediction_probas.shape[1] != len(model_classes):
+                raise ValueError('Number of classes in prediction_probas does not match number of classes in '
+                                 'model classes.')
+            batch[DeepchecksColumns.SAMPLE_PRED_PROBA_COL.value] = list(prediction_probas)
+    elif task_type == TaskType.REGRESSION:
+        if prediction_probas is not None:
+            raise ValueError('Can\'t pass prediction_proba for regression task.')
+        batch[DeepchecksColumns.SAMPLE_PRED_COL.value] = np.asarray(predictions, dtype='float64')
+    else:
+        raise ValueError(f'Unknown or unsupported task type provided - {task_type}')
+
+    for name, kind in data_columns.items():
+        column = data[name].reset_index(drop=True)
+        if kind in {ColumnType.CATEGORICAL, ColumnType.TEXT}:
+            column = column.astype(object).where(column.notna(), None)
+            batch[name] = column.map(lambda it: it if it is None else str(it))
+        elif kind == ColumnType.DATETIME:
+            if isinstance(column.dtype, pd.PeriodDtype):
+                column = column.dt.to_timestamp()
+            column = pd.to_datetime(column)
+            batch[name] = column.dt.tz_localize('UTC') if column.dt.tz is None else column.dt.tz_convert('UTC')
+        elif kind == ColumnType.BOOLEAN:
+            batch[name] = column.map(_numeric_to_boolean).astype('boolean')
+        elif kind == ColumnType.INTEGER or kind == ColumnType.BIGINT:
+            batch[name] = column.astype('Int64')
+        elif kind == ColumnType.NUMERIC:
+            batch[name] = column.astype('float64')
+        else:
+            batch[name] = column
+
+    return batch
+
+
 def process_sample(
     *,
     task_type: TaskType,
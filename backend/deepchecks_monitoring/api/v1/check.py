@@ -428,12 +428,19 @@ async def run_standalone_check_per_window_in_range(
             session=session,
             check_id=check_id,
             monitor_options=monitor_options,
-            organization_id=t.cast(int, user.organization_id)
+            organization_id=t.cast(int, user.organization_id),
+            single_scan=resources_provider.settings.check_windows_single_scan,
+            prefetch_data=resources_provider.settings.parallel_check_executor_prefetch_data,
+            n_of_workers=resources_provider.settings.total_number_of_check_executor_actors,
+            inline_max_samples=resources_provider.settings.parallel_check_executor_inline_max_samples,
+            executor=resources_provider.check_processes_pool
         )
     return await run_check_per_window_in_range(
         check_id,
         session,
-        monitor_options
+        monitor_options,
+        single_scan=resources_provider.settings.check_windows_single_scan,
+        executor=resources_provider.check_processes_pool
     )
 
 
@@ -442,6 +449,7 @@ async def get_check_window(
         check_id: int,
         monitor_options: SingleCheckRunOptions,
         session: AsyncSession = AsyncSessionDep,
+        resources_provider: ResourcesProvider = ResourcesProviderDep,
 ):
     """Run a check for the time window.
 
@@ -465,7 +473,8 @@ async def get_check_window(
     start_time = monitor_options.start_time_dt()
     end_time = monitor_options.end_time_dt()
     model, model_versions = await get_model_versions_for_time_range(session, check.model_id, start_time, end_time)
-    model_results = await run_check_window(check, monitor_options, session, model, model_versions)
+    model_results = await run_check_window(check, monitor_options, session, model, model_versions,
+                                           executor=resources_provider.check_processes_pool)
     result_per_version = reduce_check_window(model_results, monitor_options)
     return {version.name: val for version, val in result_per_version.items()}
 
@@ -571,7 +580,9 @@ async def get_check_info(
         model: Model = latest_version.model
 
     if isinstance(dp_check, ReduceMetricClassMixin):
-        check_parameter_conf = get_metric_class_info(latest_version, model)
+        statistics = (None if latest_version is None
+                      else (await latest_version.get_state_with_pending_deltas()).statistics)
+        check_parameter_conf = get_metric_class_info(latest_version, model, statistics)
     elif isinstance(dp_check, (ReduceFeatureMixin, ReducePropertyMixin)):
         check_parameter_conf = get_feature_property_info(latest_version, dp_check)
     else:
@@ -586,7 +597,8 @@ async def run_check_group_by_feature(
         model_version_id: int,
         feature: str,
         monitor_options: SingleCheckRunOptions,
-        session: AsyncSession = AsyncSessionDep
+        session: AsyncSession = AsyncSessionDep,
+        resources_provider: ResourcesProvider = ResourcesProviderDep
 ):
     """Run check window with a group by on given feature.
 
@@ -617,7 +629,7 @@ async def run_check_group_by_feature(
         raise BadRequest(f'Feature {feature} was not found in model version schema')
 
     # Get all data count
-    data_table = model_version.get_monitor_table(session)
+    data_table = model_version.get_monitor_table()
     count_query = select(func.count()).where(monitor_options.sql_time_filter(),
                                              monitor_options.sql_columns_filter()).select_from(data_table)
     if check.is_label_required:
@@ -684,7 +696,8 @@ async def run_check_group_by_feature(
         # Get value from check to run
         model_results_per_window = await get_results_for_model_versions_per_window(
             {model_version.id: session_info}, [model_version], model_version.model, check,
-            monitor_options.additional_kwargs, with_display=False)
+            monitor_options.additional_kwargs, with_display=False,
+            executor=resources_provider.check_processes_pool)
         # The function we called is more general, but we know here we have single version and window
         result = model_results_per_window[model_version][0]
         if result['result'] is not None:
@@ -8,35 +8,38 @@
 # along with Deepchecks.  If not, see <http://www.gnu.org/licenses/>.
 # ----------------------------------------------------------------------------
 """V1 API of the data input."""
-import copy
+import collections
 import typing as t
-from io import StringIO
 
-import fastjsonschema
 import numpy as np
 import pandas as pd
 import pendulum as pdl
-from fastapi import Body, Depends, Response, UploadFile, status
+from fastapi import Body, Depends, Request, Response, UploadFile, status
 from fastapi.responses import ORJSONResponse
 from sqlalchemy import func, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 from sqlalchemy.sql.functions import count
 
+from deepchecks_monitoring.bgtasks.model_version_statistics_fold import add_statistics_delta, fold_statistics_deltas
 from deepchecks_monitoring.config import Tags
 from deepchecks_monitoring.dependencies import (AsyncSessionDep, DataIngestionDep, ResourcesProviderDep,
                                                 limit_request_size)
 from deepchecks_monitoring.exceptions import BadRequest
+from deepchecks_monitoring.logic.batch_validation import frame_to_records
+from deepchecks_monitoring.logic.columnar_ingestion import ARROW_STREAM_MEDIA_TYPE, PARQUET_MEDIA_TYPE, read_arrow_table
 from deepchecks_monitoring.logic.data_ingestion import DataIngestionBackend
+from deepchecks_monitoring.logic.stream_decoding import (MSGPACK_MEDIA_TYPE, NDJSON_MEDIA_TYPE, SplitJsonDecoder,
+                                                         create_stream_decoder)
 from deepchecks_monitoring.monitoring_utils import fetch_or_404
 from deepchecks_monitoring.public_models import User
 from deepchecks_monitoring.resources import ResourcesProvider
 from deepchecks_monitoring.schema_models import Model, ModelVersion
-from deepchecks_monitoring.schema_models.column_type import SAMPLE_LABEL_COL
-from deepchecks_monitoring.schema_models.model_version import update_statistics_from_sample
+from deepchecks_monitoring.schema_models.column_type import SAMPLE_LABEL_COL, ColumnType
+from deepchecks_monitoring.schema_models.model_version import statistics_from_batch
 from deepchecks_monitoring.utils.auth import CurrentActiveUser
+from deepchecks_monitoring.utils.database import copy_records_to_table
 from deepchecks_monitoring.utils.mixpanel import LabelsUploadEvent, ProductionDataUploadEvent
-from deepchecks_monitoring.utils.other import datetime_sample_formatter
 
 from .router import router
 
@@ -69,11 +72,69 @@ async def log_data_batch(
             content={"detail": "Got empty list"}
         )
 
+    return await _log_samples_with_rate_limit(
+        model_version, len(data), lambda n: data[:n], user, session, data_ingest, resources_provider)
+
+
+@router.post(
+    "/model-versions/{model_version_id}/data/columnar",
+    tags=[Tags.DATA],
+    summary="Log inference data per model version in a columnar format.",
+    description="This API logs a batch of new samples of the inference data of an existing model version. "
+                "The batch is sent as the request body, either as an Arrow IPC stream (content type "
+                f"'{ARROW_STREAM_MEDIA_TYPE}') or as a Parquet file (content type '{PARQUET_MEDIA_TYPE}'), "
+                "and is validated column by column against the version schema.",
+)
+async def log_columnar_data_batch(
+    model_version_id: int,
+    request: Request,
+    user: User = Depends(CurrentActiveUser()),
+    session: AsyncSession = AsyncSessionDep,
+    data_ingest: DataIngestionBackend = DataIngestionDep,
+    resources_provider: ResourcesProvider = ResourcesProviderDep
+):
+    """Insert batch data samples given in a columnar format."""
+    model_version: ModelVersion = await fetch_or_404(
+        session,
+        ModelVersion,
+        id=model_version_id,
+        options=joinedload(ModelVersion.model)
+    )
+    if resources_provider.get_features_control(user).model_assignment:
+        await ModelVersion.assert_user_assigend_to_model(session, model_version_id, user)
+
+    media_type = request.headers.get("content-type", "").split(";")[0].strip()
+    table = read_arrow_table(await request.body(), media_type)
+
+    if table.num_rows == 0:
+        return ORJSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"detail": "Got empty batch"}
+        )
+
+    return await _log_samples_with_rate_limit(
+        model_version, table.num_rows, lambda n: table.slice(0, n), user, session, data_ingest, resources_provider)
+
+
+async def _log_samples_with_rate_limit(
+    model_version: ModelVersion,
+    n_of_samples: int,
+    truncate: t.Callable[[int], t.Any],
+    user: User,
+    session: AsyncSession,
+    data_ingest: DataIngestionBackend,
+    resources_provider: ResourcesProvider
+):
+    """Log the samples allowed by the user rate limit, truncating the rest of them.
+
+    The samples are given either as a list of samples or as an arrow table, by 'truncate' which returns
+    the given number of first samples.
+    """
     time = pdl.now()
     minute_rate = resources_provider.get_features_control(user).rows_per_minute
 
     # Atomically getting the count and increasing in order to avoid race conditions
-    curr_count = resources_provider.cache_functions.get_and_incr_user_rate_count(user, time, len(data))
+    curr_count = resources_provider.cache_functions.get_and_incr_user_rate_count(user, time, n_of_samples)
     remains = minute_rate - curr_count
 
     # Remains can be negative because we don't check the limit before incrementing
@@ -82,7 +143,7 @@ async def log_data_batch(
             ProductionDataUploadEvent.create_event,
             model_version=model_version,
             user=user,
-            n_of_received_samples=len(data),
+            n_of_received_samples=n_of_samples,
             n_of_accepted_samples=0
         )
         return ORJSONResponse(
@@ -93,18 +154,18 @@ async def log_data_batch(
             }
         )
 
-    truncated_data = data[:remains]
+    truncated_data = truncate(min(remains, n_of_samples))
     await data_ingest.log_samples(model_version, truncated_data, session, user.organization_id, time)
 
     await resources_provider.report_mixpanel_event(
         ProductionDataUploadEvent.create_event,
         model_version=model_version,
         user=user,
-        n_of_received_samples=len(data),
-        n_of_accepted_samples=len(truncated_data)
+        n_of_received_samples=n_of_samples,
+        n_of_accepted_samples=min(remains, n_of_samples)
     )
 
-    if remains < len(data):
+    if remains < n_of_samples:
         return ORJSONResponse(
             status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
             content={
@@ -119,6 +180,110 @@ async def log_data_batch(
     return Response(status_code=status.HTTP_200_OK)
 
 
+# Samples of a streamed upload are logged in batches of this size, each in its own transaction
+STREAM_BATCH_SIZE = 5_000
+STREAM_MAX_SAMPLE_BYTES = 1024 * 1024
+
+
+@router.post(
+    "/model-versions/{model_version_id}/data/stream",
+    tags=[Tags.DATA],
+    summary="Stream inference data per model version.",
+    description="This API logs a stream of new samples of the inference data of an existing model version, of any "
+                f"size. The samples are sent as newline delimited json (content type '{NDJSON_MEDIA_TYPE}') or "
+                f"as a sequence of msgpack maps (content type '{MSGPACK_MEDIA_TYPE}'), preferably with a chunked "
+                "request body. The samples are logged in batches while the body is read, and the response "
+                "reports the samples which could not be decoded and whether the rate limit was reached.",
+)
+async def log_data_stream(
+    model_version_id: int,
+    request: Request,
+    user: User = Depends(CurrentActiveUser()),
+    session: AsyncSession = AsyncSessionDep,
+    data_ingest: DataIngestionBackend = DataIngestionDep,
+    resources_provider: ResourcesProvider = ResourcesProviderDep
+):
+    """Insert data samples streamed in the request body."""
+    model_version: ModelVersion = await fetch_or_404(
+        session,
+        ModelVersion,
+        id=model_version_id,
+        options=joinedload(ModelVersion.model)
+    )
+    if resources_provider.get_features_control(user).model_assignment:
+        await ModelVersion.assert_user_assigend_to_model(session, model_version_id, user)
+
+    media_type = request.headers.get("content-type", "").split(";")[0].strip()
+    decoder = create_stream_decoder(media_type, STREAM_MAX_SAMPLE_BYTES)
+    minute_rate = resources_provider.get_features_control(user).rows_per_minute
+    num_saved = 0
+    rate_limited = False
+
+    async def log_batch(batch):
+        nonlocal num_saved, rate_limited
+        if rate_limited:
+            return
+        time = pdl.now()
+        # Atomically getting the count and increasing in order to avoid race conditions
+        curr_count = resources_provider.cache_functions.get_and_incr_user_rate_count(user, time, len(batch))
+        remains = minute_rate - curr_count
+        if remains < len(batch):
+            # The rest of the stream is still read, in order to report it, but is not logged
+            rate_limited = True
+            batch = batch[:max(remains, 0)]
+        if batch:
+            await data_ingest.log_samples(model_version, batch, session, user.organization_id, time)
+            # Committing each batch, so a large upload does not hold a single long transaction
+            await session.commit()
+            num_saved += len(batch)
+
+    # The body is read only after the previous batch was logged, so a fast client is slowed down by the
+    # socket buffers filling up, instead of the server buffering the upload
+    batch = []
+    async for chunk in request.stream():
+        batch.extend(decoder.feed(chunk))
+        while len(batch) >= STREAM_BATCH_SIZE:
+            await log_batch(batch[:STREAM_BATCH_SIZE])
+            batch = batch[STREAM_BATCH_SIZE:]
+    batch.extend(decoder.close())
+    if batch:
+        await log_batch(batch)
+
+    if decoder.samples_count == 0 and decoder.errors_count == 0:
+        return ORJSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"detail": "Got empty stream"}
+        )
+
+    await resources_provider.report_mixpanel_event(
+        ProductionDataUploadEvent.create_event,
+        model_version=model_version,
+        user=user,
+        n_of_received_samples=decoder.samples_count,
+        n_of_accepted_samples=num_saved
+    )
+
+    report = {
+        "num_received": decoder.samples_count,
+        "num_saved": num_saved,
+        "num_decoding_errors": decoder.errors_count,
+        "decoding_errors": decoder.errors,
+        "rate_limited": rate_limited
+    }
+    if rate_limited:
+        return ORJSONResponse(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            content={
+                "error_message": (
+                    f"Rate limit exceeded, you can send {minute_rate} rows per minute. "
+                    f"{num_saved} first rows were received"
+                ),
+                "additional_information": report
+            }
+        )
+    return ORJSONResponse(status_code=status.HTTP_200_OK, content=report)
+
+
 @router.put("/model/{model_id}/labels", tags=[Tags.DATA])
 async def log_labels(
     model_id: int,  # pylint: disable=unused-argument
@@ -185,6 +350,11 @@ async def log_labels(
     return Response(status_code=status.HTTP_200_OK)
 
 
+# Reference samples are validated and copied into the reference table in chunks of this size
+REFERENCE_CHUNK_SIZE = 10_000
+REFERENCE_READ_SIZE = 1024 * 1024
+
+
 @router.post(
     "/model-versions/{model_version_id}/reference",
     dependencies=[Depends(limit_request_size(20_000_000))],
@@ -211,7 +381,7 @@ async def save_reference(
         database session instance
     """
     max_samples = 100_000
-    ref_table = model_version.get_reference_table(session)
+    ref_table = model_version.get_reference_table()
     n_of_samples_query = select(count()).select_from(ref_table)
     current_samples = await session.scalar(n_of_samples_query)
     limit_exceeded_message = "Maximum allowed number of reference data samples is already uploaded"
@@ -221,36 +391,6 @@ async def save_reference(
     if current_samples >= max_samples:
         raise BadRequest(limit_exceeded_message)
 
-    content = await batch.read()
-
-    reference_batch = t.cast(pd.DataFrame, pd.read_json(
-        StringIO(content.decode()),
-        orient="split",
-        convert_axes=False,
-        dtype=False,
-        convert_dates=False
-    ))
-
-    reference_batch = reference_batch.replace(np.NaN, pd.NA).where(reference_batch.notnull(), None)
-    items = []
-
-    validator = t.cast(t.Callable[..., t.Any], fastjsonschema.compile(model_version.reference_json_schema))
-
-    for _, row in reference_batch.iterrows():
-        item = row.to_dict()
-        try:
-            validator(item)
-        except fastjsonschema.JsonSchemaValueException as e:
-            raise BadRequest(f"Invalid reference data: {e}") from e
-        else:
-            # TODO:
-            # 'asyncpg' driver requires values for date columns to be passed as a datetime|date instances
-            # this fact is a limitation for us, date parsing takes a lot of time and we actually doing
-            # it twice here, first time it is done by the 'fastjsonschema' and second time by us with help of
-            # the 'datetime_sample_formatter' function.
-            datetime_sample_formatter(item, model_version)
-            items.append(item)
-
     # lock will be released automatically at transaction commit/rollback
     reference_table_name = model_version.get_reference_table_name()
     reference_table_id = text(f"'{reference_table_name}'::regclass::oid::integer")
@@ -262,23 +402,67 @@ async def save_reference(
     if n_of_samples > max_samples:
         raise BadRequest(limit_exceeded_message)
 
-    # trim received data to ensure the limit of 100_000 records
-    if (len(items) + n_of_samples) > max_samples:
-        items = items[:max_samples - n_of_samples]
-
-    # calculate balance_classes and set on model version
-    existing_labels = (await session.execute(select(ref_table.c[SAMPLE_LABEL_COL]))).scalars().all()
-    new_labels = pd.Series([x.get(SAMPLE_LABEL_COL) for x in items])
-    all_labels = pd.concat([new_labels, pd.Series(existing_labels)], axis=0)
-    label_counts = all_labels.dropna().value_counts(normalize=True)
-    # Only for binary now
-    model_version.balance_classes = label_counts.shape[0] == 2 and label_counts.iloc[0] >= 0.95
-
-    updated_statistics = copy.deepcopy(model_version.statistics)
-    for sample in items:
-        update_statistics_from_sample(updated_statistics, sample)
-    if model_version.statistics != updated_statistics:
-        await model_version.update_statistics(updated_statistics)
-
-    await session.execute(ref_table.insert(), items)
+    # Label counts are kept on the version, in order to update balance_classes without reading the existing labels
+    count_labels = model_version.private_reference_columns.get(SAMPLE_LABEL_COL) == ColumnType.CATEGORICAL.value
+    label_counts = None
+    if count_labels:
+        label_counts = model_version.reference_label_counts
+        if label_counts is None:
+            label_counts = dict((await session.execute(
+                select(ref_table.c[SAMPLE_LABEL_COL], count())
+                .where(ref_table.c[SAMPLE_LABEL_COL].isnot(None))
+                .group_by(ref_table.c[SAMPLE_LABEL_COL])
+            )).all())
+        label_counts = collections.Counter(label_counts)
+
+    validator = model_version.get_reference_validator()
+
+    async def copy_rows(rows, columns):
+        chunk = pd.DataFrame(rows, columns=columns)
+        chunk = chunk.replace(np.NaN, pd.NA).where(chunk.notnull(), None)
+        validated_chunk = validator(chunk)
+        invalid_samples_errors = validated_chunk.errors.dropna()
+        if len(invalid_samples_errors) > 0:
+            raise BadRequest(f"Invalid reference data: {invalid_samples_errors.iloc[0]}")
+        samples = validated_chunk.samples
+
+        if count_labels:
+            label_counts.update(samples[SAMPLE_LABEL_COL].dropna().value_counts().to_dict())
+        await add_statistics_delta(session, model_version.id,
+                                   statistics_from_batch(model_version.statistics, samples))
+        await copy_records_to_table(session, ref_table, records=frame_to_records(samples, samples.columns),
+                                    columns=list(samples.columns))
+
+    # The uploaded json is decoded while it is read, and its rows are validated and copied in chunks, so the
+    # whole upload is never held in memory. Rows beyond the limit of 100_000 records are not even decoded.
+    # The transaction is rolled back if any of the rows is invalid.
+    decoder = SplitJsonDecoder()
+
+    def decode(content: bytes):
+        try:
+            return decoder.feed(content) if content else decoder.close()
+        except ValueError as e:
+            raise BadRequest(f"Failed to read the reference data: {e}") from e
+
+    remains = max_samples - n_of_samples
+    rows = []
+    while remains > 0:
+        content = await batch.read(REFERENCE_READ_SIZE)
+        rows.extend(decode(content))
+        while remains > 0 and (len(rows) >= min(REFERENCE_CHUNK_SIZE, remains) or (rows and not content)):
+            n_of_rows = min(REFERENCE_CHUNK_SIZE, remains, len(rows))
+            await copy_rows(rows[:n_of_rows], decoder.columns)
+            rows, remains = rows[n_of_rows:], remains - n_of_rows
+        if not content:
+            break
+
+    if count_labels:
+        model_version.reference_label_counts = dict(label_counts)
+        total = sum(label_counts.values())
+        # Only for binary now
+        model_version.balance_classes = len(label_counts) == 2 and max(label_counts.values()) / total >= 0.95
+    else:
+        model_version.balance_classes = False
+
+    await fold_statistics_deltas(session, model_version.id)
     return Response(status_code=status.HTTP_200_OK)
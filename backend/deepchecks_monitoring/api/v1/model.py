@@ -34,6 +34,7 @@ from deepchecks_monitoring.exceptions import BadRequest, PaymentRequired
 from deepchecks_monitoring.features_control import FeaturesControl
 from deepchecks_monitoring.logic.check_logic import MAX_FEATURES_TO_RETURN
 from deepchecks_monitoring.logic.monitor_alert_logic import AlertsCountPerModel
+from deepchecks_monitoring.logic.monitor_partitions import PARTITION_INTERVALS
 from deepchecks_monitoring.monitoring_utils import ExtendedAsyncSession as AsyncSession
 from deepchecks_monitoring.monitoring_utils import (IdResponse, ModelIdentifier, NameIdResponse, TimeUnit, fetch_or_404,
                                                     field_length)
@@ -44,13 +45,14 @@ from deepchecks_monitoring.resources import ResourcesProvider
 from deepchecks_monitoring.schema_models import Model, ModelNote
 from deepchecks_monitoring.schema_models.alert import Alert
 from deepchecks_monitoring.schema_models.alert_rule import AlertRule, AlertSeverity
+from deepchecks_monitoring.schema_models.artifacts import invalidate_model_artifacts, invalidate_model_version_artifacts
 from deepchecks_monitoring.schema_models.check import Check
 from deepchecks_monitoring.schema_models.column_type import SAMPLE_ID_COL, SAMPLE_LABEL_COL, SAMPLE_TS_COL
 from deepchecks_monitoring.schema_models.ingestion_errors import IngestionError
-from deepchecks_monitoring.schema_models.model import TaskType
+from deepchecks_monitoring.schema_models.model import SAMPLES_MAP_HOUR_COL, TaskType
 from deepchecks_monitoring.schema_models.model_memeber import ModelMember
 from deepchecks_monitoring.schema_models.model_version import ColumnMetadata, ModelVersion
-from deepchecks_monitoring.schema_models.monitor import Monitor, round_up_datetime
+from deepchecks_monitoring.schema_models.monitor import Frequency, Monitor, round_up_datetime
 from deepchecks_monitoring.utils import auth
 from deepchecks_monitoring.utils.mixpanel import ModelCreatedEvent, ModelDeletedEvent
 
@@ -94,6 +96,8 @@ class ModelSchema(BaseModel):
     alerts_delay_labels_ratio: float
     alerts_delay_seconds: int
     obj_store_path: t.Optional[str]
+    monitor_partition_interval: t.Optional[Frequency]
+    data_retention_days: t.Optional[int]
 
     class Config:
         """Config for Model schema."""
@@ -111,6 +115,19 @@ class ModelCreationSchema(BaseModel):
     alerts_delay_seconds: int
     notes: t.Optional[t.List[ModelNoteCreationSchema]] = None
     obj_store_path: t.Optional[str]
+    # Partition the monitor tables of the model versions by the samples timestamp
+    monitor_partition_interval: t.Optional[Frequency] = None
+    # Samples older than the given number of days are removed
+    data_retention_days: t.Optional[int] = Field(default=None, gt=0)
+
+    @validator("monitor_partition_interval")
+    @classmethod
+    def validate_monitor_partition_interval(cls, value):
+        """Validate monitor tables partition interval."""
+        if value is not None and value not in PARTITION_INTERVALS:
+            intervals = ", ".join(it.value for it in PARTITION_INTERVALS)
+            raise ValueError(f"Monitor tables can be partitioned by one of: {intervals}")
+        return value
 
     class Config:
         """Config for Model schema."""
@@ -209,10 +226,12 @@ async def get_create_model(
         # Create model tables
         labels_table = model.get_sample_labels_table(session)
         versions_map_table = model.get_samples_versions_map_table(session)
+        samples_reservoir_table = model.get_samples_reservoir_table(session)
 
         connection = await session.connection()
         await connection.run_sync(labels_table.metadata.create_all)
         await connection.run_sync(versions_map_table.metadata.create_all)
+        await connection.run_sync(samples_reservoir_table.metadata.create_all)
         await session.commit()
 
         await resources_provider.report_mixpanel_event(
@@ -336,28 +355,47 @@ async def _retrieve_models_data_ingestion(
     for model in models:
         if model.end_time < end_time - pdl.duration(seconds=time_filter):
             continue
-        tables = [version.get_monitor_table(session) for version in model.versions]
+        tables = [version.get_monitor_table() for version in model.versions]
         if not tables:
             continue
 
         labels_table = model.get_sample_labels_table(session)
-        # Get all samples within time window from all the versions
-        data_query = sa.union_all(
-            *(
+        if agg_time_unit == "minute":
+            # Get all samples within time window from all the versions
+            data_query = sa.union_all(
+                *(
+                    sa.select(
+                        sa.func.count().label("count"),
+                        sa.func.count(_sample_id(labels_table.c)).label("label_count"),
+                        truncate_date(_sample_timestamp(table.c), agg_time_unit).label("timestamp"),
+                    )
+                    .where(is_within_dateframe(
+                        _sample_timestamp(table.c),
+                        end_time
+                    ))
+                    .join(labels_table, onclause=_sample_id(table.c) == _sample_id(labels_table.c), isouter=True)
+                    .group_by(_sample_timestamp(table.c))
+                    for table in tables
+                )
+            ).subquery()
+        else:
+            # Hourly or coarser aggregation only needs the hour of the samples, which is kept by the samples
+            # versions map, so the monitor tables of the versions are not scanned
+            versions_map_table = model.get_samples_versions_map_table(session)
+            sample_hour = versions_map_table.c[SAMPLES_MAP_HOUR_COL]
+            data_query = (
                 sa.select(
                     sa.func.count().label("count"),
                     sa.func.count(_sample_id(labels_table.c)).label("label_count"),
-                    truncate_date(_sample_timestamp(table.c), agg_time_unit).label("timestamp"),
+                    truncate_date(sample_hour, agg_time_unit).label("timestamp"),
                 )
-                .where(is_within_dateframe(
-                    _sample_timestamp(table.c),
-                    end_time
-                ))
-                .join(labels_table, onclause=_sample_id(table.c) == _sample_id(labels_table.c), isouter=True)
-                .group_by(_sample_timestamp(table.c))
-                for table in tables
+                .where(is_within_dateframe(sample_hour + sa.literal_column("interval '1 hour'"), end_time),
+                       versions_map_table.c.version_id.in_([version.id for version in model.versions]))
+                .join(labels_table, onclause=_sample_id(versions_map_table.c) == _sample_id(labels_table.c),
+                      isouter=True)
+                .group_by(sample_hour)
+                .subquery()
             )
-        )
         q = sa.select(
             sa.literal(int(model.id)).label("model_id"),
             data_query.c.timestamp,
@@ -631,11 +669,14 @@ async def delete_model(
 
     organization_schema = user.organization.schema_name
     tables = [f'"{organization_schema}"."{model.get_sample_labels_table_name()}"',
-              f'"{organization_schema}"."{model.get_samples_versions_map_table_name()}"']
+              f'"{organization_schema}"."{model.get_samples_versions_map_table_name()}"',
+              f'"{organization_schema}"."{model.get_samples_reservoir_table_name()}"']
 
     for version in model.versions:
         tables.append(f'"{organization_schema}"."{version.get_monitor_table_name()}"')
         tables.append(f'"{organization_schema}"."{version.get_reference_table_name()}"')
+        invalidate_model_version_artifacts(version.id)
+    invalidate_model_artifacts(model.id)
 
     await insert_delete_db_table_task(session=session, full_table_paths=tables)
     await session.execute(sa.delete(Model).where(model_identifier.as_expression))
@@ -678,14 +719,15 @@ async def get_model_columns(
         return {}
 
     latest_version: ModelVersion = model.versions[0]
+    statistics = (await latest_version.get_state_with_pending_deltas()).statistics
     column_dict: t.Dict[str, ColumnMetadata] = {}
 
     sorted_features = latest_version.get_top_features(MAX_FEATURES_TO_RETURN)[0]
     for col_name in sorted_features:
         column_dict[col_name] = ColumnMetadata(type=latest_version.features_columns[col_name],
-                                               stats=latest_version.statistics.get(col_name, {}))
+                                               stats=statistics.get(col_name, {}))
     for (col_name, col_type) in latest_version.additional_data_columns.items():
-        column_dict[col_name] = ColumnMetadata(type=col_type, stats=latest_version.statistics.get(col_name, {}))
+        column_dict[col_name] = ColumnMetadata(type=col_type, stats=statistics.get(col_name, {}))
     return column_dict
 
 
@@ -788,30 +830,29 @@ async def retrieve_connected_models(
     for record in records:
         model = record[0]
 
-        tables = [version.get_monitor_table(session) for version in model.versions]
-
         sample_count = 0
         label_count = 0
         label_ratio = 0
 
-        if len(tables) > 0:
+        if len(model.versions) > 0:
             labels_table = model.get_sample_labels_table(session)
-
-            for table in tables:
-                query = (
-                    sa.select(
-                        sa.func.count().label("count"),
-                        sa.func.count(_sample_id(labels_table.c)).label("label_count"))
-                    .select_from(table)
-                    .join(
-                        labels_table,
-                        onclause=_sample_id(table.c) == _sample_id(labels_table.c),
-                        isouter=True
-                    )
+            versions_map_table = model.get_samples_versions_map_table(session)
+            # The samples versions map has a row per sample of each version, same as the monitor tables
+            query = (
+                sa.select(
+                    sa.func.count().label("count"),
+                    sa.func.count(_sample_id(labels_table.c)).label("label_count"))
+                .select_from(versions_map_table)
+                .join(
+                    labels_table,
+                    onclause=_sample_id(versions_map_table.c) == _sample_id(labels_table.c),
+                    isouter=True
                 )
-                row = (await session.execute(query)).first()
-                sample_count += row.count
-                label_count += row.label_count
+                .where(versions_map_table.c.version_id.in_([version.id for version in model.versions]))
+            )
+            row = (await session.execute(query)).first()
+            sample_count = row.count
+            label_count = row.label_count
 
         label_ratio = sample_count and label_count / sample_count
 
@@ -31,16 +31,19 @@ from deepchecks_monitoring.dependencies import AsyncSessionDep, ResourcesProvide
 from deepchecks_monitoring.exceptions import BadRequest, is_unique_constraint_violation_error
 from deepchecks_monitoring.logic.check_logic import (SingleCheckRunOptions, TableDataSchema, WindowDataSchema,
                                                      create_execution_data_query)
+from deepchecks_monitoring.logic.monitor_partitions import build_monitor_table
 from deepchecks_monitoring.logic.suite_logic import run_suite_for_model_version
 from deepchecks_monitoring.monitoring_utils import (ExtendedAsyncSession, IdentifierKind, IdResponse, ModelIdentifier,
                                                     ModelVersionIdentifier, exists_or_404, fetch_or_404, field_length)
 from deepchecks_monitoring.public_models.organization import Organization
 from deepchecks_monitoring.public_models.user import User
 from deepchecks_monitoring.resources import ResourcesProvider
+from deepchecks_monitoring.schema_models.artifacts import invalidate_model_version_artifacts
 from deepchecks_monitoring.schema_models.column_type import (REFERENCE_SAMPLE_ID_COL, SAMPLE_ID_COL, SAMPLE_LABEL_COL,
                                                              SAMPLE_LOGGED_TIME_COL, SAMPLE_PRED_PROBA_COL,
-                                                             SAMPLE_TS_COL, ColumnType, column_types_to_table_columns,
-                                                             get_label_column_type, get_predictions_columns_by_type)
+                                                             SAMPLE_TS_COL, ColumnType, MonitorIndexMethod,
+                                                             column_types_to_table_columns, get_label_column_type,
+                                                             get_predictions_columns_by_type)
 from deepchecks_monitoring.schema_models.model import Model, TaskType
 from deepchecks_monitoring.schema_models.model_version import ModelVersion
 from deepchecks_monitoring.utils import auth
@@ -61,6 +64,10 @@ class ModelVersionCreationSchema(BaseModel):
     feature_importance: t.Optional[t.Dict[str, float]] = None
     classes: t.Optional[t.List[str]] = None
     label_map: t.Optional[t.Dict[int, str]] = None
+    # Every index of the monitor table is updated on each insert, so only the sample timestamp is indexed by
+    # default. Columns which are used to filter or segment the data can be indexed in addition.
+    indexed_columns: t.List[str] = Field(default_factory=list)
+    time_index_method: MonitorIndexMethod = MonitorIndexMethod.BTREE
 
     class Config:
         """Config for ModelVersion schema."""
@@ -153,6 +160,15 @@ async def get_or_create_version(
         raise BadRequest(f'Can\'t use the following names for columns: {intersects_columns}')
 
     monitor_table_columns = {**meta_columns, **predictions_cols, **info.additional_data, **info.features}
+
+    # Validate indexed columns
+    unknown_columns = set(info.indexed_columns).difference(monitor_table_columns.keys())
+    if unknown_columns:
+        raise BadRequest(f'indexed_columns contains unknown columns: {unknown_columns}')
+    array_columns = [name for name in info.indexed_columns
+                     if monitor_table_columns[name] in {ColumnType.ARRAY_FLOAT, ColumnType.ARRAY_FLOAT_2D}]
+    if array_columns:
+        raise BadRequest(f'Can\'t index array columns: {array_columns}')
     # For the reference we save the label directly in the table
     label_col = {SAMPLE_LABEL_COL: get_label_column_type(TaskType(model.task_type))}
     ref_table_columns = {**predictions_cols, **info.additional_data, **info.features, **label_col}
@@ -219,6 +235,9 @@ async def get_or_create_version(
         label_map=label_map,
         private_columns=private_columns,
         private_reference_columns=private_reference_columns,
+        monitor_partition_interval=model.monitor_partition_interval,
+        monitor_indexed_columns=sorted(set(info.indexed_columns)),
+        monitor_time_index_method=info.time_index_method,
         created_by=user.id,
         updated_by=user.id
     )
@@ -227,16 +246,13 @@ async def get_or_create_version(
     # flushing to get an id for the model version, used to create the monitor + reference table names.
     await session.flush()
 
-    # Monitor data table
-    monitor_table_columns_sqlalchemy = column_types_to_table_columns({**monitor_table_columns, **private_columns})
-    monitor_table_name = model_version.get_monitor_table_name()
-
-    # using hash index in queries to get random order of samples, so adding index for it
-    monitor_table = Table(
-        monitor_table_name,
-        MetaData(),
-        *monitor_table_columns_sqlalchemy,
-        Index(f'_{monitor_table_name}_hashtext_index', text(f'hashtext({SAMPLE_ID_COL})'))
+    # Monitor data table, partitions of partitioned tables are created by the ingestion
+    monitor_table = build_monitor_table(
+        model_version.get_monitor_table_name(),
+        {**monitor_table_columns, **private_columns},
+        model_version.monitor_partition_interval,
+        model_version.monitor_indexed_columns,
+        model_version.monitor_time_index_method
     )
     await session.execute(CreateTable(monitor_table))
     # Create indices
@@ -340,6 +356,7 @@ async def update_model_version(
             raise BadRequest('version with provided name already exists') from error
         else:
             raise
+    invalidate_model_version_artifacts(model_version_id)
 
 
 class ModelVersionSchema(BaseModel):
@@ -359,6 +376,8 @@ class ModelVersionSchema(BaseModel):
     classes: t.Optional[t.List[str]]
     label_map: t.Optional[t.Dict[int, str]]
     balance_classes: bool
+    monitor_indexed_columns: t.Optional[t.List[str]]
+    monitor_time_index_method: MonitorIndexMethod
 
     class Config:
         """Schema config."""
@@ -378,7 +397,7 @@ async def retrieve_model_version_by_id(
         model_version: ModelVersion = Depends(ModelVersion.get_object_from_http_request),
 ) -> ModelVersionSchema:
     """Retrieve model version record."""
-    return ModelVersionSchema.from_orm(model_version)
+    return await _model_version_schema_with_pending_deltas(model_version)
 
 
 @router.get(
@@ -400,7 +419,15 @@ async def retrieve_model_version_by_name(
     model_version = await fetch_or_404(session, ModelVersion, name=version_name, model_id=model.id)
     if resources_provider.get_features_control(user).model_assignment:
         await ModelVersion.assert_user_assigend_to_model(session, model_version.id, user)
-    return ModelVersionSchema.from_orm(model_version)
+    return await _model_version_schema_with_pending_deltas(model_version)
+
+
+async def _model_version_schema_with_pending_deltas(model_version: ModelVersion) -> ModelVersionSchema:
+    # The statistics and timestamps of recently ingested batches might not be folded into the version yet
+    state = await model_version.get_state_with_pending_deltas()
+    return ModelVersionSchema.from_orm(model_version).copy(update={
+        'statistics': state.statistics, 'start_time': state.start_time, 'end_time': state.end_time
+    })
 
 
 @router.get('/model-versions/{model_version_id}/schema',
@@ -628,7 +655,7 @@ async def get_time_window_statistics(
     """
     model_version: ModelVersion = await fetch_or_404(session, ModelVersion, options=joinedload(ModelVersion.model),
                                                      id=model_version_id)
-    test_table = model_version.get_monitor_table(session)
+    test_table = model_version.get_monitor_table()
     sample_labels_table = model_version.model.get_sample_labels_table(session)
     sample_id = test_table.c[SAMPLE_ID_COL]
     sample_label = sample_labels_table.c[SAMPLE_LABEL_COL]
@@ -753,7 +780,14 @@ async def _delete_model_version(
         model_version = await fetch_or_404(session, ModelVersion, **version_identifier.as_kwargs)
     if resources_provider.get_features_control(user).model_assignment:
         await ModelVersion.assert_user_assigend_to_model(session, model_version.id, user)
+    model = await session.get(Model, model_version.model_id)
     await session.delete(model_version)
+    invalidate_model_version_artifacts(model_version.id)
     tables = [f'"{organization.schema_name}"."{model_version.get_monitor_table_name()}"',
               f'"{organization.schema_name}"."{model_version.get_reference_table_name()}"']
-    await insert_delete_db_table_task(session=session, full_table_paths=tables)
+    # The rows of the version in the model tables are deleted along with its tables, the readers of the model
+    # tables only count the rows of the existing versions meanwhile
+    model_tables = [f'"{organization.schema_name}"."{model.get_samples_versions_map_table_name()}"',
+                    f'"{organization.schema_name}"."{model.get_samples_reservoir_table_name()}"']
+    await insert_delete_db_table_task(session=session, full_table_paths=tables,
+                                      model_version_rows=(model_version.id, model_tables))
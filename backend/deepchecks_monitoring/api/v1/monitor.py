@@ -323,7 +323,12 @@ async def run_monitor_lookback(
             session=session,
             check_id=t.cast(int, monitor.check_id),
             monitor_options=options,
-            organization_id=t.cast(int, user.organization_id)
+            organization_id=t.cast(int, user.organization_id),
+            single_scan=resources_provider.settings.check_windows_single_scan,
+            prefetch_data=resources_provider.settings.parallel_check_executor_prefetch_data,
+            n_of_workers=resources_provider.settings.total_number_of_check_executor_actors,
+            inline_max_samples=resources_provider.settings.parallel_check_executor_inline_max_samples,
+            executor=resources_provider.check_processes_pool
         )
 
     return await run_check_per_window_in_range(
@@ -333,4 +338,6 @@ async def run_monitor_lookback(
         monitor_id=monitor_id,
         cache_funcs=cache_funcs,
         organization_id=user.organization_id,
+        single_scan=resources_provider.settings.check_windows_single_scan,
+        executor=resources_provider.check_processes_pool
     )
@@ -181,7 +181,7 @@ def create_application(
                     from deepchecks_monitoring.bgtasks.mixpanel_system_state_event import MixpanelSystemStateEvent
                     await MixpanelSystemStateEvent.enqueue_task(session=session)
 
-        if ingestion_backend.use_kafka:
+        if ingestion_backend.use_kafka and settings.kafka_consumer_in_api:
             app.state.ingestion_task = asyncio.create_task(app.state.data_ingestion_backend.run_data_consumer())
 
             def auto_removal(task):  # pylint: disable=unused-argument
@@ -189,6 +189,20 @@ def create_application(
 
             app.state.ingestion_task.add_done_callback(auto_removal)
 
+        if ingestion_backend.spool is not None:
+            app.state.spool_drainer_task = asyncio.create_task(ingestion_backend.run_spool_drainer())
+
+    @app.on_event("shutdown")
+    async def app_shutdown():
+        resources_provider = t.cast(ResourcesProvider, app.state.resources_provider)
+        if getattr(app.state, "spool_drainer_task", None) is not None:
+            app.state.spool_drainer_task.cancel()
+            await asyncio.gather(app.state.spool_drainer_task, return_exceptions=True)
+        await app.state.data_ingestion_backend.close()
+        if app.state.data_ingestion_backend.use_kafka:
+            await resources_provider.close_kafka_producer()
+        resources_provider.shutdown_check_processes_pool()
+
     # Set deepchecks testing library logging verbosity to error to not spam the logs
     deepchecks.set_verbosity(logging.ERROR)
 
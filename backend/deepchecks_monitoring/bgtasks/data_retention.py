@@ -0,0 +1,187 @@
+# ----------------------------------------------------------------------------
+# Copyright (C) 2021-2022 Deepchecks (https://www.deepchecks.com)
+#
+# This file is part of Deepchecks.
+# Deepchecks is distributed under the terms of the GNU Affero General
+# Public License (version 3 or later).
+# You should have received a copy of the GNU Affero General Public License
+# along with Deepchecks.  If not, see <http://www.gnu.org/licenses/>.
+# ----------------------------------------------------------------------------
+#
+"""Contains the data retention worker, removing the samples older than the models retention period."""
+import asyncio
+import typing as t
+
+import pendulum as pdl
+import sqlalchemy as sa
+from redis.client import Redis
+from redis.exceptions import RedisError
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from deepchecks_monitoring.logic.keys import build_monitor_cache_key, get_invalidation_set_key, parse_monitor_cache_key
+from deepchecks_monitoring.logic.monitor_partitions import drop_monitor_partitions_before
+from deepchecks_monitoring.monitoring_utils import configure_logger
+from deepchecks_monitoring.public_models.organization import Organization
+from deepchecks_monitoring.public_models.task import UNIQUE_NAME_TASK_CONSTRAINT, BackgroundWorker, Task
+from deepchecks_monitoring.schema_models import Model, ModelVersion
+from deepchecks_monitoring.schema_models.column_type import SAMPLE_ID_COL, SAMPLE_TS_COL
+from deepchecks_monitoring.schema_models.model import SAMPLES_MAP_HOUR_COL
+from deepchecks_monitoring.utils import database
+
+__all__ = ['DataRetentionWorker', 'apply_data_retention', 'insert_data_retention_task']
+
+
+QUEUE_NAME = 'data retention'
+DELAY = 0
+# Minimal time between two retention runs of a model
+RETENTION_RUN_INTERVAL = pdl.duration(hours=12)
+# Number of keys redis checks per iteration of the monitors cache scan
+CACHE_SCAN_COUNT = 1000
+
+
+class DataRetentionWorker(BackgroundWorker):
+    """Worker to remove from the model tables the samples older than the model's data retention period."""
+
+    def __init__(self):
+        super().__init__()
+        self.logger = configure_logger(self.__class__.__name__)
+
+    @classmethod
+    def queue_name(cls) -> str:
+        return QUEUE_NAME
+
+    @classmethod
+    def delay_seconds(cls) -> int:
+        return DELAY
+
+    async def run(self, task: 'Task', session: AsyncSession, resources_provider, lock):
+        await session.execute(sa.delete(Task).where(Task.id == task.id))
+
+        model_id = task.params['model_id']
+        org_id = task.params['organization_id']
+
+        self.logger.info({'message': 'starting job', 'worker name': str(type(self)),
+                          'task': task.id, 'model': model_id, 'org_id': org_id})
+
+        organization_schema = (await session.execute(
+            sa.select(Organization.schema_name).where(Organization.id == org_id)
+        )).scalar_one_or_none()
+
+        # If organization was removed its data was removed with it
+        if organization_schema is None:
+            await session.commit()
+            return
+
+        await database.attach_schema_switcher_listener(
+            session=session,
+            schema_search_path=[organization_schema, 'public']
+        )
+        model: Model = await session.scalar(
+            sa.select(Model).where(Model.id == model_id).options(selectinload(Model.versions))
+        )
+        if model is not None and model.data_retention_days is not None:
+            cutoff = pdl.now('UTC').start_of('day').subtract(days=model.data_retention_days)
+            removed = await apply_data_retention(session, model, cutoff)
+            model.data_retention_last_run_time = pdl.now()
+            await session.commit()
+            if resources_provider.redis_client is not None:
+                # The redis client is blocking, so the cache is scanned in a thread
+                await asyncio.to_thread(self._trim_redis_cache, resources_provider.redis_client, org_id,
+                                        [v.id for v in model.versions], cutoff)
+            self.logger.info({'message': 'removed samples older than retention period', 'model': model_id,
+                              'org_id': org_id, 'cutoff': cutoff.to_iso8601_string(), **removed})
+        else:
+            await session.commit()
+
+        self.logger.info({'message': 'finished job', 'worker name': str(type(self)),
+                          'task': task.id, 'model': model_id, 'org_id': org_id})
+
+    def _trim_redis_cache(self, redis: Redis, organization_id: int, model_versions_ids: t.List[int],
+                          cutoff: 'pdl.DateTime'):
+        """Remove invalidation timestamps and monitors cache entries of windows which ended before the cutoff."""
+        cutoff_ts = cutoff.int_timestamp
+        try:
+            for model_version_id in model_versions_ids:
+                invalidation_set_key = get_invalidation_set_key(organization_id, model_version_id)
+                old_timestamps = [ts for ts in redis.zrange(invalidation_set_key, start=0, end=-1)
+                                  if int(ts) < cutoff_ts]
+                pipe = redis.pipeline()
+                if old_timestamps:
+                    pipe.zrem(invalidation_set_key, *old_timestamps)
+                monitor_pattern = build_monitor_cache_key(organization_id, model_version_id, None, None, None)
+                for monitor_cache_key in redis.scan_iter(match=monitor_pattern, count=CACHE_SCAN_COUNT):
+                    *_, end_ts = parse_monitor_cache_key(monitor_cache_key)
+                    if end_ts <= cutoff_ts:
+                        # Must delete keys separately since RedisCluster does not support multi-delete
+                        pipe.delete(monitor_cache_key)
+                pipe.execute()
+        except RedisError:
+            self.logger.exception({'message': 'failed to trim redis cache', 'org_id': organization_id})
+
+
+async def apply_data_retention(session: AsyncSession, model: Model, cutoff: 'pdl.DateTime') -> t.Dict[str, t.Any]:
+    """Remove the samples older than the cutoff from the monitor tables, samples map, reservoir and labels table.
+
+    Old time partitions of partitioned monitor tables are dropped, the rows of not partitioned tables are deleted.
+    The labels of samples which are no longer logged by any version are deleted with the samples versions map rows.
+    """
+    dropped_partitions = []
+    deleted_samples = 0
+    for version in model.versions:
+        if version.monitor_partition_interval is not None:
+            dropped_partitions.extend(await drop_monitor_partitions_before(
+                session, version.get_monitor_table_name(), version.monitor_partition_interval, cutoff
+            ))
+        else:
+            monitor_table = version.get_monitor_table()
+            deleted_samples += (await session.execute(
+                sa.delete(monitor_table).where(monitor_table.c[SAMPLE_TS_COL] < cutoff)
+            )).rowcount
+
+    versions_map = model.get_samples_versions_map_table(session)
+    labels_table = model.get_sample_labels_table(session)
+    removed_ids = (
+        sa.delete(versions_map)
+        .where(versions_map.c[SAMPLES_MAP_HOUR_COL] < cutoff)
+        .returning(versions_map.c[SAMPLE_ID_COL])
+        .cte('removed_ids')
+    )
+    # The statement sees the map before the deletion, so samples logged again after the cutoff keep their labels
+    retained_ids = sa.select(versions_map.c[SAMPLE_ID_COL]).where(versions_map.c[SAMPLES_MAP_HOUR_COL] >= cutoff)
+    deleted_labels = (await session.execute(
+        sa.delete(labels_table)
+        .where(labels_table.c[SAMPLE_ID_COL].in_(sa.select(removed_ids.c[SAMPLE_ID_COL])),
+               labels_table.c[SAMPLE_ID_COL].notin_(retained_ids))
+        .add_cte(removed_ids)
+    )).rowcount
+
+    samples_reservoir = model.get_samples_reservoir_table(session)
+    await session.execute(sa.delete(samples_reservoir).where(samples_reservoir.c[SAMPLES_MAP_HOUR_COL] < cutoff))
+
+    # The remaining data starts at the cutoff
+    await session.execute(
+        sa.update(ModelVersion)
+        .where(ModelVersion.model_id == model.id, ModelVersion.start_time < cutoff, ModelVersion.end_time >= cutoff)
+        .values({ModelVersion.start_time: cutoff})
+        .execution_options(synchronize_session=False)
+    )
+    await session.execute(
+        sa.update(Model)
+        .where(Model.id == model.id, Model.start_time < cutoff, Model.end_time >= cutoff)
+        .values({Model.start_time: cutoff})
+        .execution_options(synchronize_session=False)
+    )
+
+    return {'dropped_partitions': dropped_partitions, 'deleted_samples': deleted_samples,
+            'deleted_labels': deleted_labels}
+
+
+async def insert_data_retention_task(organization_id: int, model_id: int, session: AsyncSession):
+    """Insert task to remove the model samples which are older than its retention period."""
+    params = {'organization_id': organization_id, 'model_id': model_id}
+    values = dict(name=f'{organization_id}:{model_id}', bg_worker_task=QUEUE_NAME, params=params)
+    return await session.scalar(insert(Task).values(values)
+                                .on_conflict_do_nothing(constraint=UNIQUE_NAME_TASK_CONSTRAINT)
+                                .returning(Task.id))
@@ -42,16 +42,35 @@ class DeleteDbTableTask(BackgroundWorker):
         self.logger.info({'message': 'started job', 'worker name': str(type(self))})
         for table in task.params['full_table_paths']:
             await session.execute(text(f'DROP TABLE IF EXISTS {table}'))
+        model_version_rows = task.params.get('model_version_rows')
+        if model_version_rows is not None:
+            for table in model_version_rows['full_table_paths']:
+                await session.execute(text(f'DELETE FROM {table} WHERE version_id = :version_id'),
+                                      {'version_id': model_version_rows['model_version_id']})
         # Deleting the task
         await session.execute(delete(Task).where(Task.id == task.id))
         self.logger.info({'message': 'finished job', 'worker name': str(type(self))})
 
 
-async def insert_delete_db_table_task(session: AsyncSession, full_table_paths: t.List[str]):
+async def insert_delete_db_table_task(
+    session: AsyncSession,
+    full_table_paths: t.List[str],
+    model_version_rows: t.Optional[t.Tuple[int, t.List[str]]] = None
+):
     """Insert task to delete database table.
 
+    Parameters
+    ----------
+    session : AsyncSession
+    full_table_paths : List[str]
+        tables to drop
+    model_version_rows : Optional[Tuple[int, List[str]]], default None
+        model version id and the tables whose rows of the model version are deleted
     """
     params = {'full_table_paths': full_table_paths}
+    if model_version_rows is not None:
+        model_version_id, rows_table_paths = model_version_rows
+        params['model_version_rows'] = {'model_version_id': model_version_id, 'full_table_paths': rows_table_paths}
     values = dict(name=f'Tables Deletion {str(uuid.uuid4())}', bg_worker_task=QUEUE_NAME,
                   params=params)
 
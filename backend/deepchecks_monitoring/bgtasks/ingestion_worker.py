@@ -0,0 +1,100 @@
+# ----------------------------------------------------------------------------
+# Copyright (C) 2021-2022 Deepchecks (https://www.deepchecks.com)
+#
+# This file is part of Deepchecks.
+# Deepchecks is distributed under the terms of the GNU Affero General
+# Public License (version 3 or later).
+# You should have received a copy of the GNU Affero General Public License
+# along with Deepchecks.  If not, see <http://www.gnu.org/licenses/>.
+# ----------------------------------------------------------------------------
+#
+"""Contains the standalone data ingestion worker, consuming the data topics from kafka."""
+import asyncio
+import signal
+import typing as t
+
+import anyio
+import uvloop
+
+from deepchecks_monitoring.config import Settings
+from deepchecks_monitoring.logic.data_ingestion import DataIngestionBackend
+from deepchecks_monitoring.monitoring_utils import configure_logger
+
+try:
+    from deepchecks_monitoring import ee
+    from deepchecks_monitoring.ee.resources import ResourcesProvider
+
+    with_ee = True
+except ImportError:
+    from deepchecks_monitoring.resources import ResourcesProvider
+
+    with_ee = False
+
+
+class BaseIngestionWorkerSettings():
+    """Ingestion worker settings."""
+
+    logfile: t.Optional[str] = None
+    loglevel: str = 'INFO'
+    logfile_maxsize: int = 10000000  # 10MB
+    logfile_backup_count: int = 3
+
+    class Config:
+        """Model config."""
+
+        env_file = '.env'
+        env_file_encoding = 'utf-8'
+
+
+if with_ee:
+    class IngestionWorkerSettings(BaseIngestionWorkerSettings, ee.config.Settings):
+        """Set of ingestion worker settings."""
+        pass
+else:
+    class IngestionWorkerSettings(BaseIngestionWorkerSettings, Settings):
+        """Set of ingestion worker settings."""
+        pass
+
+
+async def run_ingestion_worker(settings: IngestionWorkerSettings):
+    """Consume the data topics until the worker receives SIGTERM/SIGINT.
+
+    On a signal the worker stops fetching, waits for the messages being handled to be committed
+    and leaves the consumer group, so its partitions are rebalanced to the other workers right away.
+    """
+    service_name = 'ingestion-worker'
+
+    logger = configure_logger(
+        name=service_name,
+        log_level=settings.loglevel,
+        logfile=settings.logfile,
+        logfile_backup_count=settings.logfile_backup_count,
+    )
+
+    if settings.kafka_host is None:
+        raise RuntimeError('Ingestion worker requires kafka, "kafka_host" is not configured')
+
+    async with ResourcesProvider(settings) as rp:
+        ingestion_backend = DataIngestionBackend(rp, logger=logger)
+        consumer_task = asyncio.create_task(ingestion_backend.run_data_consumer())
+        loop = asyncio.get_running_loop()
+        signals = (signal.SIGTERM, signal.SIGINT)
+        for signum in signals:
+            loop.add_signal_handler(signum, consumer_task.cancel)
+        try:
+            await consumer_task
+        except asyncio.CancelledError:
+            logger.info('Ingestion worker stopped')
+        finally:
+            for signum in signals:
+                loop.remove_signal_handler(signum)
+
+
+def execute_worker():
+    """Execute the ingestion worker."""
+    uvloop.install()
+    anyio.run(run_ingestion_worker, IngestionWorkerSettings())
+
+
+if __name__ == '__main__':
+    execute_worker()
@@ -19,9 +19,10 @@ from deepchecks_monitoring.public_models.organization import Organization
 from deepchecks_monitoring.public_models.task import BackgroundWorker, Task
 from deepchecks_monitoring.resources import ResourcesProvider
 from deepchecks_monitoring.schema_models import Model
-from deepchecks_monitoring.schema_models.column_type import SAMPLE_ID_COL, SAMPLE_LABEL_COL, SAMPLE_TS_COL
+from deepchecks_monitoring.schema_models.column_type import SAMPLE_ID_COL, SAMPLE_LABEL_COL
 from deepchecks_monitoring.schema_models.data_ingestion_alert import DataIngestionAlert
 from deepchecks_monitoring.schema_models.data_ingestion_alert_rule import AlertRuleType, DataIngestionAlertRule
+from deepchecks_monitoring.schema_models.model import SAMPLES_MAP_HOUR_COL
 from deepchecks_monitoring.schema_models.monitor import Frequency, as_pendulum_datetime
 from deepchecks_monitoring.utils import database
 from deepchecks_monitoring.utils.alerts import Condition
@@ -99,33 +100,30 @@ class ModelDataIngestionAlerter(BackgroundWorker):
         def sample_id(columns):
             return getattr(columns, SAMPLE_ID_COL)
 
-        def sample_timestamp(columns):
-            return getattr(columns, SAMPLE_TS_COL)
-
         def sample_label(columns):
             return getattr(columns, SAMPLE_LABEL_COL)
 
-        tables = [version.get_monitor_table(
-            session) for version in model.versions]
-        if not tables:
+        if not model.versions:
             return
 
         self.logger.info({'message': 'starting job', 'worker name': str(type(self)),
                           'task': task.id, 'alert_rule_id': alert_rule_id, 'org_id': org_id})
 
         labels_table = model.get_sample_labels_table(session)
-        # Get all samples within time window from all the versions
-        data_query = sa.union_all(*(
-            sa.select(
-                sample_id(table.c).label('sample_id'),
-                truncate_date(sample_timestamp(table.c),
-                              freq.value.lower()).label('timestamp')
-            ).where(
-                sample_timestamp(table.c) <= pdl_end_time,
-                sample_timestamp(table.c) > pdl_start_time
-            ).distinct()
-            for table in tables)
-        )
+        versions_map = model.get_samples_versions_map_table(session)
+        # Get all samples within the [start, end) time window from all the versions, the samples versions map holds
+        # the hour of each sample so the monitor tables are not scanned. The windows are aligned to the frequency,
+        # thus to whole hours, so a sample is counted in the window its time is truncated to, and a sample at the
+        # end of the window is counted by the next one
+        sample_hour = versions_map.c[SAMPLES_MAP_HOUR_COL]
+        data_query = sa.select(
+            sample_id(versions_map.c).label('sample_id'),
+            truncate_date(sample_hour, freq.value.lower()).label('timestamp')
+        ).where(
+            sample_hour < pdl_end_time,
+            sample_hour >= pdl_start_time,
+            versions_map.c.version_id.in_([version.id for version in model.versions])
+        ).subquery()
         joined_query = sa.select(sa.literal(model.id).label('model_id'),
                                  data_query.c.sample_id,
                                  data_query.c.timestamp,
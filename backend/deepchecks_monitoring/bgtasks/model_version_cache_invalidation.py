@@ -15,7 +15,7 @@ from sqlalchemy import delete
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from deepchecks_monitoring.logic.keys import build_monitor_cache_key, get_invalidation_set_key
+from deepchecks_monitoring.logic.keys import build_monitor_cache_key, get_invalidation_set_key, parse_monitor_cache_key
 from deepchecks_monitoring.monitoring_utils import configure_logger
 from deepchecks_monitoring.public_models.task import UNIQUE_NAME_TASK_CONSTRAINT, BackgroundWorker, Task
 
@@ -62,8 +62,7 @@ class ModelVersionCacheInvalidation(BackgroundWorker):
             monitor_pattern = build_monitor_cache_key(org_id, model_version_id, None, None, None)
             keys_to_delete = []
             for monitor_cache_key in redis.scan_iter(match=monitor_pattern):
-                splitted = monitor_cache_key.split(b':')
-                start_ts, end_ts = int(splitted[4]), int(splitted[5])
+                *_, start_ts, end_ts = parse_monitor_cache_key(monitor_cache_key)
                 # Get first timestamp equal or larger than start_ts
                 index = bisect.bisect_left(invalidation_ts, start_ts)
                 # If index is equal to list length, then all timestamps are smaller than start_ts
@@ -0,0 +1,211 @@
+# ----------------------------------------------------------------------------
+# Copyright (C) 2021-2022 Deepchecks (https://www.deepchecks.com)
+#
+# This file is part of Deepchecks.
+# Deepchecks is distributed under the terms of the GNU Affero General
+# Public License (version 3 or later).
+# You should have received a copy of the GNU Affero General Public License
+# along with Deepchecks.  If not, see <http://www.gnu.org/licenses/>.
+# ----------------------------------------------------------------------------
+#
+import logging
+import typing as t
+from datetime import datetime
+
+import pendulum as pdl
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from deepchecks_monitoring.monitoring_utils import configure_logger
+from deepchecks_monitoring.public_models.organization import Organization
+from deepchecks_monitoring.public_models.task import UNIQUE_NAME_TASK_CONSTRAINT, BackgroundWorker, Task
+from deepchecks_monitoring.schema_models import Model, ModelVersion
+from deepchecks_monitoring.schema_models.model_version import unify_statistics
+from deepchecks_monitoring.schema_models.statistics_delta import StatisticsDelta
+from deepchecks_monitoring.utils import database
+
+__all__ = ['ModelVersionStatisticsFold', 'add_statistics_delta', 'fold_statistics_deltas',
+           'defer_statistics_deltas_fold', 'fold_deferred_statistics_deltas',
+           'insert_model_version_statistics_fold_task']
+
+
+QUEUE_NAME = 'model version statistics fold'
+DELAY = 5
+# Key of the session info holding the model versions whose deltas are folded once the session transaction commits
+DEFERRED_FOLDS_KEY = 'deferred_statistics_folds'
+
+logger: logging.Logger = configure_logger(__name__)
+
+
+class ModelVersionStatisticsFold(BackgroundWorker):
+    """Worker to fold the ingested statistics deltas into the model version and model."""
+
+    def __init__(self):
+        super().__init__()
+        self.logger = configure_logger(self.__class__.__name__)
+
+    @classmethod
+    def queue_name(cls) -> str:
+        return QUEUE_NAME
+
+    @classmethod
+    def delay_seconds(cls) -> int:
+        return DELAY
+
+    async def run(self, task: 'Task', session: AsyncSession, resources_provider, lock):
+        await session.execute(sa.delete(Task).where(Task.id == task.id))
+
+        model_version_id = task.params['model_version_id']
+        org_id = task.params['organization_id']
+
+        self.logger.info({'message': 'starting job', 'worker name': str(type(self)),
+                          'task': task.id, 'model version': model_version_id, 'org_id': org_id})
+
+        organization_schema = (await session.execute(
+            sa.select(Organization.schema_name).where(Organization.id == org_id)
+        )).scalar_one_or_none()
+
+        # If organization was removed the deltas were removed with it
+        if organization_schema is not None:
+            await database.attach_schema_switcher_listener(
+                session=session,
+                schema_search_path=[organization_schema, 'public']
+            )
+            await fold_statistics_deltas(session, model_version_id)
+
+        await session.commit()
+        self.logger.info({'message': 'finished job', 'worker name': str(type(self)),
+                          'task': task.id, 'model version': model_version_id, 'org_id': org_id})
+
+
+async def add_statistics_delta(
+        session: AsyncSession,
+        model_version_id: int,
+        statistics: t.Dict[str, t.Any],
+        start_time: t.Optional[datetime] = None,
+        end_time: t.Optional[datetime] = None
+):
+    """Append the statistics and timestamps range of an ingested batch, without locking the model version."""
+    await session.execute(insert(StatisticsDelta).values(
+        model_version_id=model_version_id,
+        statistics=statistics,
+        start_time=start_time,
+        end_time=end_time
+    ))
+
+
+async def fold_statistics_deltas(session: AsyncSession, model_version_id: int, wait: bool = True) -> bool:
+    """Fold the pending statistics deltas of the model version into the model version and its model.
+
+    Parameters
+    ----------
+    session : AsyncSession
+    model_version_id : int
+    wait : bool, default True
+        whether to wait for the model and model version rows locks. If False and the rows are locked by
+        another transaction the deltas are not folded, used by ingestion in order to never queue on the rows
+
+    Returns
+    -------
+    bool
+        False if the rows were locked and the deltas were not folded, True otherwise
+    """
+    # IMPORTANT: In order to prevent deadlock in case of model deletion, we need to lock the model first, because
+    # we must acquire the locks on the model and model versions in the same order (model first, then model version).
+    # The "no key update" locks do not conflict with the foreign key checks of concurrent deltas inserts.
+    model_id = (
+        sa.select(Model.id)
+        .where(Model.id == sa.select(ModelVersion.model_id).where(ModelVersion.id == model_version_id)
+               .scalar_subquery())
+        .with_for_update(key_share=True, skip_locked=not wait)
+    )
+    if (model_id := await session.scalar(model_id)) is None:
+        return False
+    model_version = (await session.execute(
+        sa.select(ModelVersion.statistics)
+        .where(ModelVersion.id == model_version_id)
+        .with_for_update(key_share=True, skip_locked=not wait)
+    )).first()
+    if model_version is None:
+        return False
+    statistics = model_version.statistics
+
+    deltas = (await session.execute(
+        sa.delete(StatisticsDelta)
+        .where(StatisticsDelta.model_version_id == model_version_id)
+        .returning(StatisticsDelta.statistics, StatisticsDelta.start_time, StatisticsDelta.end_time,
+                   StatisticsDelta.created_at)
+    )).all()
+    if not deltas:
+        return True
+
+    updated_statistics = statistics
+    for delta in deltas:
+        updated_statistics = unify_statistics(updated_statistics, delta.statistics)
+    version_updates = {ModelVersion.last_update_time: max(delta.created_at for delta in deltas)}
+    if updated_statistics != statistics:
+        version_updates[ModelVersion.statistics] = updated_statistics
+
+    model_updates = {}
+    start_times = [delta.start_time for delta in deltas if delta.start_time is not None]
+    end_times = [delta.end_time for delta in deltas if delta.end_time is not None]
+    if start_times:
+        version_updates[ModelVersion.start_time] = sa.func.least(ModelVersion.start_time, min(start_times))
+        model_updates[Model.start_time] = sa.func.least(Model.start_time, min(start_times))
+    if end_times:
+        version_updates[ModelVersion.end_time] = sa.func.greatest(ModelVersion.end_time, max(end_times))
+        model_updates[Model.end_time] = sa.func.greatest(Model.end_time, max(end_times))
+
+    if model_updates:
+        await session.execute(sa.update(Model).where(Model.id == model_id).values(model_updates)
+                              .execution_options(synchronize_session=False))
+    await session.execute(sa.update(ModelVersion).where(ModelVersion.id == model_version_id).values(version_updates)
+                          .execution_options(synchronize_session=False))
+    return True
+
+
+async def defer_statistics_deltas_fold(session: AsyncSession, organization_id: int, model_version_id: int):
+    """Mark the deltas of the model version to be folded by 'fold_deferred_statistics_deltas'.
+
+    Folding locks the model and model version rows until the end of the transaction, so the deltas added by
+    ingestion are folded in a transaction of their own, after the ingestion transaction committed. The fold
+    task is inserted by the transaction adding the deltas, once per model version, so the deltas are folded
+    by the background worker even if the fold after the commit never happens.
+    """
+    deferred_folds = session.info.setdefault(DEFERRED_FOLDS_KEY, set())
+    if model_version_id not in deferred_folds:
+        deferred_folds.add(model_version_id)
+        await insert_model_version_statistics_fold_task(organization_id, model_version_id, session)
+
+
+async def fold_deferred_statistics_deltas(session: AsyncSession):
+    """Fold the deltas marked by 'defer_statistics_deltas_fold', each in its own transaction.
+
+    Must be called after the transaction which added the deltas committed. This only saves the wait for the fold
+    task, so deltas of rows which are locked by another transaction are not waited on, and a failed fold is left
+    to the task as well.
+    """
+    for model_version_id in sorted(session.info.pop(DEFERRED_FOLDS_KEY, ())):
+        try:
+            await fold_statistics_deltas(session, model_version_id, wait=False)
+            await session.commit()
+        except Exception:  # pylint: disable=broad-except
+            logger.exception({'message': 'failed to fold statistics deltas', 'model version': model_version_id})
+            await session.rollback()
+
+
+async def insert_model_version_statistics_fold_task(organization_id, model_version_id, session):
+    """Insert task to fold the statistics deltas of the model version.
+
+    We do this in the transaction which adds the deltas, so they are folded even if the ingestion did not fold them.
+    """
+    now = pdl.now().int_timestamp
+    # Same as the cache invalidation task, the floored timestamp makes sure deltas inserted while the worker
+    # is running are folded by the next task
+    floored_now = now - now % DELAY
+    params = {'organization_id': organization_id, 'model_version_id': model_version_id}
+    values = dict(name=f'{organization_id}:{model_version_id}:{floored_now}', bg_worker_task=QUEUE_NAME, params=params)
+    return await session.scalar(insert(Task).values(values)
+                                .on_conflict_do_nothing(constraint=UNIQUE_NAME_TASK_CONSTRAINT)
+                                .returning(Task.id))
@@ -30,6 +30,7 @@ from sqlalchemy.orm import joinedload, load_only, selectinload, sessionmaker
 
 from deepchecks_monitoring import config
 from deepchecks_monitoring.bgtasks.alert_task import AlertsTask
+from deepchecks_monitoring.bgtasks.data_retention import RETENTION_RUN_INTERVAL, insert_data_retention_task
 from deepchecks_monitoring.bgtasks.model_data_ingestion_alerter import ModelDataIngestionAlerter
 from deepchecks_monitoring.monitoring_utils import TimeUnit, configure_logger, json_dumps
 from deepchecks_monitoring.public_models import Organization
@@ -119,6 +120,9 @@ class AlertsScheduler:
                 async with self.organization_error_handler(org.id, 'run_object_storage_ingestion'):
                     await self.run_object_storage_ingestion(org)
 
+            async with self.organization_error_handler(org.id, 'run_data_retention'):
+                await self.run_data_retention(org)
+
     async def run_organization(self, organization):
         """Try enqueue monitor execution tasks."""
         async with self.async_session_factory() as session:
@@ -233,6 +237,31 @@ class AlertsScheduler:
                                 self.logger.exception('Model(id=%s) tasks enqueue failed', model.id)
                                 raise
 
+    async def run_data_retention(self, organization):
+        """Enqueue data retention tasks of the models with a retention period."""
+        async with self.async_session_factory() as session:
+            await database.attach_schema_switcher_listener(
+                session=session,
+                schema_search_path=[organization.schema_name, 'public']
+            )
+            retention_due = pdl.now() - RETENTION_RUN_INTERVAL
+            models_ids = (await session.scalars(
+                select(Model.id)
+                .where(Model.data_retention_days.isnot(None))
+                .where(sa.or_(Model.data_retention_last_run_time.is_(None),
+                              Model.data_retention_last_run_time < retention_due))
+            )).all()
+
+            for model_id in models_ids:
+                try:
+                    await insert_data_retention_task(organization.id, model_id, session)
+                    await session.commit()
+                except (SerializationError, DBAPIError) as error:
+                    await session.rollback()
+                    if isinstance(error, DBAPIError) and not is_serialization_error(error):
+                        self.logger.exception('Model(id=%s) data retention task enqueue failed', model_id)
+                        raise
+
     async def run_object_storage_ingestion(self, organization):
         async with self.async_session_factory() as session:
             await database.attach_schema_switcher_listener(
@@ -20,10 +20,12 @@ from redis.asyncio import Redis, RedisCluster
 from sqlalchemy import select
 
 from deepchecks_monitoring.bgtasks.alert_task import AlertsTask
+from deepchecks_monitoring.bgtasks.data_retention import DataRetentionWorker
 from deepchecks_monitoring.bgtasks.delete_db_table_task import DeleteDbTableTask
 from deepchecks_monitoring.bgtasks.mixpanel_system_state_event import MixpanelSystemStateEvent
 from deepchecks_monitoring.bgtasks.model_data_ingestion_alerter import ModelDataIngestionAlerter
 from deepchecks_monitoring.bgtasks.model_version_cache_invalidation import ModelVersionCacheInvalidation
+from deepchecks_monitoring.bgtasks.model_version_statistics_fold import ModelVersionStatisticsFold
 from deepchecks_monitoring.config import Settings
 from deepchecks_monitoring.logic.keys import GLOBAL_TASK_QUEUE, TASK_RUNNER_LOCK
 from deepchecks_monitoring.monitoring_utils import configure_logger
@@ -180,6 +182,8 @@ def execute_worker():
 
             workers = [
                 ModelVersionCacheInvalidation(),
+                ModelVersionStatisticsFold(),
+                DataRetentionWorker(),
                 ModelDataIngestionAlerter(),
                 DeleteDbTableTask(),
                 AlertsTask(),
@@ -18,14 +18,17 @@ import click
 import sqlalchemy as sa
 import uvicorn
 from sqlalchemy import create_engine
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 
 from deepchecks_monitoring import __version__
 from deepchecks_monitoring.bgtasks.scheduler import AlertsScheduler, execute_alerts_scheduler
 from deepchecks_monitoring.config import DatabaseSettings, Settings
+from deepchecks_monitoring.logic.monitor_indexes import drop_unused_monitor_indexes, get_monitor_indexes_usage
+from deepchecks_monitoring.logic.monitor_partitions import partition_monitor_table
 from deepchecks_monitoring.monitoring_utils import fetch_unused_monitoring_tables
 from deepchecks_monitoring.public_models import Organization
 from deepchecks_monitoring.resources import ResourcesProvider
+from deepchecks_monitoring.schema_models import Model, ModelVersion
 from deepchecks_monitoring.utils import auth
 from deepchecks_monitoring.utils.other import generate_random_user, generate_test_user
 
@@ -108,6 +111,102 @@ def upgrade_organizations_schemas(orgid: str):
     anyio.run(fn)
 
 
+@cli.command()
+@click.option(
+    "--orgid",
+    default="all",
+    help=(
+        "Id of an organization, monitor tables of which to partition. "
+        "Pass 'all' if you want to partition monitor tables of all organizations"
+    )
+)
+def partition_monitor_tables(orgid: str):
+    """Convert monitor tables of models with a partition interval into partitioned tables."""
+
+    async def fn():
+        settings = Settings(echo_sql=False)  # type: ignore
+        async with ResourcesProvider(settings) as rp:
+            async with rp.create_async_database_session() as s:
+                q = sa.select(Organization.id, Organization.name)
+                if orgid != "all":
+                    q = q.where(Organization.id == int(orgid))
+                organizations = (await s.execute(q)).all()
+            for org in organizations:
+                async with rp.create_async_database_session(org.id) as s:
+                    versions = (await s.scalars(
+                        sa.select(ModelVersion).join(ModelVersion.model)
+                        .where(Model.monitor_partition_interval.isnot(None),
+                               ModelVersion.monitor_partition_interval.is_(None))
+                        .options(joinedload(ModelVersion.model))
+                    )).all()
+                    # Each table is converted in its own transaction, to hold its lock only while it is copied
+                    for version in versions:
+                        await partition_monitor_table(s, version, version.model.monitor_partition_interval)
+                        await s.commit()
+                        print(f"Partitioned {org.name} {version.get_monitor_table_name()} table")
+
+    anyio.run(fn)
+
+
+@cli.command()
+@click.option(
+    "--orgid",
+    default="all",
+    help=(
+        "Id of an organization, monitor tables indexes of which to report. "
+        "Pass 'all' if you want to report the indexes of all organizations"
+    )
+)
+def monitor_indexes_usage(orgid: str):
+    """Report the number of scans and the size of the monitor tables indexes."""
+
+    async def fn():
+        settings = Settings(echo_sql=False)  # type: ignore
+        async with ResourcesProvider(settings) as rp:
+            async with rp.create_async_database_session() as s:
+                q = sa.select(Organization.id, Organization.name)
+                if orgid != "all":
+                    q = q.where(Organization.id == int(orgid))
+                organizations = (await s.execute(q)).all()
+            for org in organizations:
+                async with rp.create_async_database_session(org.id) as s:
+                    print(f"{org.name} monitor tables indexes:")
+                    for index in await get_monitor_indexes_usage(s):
+                        print(f"- {index.index_name}: {index.scans} scans, {index.size} bytes")
+
+    anyio.run(fn)
+
+
+@cli.command()
+@click.option(
+    "--orgid",
+    default="all",
+    help=(
+        "Id of an organization, unused monitor tables indexes of which to drop. "
+        "Pass 'all' if you want to drop the unused indexes of all organizations"
+    )
+)
+@click.option("--max-scans", default=0, help="Indexes scanned at most this number of times are dropped")
+def drop_unused_monitor_tables_indexes(orgid: str, max_scans: int):
+    """Drop the columns indexes of the monitor tables which are not used by the queries."""
+
+    async def fn():
+        settings = Settings(echo_sql=False)  # type: ignore
+        async with ResourcesProvider(settings) as rp:
+            async with rp.create_async_database_session() as s:
+                q = sa.select(Organization.id, Organization.name)
+                if orgid != "all":
+                    q = q.where(Organization.id == int(orgid))
+                organizations = (await s.execute(q)).all()
+            for org in organizations:
+                async with rp.create_async_database_session(org.id) as s:
+                    indexes = "\n- ".join(await drop_unused_monitor_indexes(s, max_scans))
+                    await s.commit()
+                    print(f"Next {org.name} indexes were dropped:\n- {indexes}")
+
+    anyio.run(fn)
+
+
 @cli.command()
 def run():
     """Run web server."""
@@ -67,6 +67,20 @@ class KafkaSettings(BaseDeepchecksSettings):
     kafka_password: t.Optional[str] = None
     kafka_replication_factor: int = 1
     kafka_max_metadata_age: int = 300000
+    kafka_producer_linger_ms: int = 5
+    kafka_producer_max_batch_size: int = 262144
+    # One of gzip, snappy, lz4 or zstd
+    kafka_producer_compression_type: t.Optional[str] = None
+    # Must not exceed the broker message.max.bytes, messages of larger batches are split to fit in it
+    kafka_producer_max_request_size: int = 1048576
+    kafka_max_samples_per_message: int = 1000
+    # Whether the api server consumes the data topics, disable when running dedicated ingestion workers
+    kafka_consumer_in_api: bool = True
+    # Maximal number of partitions handled concurrently by a consumer
+    kafka_consumer_concurrency: int = 8
+    kafka_consumer_max_poll_records: int = 500
+    kafka_consumer_fetch_max_bytes: int = 52428800
+    kafka_consumer_max_partition_fetch_bytes: int = 1048576
 
     @property
     def kafka_params(self):
@@ -81,6 +95,17 @@ class KafkaSettings(BaseDeepchecksSettings):
             'metadata_max_age_ms': self.kafka_max_metadata_age
         }
 
+    @property
+    def kafka_producer_params(self):
+        """Get parameters for kafka producer."""
+        return {
+            **self.kafka_params,
+            'linger_ms': self.kafka_producer_linger_ms,
+            'max_batch_size': self.kafka_producer_max_batch_size,
+            'max_request_size': self.kafka_producer_max_request_size,
+            'compression_type': self.kafka_producer_compression_type
+        }
+
 
 def get_postgres_uri(postgres_secret_name, amazon_region_name) -> str:
     """Get postgres uri from AWS secrets manager."""
@@ -164,6 +189,33 @@ class Settings(
 
     init_local_ray_instance: str | None = None
     total_number_of_check_executor_actors: int = os.cpu_count() or 8
+    # Whether the data of a lookback check run is fetched once by the server and shared with the check executor
+    # actors through the ray object store, instead of being queried by each of the actors
+    parallel_check_executor_prefetch_data: bool = False
+    # Lookback check runs estimated to read up to this number of samples in total are executed by the server,
+    # as the overhead of the check executor actors exceeds their gain
+    parallel_check_executor_inline_max_samples: int = 10_000
+    # Whether the data of the windows of a lookback check run is fetched by a single query per model version,
+    # instead of a query per window
+    check_windows_single_scan: bool = True
+    # Number of processes which run the checks when ray is not available, instead of running them in the
+    # event loop of the server, 0 disables the processes pool. Each server worker process (e.g. of uvicorn
+    # --workers 4) has a pool of its own, so the total number of check processes is the workers number times this
+    check_processes_pool_size: int = 0
+
+    # Small batches of samples logged to the same model version within this time are written in a single
+    # transaction, 0 disables the coalescing. Applies only when the data is not sent through kafka
+    ingestion_coalesce_linger_ms: int = 0
+    # Buffered samples of a model version are written once reaching this number, larger batches are written directly
+    ingestion_coalesce_max_samples: int = 1000
+    # Directory of a local disk spool which the data is appended to, and loaded from into the database in the
+    # background. Used in place of kafka by single node deployments. Each server process (e.g. each uvicorn worker)
+    # uses a spool of its own in a sub-directory, so the directory can be shared by the processes of a single node
+    ingestion_spool_dir: t.Optional[pathlib.Path] = None
+    ingestion_spool_segment_bytes: int = 67108864
+    ingestion_spool_fsync_ms: int = 5
+    # Maximal number of spooled messages of a topic loaded into the database in a single transaction
+    ingestion_spool_drain_batch: int = 500
 
 
 class Tags(Enum):
@@ -0,0 +1,312 @@
+# ----------------------------------------------------------------------------
+# Copyright (C) 2021-2022 Deepchecks (https://www.deepchecks.com)
+#
+# This file is part of Deepchecks.
+# Deepchecks is distributed under the terms of the GNU Affero General
+# Public License (version 3 or later).
+# You should have received a copy of the GNU Affero General Public License
+# along with Deepchecks.  If not, see <http://www.gnu.org/licenses/>.
+# ----------------------------------------------------------------------------
+"""Module defining the column-wise json schema validation of data samples batches."""
+import re
+import typing as t
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+import pendulum as pdl
+
+__all__ = ["BatchValidator", "ValidatedBatch", "frame_to_records", "frame_hours", "parse_date_time"]
+
+
+# Same pattern as 'fastjsonschema' uses for the 'date-time' format
+DATE_TIME_PATTERN = re.compile(
+    r"^\d{4}-[01]\d-[0-3]\d(t|T)[0-2]\d:[0-5]\d:[0-5]\d(?:\.\d+)?(?:[+-][0-2]\d:[0-5]\d|[+-][0-2]\d[0-5]\d|z|Z)\Z"
+)
+
+
+class _Missing:
+    """Placeholder of a property which is not present in a sample."""
+
+
+_MISSING = _Missing()
+
+
+class ValidatedBatch(t.NamedTuple):
+    """Result of a batch validation.
+
+    Attributes
+    ----------
+    samples : pd.DataFrame
+        the batch samples, a column per schema property (missing optional properties are filled with None),
+        date-time properties are parsed into 'datetime64[us, UTC]' columns
+    errors : pd.Series
+        validation error message of each sample, None for valid samples
+    """
+
+    samples: pd.DataFrame
+    errors: pd.Series
+
+    @property
+    def valid_samples(self) -> pd.DataFrame:
+        return self.samples[self.errors.isna().to_numpy()]
+
+
+def _json_types(definition: t.Dict[str, t.Any]) -> t.List[str]:
+    json_types = definition.get("type", [])
+    return [json_types] if isinstance(json_types, str) else json_types
+
+
+def _is_of_types(value_type: type, json_types: t.Sequence[str]) -> t.Optional[bool]:
+    """Check whether values of the given python type are of one of the json types.
+
+    Returns None for floats checked against the 'integer' type, which depends on the value itself.
+    """
+    if issubclass(value_type, bool):
+        return "boolean" in json_types
+    for json_type in json_types:
+        if json_type == "number" and issubclass(value_type, (int, float, Decimal)):
+            return True
+        if json_type == "integer" and issubclass(value_type, int):
+            return True
+        if json_type == "string" and issubclass(value_type, str):
+            return True
+        if json_type == "array" and issubclass(value_type, (list, tuple)):
+            return True
+        if json_type == "object" and issubclass(value_type, dict):
+            return True
+        if json_type == "null" and value_type is type(None):
+            return True
+    if "integer" in json_types and issubclass(value_type, float):
+        return None
+    return False
+
+
+def _first_errors(*errors: np.ndarray) -> np.ndarray:
+    """Merge arrays of error messages, keeping the first error found for each value."""
+    result = np.full(len(errors[0]), None, dtype=object)
+    for it in errors:
+        result = np.where(pd.isna(result), it, result)
+    return result
+
+
+def _validate_values(values: np.ndarray, definition: t.Dict[str, t.Any]) -> np.ndarray:
+    """Validate values against a json schema definition.
+
+    Returns an array with an error message suffix (e.g. ' must be number', '[1] must be number')
+    for each invalid value and None for each valid value, in the same order as 'fastjsonschema' checks them.
+    """
+    errors = np.full(len(values), None, dtype=object)
+    if len(values) == 0:
+        return errors
+
+    json_types = _json_types(definition)
+    value_types = pd.Series(values, dtype=object).map(type)
+
+    if not json_types:
+        type_is_valid = np.full(len(values), True)
+    else:
+        types_validity = {it: _is_of_types(it, json_types) for it in value_types.unique()}
+        type_is_valid = value_types.map(types_validity).to_numpy(dtype=object)
+        # Floats are valid integers only if they have no fractional part
+        float_as_integer = pd.isna(type_is_valid)
+        if float_as_integer.any():
+            floats = values[float_as_integer].astype(float)
+            type_is_valid[float_as_integer] = np.isfinite(floats) & (np.floor(floats) == floats)
+        type_is_valid = type_is_valid.astype(bool)
+        errors[~type_is_valid] = f" must be {' or '.join(json_types)}"
+
+    def checked(kinds: t.Tuple[type, ...]) -> np.ndarray:
+        # Constraints are checked only for values of the relevant kind which passed the type validation
+        is_kind = value_types.map(lambda it: issubclass(it, kinds) and not issubclass(it, bool)).to_numpy(dtype=bool)
+        return is_kind & type_is_valid & pd.isna(errors)
+
+    if "minimum" in definition or "maximum" in definition:
+        is_number = checked((int, float, Decimal))
+        numbers = values[is_number]
+        if "minimum" in definition:
+            too_small = np.less(numbers, definition["minimum"]).astype(bool)
+            errors[np.flatnonzero(is_number)[too_small]] = f" must be bigger than or equal to {definition['minimum']}"
+        if "maximum" in definition:
+            too_big = np.greater(numbers, definition["maximum"]).astype(bool) & pd.isna(errors[is_number])
+            errors[np.flatnonzero(is_number)[too_big]] = f" must be smaller than or equal to {definition['maximum']}"
+
+    if "minItems" in definition or "maxItems" in definition or "items" in definition:
+        is_array = checked((list, tuple))
+        arrays = values[is_array]
+        lengths = np.fromiter((len(it) for it in arrays), dtype=np.int64, count=len(arrays))
+        arrays_errors = [np.full(len(arrays), None, dtype=object)]
+        if "minItems" in definition:
+            arrays_errors.append(np.where(lengths < definition["minItems"],
+                                          f" must contain at least {definition['minItems']} items", None))
+        if "maxItems" in definition:
+            arrays_errors.append(np.where(lengths > definition["maxItems"],
+                                          f" must contain less than or equal to {definition['maxItems']} items", None))
+        if "items" in definition:
+            arrays_errors.append(_validate_items(arrays, lengths, definition["items"]))
+        errors[is_array] = _first_errors(*arrays_errors)
+
+    if definition.get("format") == "date-time":
+        is_string = checked((str,))
+        matches = pd.Series(values[is_string], dtype=object).str.match(DATE_TIME_PATTERN).to_numpy(dtype=bool)
+        errors[np.flatnonzero(is_string)[~matches]] = " must be date-time"
+
+    return errors
+
+
+def _validate_items(arrays: np.ndarray, lengths: np.ndarray, definition: t.Dict[str, t.Any]) -> np.ndarray:
+    """Validate the items of each array, returning the error of the first invalid item of each array."""
+    errors = np.full(len(arrays), None, dtype=object)
+    if lengths.sum() == 0:
+        return errors
+    items = np.empty(lengths.sum(), dtype=object)
+    items[:] = [item for array in arrays for item in array]
+    array_index = np.repeat(np.arange(len(arrays)), lengths)
+    item_position = np.arange(len(items)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+
+    items_errors = _validate_values(items, definition)
+    invalid = np.flatnonzero(pd.notna(items_errors))
+    # Items are ordered by array and position, so the first invalid item of each array is its first occurrence
+    first_invalid = invalid[~pd.Index(array_index[invalid]).duplicated()]
+    errors[array_index[first_invalid]] = [
+        f"[{item_position[index]}]{items_errors[index]}"
+        for index in first_invalid
+    ]
+    return errors
+
+
+def parse_date_time(values: np.ndarray) -> t.Tuple[pd.Series, np.ndarray]:
+    """Parse ISO 8601 strings into UTC timestamps, returning also a mask of the values which failed to parse."""
+    strings = pd.Series(values, dtype=object)
+    is_string = strings.map(type).eq(str).to_numpy()
+    parsed = pd.Series(pd.NaT, index=strings.index, dtype="datetime64[us, UTC]")
+    if is_string.any():
+        parsed[is_string] = pd.to_datetime(strings[is_string].str.upper(), format="ISO8601", utc=True,
+                                           errors="coerce").astype(parsed.dtype)
+    # Timestamps out of the nanoseconds range are not parsed by pandas, parsing them one by one
+    for index in np.flatnonzero(is_string & parsed.isna().to_numpy()):
+        try:
+            parsed[index] = pdl.parse(values[index])
+        except (ValueError, OverflowError):
+            pass
+    return parsed, is_string & parsed.isna().to_numpy()
+
+
+class BatchValidator:
+    """Validate batches of samples against a json schema, column by column.
+
+    Supports the subset of json schema which is generated for the model versions tables
+    (see 'ColumnType.to_json_schema_type'). Invalid samples get the same error message
+    'fastjsonschema' raises for them, e.g. 'data.a must be number'.
+
+    Parameters
+    ----------
+    schema : Dict[str, Any]
+        json schema of a single sample
+    """
+
+    def __init__(self, schema: t.Dict[str, t.Any]):
+        self.properties = schema["properties"]
+        self.required = schema.get("required", [])
+        self.additional_properties = schema.get("additionalProperties", True)
+        self.date_time_properties = [name for name, definition in self.properties.items()
+                                     if definition.get("format") == "date-time"]
+
+    def __call__(self, samples: t.Union[t.Sequence[t.Dict[str, t.Any]], pd.DataFrame]) -> ValidatedBatch:
+        """Validate the given samples, either as a list of samples or as a dataframe of samples."""
+        n_samples = len(samples)
+        columns = {}
+        is_present = {}
+        if isinstance(samples, pd.DataFrame):
+            is_object = np.full(n_samples, True)
+            for name in self.properties:
+                if name in samples.columns:
+                    columns[name] = samples[name].to_numpy(dtype=object)
+                    is_present[name] = np.full(n_samples, True)
+                else:
+                    columns[name] = np.full(n_samples, None, dtype=object)
+                    is_present[name] = np.full(n_samples, False)
+            unknown_keys = [set(samples.columns).difference(self.properties)] * n_samples
+        else:
+            is_object = np.fromiter((isinstance(it, dict) for it in samples), dtype=bool, count=n_samples)
+            samples = [it if isinstance(it, dict) else {} for it in samples]
+            for name in self.properties:
+                values = np.empty(n_samples, dtype=object)
+                values[:] = [sample.get(name, _MISSING) for sample in samples]
+                is_present[name] = np.fromiter((it is not _MISSING for it in values), dtype=bool, count=n_samples)
+                values[~is_present[name]] = None
+                columns[name] = values
+            unknown_keys = [sample.keys() - self.properties.keys() for sample in samples]
+
+        errors = np.full(n_samples, None, dtype=object)
+
+        def add_errors(mask: np.ndarray, messages):
+            # First found error of a sample is the one reported
+            mask = mask & pd.isna(errors)
+            errors[mask] = messages[mask] if isinstance(messages, np.ndarray) else messages
+
+        add_errors(~is_object, "data must be object")
+
+        not_present = np.full(n_samples, False)
+        missing_required = np.full(n_samples, False)
+        for name in self.required:
+            missing_required |= ~is_present.get(name, not_present)
+        if missing_required.any():
+            required_messages = np.full(n_samples, None, dtype=object)
+            for index in np.flatnonzero(missing_required):
+                missing = sorted(name for name in self.required if not is_present.get(name, not_present)[index])
+                required_messages[index] = f"data must contain {missing} properties"
+            add_errors(missing_required, required_messages)
+
+        for name, definition in self.properties.items():
+            present = np.flatnonzero(is_present[name])
+            column_errors = np.full(n_samples, None, dtype=object)
+            property_errors = _validate_values(columns[name][present], definition)
+            column_errors[present] = [None if it is None else f"data.{name}{it}" for it in property_errors]
+            add_errors(pd.notna(column_errors), column_errors)
+
+        if self.additional_properties is False:
+            has_unknown_keys = np.fromiter((bool(it) for it in unknown_keys), dtype=bool, count=n_samples)
+            if has_unknown_keys.any():
+                unknown_messages = np.full(n_samples, None, dtype=object)
+                for index in np.flatnonzero(has_unknown_keys):
+                    unknown_messages[index] = f"data must not contain {set(unknown_keys[index])} properties"
+                add_errors(has_unknown_keys, unknown_messages)
+
+        frame = pd.DataFrame(index=pd.RangeIndex(n_samples))
+        for name, definition in self.properties.items():
+            values = columns[name]
+            if name in self.date_time_properties:
+                parsed, failed = parse_date_time(values)
+                add_errors(failed, f"data.{name} must be date-time")
+                frame[name] = parsed
+                continue
+            if "integer" in _json_types(definition):
+                # Integral floats are valid integers, converting them so they can be written to an integer column
+                is_float = pd.Series(values, dtype=object).map(type).eq(float).to_numpy()
+                if is_float.any():
+                    values = values.copy()
+                    values[is_float] = [int(it) if it.is_integer() else it for it in values[is_float]]
+            frame[name] = pd.Series(values, dtype=object)
+
+        return ValidatedBatch(frame, pd.Series(errors, dtype=object))
+
+
+def frame_to_records(frame: pd.DataFrame, columns: t.Sequence[str]) -> t.Iterator[t.Tuple[t.Any, ...]]:
+    """Convert the frame columns into records of python values, as expected by the database driver."""
+    values = []
+    for name in columns:
+        column = frame[name]
+        if isinstance(column.dtype, pd.DatetimeTZDtype):
+            column_values = column.array.to_pydatetime().astype(object)
+            column_values[column.isna().to_numpy()] = None
+            values.append(column_values.tolist())
+        else:
+            values.append(column.tolist())
+    return zip(*values)
+
+
+def frame_hours(frame: pd.DataFrame, column: str) -> t.List["pdl.DateTime"]:
+    """Return the distinct hours of the timestamps column."""
+    hours = frame[column].dropna().dt.floor("h").unique()
+    return [pdl.instance(it.to_pydatetime()) for it in hours]
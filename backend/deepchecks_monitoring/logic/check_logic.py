@@ -11,16 +11,19 @@
 """Module defining utility functions for check running."""
 import typing as t
 from collections import defaultdict
+from concurrent.futures import Executor
 from copy import deepcopy
+from datetime import datetime
 from numbers import Number
 
+import pandas as pd
 import pendulum as pdl
 from deepchecks import BaseCheck, CheckResult
 from deepchecks.core.reduce_classes import ReduceFeatureMixin
 from deepchecks.tabular.metric_utils.scorers import binary_scorers_dict, multiclass_scorers_dict
 from deepchecks.utils.dataframes import un_numpy
 from pydantic import BaseModel, Field, ValidationError, root_validator
-from sqlalchemy import VARCHAR, Column, and_, func, select
+from sqlalchemy import VARCHAR, Column, DateTime, Integer, and_, func, select, values
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
@@ -37,7 +40,8 @@ from deepchecks_monitoring.schema_models import ModelVersion
 from deepchecks_monitoring.schema_models.check import Check
 from deepchecks_monitoring.schema_models.column_type import (REFERENCE_SAMPLE_ID_COL, SAMPLE_ID_COL, SAMPLE_LABEL_COL,
                                                              SAMPLE_PRED_COL, SAMPLE_TS_COL)
-from deepchecks_monitoring.schema_models.model import Model, TaskType
+from deepchecks_monitoring.schema_models.model import (SAMPLES_MAP_HOUR_COL, SAMPLES_RESERVOIR_HASH_COL,
+                                                       SAMPLES_RESERVOIR_SIZE, Model, TaskType)
 from deepchecks_monitoring.schema_models.monitor import Frequency, round_up_datetime
 from deepchecks_monitoring.utils.typing import as_pendulum_datetime
 
@@ -46,6 +50,11 @@ if t.TYPE_CHECKING:
     import sqlalchemy as sa
 
 MAX_FEATURES_TO_RETURN = 1000
+# Columns added by the windows data query, prefixed like the other internal columns
+WINDOW_INDEX_COL = "_dc_window_index"
+WINDOW_START_COL = "_dc_window_start"
+WINDOW_END_COL = "_dc_window_end"
+WINDOW_RANK_COL = "_dc_window_rank"
 
 
 class AlertCheckOptions(BaseModel):
@@ -202,18 +211,30 @@ def _times_to_data_filter(start_time, end_time) -> DataFilterList:
     return DataFilterList(filters=data_filters)
 
 
-def _get_observed_classes(model_version: ModelVersion) -> t.List[t.Union[int, str]]:
-    label_classes = model_version.statistics.get(SAMPLE_LABEL_COL, {}).get("values", [])
-    pred_classes = model_version.statistics.get(SAMPLE_PRED_COL, {}).get("values", [])
+def _get_observed_classes(
+        model_version: ModelVersion,
+        statistics: t.Optional[t.Dict[str, t.Any]] = None
+) -> t.List[t.Union[int, str]]:
+    statistics = model_version.statistics if statistics is None else statistics
+    label_classes = statistics.get(SAMPLE_LABEL_COL, {}).get("values", [])
+    pred_classes = statistics.get(SAMPLE_PRED_COL, {}).get("values", [])
     all_classes = sorted(set(label_classes + pred_classes))
     if not model_version.label_map:
         return all_classes
     return [model_version.label_map.get(str(clazz), str(clazz)) for clazz in all_classes]
 
 
-def get_metric_class_info(latest_version: ModelVersion, model: Model) -> MonitorCheckConf:
-    """Get check info for checks that are instance of ReduceMetricClassMixin."""
-    classes = None if latest_version is None else _get_observed_classes(latest_version)
+def get_metric_class_info(
+        latest_version: ModelVersion,
+        model: Model,
+        statistics: t.Optional[t.Dict[str, t.Any]] = None
+) -> MonitorCheckConf:
+    """Get check info for checks that are instance of ReduceMetricClassMixin.
+
+    The statistics of the latest version can be given in order to include the statistics deltas which were not
+    folded yet into the version.
+    """
+    classes = None if latest_version is None else _get_observed_classes(latest_version, statistics)
     if classes is not None:
         classes = [{"name": class_name} for class_name in classes]
     # get the scorers by task type
@@ -253,6 +274,8 @@ async def run_check_per_window_in_range(
         monitor_id: int | None = None,
         cache_funcs: CacheFunctions | None = None,
         organization_id: int | None = None,
+        single_scan: bool = False,
+        executor: t.Optional[Executor] = None,
 ) -> t.Dict[str, t.Any]:
     """Run a check on a monitor table per time window in the time range.
     The function gets the relevant model versions and the task type of the check.
@@ -270,6 +293,10 @@ async def run_check_per_window_in_range(
     monitor_id
     cache_funcs
     organization_id
+    single_scan : bool, default False
+        Whether to fetch the data of all the windows of a model version by a single query.
+    executor : Executor, optional
+        Pool of processes to run the check of the windows in, instead of running them in the event loop.
 
     Returns
     -------
@@ -317,8 +344,9 @@ async def run_check_per_window_in_range(
     for model_version in model_versions:
         query_reference = False
         test_info: t.List[t.Dict] = []
+        windows_to_query: t.Dict[int, t.Dict] = {}
         # create the session per time window
-        for window_end in all_windows:
+        for window_index, window_end in enumerate(all_windows):
             window_start = window_end - aggregation_window
             curr_test_info = {"start": window_start, "end": window_end}
             test_info.append(curr_test_info)
@@ -330,15 +358,32 @@ async def run_check_per_window_in_range(
                     curr_test_info["result"] = cache_result.value
                     continue
             if model_version.is_in_range(window_start, window_end):
-                period = window_end - window_start
+                windows_to_query[window_index] = curr_test_info
+                query_reference = True
+            else:
+                curr_test_info["query"] = None
+
+        if single_scan and len(windows_to_query) > 1:
+            query = create_windows_execution_data_query(
+                model_version, monitor_options,
+                windows=[(index, info["start"], info["end"]) for index, info in windows_to_query.items()],
+                columns=columns,
+                with_labels=check.is_label_required,
+                filter_labels_exist=check.is_label_required
+            )
+            query_result = await session.execute(query)
+            windows_data = split_windows_data(
+                pd.DataFrame(query_result.all(), columns=[str(key) for key in query_result.keys()]))
+            for index, info in windows_to_query.items():
+                info["data"] = windows_data.get(index, pd.DataFrame())
+        else:
+            for info in windows_to_query.values():
+                period = info["end"] - info["start"]
                 query = create_execution_data_query(model_version, monitor_options, period=period, columns=columns,
                                                     with_labels=check.is_label_required,
                                                     filter_labels_exist=check.is_label_required,
                                                     is_ref=False)
-                curr_test_info["query"] = session.execute(query)
-                query_reference = True
-            else:
-                curr_test_info["query"] = None
+                info["query"] = session.execute(query)
 
         if check.is_reference_required and query_reference:
             # Reference query
@@ -358,7 +403,8 @@ async def run_check_per_window_in_range(
         model_versions,
         model,
         check,
-        monitor_options.additional_kwargs
+        monitor_options.additional_kwargs,
+        executor=executor
     )
 
     # Reduce the check results
@@ -391,6 +437,7 @@ async def run_check_window(
         reference_only: bool = False,
         n_samples: int = DEFAULT_N_SAMPLES,
         with_display: bool = False,
+        executor: t.Optional[Executor] = None,
 ) -> t.Dict[ModelVersion, t.Optional[t.Dict]]:
     """Run a check for each time window by lookback or for reference only.
 
@@ -412,6 +459,8 @@ async def run_check_window(
         The number of samples to use.
     with_display : bool, optional
         Whether to run the check with display or not.
+    executor : Executor, optional
+        Pool of processes to run the check in, the results are then already reduced.
 
     Returns
     -------
@@ -452,7 +501,8 @@ async def run_check_window(
             model,
             check,
             monitor_options.additional_kwargs,
-            with_display
+            with_display,
+            executor=executor
         )
     else:
         model_results_per_window = await get_results_for_model_versions_for_reference(
@@ -538,9 +588,18 @@ def create_execution_data_query(
         columns = sorted(columns)
 
         data_query = select([table.c[col] for col in columns]).filter(options.sql_columns_filter()) \
-            .filter(table.c[SAMPLE_TS_COL] >= period.start, table.c[SAMPLE_TS_COL] < period.end) \
-            .order_by(func.hashtext(table.c[SAMPLE_ID_COL]))\
-            .limit(n_samples)
+            .filter(table.c[SAMPLE_TS_COL] >= period.start, table.c[SAMPLE_TS_COL] < period.end)
+        if can_read_samples_reservoir(options, [(period.start, period.end)], n_samples):
+            # The samples with the smallest hashes in the window are the smallest ones of the reservoirs of its hours
+            reservoir = model_version.get_samples_reservoir_table()
+            reservoir_ids = select(reservoir.c[SAMPLE_ID_COL]) \
+                .where(reservoir.c.version_id == model_version.id,
+                       reservoir.c[SAMPLES_MAP_HOUR_COL] >= period.start,
+                       reservoir.c[SAMPLES_MAP_HOUR_COL] < period.end) \
+                .order_by(reservoir.c[SAMPLES_RESERVOIR_HASH_COL], reservoir.c[SAMPLE_ID_COL]) \
+                .limit(n_samples)
+            data_query = data_query.filter(table.c[SAMPLE_ID_COL].in_(reservoir_ids))
+        data_query = data_query.order_by(func.hashtext(table.c[SAMPLE_ID_COL])).limit(n_samples)
 
         # For monitoring tables, we join the labels table if needed
         if with_labels:
@@ -557,6 +616,162 @@ def create_execution_data_query(
         return data_query
 
 
+def can_read_samples_reservoir(
+        options: TableFiltersSchema,
+        windows: t.Sequence[t.Tuple["pdl.DateTime", "pdl.DateTime"]],
+        n_samples: int,
+        filter_labels_exist: bool = False
+) -> bool:
+    """Return whether the samples of the windows can be read from the samples reservoir.
+
+    The reservoir of an hour holds its samples with the smallest hashes, so it gives the same samples as the
+    monitor table for windows of whole hours, of up to the reservoir size samples and without data filters or
+    the labels filter of the windows query (which are applied before the samples are limited).
+    """
+    if n_samples > SAMPLES_RESERVOIR_SIZE or (options.filter is not None and options.filter.filters):
+        return False
+    if filter_labels_exist:
+        return False
+    return all(_is_whole_hour(start) and _is_whole_hour(end) for start, end in windows)
+
+
+def _is_whole_hour(timestamp: datetime) -> bool:
+    timestamp = pdl.instance(timestamp).in_timezone("UTC")
+    return timestamp == timestamp.start_of("hour")
+
+
+def create_windows_execution_data_query(
+        model_version: ModelVersion,
+        options: TableFiltersSchema,
+        windows: t.Sequence[t.Tuple[int, "pdl.DateTime", "pdl.DateTime"]],
+        columns: "t.Optional[list[str]]" = None,
+        n_samples: int = DEFAULT_N_SAMPLES,
+        with_labels: bool = False,
+        filter_labels_exist: bool = False,
+) -> "sa.sql.Selectable":
+    """Return a single query of the monitor table data of several time windows.
+
+    Selects the same samples as a 'create_execution_data_query' per window, but scans the time range of
+    all the windows once. The windows are joined as values, so overlapping windows are supported, and the
+    samples of each window are ranked by the hash of their id. When possible only the samples reservoirs of
+    the windows hours are ranked (see 'can_read_samples_reservoir'). The result has an additional window index
+    column, and is split into the windows data with 'split_windows_data'.
+
+    Unlike the per window query, which filters the samples without labels after its limit, with
+    'filter_labels_exist' the samples without labels are filtered before the samples are ranked, so each
+    window gets up to 'n_samples' labeled samples.
+
+    Parameters
+    ----------
+    model_version: ModelVersion
+    options
+    windows
+        index, start and end of each window
+    columns
+    n_samples: int
+        The number of samples to collect per window
+    with_labels: bool, default False
+        Whether to add labels to the query
+    filter_labels_exist: bool, default False
+        Whether to filter out samples without labels
+
+    Returns
+    -------
+    Selectable
+    """
+    if filter_labels_exist and not with_labels:
+        raise ValueError("filter_labels_exist is True but with_labels is False")
+
+    table = model_version.get_monitor_table()
+    if columns is None:
+        columns = [col.name for col in table.c]
+    # Forcefully add the sample id and ts columns, sorted same as in 'create_execution_data_query'
+    columns = sorted(set(columns + [SAMPLE_TS_COL, SAMPLE_ID_COL]))
+
+    windows_values = values(
+        Column(WINDOW_INDEX_COL, Integer),
+        Column(WINDOW_START_COL, DateTime(timezone=True)),
+        Column(WINDOW_END_COL, DateTime(timezone=True)),
+        name="windows"
+    ).data([(index, start, end) for index, start, end in windows])
+    sample_ts = table.c[SAMPLE_TS_COL]
+
+    range_start, range_end = min(start for _, start, _ in windows), max(end for _, _, end in windows)
+
+    # For monitoring tables, we join the labels table if needed, before the samples of the windows are ranked
+    sample_labels_table = model_version.model.get_sample_labels_table() if with_labels else None
+    label_columns = [SAMPLE_LABEL_COL] if with_labels else []
+    # Filter only samples with labels
+    labels_filters = [sample_labels_table.c[SAMPLE_LABEL_COL].isnot(None)] if filter_labels_exist else []
+
+    def join_labels(selectable, sample_id):
+        if sample_labels_table is None:
+            return selectable
+        return selectable.outerjoin(sample_labels_table, sample_id == sample_labels_table.c[SAMPLE_ID_COL])
+
+    if can_read_samples_reservoir(options, [(start, end) for _, start, end in windows], n_samples,
+                                  filter_labels_exist):
+        # Ranking the samples of the reservoirs of the windows hours, then reading only the kept samples
+        reservoir = model_version.get_samples_reservoir_table()
+        sample_hour = reservoir.c[SAMPLES_MAP_HOUR_COL]
+        ranked = select([
+            reservoir.c[SAMPLE_ID_COL],
+            windows_values.c[WINDOW_INDEX_COL],
+            *(sample_labels_table.c[col] for col in label_columns),
+            func.row_number().over(
+                partition_by=windows_values.c[WINDOW_INDEX_COL],
+                order_by=[reservoir.c[SAMPLES_RESERVOIR_HASH_COL], reservoir.c[SAMPLE_ID_COL]]
+            ).label(WINDOW_RANK_COL)
+        ]) \
+            .select_from(join_labels(
+                reservoir.join(windows_values, and_(sample_hour >= windows_values.c[WINDOW_START_COL],
+                                                    sample_hour < windows_values.c[WINDOW_END_COL])),
+                reservoir.c[SAMPLE_ID_COL]
+            )) \
+            .where(reservoir.c.version_id == model_version.id, sample_hour >= range_start, sample_hour < range_end) \
+            .subquery()
+        data_query = select([
+            *(table.c[col] for col in columns),
+            ranked.c[WINDOW_INDEX_COL],
+            *(ranked.c[col] for col in label_columns)
+        ]) \
+            .select_from(ranked.join(table, table.c[SAMPLE_ID_COL] == ranked.c[SAMPLE_ID_COL])) \
+            .where(ranked.c[WINDOW_RANK_COL] <= n_samples, sample_ts >= range_start, sample_ts < range_end) \
+            .order_by(ranked.c[WINDOW_INDEX_COL], ranked.c[WINDOW_RANK_COL])
+    else:
+        rank = func.row_number().over(
+            partition_by=windows_values.c[WINDOW_INDEX_COL],
+            order_by=func.hashtext(table.c[SAMPLE_ID_COL])
+        ).label(WINDOW_RANK_COL)
+        ranked = select([
+            *(table.c[col] for col in columns),
+            *(sample_labels_table.c[col] for col in label_columns),
+            windows_values.c[WINDOW_INDEX_COL],
+            rank
+        ]) \
+            .select_from(join_labels(
+                table.join(windows_values, and_(sample_ts >= windows_values.c[WINDOW_START_COL],
+                                                sample_ts < windows_values.c[WINDOW_END_COL])),
+                table.c[SAMPLE_ID_COL]
+            )) \
+            .filter(options.sql_columns_filter()) \
+            .filter(sample_ts >= range_start, sample_ts < range_end, *labels_filters) \
+            .subquery()
+        data_query = select([ranked.c[col] for col in [*columns, WINDOW_INDEX_COL, *label_columns]]) \
+            .where(ranked.c[WINDOW_RANK_COL] <= n_samples) \
+            .order_by(ranked.c[WINDOW_INDEX_COL], ranked.c[WINDOW_RANK_COL])
+
+    return data_query
+
+
+def split_windows_data(data: pd.DataFrame) -> t.Dict[int, pd.DataFrame]:
+    """Split the result of 'create_windows_execution_data_query' into the data of each window."""
+    return {
+        int(index): window_data.drop(columns=WINDOW_INDEX_COL).reset_index(drop=True)
+        for index, window_data in data.groupby(WINDOW_INDEX_COL, sort=False)
+    }
+
+
 def load_data_for_check(
         model_version: ModelVersion,
         features: t.List[str],
@@ -628,6 +843,9 @@ def reduce_check_result(result: CheckResult, additional_kwargs) -> t.Optional[t.
     """Reduce check result and apply filtering on the check results (after reduce)."""
     if result is None:
         return
+    # Results of checks which were run by the pool processes are already reduced
+    if isinstance(result, dict):
+        return result
     final_result = {}
 
     def set_key_value(key, value):
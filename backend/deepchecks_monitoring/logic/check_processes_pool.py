@@ -0,0 +1,141 @@
+# ----------------------------------------------------------------------------
+# Copyright (C) 2021-2022 Deepchecks (https://www.deepchecks.com)
+#
+# This file is part of Deepchecks.
+# Deepchecks is distributed under the terms of the GNU Affero General
+# Public License (version 3 or later).
+# You should have received a copy of the GNU Affero General Public License
+# along with Deepchecks.  If not, see <http://www.gnu.org/licenses/>.
+# ----------------------------------------------------------------------------
+"""Execution of checks by a pool of processes, used when ray is not available.
+
+The windows data is sent to the processes as arrow IPC buffers, and is converted back to dataframes by the
+processes, which return the reduced check results instead of the check results objects. The pool belongs to
+a single server process, so each server worker process has a pool of its own.
+"""
+import logging
+import multiprocessing
+import typing as t
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import deepchecks
+import pandas as pd
+import pyarrow as pa
+
+from deepchecks_monitoring.monitoring_utils import MonitorCheckConfSchema
+
+__all__ = ["CheckRunArgs", "CheckProcessesPool", "create_check_processes_pool", "dataframe_to_ipc", "ipc_to_dataframe",
+           "run_check"]
+
+
+class CheckRunArgs(t.NamedTuple):
+    """Arguments of a check run which are the same for all the windows of a model version."""
+
+    check_config: t.Dict[str, t.Any]
+    balance_classes: bool
+    additional_kwargs: t.Optional[MonitorCheckConfSchema]
+    task_type: str
+    features_columns: t.Dict[str, str]
+    classes: t.Optional[t.List[t.Any]]
+    top_feat: t.List[str]
+    feat_imp: t.Optional[pd.Series]
+    model_id: int
+    model_version_id: int
+
+
+class CheckProcessesPool(ProcessPoolExecutor):
+    """Pool of processes which tracks whether it is broken.
+
+    A pool whose process terminated abruptly (e.g. killed by the OOM killer) is broken and rejects any further
+    work, which is noticed by the failure of its executions with 'BrokenProcessPool'.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.broken = False
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        try:
+            future = super().submit(fn, *args, **kwargs)
+        except BrokenProcessPool:
+            self.broken = True
+            raise
+        future.add_done_callback(self._track_broken)
+        return future
+
+    def _track_broken(self, future: Future):
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self.broken = True
+
+
+def create_check_processes_pool(size: int) -> CheckProcessesPool:
+    """Create the pool of the check processes.
+
+    The processes are spawned and not forked, as forking a process which runs an event loop and holds
+    database connections is not safe.
+    """
+    return CheckProcessesPool(
+        max_workers=size,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_initialize_process
+    )
+
+
+def _initialize_process():
+    # Same verbosity as the server, to not spam the logs
+    deepchecks.set_verbosity(logging.ERROR)
+
+
+def dataframe_to_ipc(df: t.Optional[pd.DataFrame]) -> t.Union[bytes, pd.DataFrame, None]:
+    """Serialize the dataframe to an arrow IPC buffer.
+
+    Dataframes with values arrow can't convert (e.g. object columns of mixed types) are returned as is,
+    and are pickled instead.
+    """
+    if df is None:
+        return None
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        return df
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def ipc_to_dataframe(data: t.Union[bytes, pd.DataFrame, None]) -> t.Optional[pd.DataFrame]:
+    """Deserialize a dataframe which was serialized by 'dataframe_to_ipc'."""
+    if data is None or isinstance(data, pd.DataFrame):
+        return data
+    return pa.ipc.open_stream(data).read_all().to_pandas()
+
+
+def run_check(
+    args: CheckRunArgs,
+    test_data: t.Union[bytes, pd.DataFrame],
+    reference_data: t.Union[bytes, pd.DataFrame, None],
+) -> t.Optional[t.Dict[str, t.Any]]:
+    """Run the check on the window data and return its reduced result, executed by the pool processes."""
+    # pylint: disable=import-outside-toplevel
+    from deepchecks_monitoring.logic.check_logic import reduce_check_result
+    from deepchecks_monitoring.logic.model_logic import dataframe_to_dataset_and_pred, initialize_check, run_deepchecks
+    from deepchecks_monitoring.schema_models import Model, ModelVersion
+    from deepchecks_monitoring.schema_models.model import TaskType
+
+    dp_check = initialize_check(args.check_config, args.balance_classes, args.additional_kwargs)
+    reference_ds, reference_pred, reference_proba = dataframe_to_dataset_and_pred(
+        df=ipc_to_dataframe(reference_data),
+        features_columns=args.features_columns,
+        task_type=args.task_type,
+        top_feat=args.top_feat,
+        dataset_name="Reference"
+    )
+    # Transient instances, holding only the fields used by 'run_deepchecks'
+    model = Model(id=args.model_id, task_type=TaskType(args.task_type))
+    model_version = ModelVersion(id=args.model_version_id, features_columns=args.features_columns,
+                                 classes=args.classes)
+    result = run_deepchecks(ipc_to_dataframe(test_data), model_version, model, args.top_feat, dp_check,
+                            args.feat_imp, False, reference_ds, reference_pred, reference_proba)
+    return reduce_check_result(result, args.additional_kwargs)
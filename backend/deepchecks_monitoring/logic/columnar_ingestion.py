@@ -0,0 +1,276 @@
+# ----------------------------------------------------------------------------
+# Copyright (C) 2021-2022 Deepchecks (https://www.deepchecks.com)
+#
+# This file is part of Deepchecks.
+# Deepchecks is distributed under the terms of the GNU Affero General
+# Public License (version 3 or later).
+# You should have received a copy of the GNU Affero General Public License
+# along with Deepchecks.  If not, see <http://www.gnu.org/licenses/>.
+# ----------------------------------------------------------------------------
+"""Module defining the column-wise (Arrow) validation and preparation of data samples batches."""
+import io
+import typing as t
+
+import numpy as np
+import pandas as pd
+import pendulum as pdl
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from deepchecks_monitoring.exceptions import BadRequest
+from deepchecks_monitoring.schema_models.column_type import (SAMPLE_ID_COL, SAMPLE_LOGGED_TIME_COL, SAMPLE_TS_COL,
+                                                             ColumnType)
+from deepchecks_monitoring.schema_models.model_version import CATEGORICAL_STATISTICS_VALUES_LIMIT, ModelVersion
+
+__all__ = [
+    "ARROW_STREAM_MEDIA_TYPE",
+    "PARQUET_MEDIA_TYPE",
+    "read_arrow_table",
+    "prepare_arrow_table",
+    "table_statistics",
+    "table_hours",
+    "table_to_json_records",
+]
+
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+
+# Integers beyond this magnitude are not exactly representable as float64
+MAX_EXACT_FLOAT_INTEGER = 2 ** 53
+MAX_INT64 = 2 ** 63 - 1
+
+ARROW_TYPES = {
+    ColumnType.NUMERIC: pa.float64(),
+    ColumnType.INTEGER: pa.int32(),
+    ColumnType.BIGINT: pa.int64(),
+    ColumnType.CATEGORICAL: pa.string(),
+    ColumnType.BOOLEAN: pa.bool_(),
+    ColumnType.TEXT: pa.string(),
+    ColumnType.ARRAY_FLOAT: pa.list_(pa.float64()),
+    ColumnType.ARRAY_FLOAT_2D: pa.list_(pa.list_(pa.float64())),
+    ColumnType.DATETIME: pa.timestamp("us", tz="UTC"),
+}
+
+
+def read_arrow_table(content: bytes, media_type: str) -> pa.Table:
+    """Read an Arrow IPC stream or a Parquet file into an Arrow table."""
+    try:
+        if media_type == ARROW_STREAM_MEDIA_TYPE:
+            with pa.ipc.open_stream(content) as reader:
+                return reader.read_all()
+        if media_type == PARQUET_MEDIA_TYPE:
+            return pq.read_table(io.BytesIO(content))
+    except (pa.ArrowInvalid, OSError) as e:
+        raise BadRequest(f"Failed to read the data batch: {e}") from e
+    raise BadRequest(f"Unsupported content type '{media_type}', "
+                     f"expected one of: {ARROW_STREAM_MEDIA_TYPE}, {PARQUET_MEDIA_TYPE}")
+
+
+def _is_numeric(arrow_type: pa.DataType) -> bool:
+    return pa.types.is_integer(arrow_type) or pa.types.is_floating(arrow_type)
+
+
+def _is_string(arrow_type: pa.DataType) -> bool:
+    return pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type)
+
+
+def _is_list_of(arrow_type: pa.DataType, predicate: t.Callable[[pa.DataType], bool]) -> bool:
+    is_list = (pa.types.is_list(arrow_type) or pa.types.is_large_list(arrow_type)
+               or pa.types.is_fixed_size_list(arrow_type))
+    return is_list and predicate(arrow_type.value_type)
+
+
+def is_compatible_arrow_type(column_type: ColumnType, arrow_type: pa.DataType) -> bool:
+    """Check whether values of the given arrow type can be stored in a column of the given type."""
+    if pa.types.is_dictionary(arrow_type):
+        arrow_type = arrow_type.value_type
+    if pa.types.is_null(arrow_type):
+        return True
+    if column_type == ColumnType.NUMERIC:
+        return _is_numeric(arrow_type)
+    if column_type in (ColumnType.INTEGER, ColumnType.BIGINT):
+        return pa.types.is_integer(arrow_type)
+    if column_type in (ColumnType.CATEGORICAL, ColumnType.TEXT):
+        return _is_string(arrow_type)
+    if column_type == ColumnType.BOOLEAN:
+        return pa.types.is_boolean(arrow_type)
+    if column_type == ColumnType.ARRAY_FLOAT:
+        return _is_list_of(arrow_type, _is_numeric)
+    if column_type == ColumnType.ARRAY_FLOAT_2D:
+        return _is_list_of(arrow_type, lambda it: _is_list_of(it, _is_numeric))
+    if column_type == ColumnType.DATETIME:
+        return pa.types.is_timestamp(arrow_type)
+    return False
+
+
+def _column_types(model_version: ModelVersion) -> t.Dict[str, ColumnType]:
+    columns = {**model_version.features_columns, **model_version.additional_data_columns,
+               **model_version.model_columns, **model_version.meta_columns}
+    return {name: ColumnType(column_type) for name, column_type in columns.items()}
+
+
+def _to_utc(column: pa.ChunkedArray) -> pa.ChunkedArray:
+    # Naive timestamps are treated as UTC, same as naive ISO strings in the json api,
+    # sub-microsecond precision is truncated as postgres does not store it
+    return column.cast(ARROW_TYPES[ColumnType.DATETIME], safe=False)
+
+
+def prepare_arrow_table(
+        model_version: ModelVersion,
+        table: pa.Table,
+        log_time: "pdl.DateTime",
+) -> t.Tuple[pa.Table, t.List[t.Dict[str, t.Any]]]:
+    """Validate a batch of samples column by column and conform it to the monitor table types.
+
+    Schema level problems (unknown columns, missing required columns, columns of incompatible type)
+    fail the whole batch, while problems of specific samples are returned as ingestion errors,
+    in the same format as the json api produces them.
+
+    Parameters
+    ----------
+    model_version : ModelVersion
+    table : pa.Table
+        batch of samples
+    log_time : pdl.DateTime
+        time of the batch logging
+
+    Returns
+    -------
+    Tuple[pa.Table, List[Dict[str, Any]]]
+        table of the valid samples, ordered as the monitor table columns, and the ingestion errors
+    """
+    column_types = _column_types(model_version)
+    schema = model_version.monitor_json_schema
+
+    if len(set(table.column_names)) != table.num_columns:
+        raise BadRequest("Got batch with duplicated column names")
+    unknown_columns = set(table.column_names).difference(column_types)
+    if unknown_columns:
+        raise BadRequest(f"Got columns which are not part of the model version schema: {sorted(unknown_columns)}")
+    missing_columns = set(schema["required"]).difference(table.column_names)
+    if missing_columns:
+        raise BadRequest(f"Got batch without the required columns: {sorted(missing_columns)}")
+    incompatible_columns = [
+        f"{name} ({table.schema.field(name).type} for {column_types[name].value})"
+        for name in table.column_names
+        if not is_compatible_arrow_type(column_types[name], table.schema.field(name).type)
+    ]
+    if incompatible_columns:
+        raise BadRequest(f"Got columns of incompatible types: {', '.join(incompatible_columns)}")
+
+    n_rows = table.num_rows
+    messages = np.full(n_rows, None, dtype=object)
+
+    def add_errors(mask, message: str):
+        # First found error of a sample is the one reported
+        messages[np.asarray(mask, dtype=bool) & pd.isna(messages)] = message
+
+    for name in table.column_names:
+        column = table.column(name)
+        column_type = column_types[name]
+        if name in schema["required"] and column.null_count:
+            add_errors(column.is_null(), f"data.{name} must not be null")
+        if pa.types.is_null(column.type):
+            continue
+        if column_type == ColumnType.INTEGER and pa.types.is_integer(column.type):
+            bounds = schema["properties"][name]
+            out_of_range = pc.or_(pc.less(column, bounds["minimum"]), pc.greater(column, bounds["maximum"]))
+            add_errors(out_of_range.fill_null(False), f"data.{name} must be within int32 range")
+        if column_type == ColumnType.NUMERIC and pa.types.is_integer(column.type) and column.type.bit_width > 32:
+            inexact = pc.greater(column, pa.scalar(MAX_EXACT_FLOAT_INTEGER, column.type))
+            if pa.types.is_signed_integer(column.type):
+                inexact = pc.or_(inexact, pc.less(column, -MAX_EXACT_FLOAT_INTEGER))
+            add_errors(inexact.fill_null(False), f"data.{name} must be within the float precision range")
+        if column_type == ColumnType.BIGINT and pa.types.is_uint64(column.type):
+            # Compared with a scalar of the column type, otherwise the column is cast to int64
+            overflow = pc.greater(column, pa.scalar(MAX_INT64, column.type))
+            add_errors(overflow.fill_null(False), f"data.{name} must be within int64 range")
+        if (n_items := schema["properties"][name].get("minItems")) is not None:
+            wrong_length = pc.not_equal(pc.list_value_length(column), n_items)
+            add_errors(wrong_length.fill_null(False), f"data.{name} must contain {n_items} items")
+
+    timestamps = _to_utc(table.column(SAMPLE_TS_COL))
+    future = pc.greater(timestamps, pa.scalar(pdl.now(), type=timestamps.type))
+    add_errors(future.fill_null(False), "Got future timestamp")
+    # Only the first valid sample of an id is kept, same as in the json api
+    sample_ids = table.column(SAMPLE_ID_COL).to_pandas().where(pd.isna(messages))
+    add_errors(sample_ids.duplicated(keep="first") & sample_ids.notna(), "Got duplicate sample id")
+
+    errors = []
+    invalid_mask = pd.notna(messages)
+    if invalid_mask.any():
+        invalid_rows = table.filter(pa.array(invalid_mask)).to_pylist()
+        for sample, message in zip(invalid_rows, messages[invalid_mask]):
+            errors.append({
+                "sample": str(sample),
+                "sample_id": sample.get(SAMPLE_ID_COL),
+                "error": f"{message}, for id: {sample.get(SAMPLE_ID_COL)}",
+                "model_id": model_version.model_id,
+                "model_version_id": model_version.id
+            })
+        table = table.filter(pa.array(~invalid_mask))
+
+    monitor_columns = [column.name for column in model_version.get_monitor_table().columns]
+    arrays = []
+    for name in monitor_columns:
+        if name == SAMPLE_LOGGED_TIME_COL:
+            arrays.append(pa.array([log_time] * table.num_rows, type=ARROW_TYPES[ColumnType.DATETIME]))
+            continue
+        target_type = ARROW_TYPES[column_types[name]]
+        if name in table.column_names:
+            column = table.column(name)
+            if pa.types.is_dictionary(column.type):
+                column = column.cast(column.type.value_type)
+            if column_types[name] == ColumnType.DATETIME and not pa.types.is_null(column.type):
+                column = _to_utc(column)
+            try:
+                arrays.append(column.cast(target_type))
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+                # The values which can't be converted are reported per sample above, this is a safety net
+                raise BadRequest(f"Failed to convert column {name} to {column_types[name].value}: {e}") from e
+        else:
+            arrays.append(pa.nulls(table.num_rows, type=target_type))
+
+    return pa.Table.from_arrays(arrays, names=monitor_columns), errors
+
+
+def table_statistics(statistics: t.Dict[str, t.Any], table: pa.Table) -> t.Dict[str, t.Any]:
+    """Compute the statistics of the given table, in the structure of the given model version statistics."""
+    batch_statistics = {}
+    for name, stats_info in statistics.items():
+        column_stats = {key: None for key in ("min", "max") if key in stats_info}
+        if "values" in stats_info:
+            column_stats["values"] = []
+        batch_statistics[name] = column_stats
+        if name not in table.column_names:
+            continue
+        column = table.column(name)
+        if column_stats.keys() & {"min", "max"}:
+            min_max = pc.min_max(column).as_py()
+            for key in ("min", "max"):
+                value = min_max[key]
+                if key in column_stats and value is not None:
+                    column_stats[key] = value.timestamp() if pa.types.is_timestamp(column.type) else value
+        if "values" in column_stats:
+            unique_values = pc.unique(column).drop_null()
+            column_stats["values"] = unique_values.slice(0, CATEGORICAL_STATISTICS_VALUES_LIMIT).to_pylist()
+    return batch_statistics
+
+
+def table_hours(table: pa.Table, column: str = SAMPLE_TS_COL) -> t.List["pdl.DateTime"]:
+    """Return the distinct hours of the timestamps column."""
+    hours = pc.unique(pc.floor_temporal(table.column(column), unit="hour")).drop_null()
+    return [pdl.instance(it) for it in hours.to_pylist()]
+
+
+def table_to_json_records(table: pa.Table) -> t.List[t.Dict[str, t.Any]]:
+    """Convert the table into json serializable samples, as they are received by the json api."""
+    for index, field in enumerate(table.schema):
+        if pa.types.is_timestamp(field.type):
+            # The timestamps are cast to microseconds, for which arrow formats the seconds with their fraction
+            # ("%f" is not supported), so the samples keep the precision of those sent to the json api
+            iso_strings = pc.strftime(_to_utc(table.column(index)), format="%Y-%m-%dT%H:%M:%S%z")
+            table = table.set_column(index, field.name, iso_strings)
+    return table.to_pylist()
@@ -10,48 +10,89 @@
 
 """Module defining the dynamic tables metadata for the monitoring package."""
 import asyncio
-import copy
 import json
 import typing as t
 
 import asyncpg.exceptions
-import fastjsonschema
+import msgpack
+import numpy as np
 import pandas as pd
 import pendulum as pdl
+import pyarrow as pa
+import pyarrow.compute as pc
 import sqlalchemy.exc
 from aiokafka import AIOKafkaConsumer, AIOKafkaProducer, TopicPartition
 from aiokafka.structs import ConsumerRecord
-from sqlalchemy import Column, select, text
+from sqlalchemy import Column, MetaData, Table, all_, delete, func, literal, select, tuple_, union
 from sqlalchemy.dialects import postgresql
 from sqlalchemy.dialects.postgresql import array_agg
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
+from sqlalchemy.sql.ddl import CreateTable, DropTable
 
 from deepchecks_monitoring.bgtasks.model_version_cache_invalidation import insert_model_version_cache_invalidation_task
+from deepchecks_monitoring.bgtasks.model_version_statistics_fold import (add_statistics_delta,
+                                                                         defer_statistics_deltas_fold,
+                                                                         fold_deferred_statistics_deltas)
+from deepchecks_monitoring.logic.batch_validation import frame_hours, frame_to_records, parse_date_time
+from deepchecks_monitoring.logic.columnar_ingestion import (prepare_arrow_table, table_hours, table_statistics,
+                                                            table_to_json_records)
+from deepchecks_monitoring.logic.ingestion_spool import (IngestionSpool, SpoolRecord, open_process_spool,
+                                                         open_unused_spools)
 from deepchecks_monitoring.logic.kafka_consumer import consume_from_kafka
 from deepchecks_monitoring.logic.keys import DATA_TOPIC_PREFIXES, data_topic_name_to_ids, get_data_topic_name
+from deepchecks_monitoring.logic.monitor_partitions import create_partitions_for_table
 from deepchecks_monitoring.monitoring_utils import configure_logger
 from deepchecks_monitoring.resources import ResourcesProvider
 from deepchecks_monitoring.schema_models import Model, ModelVersion
 from deepchecks_monitoring.schema_models.column_type import (SAMPLE_ID_COL, SAMPLE_LABEL_COL, SAMPLE_LOGGED_TIME_COL,
-                                                             SAMPLE_PRED_COL, SAMPLE_TS_COL)
+                                                             SAMPLE_PRED_COL, SAMPLE_TS_COL, get_label_column_type)
 from deepchecks_monitoring.schema_models.ingestion_errors import IngestionError
-from deepchecks_monitoring.schema_models.model_version import get_monitor_table_name, update_statistics_from_sample
+from deepchecks_monitoring.schema_models.model import (SAMPLES_MAP_HOUR_COL, SAMPLES_RESERVOIR_HASH_COL,
+                                                       SAMPLES_RESERVOIR_SIZE)
+from deepchecks_monitoring.schema_models.model_version import CATEGORICAL_STATISTICS_VALUES_LIMIT, statistics_from_batch
+from deepchecks_monitoring.schema_models.statistics_delta import StatisticsDelta
 from deepchecks_monitoring.schema_models.task_type import TaskType
-from deepchecks_monitoring.utils.database import sqlalchemy_exception_to_asyncpg_exception
-from deepchecks_monitoring.utils.other import datetime_sample_formatter
+from deepchecks_monitoring.utils.database import copy_records_to_table, sqlalchemy_exception_to_asyncpg_exception
 
-__all__ = ["DataIngestionBackend", "log_data", "log_labels", "save_failures"]
+__all__ = ["DataIngestionBackend", "SamplesCoalescer", "log_data", "log_data_columnar", "log_labels", "save_failures"]
 
 
-QUERY_PARAM_LIMIT = 32765
+# Messages of this format carry a batch of samples encoded with msgpack, and the log time once per message.
+# Messages without headers are of the older format, with a single json encoded sample per message.
+BATCH_MESSAGE_HEADERS = [("format", b"msgpack-batch")]
+# Upper bound of the size the producer adds to a message value (record and batch headers, key and headers)
+MESSAGE_SIZE_OVERHEAD = 1024
+# Time to wait before reading the spool again once all of its messages were loaded
+SPOOL_DRAIN_INTERVAL_SECONDS = 0.5
+# Time between attempts to take over the spools which are not used by any process
+SPOOL_TAKEOVER_INTERVAL_SECONDS = 60
+
+
+def _log_times_column(log_times: t.Sequence[t.Any], now: "pdl.DateTime") -> pd.Series:
+    """Convert the samples log times, given as datetimes or ISO 8601 strings, into UTC timestamps.
+
+    The samples of a request or of a kafka message share their log time, so only the distinct values
+    are converted. Missing or invalid log times are set to now.
+    """
+    codes, distinct = pd.factorize(pd.Series(log_times, dtype=object))
+    # Appending now as the last value, it is taken by the missing values code (-1)
+    distinct = pd.Series([*distinct, now], dtype=object)
+    is_string = distinct.map(type).eq(str).to_numpy()
+    converted = pd.Series(pd.NaT, index=distinct.index, dtype="datetime64[us, UTC]")
+    if is_string.any():
+        converted[is_string] = parse_date_time(distinct[is_string].to_numpy())[0].to_numpy()
+    if not is_string.all():
+        converted[~is_string] = pd.to_datetime(distinct[~is_string], utc=True).astype(converted.dtype)
+    converted = converted.fillna(pd.Timestamp(now))
+    return pd.Series(converted.array.take(codes))
 
 
 async def log_data(
         model_version: ModelVersion,
         data: t.List[t.Dict[t.Any, t.Any]],
         session: AsyncSession,
-        log_times: t.List["pdl.DateTime"],
+        log_times: t.Sequence[t.Union["pdl.DateTime", str, None]],
         logger,
         org_id: int,
         cache_functions
@@ -67,86 +108,68 @@ async def log_data(
     logger
     org_id
     cache_functions
+
+    Returns
+    -------
+    List[int]
+        positions in data of the samples which were logged
     """
     now = pdl.now()
-    valid_data = {}
     errors = []
-    validator = t.cast(t.Callable[..., t.Any], fastjsonschema.compile(model_version.monitor_json_schema))
-    model: Model = model_version.model
+    batch = model_version.get_monitor_validator()(data)
 
-    for index, sample in enumerate(data):
-        # Samples can have different optional fields sent on them, so in order to save them in multi-insert we need
-        # to make sure all samples have same set of fields.
-        model_version.fill_optional_fields(sample)
-        try:
-            validator(sample)
-        except fastjsonschema.JsonSchemaValueException as e:
-            errors.append({
-                "sample": str(sample),
-                "sample_id": sample.get(SAMPLE_ID_COL),
-                "error": f"Exception: {str(e)}, for id: {sample.get(SAMPLE_ID_COL)}",
-                "model_id": model_version.model_id,
-                "model_version_id": model_version.id
-            })
+    for index in np.flatnonzero(batch.errors.notna().to_numpy()):
+        sample = data[index]
+        if isinstance(sample, dict):
+            model_version.fill_optional_fields(sample)
+        errors.append({
+            "sample": str(sample),
+            "sample_id": sample.get(SAMPLE_ID_COL) if isinstance(sample, dict) else None,
+            "error": f"Exception: {batch.errors[index]}, for id: "
+                     f"{sample.get(SAMPLE_ID_COL) if isinstance(sample, dict) else None}",
+            "model_id": model_version.model_id,
+            "model_version_id": model_version.id
+        })
+
+    samples = batch.valid_samples
+    samples = samples.assign(**{
+        SAMPLE_LOGGED_TIME_COL: _log_times_column(log_times, now)[samples.index]
+    })
+    # Only the first sample of each id which is not in the future is kept, same as before the batch validation
+    sample_ids = samples[SAMPLE_ID_COL]
+    is_future = (samples[SAMPLE_TS_COL] > pd.Timestamp(now)).to_numpy()
+    is_kept = ~is_future & ~sample_ids.where(~is_future).duplicated(keep="first").to_numpy()
+    kept_positions = pd.Series(np.flatnonzero(is_kept), index=sample_ids[is_kept])
+    has_kept_before = (sample_ids.map(kept_positions) < np.arange(len(samples))).to_numpy()
+    for index in np.flatnonzero(~is_kept):
+        sample = samples.iloc[index]
+        if has_kept_before[index]:
+            error = f"Got duplicate sample id: {sample[SAMPLE_ID_COL]}"
         else:
-            sample[SAMPLE_LOGGED_TIME_COL] = log_times[index]
-            datetime_sample_formatter(sample, model_version)
-            error = None
-            # If got same index more than once, log it as error
-            if sample[SAMPLE_ID_COL] in valid_data:
-                error = f"Got duplicate sample id: {sample[SAMPLE_ID_COL]}"
-            # If got future timestamp prevent save
-            elif sample[SAMPLE_TS_COL] > now:
-                error = f"Got future timestamp: {sample[SAMPLE_TS_COL]}, for sample id: {sample[SAMPLE_ID_COL]}"
-
-            if error:
-                errors.append({
-                    "sample": str(sample),
-                    "sample_id": sample.get(SAMPLE_ID_COL),
-                    "error": error,
-                    "model_id": model_version.model_id,
-                    "model_version_id": model_version.id
-                })
-            else:
-                valid_data[sample[SAMPLE_ID_COL]] = sample
+            error = (f"Got future timestamp: {sample[SAMPLE_TS_COL].isoformat()}, "
+                     f"for sample id: {sample[SAMPLE_ID_COL]}")
+        errors.append({
+            "sample": str(sample.to_dict()),
+            "sample_id": sample[SAMPLE_ID_COL],
+            "error": error,
+            "model_id": model_version.model_id,
+            "model_version_id": model_version.id
+        })
+    samples = samples[is_kept]
 
     # Insert samples, and log samples which failed on existing index
     logged_ids = set()
-    if valid_data:
-        # Starting by adding to the version map
-        versions_map = model.get_samples_versions_map_table(session)
-        ids_to_log = [{SAMPLE_ID_COL: sample_id, "version_id": model_version.id} for sample_id in valid_data]
-        ids_not_existing = set()
-        max_messages_per_insert = QUERY_PARAM_LIMIT // 5
-        for start_index in range(0, len(ids_to_log), max_messages_per_insert):
-            statement = (postgresql.insert(versions_map)
-                         .values(ids_to_log[start_index:start_index + max_messages_per_insert])
-                         .on_conflict_do_nothing(index_elements=versions_map.primary_key.columns)
-                         .returning(versions_map.c[SAMPLE_ID_COL]))
-            ids_not_existing.update((await session.execute(statement)).scalars())
-        # Filter from the data ids which weren't logged to the versions table
-        data_list = [sample for id, sample in valid_data.items() if id in ids_not_existing]
-        if data_list:
-            # Postgres driver has a limit of 32767 query params, which for 1000 messages, limits us to 32 columns. In
-            # order to solve that we can either pre-compile the statement with bind literals, or separate to batches
-            num_columns = len(data_list[0])
-            max_messages_per_insert = QUERY_PARAM_LIMIT // num_columns
-            monitor_table = model_version.get_monitor_table(session)
-            for start_index in range(0, len(data_list), max_messages_per_insert):
-                batch = data_list[start_index:start_index + max_messages_per_insert]
-                statement = (postgresql.insert(monitor_table).values(batch)
-                             .on_conflict_do_nothing(index_elements=[SAMPLE_ID_COL])
-                             .returning(monitor_table.c[SAMPLE_ID_COL]))
-                results = (await session.execute(statement)).scalars()
-                logged_ids.update(set(results))
-
-    logged_samples = [v for k, v in valid_data.items() if k in logged_ids]
-    not_logged_samples = [v for k, v in valid_data.items() if k not in logged_ids]
-    for sample in not_logged_samples:
+    if len(samples) > 0:
+        columns = [column.name for column in model_version.get_monitor_table().columns]
+        logged_ids = await _bulk_insert_records(model_version, columns, frame_to_records(samples, columns), session)
+
+    is_logged = samples[SAMPLE_ID_COL].isin(logged_ids).to_numpy()
+    for sample in samples[~is_logged].to_dict("records"):
         errors.append(dict(sample=str(sample), sample_id=sample[SAMPLE_ID_COL],
                            error=f"Duplicate index on log for id {sample[SAMPLE_ID_COL]}",
                            model_id=model_version.model_id, model_version_id=model_version.id))
 
+    logged_samples = samples[is_logged]
     if len(logged_samples) == 0:
         # If did not log any samples, only needs to save the errors. If did log samples, will save the errors later
         # after updating the model
@@ -154,27 +177,205 @@ async def log_data(
         return []
 
     # Update statistics and timestamps, running only on samples which were logged successfully
-    logged_timestamps = []
-    updated_statistics = copy.deepcopy(model_version.statistics)
-    for sample in logged_samples:
-        update_statistics_from_sample(updated_statistics, sample)
-        logged_timestamps.append(sample[SAMPLE_TS_COL])
-
-    max_ts = max(logged_timestamps)
-    min_ts = min(logged_timestamps)
-    # IMPORTANT: In order to prevent deadlock in case of model deletion, we need to update the model first, because
-    # we must acquire the locks on the model and model versions in the same order (model first, then model version).
-    await model.update_timestamps(min_ts, max_ts)
-
-    # Save errors only after updating model, since it also acquires a lock on the model version
+    await _update_model_version_after_ingestion(
+        model_version, session, errors, logger, org_id, cache_functions,
+        batch_statistics=statistics_from_batch(model_version.statistics, logged_samples),
+        min_ts=pdl.instance(logged_samples[SAMPLE_TS_COL].min().to_pydatetime()),
+        max_ts=pdl.instance(logged_samples[SAMPLE_TS_COL].max().to_pydatetime()),
+        timestamps_updated=frame_hours(logged_samples, SAMPLE_TS_COL)
+    )
+    return logged_samples.index.tolist()
+
+
+async def log_data_columnar(
+        model_version: ModelVersion,
+        table: pa.Table,
+        session: AsyncSession,
+        log_time: "pdl.DateTime",
+        logger,
+        org_id: int,
+        cache_functions
+):
+    """Insert batch of data samples given as an Arrow table.
+
+    Same as `log_data`, but the batch is validated, inserted and summarized column by column,
+    without creating a dict per sample.
+    """
+    valid_table, errors = prepare_arrow_table(model_version, table, log_time)
+
+    logged_ids = set()
+    if valid_table.num_rows > 0:
+        columns = valid_table.column_names
+        records = zip(*(valid_table.column(name).to_pylist() for name in columns))
+        logged_ids = await _bulk_insert_records(model_version, columns, records, session)
+
+    is_logged = pc.is_in(valid_table.column(SAMPLE_ID_COL), value_set=pa.array(list(logged_ids), type=pa.string()))
+    for sample in valid_table.filter(pc.invert(is_logged)).to_pylist():
+        errors.append(dict(sample=str(sample), sample_id=sample[SAMPLE_ID_COL],
+                           error=f"Duplicate index on log for id {sample[SAMPLE_ID_COL]}",
+                           model_id=model_version.model_id, model_version_id=model_version.id))
+
+    logged_table = valid_table.filter(is_logged)
+    if logged_table.num_rows == 0:
+        await save_failures(session, errors, logger)
+        return
+
+    timestamps_range = pc.min_max(logged_table.column(SAMPLE_TS_COL)).as_py()
+    await _update_model_version_after_ingestion(
+        model_version, session, errors, logger, org_id, cache_functions,
+        batch_statistics=table_statistics(model_version.statistics, logged_table),
+        min_ts=pdl.instance(timestamps_range["min"]),
+        max_ts=pdl.instance(timestamps_range["max"]),
+        timestamps_updated=table_hours(logged_table)
+    )
+
+
+async def _update_model_version_after_ingestion(
+        model_version: ModelVersion,
+        session: AsyncSession,
+        errors: t.List[t.Dict[str, t.Any]],
+        logger,
+        org_id: int,
+        cache_functions,
+        batch_statistics: t.Dict[str, t.Any],
+        min_ts: "pdl.DateTime",
+        max_ts: "pdl.DateTime",
+        timestamps_updated: t.List["pdl.DateTime"]
+):
     await save_failures(session, errors, logger)
+    await add_statistics_delta(session, model_version.id, batch_statistics, start_time=min_ts, end_time=max_ts)
+    await defer_statistics_deltas_fold(session, org_id, model_version.id)
+    await add_cache_invalidation(org_id, model_version.id, timestamps_updated, session, cache_functions)
+
+
+async def _commit_and_fold_statistics_deltas(session: AsyncSession):
+    """Commit the ingestion transaction, then fold the statistics deltas it added.
+
+    Statistics and timestamps are folded right away if no other transaction is folding them, otherwise the
+    deltas are left to the fold task inserted with them, so concurrent ingestions to the same version never wait on
+    each other.
+    Each fold runs in its own transaction, so the model and model version rows are not locked for the
+    whole ingestion transaction.
+    """
+    await session.commit()
+    await fold_deferred_statistics_deltas(session)
+
+
+async def _bulk_insert_records(
+        model_version: ModelVersion,
+        columns: t.List[str],
+        records: t.Iterable[t.Sequence[t.Any]],
+        session: AsyncSession
+) -> t.Set[str]:
+    """Insert validated records of the given columns into the version's monitor table.
+
+    The records are streamed with binary COPY into a temporary staging table, then a single statement
+    adds them to the samples versions map and to the monitor table, skipping samples whose id was already
+    logged to this version.
+
+    Returns
+    -------
+    Set[str]
+        ids of the samples which were inserted
+    """
+    model: Model = model_version.model
+    monitor_table = model_version.get_monitor_table()
+    versions_map = model.get_samples_versions_map_table(session)
+    samples_reservoir = model.get_samples_reservoir_table(session)
+
+    staging_table = Table(
+        f"staging_{monitor_table.name}",
+        MetaData(),
+        *(Column(name, monitor_table.c[name].type) for name in columns),
+        prefixes=["TEMPORARY"],
+        postgresql_on_commit="DROP"
+    )
+    await session.execute(CreateTable(staging_table))
+    await copy_records_to_table(session, staging_table, records=records, columns=columns)
+    if model_version.monitor_partition_interval is not None:
+        await create_partitions_for_table(session, monitor_table.name, model_version.monitor_partition_interval,
+                                          staging_table)
 
-    # Update model version statistics and timestamps
-    if model_version.statistics != updated_statistics:
-        await model_version.update_statistics(updated_statistics)
-    await model_version.update_timestamps(min_ts, max_ts)
-    await add_cache_invalidation(org_id, model_version.id, logged_timestamps, session, cache_functions)
-    model_version.last_update_time = pdl.now()
+    # Starting by adding to the version map, samples which are already mapped are not inserted to the monitor table
+    inserted_ids = (
+        postgresql.insert(versions_map)
+        .from_select(
+            [SAMPLE_ID_COL, "version_id", SAMPLES_MAP_HOUR_COL],
+            select(staging_table.c[SAMPLE_ID_COL], literal(model_version.id),
+                   func.date_trunc("hour", staging_table.c[SAMPLE_TS_COL]))
+        )
+        .on_conflict_do_nothing(index_elements=versions_map.primary_key.columns)
+        .returning(versions_map.c[SAMPLE_ID_COL])
+        .cte("inserted_ids")
+    )
+    logged_samples = (
+        postgresql.insert(monitor_table)
+        .from_select(
+            columns,
+            select(*(staging_table.c[name] for name in columns))
+            .where(staging_table.c[SAMPLE_ID_COL].in_(select(inserted_ids.c[SAMPLE_ID_COL])))
+        )
+        # Without conflict target, since the primary key of partitioned tables contains the sample timestamp
+        .on_conflict_do_nothing()
+        .returning(monitor_table.c[SAMPLE_ID_COL], monitor_table.c[SAMPLE_TS_COL])
+        .cte("logged_samples")
+    )
+    # The logged samples are added to the reservoir, which is trimmed back to its size right after
+    reservoir_samples = (
+        postgresql.insert(samples_reservoir)
+        .from_select(
+            ["version_id", SAMPLES_MAP_HOUR_COL, SAMPLES_RESERVOIR_HASH_COL, SAMPLE_ID_COL],
+            select(literal(model_version.id), func.date_trunc("hour", logged_samples.c[SAMPLE_TS_COL]),
+                   func.hashtext(logged_samples.c[SAMPLE_ID_COL]), logged_samples.c[SAMPLE_ID_COL])
+        )
+        .on_conflict_do_nothing()
+        .cte("reservoir_samples")
+    )
+    statement = (
+        select(logged_samples.c[SAMPLE_ID_COL])
+        .add_cte(inserted_ids)
+        .add_cte(logged_samples)
+        .add_cte(reservoir_samples)
+    )
+    logged_ids = set((await session.execute(statement)).scalars())
+    if logged_ids:
+        await _trim_samples_reservoir(model_version, session, staging_table)
+    await session.execute(DropTable(staging_table))
+    return logged_ids
+
+
+async def _trim_samples_reservoir(model_version: ModelVersion, session: AsyncSession, staging_table: Table):
+    """Remove the samples of the version which exceed the reservoir size, in the hours of the staged samples.
+
+    Concurrent ingestions do not see each other samples, so an hour might be left with more samples than the
+    reservoir size until its next ingestion, which is fine since the reservoir only needs to hold the samples
+    with the smallest hashes.
+    """
+    samples_reservoir = model_version.model.get_samples_reservoir_table(session)
+    key_columns = [samples_reservoir.c[name] for name in (SAMPLES_MAP_HOUR_COL, SAMPLES_RESERVOIR_HASH_COL,
+                                                          SAMPLE_ID_COL)]
+    ranked = (
+        select(
+            *key_columns,
+            func.row_number().over(
+                partition_by=samples_reservoir.c[SAMPLES_MAP_HOUR_COL],
+                order_by=[samples_reservoir.c[SAMPLES_RESERVOIR_HASH_COL], samples_reservoir.c[SAMPLE_ID_COL]]
+            ).label("rank")
+        )
+        .where(samples_reservoir.c.version_id == model_version.id,
+               samples_reservoir.c[SAMPLES_MAP_HOUR_COL].in_(
+                   select(func.date_trunc("hour", staging_table.c[SAMPLE_TS_COL])).distinct()
+               ))
+        .subquery()
+    )
+    await session.execute(
+        delete(samples_reservoir)
+        .where(samples_reservoir.c.version_id == model_version.id,
+               tuple_(*key_columns).in_(
+                   select(*(ranked.c[column.name] for column in key_columns))
+                   .where(ranked.c.rank > SAMPLES_RESERVOIR_SIZE)
+               ))
+    )
 
 
 async def log_labels(
@@ -185,122 +386,171 @@ async def log_labels(
         cache_functions,
         logger
 ):
-    unbatched_valid_data = pd.Series()
-    logged_ids = set()
-    labels_table_columns = model.get_sample_labels_columns()
-    labels_table_json_schema = {
-        "type": "object",
-        "properties": {
-            name: data_type.to_json_schema_type(nullable=name != SAMPLE_ID_COL)
-            for name, data_type in labels_table_columns.items()
-        },
-        "required": list(labels_table_columns.keys()),
-        "additionalProperties": False
-    }
-
-    validator = t.cast(t.Callable[..., t.Any], fastjsonschema.compile(labels_table_json_schema))
+    """Insert or update batch of labels.
+
+    The labels are streamed with binary COPY into a temporary staging table, then the versions of the labeled
+    samples are resolved, validated, summarized and invalidated with set based statements.
+    """
+    batch = model.get_sample_labels_validator()(data)
     errors = []
-    for sample in data:
-        try:
-            validator(sample)
-        except fastjsonschema.JsonSchemaValueException as e:
-            errors.append({
-                "sample": str(sample),
-                "sample_id": sample.get(SAMPLE_ID_COL),
-                "error": f"Exception saving label: {str(e)}, for id: {sample.get(SAMPLE_ID_COL)}",
-                "model_id": model.id,
-            })
-        else:
-            # If got same index more than once, log it as error
-            if sample[SAMPLE_ID_COL] in logged_ids:
-                errors.append({
-                    "sample": str(sample),
-                    "sample_id": sample.get(SAMPLE_ID_COL),
-                    "error": f"Got duplicate label for sample id: {sample[SAMPLE_ID_COL]}. "
-                             f"{sample.get(SAMPLE_LABEL_COL)} vs "
-                             f"{unbatched_valid_data[sample[SAMPLE_ID_COL]].get(SAMPLE_LABEL_COL)}",
-                    "model_id": model.id,
-                })
-            else:
-                unbatched_valid_data[sample[SAMPLE_ID_COL]] = sample
-                logged_ids.add(sample[SAMPLE_ID_COL])
+    for index in np.flatnonzero(batch.errors.notna().to_numpy()):
+        sample = data[index]
+        sample_id = sample.get(SAMPLE_ID_COL) if isinstance(sample, dict) else None
+        errors.append({
+            "sample": str(sample),
+            "sample_id": sample_id,
+            "error": f"Exception saving label: {batch.errors[index]}, for id: {sample_id}",
+            "model_id": model.id,
+        })
+
+    # If got same index more than once, log it as error
+    samples = batch.valid_samples
+    is_duplicate = samples[SAMPLE_ID_COL].duplicated(keep="first").to_numpy()
+    labels = samples[~is_duplicate]
+    first_labels = labels.set_index(SAMPLE_ID_COL)[SAMPLE_LABEL_COL]
+    for sample in samples[is_duplicate].to_dict("records"):
+        errors.append({
+            "sample": str(sample),
+            "sample_id": sample.get(SAMPLE_ID_COL),
+            "error": f"Got duplicate label for sample id: {sample[SAMPLE_ID_COL]}. "
+                     f"{sample.get(SAMPLE_LABEL_COL)} vs {first_labels[sample[SAMPLE_ID_COL]]}",
+            "model_id": model.id,
+        })
 
     await save_failures(session, errors, logger)
 
-    if len(unbatched_valid_data) == 0:
+    if len(labels) == 0:
         return
-    max_messages_per_insert = QUERY_PARAM_LIMIT // 5
-    ids_to_log = unbatched_valid_data.keys()
-    for start_index in range(0, len(ids_to_log), max_messages_per_insert):
-        valid_data = unbatched_valid_data[ids_to_log[start_index:start_index + max_messages_per_insert]]
-        # Query from the ids mapping all the relevant versions per each version. This is needed in order to query
-        # the timestamps to invalidate the monitors cache
-        versions_table = model.get_samples_versions_map_table(session)
-        versions_select = (
-            select(
-                versions_table.c["version_id"],
-                array_agg(versions_table.c[SAMPLE_ID_COL])
-            )
-            .where(versions_table.c[SAMPLE_ID_COL].in_(list(valid_data.keys())))
-            .group_by(versions_table.c["version_id"])
+
+    labels_table = model.get_sample_labels_table(session)
+    versions_map = model.get_samples_versions_map_table(session)
+    columns = [SAMPLE_ID_COL, SAMPLE_LABEL_COL]
+    staging_table = Table(
+        f"staging_{labels_table.name}",
+        MetaData(),
+        *(Column(name, labels_table.c[name].type) for name in columns),
+        prefixes=["TEMPORARY"],
+        postgresql_on_commit="DROP"
+    )
+    await session.execute(CreateTable(staging_table))
+    await copy_records_to_table(session, staging_table, records=frame_to_records(labels, columns), columns=columns)
+
+    # Validation of classes amount for binary tasks
+    if model.task_type == TaskType.BINARY:
+        await save_failures(session, await _remove_labels_of_unknown_classes(model, staging_table, session), logger)
+
+    # Insert or update all labels
+    insert_statement = postgresql.insert(labels_table).from_select(columns, select(staging_table))
+    upsert_statement = insert_statement.on_conflict_do_update(
+        index_elements=[SAMPLE_ID_COL],
+        set_={SAMPLE_LABEL_COL: insert_statement.excluded[SAMPLE_LABEL_COL]}
+    )
+    upserted = (await session.execute(upsert_statement)).rowcount
+
+    # Update label statistics of the versions which logged the labeled samples
+    label = staging_table.c[SAMPLE_LABEL_COL]
+    label_stub = get_label_column_type(TaskType(model.task_type)).to_statistics_stub()
+    aggregates = [func.min(label), func.max(label)] if "min" in label_stub else [array_agg(label.distinct())]
+    labels_statistics = (
+        select(versions_map.c["version_id"], *aggregates)
+        .join(versions_map, versions_map.c[SAMPLE_ID_COL] == staging_table.c[SAMPLE_ID_COL])
+        .join(ModelVersion, ModelVersion.id == versions_map.c["version_id"])
+        .where(label.isnot(None), ModelVersion.statistics.has_key(SAMPLE_LABEL_COL))
+        .group_by(versions_map.c["version_id"])
+    )
+    for version_id, *values in (await session.execute(labels_statistics)).all():
+        if "min" in label_stub:
+            label_statistics = {"min": values[0], "max": values[1]}
+        else:
+            label_statistics = {"values": values[0][:CATEGORICAL_STATISTICS_VALUES_LIMIT]}
+        await add_statistics_delta(session, version_id, {SAMPLE_LABEL_COL: label_statistics})
+        await defer_statistics_deltas_fold(session, org_id, version_id)
+
+    # Invalidate the monitors cache of the hours of the labeled samples
+    for version_id, hours in (await _labeled_hours(model, staging_table, session)).items():
+        await add_cache_invalidation(org_id, version_id, hours, session, cache_functions)
+
+    await session.execute(DropTable(staging_table))
+    if upserted:
+        model.last_update_time = pdl.now()
+
+
+async def _remove_labels_of_unknown_classes(
+        model: Model,
+        staging_table: Table,
+        session: AsyncSession
+) -> t.List[t.Dict[str, t.Any]]:
+    """Remove from the staging table labels which are not one of the classes already seen by the sample version.
+
+    Only versions which already seen 2 classes are validated. Returns the ingestion errors of the removed labels.
+    """
+    versions_map = model.get_samples_versions_map_table(session)
+    classes_sources = []
+    for column in (SAMPLE_LABEL_COL, SAMPLE_PRED_COL):
+        classes_sources.append(
+            select(ModelVersion.id.label("version_id"),
+                   func.jsonb_array_elements_text(ModelVersion.statistics[column]["values"]).label("class"))
+            .where(ModelVersion.model_id == model.id)
         )
-        results = (await session.execute(versions_select)).all()
-
-        # Validation of classes amount for binary tasks
-        if model.task_type == TaskType.BINARY:
-            errors = []
-            for row in results:
-                version_id = row[0]
-                sample_ids = row[1]
-                model_version: ModelVersion = \
-                    (await session.execute(select(ModelVersion).where(ModelVersion.id == version_id))).scalars().first()
-                classes = set(model_version.statistics.get(SAMPLE_LABEL_COL, {"values": []})["values"] +
-                              model_version.statistics.get(SAMPLE_PRED_COL, {"values": []})["values"])
-                for sample_id in sample_ids:
-                    if len(classes) > 1 and valid_data[sample_id][SAMPLE_LABEL_COL] not in classes:
-                        errors.append(dict(sample=str(valid_data[sample_id]),
-                                           sample_id=valid_data[sample_id],
-                                           error=f"More than 2 classes in binary model. {classes} present, " +
-                                           f"""received: {valid_data[sample_id][SAMPLE_LABEL_COL]},
-                                           sample id: {valid_data[sample_id]}""",
-                                           model_id=model_version.model_id,
-                                           model_version_id=model_version.id))
-                        del valid_data[sample_id]
-            await save_failures(session, errors, logger)
-
-        if len(valid_data) > 0:
-            # update label statistics
-            for row in results:
-                version_id = row[0]
-                sample_ids = [sample_id for sample_id in row[1] if sample_id in valid_data]
-                model_version: ModelVersion = \
-                    (await session.execute(select(ModelVersion).where(ModelVersion.id == version_id))).scalars().first()
-                updated_statistics = copy.deepcopy(model_version.statistics)
-                for sample_id in sample_ids:
-                    update_statistics_from_sample(updated_statistics, valid_data[sample_id])
-                if model_version.statistics != updated_statistics:
-                    await model_version.update_statistics(updated_statistics)
-
-            # Insert or update all labels
-            labels_table = model.get_sample_labels_table(session)
-            insert_statement = postgresql.insert(labels_table)
-            upsert_statement = insert_statement.on_conflict_do_update(
-                index_elements=[SAMPLE_ID_COL],
-                set_={SAMPLE_LABEL_COL: insert_statement.excluded[SAMPLE_LABEL_COL]}
-            )
-            await session.execute(upsert_statement, valid_data.tolist())
+        # Classes of statistics which were not folded yet into the version
+        classes_sources.append(
+            select(StatisticsDelta.model_version_id.label("version_id"),
+                   func.jsonb_array_elements_text(StatisticsDelta.statistics[column]["values"]).label("class"))
+            .join(ModelVersion, ModelVersion.id == StatisticsDelta.model_version_id)
+            .where(ModelVersion.model_id == model.id)
+        )
+    classes = union(*classes_sources).subquery("classes")
+    version_classes = (
+        select(classes.c.version_id, array_agg(classes.c["class"]).label("classes"))
+        .group_by(classes.c.version_id)
+        .having(func.count() > 1)
+        .cte("version_classes")
+    )
+    unknown_labels = (
+        select(staging_table.c[SAMPLE_ID_COL], staging_table.c[SAMPLE_LABEL_COL],
+               version_classes.c.version_id, version_classes.c.classes)
+        .join(versions_map, versions_map.c[SAMPLE_ID_COL] == staging_table.c[SAMPLE_ID_COL])
+        .join(version_classes, version_classes.c.version_id == versions_map.c["version_id"])
+        .where(staging_table.c[SAMPLE_LABEL_COL].isnot(None),
+               staging_table.c[SAMPLE_LABEL_COL] != all_(version_classes.c.classes))
+    )
+    rows = (await session.execute(unknown_labels)).all()
+    if not rows:
+        return []
+
+    await session.execute(
+        delete(staging_table)
+        .where(staging_table.c[SAMPLE_ID_COL].in_(select(unknown_labels.subquery().c[SAMPLE_ID_COL])))
+    )
+    return [
+        dict(sample=str({SAMPLE_ID_COL: sample_id, SAMPLE_LABEL_COL: label}),
+             sample_id=sample_id,
+             error=f"More than 2 classes in binary model. {set(classes)} present, "
+                   f"received: {label}, sample id: {sample_id}",
+             model_id=model.id,
+             model_version_id=version_id)
+        for sample_id, label, version_id, classes in rows
+    ]
 
-            for row in results:
-                version_id = row[0]
-                sample_ids = [sample_id for sample_id in row[1] if sample_id in valid_data]
-                monitor_table_name = get_monitor_table_name(model.id, version_id)
-                ts_select = (select(Column(SAMPLE_TS_COL))
-                             .select_from(text(monitor_table_name))
-                             .where(Column(SAMPLE_ID_COL).in_(sample_ids)))
-                timestamps_affected = [pdl.instance(x) for x in (await session.execute(ts_select)).scalars()]
-                await add_cache_invalidation(org_id, version_id, timestamps_affected, session, cache_functions)
 
-            model.last_update_time = pdl.now()
+async def _labeled_hours(
+        model: Model,
+        staging_table: Table,
+        session: AsyncSession
+) -> t.Dict[int, t.List["pdl.DateTime"]]:
+    """Return the distinct hours of the labeled samples, per version which logged them.
+
+    The hours are read from the samples versions map alone, without touching the monitor tables.
+    """
+    versions_map = model.get_samples_versions_map_table(session)
+    hours = (
+        select(versions_map.c["version_id"], versions_map.c[SAMPLES_MAP_HOUR_COL]).distinct()
+        .join(staging_table, staging_table.c[SAMPLE_ID_COL] == versions_map.c[SAMPLE_ID_COL])
+    )
+    labeled_hours = {}
+    for version_id, hour in (await session.execute(hours)).all():
+        labeled_hours.setdefault(version_id, []).append(pdl.instance(hour))
+    return labeled_hours
 
 
 async def add_cache_invalidation(organization_id, model_version_id, timestamps_updated, session, cache_functions):
@@ -334,6 +584,106 @@ async def save_failures(session: AsyncSession, errors, logger):
             logger.exception("Got unexpected error while saving ingestion errors")
 
 
+class _PendingSamples:
+    """Samples buffered for a model version, and the futures of the callers which logged them."""
+
+    def __init__(self):
+        self.samples: t.List[t.Dict[str, t.Any]] = []
+        self.log_times: t.List["pdl.DateTime"] = []
+        # Position range of each caller samples, and the future resolved with the ids of its logged samples
+        self.callers: t.List[t.Tuple[int, int, asyncio.Future]] = []
+        self.flush_handle: t.Optional[asyncio.TimerHandle] = None
+
+    def add(self, samples: t.List[t.Dict[str, t.Any]], log_time: "pdl.DateTime", future: asyncio.Future):
+        self.callers.append((len(self.samples), len(self.samples) + len(samples), future))
+        self.samples.extend(samples)
+        self.log_times.extend([log_time] * len(samples))
+
+
+class SamplesCoalescer:
+    """Coalesce small batches of samples logged to the same model version into a single write.
+
+    The samples are buffered per model version for up to ``linger_ms``, or until ``max_samples`` are buffered,
+    and are then logged together in their own transaction. Each caller waits for the write of the samples
+    it logged, and gets back the ids of its samples which were logged.
+    """
+
+    def __init__(self, resources_provider: ResourcesProvider, logger, linger_ms: int, max_samples: int):
+        self.resources_provider = resources_provider
+        self.logger = logger
+        self.linger_seconds = linger_ms / 1000
+        self.max_samples = max_samples
+        self._pending: t.Dict[t.Tuple[int, int], _PendingSamples] = {}
+        self._flush_tasks: t.Set[asyncio.Task] = set()
+
+    async def log(
+            self,
+            organization_id: int,
+            model_version_id: int,
+            samples: t.List[t.Dict[str, t.Any]],
+            log_time: "pdl.DateTime"
+    ) -> t.Set[str]:
+        """Buffer the samples, and return the ids of the samples which were logged once they are written."""
+        loop = asyncio.get_running_loop()
+        key = (organization_id, model_version_id)
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = _PendingSamples()
+            pending.flush_handle = loop.call_later(self.linger_seconds, self._flush, key, pending)
+        future = loop.create_future()
+        pending.add(samples, log_time, future)
+        if len(pending.samples) >= self.max_samples:
+            self._flush(key, pending)
+        return await future
+
+    async def close(self):
+        """Write the buffered samples and wait for the writes in progress."""
+        for key, pending in list(self._pending.items()):
+            self._flush(key, pending)
+        await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+
+    def _flush(self, key: t.Tuple[int, int], pending: _PendingSamples):
+        # Called either by the timer or when the buffer is full, whichever comes first
+        if self._pending.get(key) is not pending:
+            return
+        del self._pending[key]
+        pending.flush_handle.cancel()
+        task = asyncio.create_task(self._write(*key, pending))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _write(self, organization_id: int, model_version_id: int, pending: _PendingSamples):
+        try:
+            logged_positions = await self._log_samples(organization_id, model_version_id, pending)
+        except Exception as exception:  # pylint: disable=broad-except
+            for _, _, future in pending.callers:
+                if not future.done():
+                    future.set_exception(exception)
+            return
+        logged_positions = set(logged_positions)
+        for start, end, future in pending.callers:
+            if not future.done():
+                future.set_result({pending.samples[position][SAMPLE_ID_COL]
+                                   for position in range(start, end) if position in logged_positions})
+
+    async def _log_samples(self, organization_id: int, model_version_id: int, pending: _PendingSamples) -> t.List[int]:
+        async with self.resources_provider.create_async_database_session(organization_id) as session:
+            # If session is none, it means the organization was removed
+            if session is None:
+                return []
+            model_version: ModelVersion = (await session.execute(
+                select(ModelVersion)
+                .options(joinedload(ModelVersion.model))
+                .where(ModelVersion.id == model_version_id))
+            ).scalars().first()
+            if model_version is None:
+                return []
+            logged_positions = await log_data(model_version, pending.samples, session, pending.log_times,
+                                              self.logger, organization_id, self.resources_provider.cache_functions)
+            await _commit_and_fold_statistics_deltas(session)
+            return logged_positions
+
+
 class DataIngestionBackend(object):
     """Holds the logic for the data ingestion."""
 
@@ -345,6 +695,18 @@ class DataIngestionBackend(object):
         self.resources_provider: ResourcesProvider = resources_provider
         self.logger = logger or configure_logger(name="data-ingestion")
         self.use_kafka = self.resources_provider.kafka_settings.kafka_host is not None
+        settings = self.resources_provider.settings
+        if not self.use_kafka and settings.ingestion_spool_dir is not None:
+            self.spool = open_process_spool(settings.ingestion_spool_dir, settings.ingestion_spool_segment_bytes,
+                                            settings.ingestion_spool_fsync_ms)
+        else:
+            self.spool = None
+        if not self.use_kafka and self.spool is None and settings.ingestion_coalesce_linger_ms > 0:
+            self.coalescer = SamplesCoalescer(self.resources_provider, self.logger,
+                                              settings.ingestion_coalesce_linger_ms,
+                                              settings.ingestion_coalesce_max_samples)
+        else:
+            self.coalescer = None
 
     async def _send_with_retry(
             self,
@@ -354,18 +716,30 @@ class DataIngestionBackend(object):
             total_msgs: int,
             max_retries=3
     ):
-        """Send messages to Kafka with asynchronous retry logic."""
+        """Send messages to Kafka with asynchronous retry logic.
+
+        All the messages are appended to the producer batches before waiting for any of them to be delivered,
+        so they are sent in as few requests as the producer batch size and linger allow.
+        """
         retry_count = 0
         while messages and retry_count < max_retries:
-            send_futures = [
-                await producer.send(topic_name, value=message, key=key)
-                for key, message in messages
+            send_futures = await asyncio.gather(
+                *(producer.send(topic_name, value=message, key=key, headers=headers)
+                  for key, message, headers in messages),
+                return_exceptions=True
+            )
+            delivery_futures = [
+                future for future in send_futures
+                if not isinstance(future, Exception)
+            ]
+            delivery_results = iter(await asyncio.gather(*delivery_futures, return_exceptions=True))
+            results = [
+                future if isinstance(future, Exception) else next(delivery_results)
+                for future in send_futures
             ]
-
-            results = await asyncio.gather(*send_futures, return_exceptions=True)
 
             failed_messages = [
-                ((key, message), result) for ((key, message), result) in zip(messages, results)
+                (message, result) for (message, result) in zip(messages, results)
                 if isinstance(result, Exception)
             ]
 
@@ -373,7 +747,7 @@ class DataIngestionBackend(object):
             if len(exception_types) == 1:
                 self.logger.warning(f"All messages failed with the same error: {list(exception_types)[0]}")
             else:
-                for ((key, _), result) in failed_messages:
+                for ((key, *_), result) in failed_messages:
                     self.logger.warning(
                         f"Failed message key: {key.decode() if key else 'None'} with error: {str(result)}"
                     )
@@ -394,15 +768,29 @@ class DataIngestionBackend(object):
                 f"messages after {max_retries} retries out of original {total_msgs}."
             )
 
+    async def close(self):
+        """Write the samples buffered by the coalescer, and close the spool."""
+        if self.coalescer is not None:
+            await self.coalescer.close()
+        if self.spool is not None:
+            self.spool.close()
+
     async def log_samples(
         self,
         model_version: ModelVersion,
-        data: t.List[t.Dict[str, t.Any]] | pd.DataFrame,
+        data: t.List[t.Dict[str, t.Any]] | pd.DataFrame | pa.Table,
         session: AsyncSession,
         organization_id: int,
         log_time: "pdl.DateTime",
     ):
-        if isinstance(data, pd.DataFrame):
+        if isinstance(data, pa.Table):
+            if not self.use_kafka and self.spool is None:
+                await log_data_columnar(model_version, data, session, log_time, self.logger,
+                                        organization_id, self.resources_provider.cache_functions)
+                await _commit_and_fold_statistics_deltas(session)
+                return
+            data = table_to_json_records(data)
+        elif isinstance(data, pd.DataFrame):
             data = data.to_dict(orient="records")
 
         if self.use_kafka:
@@ -417,16 +805,23 @@ class DataIngestionBackend(object):
                 # await insert_model_version_topic_delete_task(organization_id, model_version.id, entity, session)
 
             async with self.resources_provider.get_kafka_producer() as producer:
-                messages = [
-                    (sample.get(SAMPLE_ID_COL, "").encode(),
-                     json.dumps({"data": sample, "log_time": log_time.to_iso8601_string()}).encode("utf-8"))
-                    for sample in data
-                ]
-
+                messages = self._encode_batch_messages(data, log_time=log_time.to_iso8601_string())
                 await self._send_with_retry(producer, topic_name, messages, len(messages))
+        elif self.spool is not None:
+            topic_name = get_data_topic_name(organization_id, model_version.id, "model-version")
+            # Same as for a new kafka topic, the offsets of a new spool topic start over
+            if not self.spool.ensure_topic(topic_name):
+                model_version.ingestion_offset = -1
+                model_version.topic_end_offset = -1
+            messages = self._encode_batch_messages(data, log_time=log_time.to_iso8601_string())
+            await self.spool.append(topic_name, [value for _, value, _ in messages])
+        elif self.coalescer is not None and len(data) < self.coalescer.max_samples:
+            # The samples are written in the coalescer transaction, not in the given session
+            await self.coalescer.log(organization_id, model_version.id, data, log_time)
         else:
             await log_data(model_version, data, session, [log_time] * len(data), self.logger,
                            organization_id, self.resources_provider.cache_functions)
+            await _commit_and_fold_statistics_deltas(session)
 
     async def log_labels(
         self,
@@ -450,16 +845,49 @@ class DataIngestionBackend(object):
                 # await insert_model_version_topic_delete_task(organization_id, model.id, entity, session)
 
             async with self.resources_provider.get_kafka_producer() as producer:
-                messages = [
-                    (sample.get(SAMPLE_ID_COL, "").encode(),
-                     json.dumps({"data": sample}).encode("utf-8"))
-                    for sample in data
-                ]
-
+                messages = self._encode_batch_messages(data)
                 await self._send_with_retry(producer, topic_name, messages, len(messages))
+        elif self.spool is not None:
+            topic_name = get_data_topic_name(organization_id, model.id, "model")
+            if not self.spool.ensure_topic(topic_name):
+                model.ingestion_offset = -1
+                model.topic_end_offset = -1
+            messages = self._encode_batch_messages(data)
+            await self.spool.append(topic_name, [value for _, value, _ in messages])
         else:
             await log_labels(model, data, session, organization_id,
                              self.resources_provider.cache_functions, self.logger)
+            await _commit_and_fold_statistics_deltas(session)
+
+    def _encode_batch_messages(
+            self,
+            samples: t.List[t.Dict[str, t.Any]],
+            log_time: t.Optional[str] = None
+    ) -> t.List[tuple]:
+        """Encode the samples into kafka messages, each carrying a batch of samples.
+
+        Batches are split in halves until they fit in the producer max request size, otherwise the producer
+        rejects the whole batch. A single sample which does not fit is still sent, and is rejected by itself.
+        """
+        settings = self.resources_provider.kafka_settings
+        max_samples = settings.kafka_max_samples_per_message
+        max_size = settings.kafka_producer_max_request_size - MESSAGE_SIZE_OVERHEAD
+        # Stack of batches to encode, the first batch is on top in order to keep the samples order
+        batches = [samples[start_index:start_index + max_samples]
+                   for start_index in range(0, len(samples), max_samples)][::-1]
+        messages = []
+        while batches:
+            batch = batches.pop()
+            value = {"data": batch}
+            if log_time is not None:
+                value["log_time"] = log_time
+            encoded = msgpack.packb(value)
+            if len(encoded) > max_size and len(batch) > 1:
+                middle = len(batch) // 2
+                batches.extend((batch[middle:], batch[:middle]))
+            else:
+                messages.append((None, encoded, BATCH_MESSAGE_HEADERS))
+        return messages
 
     async def run_data_consumer(self):
         """Create an endless-loop of consuming messages from kafka."""
@@ -467,14 +895,83 @@ class DataIngestionBackend(object):
         await consume_from_kafka(self.resources_provider.kafka_settings, self._handle_data_messages,
                                  regex_pattern, self.logger)
 
+    async def run_spool_drainer(self):
+        """Create an endless-loop of loading the spooled messages into the database.
+
+        Besides its own spool, the drainer periodically takes over the spools which are not used by any process,
+        and releases them once they were drained.
+        """
+        settings = self.resources_provider.settings
+        max_messages = settings.ingestion_spool_drain_batch
+        unused_spools: t.List[IngestionSpool] = []
+        loop = asyncio.get_running_loop()
+        next_takeover = loop.time()
+        try:
+            while True:
+                if loop.time() >= next_takeover:
+                    unused_spools.extend(await asyncio.to_thread(
+                        open_unused_spools, settings.ingestion_spool_dir, settings.ingestion_spool_segment_bytes,
+                        settings.ingestion_spool_fsync_ms
+                    ))
+                    next_takeover = loop.time() + SPOOL_TAKEOVER_INTERVAL_SECONDS
+                drained = False
+                for spool in [self.spool, *unused_spools]:
+                    drained = await self._drain_spool(spool, max_messages) or drained
+                for spool in [spool for spool in unused_spools if spool.is_drained()]:
+                    spool.close()
+                    unused_spools.remove(spool)
+                if not drained:
+                    await asyncio.sleep(SPOOL_DRAIN_INTERVAL_SECONDS)
+        finally:
+            for spool in unused_spools:
+                spool.close()
+
+    async def _drain_spool(self, spool: IngestionSpool, max_messages: int) -> bool:
+        """Load the messages of the spool topics into the database, returns whether any message was loaded."""
+        drained = False
+        for topic_name in spool.topics():
+            try:
+                messages = await spool.read(topic_name, max_messages)
+            except OSError:
+                self.logger.exception("Failed to read the spool topic %s", topic_name)
+                continue
+            if not messages:
+                continue
+            end_offset = spool.end_offset(topic_name)
+
+            async def get_topic_offset():
+                return end_offset  # pylint: disable=cell-var-from-loop
+
+            organization_id, entity_id, entity = data_topic_name_to_ids(topic_name)
+            # Same as committing the kafka messages, on a connection error they are read again
+            if await self._ingest_messages(organization_id, entity_id, entity, messages, get_topic_offset):
+                spool.commit(topic_name, messages[-1].offset)
+                drained = True
+        return drained
+
     async def _handle_data_messages(self,
                                     consumer: AIOKafkaConsumer,
                                     tp: TopicPartition,
                                     messages: list[ConsumerRecord]) -> bool:
         """Handle messages consumed from kafka."""
         organization_id, entity_id, entity = data_topic_name_to_ids(tp.topic)
+
+        async def get_topic_offset():
+            return (await consumer.end_offsets([tp]))[tp] - 1
+
+        return await self._ingest_messages(organization_id, entity_id, entity, messages, get_topic_offset)
+
+    async def _ingest_messages(
+            self,
+            organization_id: int,
+            entity_id: int,
+            entity: str,
+            messages: t.Sequence[ConsumerRecord | SpoolRecord],
+            get_topic_offset: t.Callable[[], t.Awaitable[int]]
+    ) -> bool:
+        """Load messages of a data topic into the database, returns whether the messages can be committed."""
         try:
-            topic_offset = (await consumer.end_offsets([tp]))[tp] - 1
+            topic_offset = await get_topic_offset()
             async with self.resources_provider.create_async_database_session(organization_id) as session:
                 # If session is none, it means the organization was removed, so no need to do anything
                 if session is None:
@@ -491,9 +988,13 @@ class DataIngestionBackend(object):
                     model_version.topic_end_offset = topic_offset
                     # If kafka commit failed we might rerun on same messages, so using the ingestion offset to forward
                     # already ingested messages
-                    messages_data = [json.loads(m.value) for m in messages if m.offset > model_version.ingestion_offset]
-                    samples = [m["data"] for m in messages_data]
-                    log_times = [pdl.parse(m["log_time"]) for m in messages_data]
+                    # The log times are kept as strings, log_data parses each distinct one once
+                    samples, log_times = [], []
+                    for message in messages:
+                        if message.offset > model_version.ingestion_offset:
+                            message_samples, log_time = _decode_data_message(message)
+                            samples.extend(message_samples)
+                            log_times.extend([log_time] * len(message_samples))
                     await log_data(model_version, samples, session, log_times, self.logger, organization_id,
                                    self.resources_provider.cache_functions)
                     model_version.ingestion_offset = messages[-1].offset
@@ -505,11 +1006,15 @@ class DataIngestionBackend(object):
                     model.topic_end_offset = topic_offset
                     # If kafka commit failed we might rerun on same messages, so using the ingestion offset to forward
                     # already ingested messages
-                    messages_data = [json.loads(m.value) for m in messages if m.offset > model.ingestion_offset]
-                    samples = [m["data"] for m in messages_data]
+                    samples = [
+                        sample
+                        for message in messages if message.offset > model.ingestion_offset
+                        for sample in _decode_data_message(message)[0]
+                    ]
                     await log_labels(model, samples, session, organization_id,
                                      self.resources_provider.cache_functions, self.logger)
                     model.ingestion_offset = messages[-1].offset
+                await _commit_and_fold_statistics_deltas(session)
 
             return True
         except Exception as exception:  # pylint: disable=broad-except
@@ -531,11 +1036,23 @@ class DataIngestionBackend(object):
 
             self.logger.exception("Got unexpected error, saving errors and committing kafka messages anyway")
             if entity == "model-version":
-                errors = [{"sample_id": json.loads(m.value.decode())["data"].get(SAMPLE_ID_COL),
-                           "sample": m.value.decode(),
+                samples = [sample for m in messages for sample in _decode_data_message(m)[0]]
+                sample_ids = [sample.get(SAMPLE_ID_COL) if isinstance(sample, dict) else None for sample in samples]
+                errors = [{"sample_id": sample_id,
+                           "sample": str(sample),
                            "error": f'''{str(exception)},
-                           sample id: {json.loads(m.value.decode())["data"].get(SAMPLE_ID_COL)}'''}
-                          for m in messages]
+                           sample id: {sample_id}'''}
+                          for sample, sample_id in zip(samples, sample_ids)]
                 async with self.resources_provider.create_async_database_session(organization_id) as session:
                     await save_failures(session, errors, self.logger)
             return True
+
+
+def _decode_data_message(message: ConsumerRecord) -> t.Tuple[t.List[t.Dict[str, t.Any]], t.Optional[str]]:
+    """Decode a kafka data message into its samples and their log time, supporting both messages formats."""
+    if message.headers and tuple(BATCH_MESSAGE_HEADERS[0]) in message.headers:
+        value = msgpack.unpackb(message.value)
+    else:
+        value = json.loads(message.value)
+        value["data"] = [value["data"]]
+    return value["data"], value.get("log_time")
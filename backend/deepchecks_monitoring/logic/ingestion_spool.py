@@ -0,0 +1,283 @@
+# ----------------------------------------------------------------------------
+# Copyright (C) 2021-2022 Deepchecks (https://www.deepchecks.com)
+#
+# This file is part of Deepchecks.
+# Deepchecks is distributed under the terms of the GNU Affero General
+# Public License (version 3 or later).
+# You should have received a copy of the GNU Affero General Public License
+# along with Deepchecks.  If not, see <http://www.gnu.org/licenses/>.
+# ----------------------------------------------------------------------------
+"""Local disk spool of the ingested data, used in place of kafka by single node deployments.
+
+The spool holds an append only log per topic (same topics as kafka), split into segment files named by the
+offset of their first record. Each record is a kafka message value, prefixed by its length and checksum.
+Appends are acknowledged once written and fsynced, the fsync is shared by the appends which arrive within
+the fsync interval. The drainer reads the records after the committed offset, loads them into the database
+and commits their offset, segments which were fully committed are deleted.
+
+A spool directory must be used by a single process, which is enforced with a lock file. Every process of the
+server (e.g. each uvicorn worker) therefore appends to and drains a spool of its own, in a sub-directory of the
+configured directory. Spools of sub-directories which are not used by any process (e.g. after the number of
+processes was reduced) are drained by the other processes.
+"""
+import asyncio
+import bisect
+import contextlib
+import fcntl
+import itertools
+import mmap
+import os
+import pathlib
+import struct
+import typing as t
+import zlib
+
+__all__ = ["IngestionSpool", "SpoolInUseError", "SpoolRecord", "open_process_spool", "open_unused_spools"]
+
+
+_RECORD_HEADER = struct.Struct(">II")
+_SEGMENT_SUFFIX = ".log"
+_COMMITTED_FILE = "committed"
+_LOCK_FILE = ".lock"
+_PROCESS_DIR_PREFIX = "worker-"
+# Spooled records are always kafka messages of the batch format
+_BATCH_HEADERS = [("format", b"msgpack-batch")]
+
+
+class SpoolInUseError(RuntimeError):
+    """Raised when opening a spool directory which is used by another process."""
+
+
+class SpoolRecord(t.NamedTuple):
+    """Record read from the spool, has the same fields as the kafka consumer records used by the ingestion."""
+
+    offset: int
+    value: bytes
+    headers: t.Sequence[t.Tuple[str, bytes]]
+
+
+def _iter_records(buffer, position: int = 0) -> t.Iterator[t.Tuple[int, bytes]]:
+    """Iterate over the complete records of a segment from the position, yielding the end position and value \
+    of each record.
+
+    Stops at a record which was not fully written or is corrupted.
+    """
+    while position + _RECORD_HEADER.size <= len(buffer):
+        length, checksum = _RECORD_HEADER.unpack_from(buffer, position)
+        end = position + _RECORD_HEADER.size + length
+        if end > len(buffer):
+            return
+        value = buffer[position + _RECORD_HEADER.size:end]
+        if zlib.crc32(value) != checksum:
+            return
+        yield end, value
+        position = end
+
+
+@contextlib.contextmanager
+def _map_segment(path: pathlib.Path):
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield buffer
+
+
+class _SpoolTopic:
+    """Append only log of a single topic."""
+
+    def __init__(self, path: pathlib.Path, segment_max_bytes: int, fsync_seconds: float):
+        self.path = path
+        self.segment_max_bytes = segment_max_bytes
+        self.fsync_seconds = fsync_seconds
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        committed_file = self.path / _COMMITTED_FILE
+        self.committed_offset = int(committed_file.read_text()) if committed_file.exists() else -1
+        self.segments = sorted(int(it.stem) for it in self.path.glob(f"*{_SEGMENT_SUFFIX}"))
+        if not self.segments:
+            self.segments.append(self.committed_offset + 1)
+
+        # Truncating a record which was partially written before a crash, it was never acknowledged
+        last_segment = self._segment_path(self.segments[-1])
+        self.fd = os.open(last_segment, os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+        with _map_segment(last_segment) as buffer:
+            records_ends = [end for end, _ in _iter_records(buffer)]
+        self.segment_size = records_ends[-1] if records_ends else 0
+        os.ftruncate(self.fd, self.segment_size)
+        os.fsync(self.fd)
+
+        self.next_offset = self.segments[-1] + len(records_ends)
+        self.synced_offset = self.next_offset - 1
+        # Segment and position following the last read record and the last committed record, so the reads start
+        # at the committed position instead of scanning the segment from its start
+        self._read_position: t.Optional[t.Tuple[int, int, int]] = None
+        self._committed_position: t.Optional[t.Tuple[int, int]] = None
+        self._sync_task: t.Optional[asyncio.Task] = None
+        self._rolled_fds: t.List[int] = []
+
+    def _segment_path(self, base_offset: int) -> pathlib.Path:
+        return self.path / f"{base_offset:020d}{_SEGMENT_SUFFIX}"
+
+    def write(self, values: t.Sequence[bytes]) -> int:
+        """Write the records to the current segment, returns offset of the last one."""
+        if self.segment_size >= self.segment_max_bytes:
+            # The previous segment is closed by the next sync, which might be running on it
+            os.fsync(self.fd)
+            self._rolled_fds.append(self.fd)
+            self.segments.append(self.next_offset)
+            self.fd = os.open(self._segment_path(self.next_offset), os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+            self.segment_size = 0
+        data = b"".join(_RECORD_HEADER.pack(len(value), zlib.crc32(value)) + value for value in values)
+        os.write(self.fd, data)
+        self.segment_size += len(data)
+        self.next_offset += len(values)
+        return self.next_offset - 1
+
+    async def wait_synced(self, offset: int):
+        """Wait for the records up to the offset to be fsynced."""
+        while self.synced_offset < offset:
+            if self._sync_task is None:
+                self._sync_task = asyncio.create_task(self._sync())
+            await asyncio.shield(self._sync_task)
+
+    async def _sync(self):
+        try:
+            # Waiting for more appends to share the fsync
+            await asyncio.sleep(self.fsync_seconds)
+            offset = self.next_offset - 1
+            rolled_fds, self._rolled_fds = self._rolled_fds, []
+            await asyncio.to_thread(os.fsync, self.fd)
+            for fd in rolled_fds:
+                os.close(fd)
+            self.synced_offset = offset
+        finally:
+            self._sync_task = None
+
+    def read(self, max_records: int) -> t.List[SpoolRecord]:
+        """Read the records following the committed offset."""
+        start = self.committed_offset + 1
+        end = min(self.next_offset, start + max_records)
+        segments = self.segments[max(bisect.bisect_right(self.segments, start) - 1, 0):]
+        records = []
+        read_position = None
+        for base_offset in segments:
+            if base_offset >= end:
+                break
+            if self._committed_position is not None and self._committed_position[0] == base_offset:
+                first_offset, position = start, self._committed_position[1]
+            else:
+                first_offset, position = base_offset, 0
+            with _map_segment(self._segment_path(base_offset)) as buffer:
+                for offset, (record_end, value) in enumerate(_iter_records(buffer, position), first_offset):
+                    if offset >= end:
+                        break
+                    if offset >= start:
+                        records.append(SpoolRecord(offset, value, _BATCH_HEADERS))
+                        read_position = (offset, base_offset, record_end)
+        self._read_position = read_position
+        return records
+
+    def commit(self, offset: int):
+        """Commit the records up to the offset, and delete the segments which were fully committed."""
+        temp_file = self.path / f"{_COMMITTED_FILE}.tmp"
+        temp_file.write_text(str(offset))
+        os.replace(temp_file, self.path / _COMMITTED_FILE)
+        self.committed_offset = offset
+        if self._read_position is not None and self._read_position[0] == offset:
+            self._committed_position = self._read_position[1:]
+        else:
+            self._committed_position = None
+        while len(self.segments) > 1 and self.segments[1] <= offset + 1:
+            self._segment_path(self.segments.pop(0)).unlink(missing_ok=True)
+
+    def close(self):
+        os.fsync(self.fd)
+        for fd in [*self._rolled_fds, self.fd]:
+            os.close(fd)
+
+
+class IngestionSpool:
+    """Local disk spool of the data topics."""
+
+    def __init__(self, directory: pathlib.Path, segment_max_bytes: int, fsync_ms: int):
+        self.directory = pathlib.Path(directory)
+        self.segment_max_bytes = segment_max_bytes
+        self.fsync_seconds = fsync_ms / 1000
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock_fd = os.open(self.directory / _LOCK_FILE, os.O_RDWR | os.O_CREAT)
+        try:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError as e:
+            os.close(self._lock_fd)
+            raise SpoolInUseError(f"Ingestion spool directory {self.directory} is used by another process") from e
+        self._topics: t.Dict[str, _SpoolTopic] = {}
+        for path in self.directory.iterdir():
+            if path.is_dir():
+                self._topics[path.name] = self._open_topic(path.name)
+
+    def _open_topic(self, topic_name: str) -> _SpoolTopic:
+        return _SpoolTopic(self.directory / topic_name, self.segment_max_bytes, self.fsync_seconds)
+
+    def ensure_topic(self, topic_name: str) -> bool:
+        """Create the topic if needed, returns whether it existed."""
+        if topic_name in self._topics:
+            return True
+        self._topics[topic_name] = self._open_topic(topic_name)
+        return False
+
+    def topics(self) -> t.List[str]:
+        return list(self._topics)
+
+    def end_offset(self, topic_name: str) -> int:
+        """Return offset of the last record of the topic."""
+        return self._topics[topic_name].next_offset - 1
+
+    async def append(self, topic_name: str, values: t.Sequence[bytes]):
+        """Append the messages values to the topic, and return once they are written to the disk."""
+        if not values:
+            return
+        self.ensure_topic(topic_name)
+        topic = self._topics[topic_name]
+        await topic.wait_synced(topic.write(values))
+
+    async def read(self, topic_name: str, max_records: int) -> t.List[SpoolRecord]:
+        """Read the records of the topic which were not committed yet."""
+        return await asyncio.to_thread(self._topics[topic_name].read, max_records)
+
+    def commit(self, topic_name: str, offset: int):
+        """Commit the records of the topic up to the given offset."""
+        self._topics[topic_name].commit(offset)
+
+    def is_drained(self) -> bool:
+        """Return whether all the records of all the topics were committed."""
+        return all(topic.committed_offset >= topic.next_offset - 1 for topic in self._topics.values())
+
+    def close(self):
+        for topic in self._topics.values():
+            topic.close()
+        self._topics = {}
+        fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+        os.close(self._lock_fd)
+
+
+def open_process_spool(directory: pathlib.Path, segment_max_bytes: int, fsync_ms: int) -> IngestionSpool:
+    """Open the spool of the first sub-directory of the directory which is not used by another process."""
+    for index in itertools.count():
+        try:
+            return IngestionSpool(pathlib.Path(directory) / f"{_PROCESS_DIR_PREFIX}{index}", segment_max_bytes,
+                                  fsync_ms)
+        except SpoolInUseError:
+            continue
+
+
+def open_unused_spools(directory: pathlib.Path, segment_max_bytes: int, fsync_ms: int) -> t.List[IngestionSpool]:
+    """Open the spools of the sub-directories of the directory which are not used by any process."""
+    spools = []
+    for path in sorted(pathlib.Path(directory).glob(f"{_PROCESS_DIR_PREFIX}*")):
+        try:
+            spools.append(IngestionSpool(path, segment_max_bytes, fsync_ms))
+        except SpoolInUseError:
+            continue
+    return spools
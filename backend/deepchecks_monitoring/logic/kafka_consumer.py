@@ -9,48 +9,126 @@
 # ----------------------------------------------------------------------------
 """Module defining an infinite consuming loop form kafka."""
 import asyncio
+import functools
+import typing as t
 
-from aiokafka import AIOKafkaConsumer, TopicPartition
+from aiokafka import AIOKafkaConsumer, ConsumerRebalanceListener, TopicPartition
 from kafka.errors import KafkaError
 
 from deepchecks_monitoring.config import KafkaSettings
 
 
 async def consume_from_kafka(settings: KafkaSettings, handle_func, pattern, logger):
-    """Create an endless-loop of consuming messages from kafka."""
+    """Create an endless-loop of consuming messages from kafka.
+
+    Messages of different partitions are handled concurrently, up to `kafka_consumer_concurrency` partitions
+    at a time. A partition is paused while its messages are handled, so messages of the same partition are
+    handled and committed in order, while slow partitions do not block the others.
+    Errors of the handlers are raised by the consuming loop, same as if the messages were handled by it.
+    """
     while True:
         consumer = None
+        in_flight: t.Dict[TopicPartition, asyncio.Task] = {}
+        # Handlers remove themselves from 'in_flight' when done, so their errors are collected by a done callback
+        failures: t.List[BaseException] = []
         try:
             consumer = AIOKafkaConsumer(
                 **settings.kafka_params,
                 group_id="data_group",  # Consumer must be in a group to commit
                 enable_auto_commit=False,  # Will disable autocommit
                 auto_offset_reset="earliest",  # If committed offset not found, start from beginning,
-                max_poll_records=500,
+                max_poll_records=settings.kafka_consumer_max_poll_records,
+                fetch_max_bytes=settings.kafka_consumer_fetch_max_bytes,
+                max_partition_fetch_bytes=settings.kafka_consumer_max_partition_fetch_bytes,
                 session_timeout_ms=300 * 1000,
                 heartbeat_interval_ms=60 * 1000,
                 consumer_timeout_ms=60 * 1000,
             )
             await consumer.start()
-            consumer.subscribe(pattern=pattern)
+            consumer.subscribe(pattern=pattern, listener=_FinishHandlersOnRevoke(in_flight))
+            semaphore = asyncio.Semaphore(settings.kafka_consumer_concurrency)
+            commit_lock = asyncio.Lock()
             while True:
-                result = await consumer.getmany(timeout_ms=30 * 1000)
+                # Raise errors of finished handlers, and wait for a free slot before fetching more messages
+                _raise_failure(failures)
+                while len(in_flight) >= settings.kafka_consumer_concurrency:
+                    await asyncio.wait(list(in_flight.values()), return_when=asyncio.FIRST_COMPLETED)
+                    _raise_failure(failures)
+                # While handlers are running, polling often in order to fetch the partitions they resume
+                result = await consumer.getmany(timeout_ms=1000 if in_flight else 30 * 1000)
                 for tp, messages in result.items():
                     tp: TopicPartition
                     if messages:
-                        to_commit = await handle_func(consumer, tp, messages)
-                        if to_commit:
-                            offset = messages[-1].offset
-                            if tp in consumer.assignment():
-                                await consumer.commit({tp: offset + 1})
-                            else:
-                                logger.warning(
-                                    f"Partition {tp.topic} not assigned to consumer anymore. Cannot commit offsets."
-                                )
+                        consumer.pause(tp)
+                        task = asyncio.create_task(_handle_partition_messages(
+                            consumer, tp, messages, handle_func, logger, semaphore, commit_lock,
+                            previous=in_flight.get(tp), in_flight=in_flight
+                        ))
+                        task.add_done_callback(functools.partial(_collect_failure, failures))
+                        in_flight[tp] = task
         except KafkaError as e:  # pylint: disable=broad-except
             logger.exception(e)
         finally:
+            if in_flight:
+                await asyncio.gather(*in_flight.values(), return_exceptions=True)
             if consumer:
                 await consumer.stop()
         # If consumer fails sleep 30 seconds and tried again
         await asyncio.sleep(30)
+
+
+def _collect_failure(failures: t.List[BaseException], task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        failures.append(task.exception())
+
+
+def _raise_failure(failures: t.List[BaseException]):
+    if failures:
+        raise failures[0]
+
+
+class _FinishHandlersOnRevoke(ConsumerRebalanceListener):
+    """Wait for the handlers of revoked partitions, so their messages are committed before another consumer \
+    takes over the partitions."""
+
+    def __init__(self, in_flight: t.Dict[TopicPartition, asyncio.Task]):
+        self.in_flight = in_flight
+
+    async def on_partitions_revoked(self, revoked):
+        tasks = [self.in_flight[tp] for tp in revoked if tp in self.in_flight]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def on_partitions_assigned(self, assigned):
+        pass
+
+
+async def _handle_partition_messages(
+        consumer: AIOKafkaConsumer,
+        tp: TopicPartition,
+        messages: list,
+        handle_func,
+        logger,
+        semaphore: asyncio.Semaphore,
+        commit_lock: asyncio.Lock,
+        previous: t.Optional[asyncio.Task],
+        in_flight: t.Dict[TopicPartition, asyncio.Task]
+):
+    try:
+        # The partition might have been re-assigned while its previous messages are still handled
+        if previous is not None:
+            await asyncio.gather(previous, return_exceptions=True)
+        async with semaphore:
+            to_commit = await handle_func(consumer, tp, messages)
+        if to_commit:
+            offset = messages[-1].offset
+            if tp in consumer.assignment():
+                async with commit_lock:
+                    await consumer.commit({tp: offset + 1})
+            else:
+                logger.warning(f"Partition {tp.topic} not assigned to consumer anymore. Cannot commit offsets.")
+    finally:
+        if in_flight.get(tp) is asyncio.current_task():
+            del in_flight[tp]
+            if tp in consumer.assignment():
+                consumer.resume(tp)
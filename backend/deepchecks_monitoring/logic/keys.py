@@ -82,3 +82,17 @@ def build_monitor_cache_key(
     model_version_id = model_version_id if isinstance(model_version_id, int) else "*"
     monitor_id = monitor_id if isinstance(monitor_id, int) else "*"
     return f"mon_cache:{organization_id}:{model_version_id}:{monitor_id}:{start_time}:{end_time}"
+
+
+def parse_monitor_cache_key(key: t.Union[str, bytes]) -> t.Tuple[int, int, int, int, int]:
+    """Parse key built by 'build_monitor_cache_key'.
+
+    Returns
+    -------
+    t.Tuple[int, int, int, int, int]
+        organization id, model version id, monitor id, start timestamp and end timestamp of the key.
+    """
+    if isinstance(key, bytes):
+        key = key.decode()
+    _, organization_id, model_version_id, monitor_id, start_time, end_time = key.split(":")
+    return int(organization_id), int(model_version_id), int(monitor_id), int(start_time), int(end_time)
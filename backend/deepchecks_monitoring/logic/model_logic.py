@@ -9,8 +9,11 @@
 # ----------------------------------------------------------------------------
 
 """Module defining utility functions for specific db objects."""
+import asyncio
 import logging
 import typing as t
+from concurrent.futures import Executor
+from concurrent.futures.process import BrokenProcessPool
 
 import numpy as np
 import pandas as pd
@@ -22,6 +25,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from deepchecks_monitoring.logic.check_processes_pool import CheckRunArgs, dataframe_to_ipc, run_check
 from deepchecks_monitoring.monitoring_utils import (CheckParameterTypeEnum, MonitorCheckConfSchema, configure_logger,
                                                     fetch_or_404)
 from deepchecks_monitoring.schema_models import Check, Model, ModelVersion
@@ -174,13 +178,23 @@ async def get_results_for_model_versions_per_window(
         check: t.Union[Check, t.List[Check]],
         additional_kwargs: MonitorCheckConfSchema,
         with_display: bool = False,
+        executor: t.Optional[Executor] = None,
 ) -> t.Dict[ModelVersion, t.Optional[t.List[t.Dict]]]:
-    """Get results for active model version sessions per window."""
+    """Get results for active model version sessions per window.
+
+    With an executor (pool of processes created by 'create_check_processes_pool') the checks of the windows run
+    concurrently in the executor, and the results are the reduced check results. It is not used for suites or
+    when the display is needed. If a process of the pool terminated abruptly the pool is broken, and the checks
+    of its windows run in the server instead.
+    """
     top_feat, feat_imp = get_top_features_or_from_conf(model_versions[0], additional_kwargs)
 
     model_results = {}
     need_ref = check.is_reference_required if isinstance(check, Check) else \
         any((c.is_reference_required for c in check))
+    if not isinstance(check, Check) or with_display:
+        executor = None
+    executions = []
 
     for model_version in model_versions:
         data_dict = model_versions_data[model_version.id]
@@ -191,31 +205,48 @@ async def get_results_for_model_versions_per_window(
         else:
             reference = None
 
-        if isinstance(check, Check):
-            dp_check = initialize_check(
-                check.config,
-                model_version.balance_classes,
-                additional_kwargs
+        if executor is not None:
+            # The check and the datasets are created by the pool processes
+            run_args = CheckRunArgs(
+                check_config=check.config,
+                balance_classes=model_version.balance_classes,
+                additional_kwargs=additional_kwargs,
+                task_type=t.cast('TaskType', model.task_type).value,
+                features_columns=t.cast('dict[str, str]', model_version.features_columns),
+                classes=model_version.classes,
+                top_feat=top_feat,
+                feat_imp=feat_imp,
+                model_id=model.id,
+                model_version_id=model_version.id
             )
+            # Serialized once and sent with each of the windows
+            reference_data = dataframe_to_ipc(reference)
         else:
-            all_checks = []
-            for c in check:
-                init_check = initialize_check(
-                    c.config,
+            if isinstance(check, Check):
+                dp_check = initialize_check(
+                    check.config,
                     model_version.balance_classes,
                     additional_kwargs
                 )
-                init_check.check_id = c.id
-                all_checks.append(init_check)
-            dp_check = Suite('', *all_checks)
-
-        reference_table_ds, reference_table_pred, reference_table_proba = dataframe_to_dataset_and_pred(
-            df=reference,
-            features_columns=t.cast('dict[str, str]', model_version.features_columns),
-            task_type=t.cast('TaskType', model.task_type).value,
-            top_feat=top_feat,
-            dataset_name='Reference'
-        )
+            else:
+                all_checks = []
+                for c in check:
+                    init_check = initialize_check(
+                        c.config,
+                        model_version.balance_classes,
+                        additional_kwargs
+                    )
+                    init_check.check_id = c.id
+                    all_checks.append(init_check)
+                dp_check = Suite('', *all_checks)
+
+            reference_table_ds, reference_table_pred, reference_table_proba = dataframe_to_dataset_and_pred(
+                df=reference,
+                features_columns=t.cast('dict[str, str]', model_version.features_columns),
+                task_type=t.cast('TaskType', model.task_type).value,
+                top_feat=top_feat,
+                dataset_name='Reference'
+            )
 
         model_results[model_version] = []
         for curr_window in data_dict['windows']:
@@ -234,8 +265,11 @@ async def get_results_for_model_versions_per_window(
                     continue
                 data_results = await curr_window['query']
                 data_df = pd.DataFrame(data_results.all(), columns=[str(key) for key in data_results.keys()])
+            elif 'data' in curr_window:
+                # Data of the window which was fetched together with the other windows
+                data_df = curr_window['data']
             else:
-                raise ValueError('Window must have either result or query, something went wrong')
+                raise ValueError('Window must have either result, query or data, something went wrong')
 
             # If reference is none it was not provided at all.
             if need_ref and reference is None:
@@ -244,9 +278,29 @@ async def get_results_for_model_versions_per_window(
             if data_df.empty or (need_ref and reference.empty):
                 continue
 
-            result['result'] = run_deepchecks(data_df, model_version, model, top_feat, dp_check,
-                                              feat_imp, with_display, reference_table_ds, reference_table_pred,
-                                              reference_table_proba)
+            if executor is not None:
+                test_data = dataframe_to_ipc(data_df)
+                execution = asyncio.get_running_loop().run_in_executor(
+                    executor, run_check, run_args, test_data, reference_data)
+                executions.append((result, execution, (run_args, test_data, reference_data)))
+            else:
+                result['result'] = run_deepchecks(data_df, model_version, model, top_feat, dp_check,
+                                                  feat_imp, with_display, reference_table_ds, reference_table_pred,
+                                                  reference_table_proba)
+
+    if executions:
+        # The windows are executed while the data of the following ones is fetched, waiting for them at the end
+        executions_results = await asyncio.gather(*(execution for _, execution, _ in executions),
+                                                  return_exceptions=True)
+        for (result, _, run_check_args), execution_result in zip(executions, executions_results):
+            if isinstance(execution_result, BrokenProcessPool):
+                # The resources provider replaces the broken pool on its next use, meanwhile the check runs in a
+                # thread of the server so the event loop is not blocked
+                logger.warning('Check processes pool is broken, running the check of the window in the server')
+                execution_result = await asyncio.to_thread(run_check, *run_check_args)
+            elif isinstance(execution_result, BaseException):
+                raise execution_result
+            result['result'] = execution_result
 
     return model_results
 
@@ -0,0 +1,86 @@
+# ----------------------------------------------------------------------------
+# Copyright (C) 2021-2022 Deepchecks (https://www.deepchecks.com)
+#
+# This file is part of Deepchecks.
+# Deepchecks is distributed under the terms of the GNU Affero General
+# Public License (version 3 or later).
+# You should have received a copy of the GNU Affero General Public License
+# along with Deepchecks.  If not, see <http://www.gnu.org/licenses/>.
+# ----------------------------------------------------------------------------
+"""Usage report of the monitor tables indexes, and removal of the unused ones.
+
+Each index of a monitor table is updated by every insert into it, so indexes which are not used by the
+queries only slow down the ingestion. The usage is taken from ``pg_stat_user_indexes``, which counts the
+index scans since the last reset of the database statistics.
+"""
+import typing as t
+
+from sqlalchemy import select, text
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from deepchecks_monitoring.schema_models.column_type import SAMPLE_TS_COL, ColumnType
+from deepchecks_monitoring.schema_models.model_version import ModelVersion
+
+__all__ = ["get_monitor_indexes_usage", "drop_unused_monitor_indexes"]
+
+
+async def get_monitor_indexes_usage(session: AsyncSession) -> t.List[Row]:
+    """Return the scans count and size of the monitor tables indexes in the current schema.
+
+    The indexes of the partitions are summed up into the index of their partitioned table. Each row has
+    ``table_name``, ``index_name``, ``column_name`` (None for multi column and expression indexes),
+    ``scans`` and ``size`` (in bytes).
+    """
+    return (await session.execute(text(
+        "SELECT coalesce(parent_table.relname, s.relname) AS table_name, "
+        "coalesce(parent_index.relname, s.indexrelname) AS index_name, "
+        "a.attname AS column_name, "
+        "sum(s.idx_scan) AS scans, "
+        "sum(pg_relation_size(s.indexrelid)) AS size "
+        "FROM pg_catalog.pg_stat_user_indexes s "
+        "JOIN pg_catalog.pg_index i ON i.indexrelid = s.indexrelid "
+        "LEFT JOIN pg_catalog.pg_attribute a "
+        "ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0] AND i.indnatts = 1 "
+        "LEFT JOIN pg_catalog.pg_inherits index_inherits ON index_inherits.inhrelid = s.indexrelid "
+        "LEFT JOIN pg_catalog.pg_class parent_index ON parent_index.oid = index_inherits.inhparent "
+        "LEFT JOIN pg_catalog.pg_inherits table_inherits ON table_inherits.inhrelid = s.relid "
+        "LEFT JOIN pg_catalog.pg_class parent_table ON parent_table.oid = table_inherits.inhparent "
+        "WHERE s.schemaname = current_schema() AND NOT i.indisunique "
+        "AND coalesce(parent_table.relname, s.relname) LIKE 'model_%_monitor_data_%' "
+        "GROUP BY 1, 2, 3 "
+        "ORDER BY 1, 2"
+    ))).all()
+
+
+async def drop_unused_monitor_indexes(session: AsyncSession, max_scans: int = 0) -> t.List[str]:
+    """Drop the columns indexes of the monitor tables which were scanned at most ``max_scans`` times.
+
+    The sample timestamp index, the sample hash index and the primary key are kept. The dropped columns are
+    removed from the indexed columns of the model versions, so they are not indexed again when the monitor
+    table is rebuilt. Returns names of the dropped indexes.
+    """
+    unused = [
+        index for index in await get_monitor_indexes_usage(session)
+        if index.column_name is not None and index.column_name != SAMPLE_TS_COL and index.scans <= max_scans
+    ]
+    if not unused:
+        return []
+
+    versions = {
+        version.get_monitor_table_name(): version
+        for version in (await session.scalars(select(ModelVersion))).all()
+    }
+    for index in unused:
+        await session.execute(text(f'DROP INDEX "{index.index_name}"'))
+        version = versions.get(index.table_name)
+        if version is None:
+            continue
+        indexed_columns = version.monitor_indexed_columns
+        if indexed_columns is None:
+            columns = {**version.meta_columns, **version.model_columns, **version.additional_data_columns,
+                       **version.features_columns, **(version.private_columns or {})}
+            indexed_columns = [name for name, it in columns.items() if ColumnType(it).is_indexed()]
+        version.monitor_indexed_columns = sorted(set(indexed_columns) - {index.column_name})
+
+    return [index.index_name for index in unused]
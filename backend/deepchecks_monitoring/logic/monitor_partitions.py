@@ -0,0 +1,217 @@
+# ----------------------------------------------------------------------------
+# Copyright (C) 2021-2022 Deepchecks (https://www.deepchecks.com)
+#
+# This file is part of Deepchecks.
+# Deepchecks is distributed under the terms of the GNU Affero General
+# Public License (version 3 or later).
+# You should have received a copy of the GNU Affero General Public License
+# along with Deepchecks.  If not, see <http://www.gnu.org/licenses/>.
+# ----------------------------------------------------------------------------
+"""Time range partitioning of the monitor tables by the sample timestamp.
+
+A partitioned monitor table is declared with ``PARTITION BY RANGE (_dc_time)``, and has a partition per
+day, week or month (the model's ``monitor_partition_interval``). Window queries filter on ``_dc_time``,
+so postgres prunes them to the partitions of the window. Partitions are created by the ingestion for the
+timestamps of the ingested samples.
+"""
+import typing as t
+from datetime import datetime
+
+import pendulum as pdl
+import sqlalchemy as sa
+from sqlalchemy import Index, MetaData, PrimaryKeyConstraint, Table, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.ddl import CreateIndex, CreateTable
+
+from deepchecks_monitoring.schema_models.column_type import (SAMPLE_ID_COL, SAMPLE_TS_COL, ColumnType,
+                                                             MonitorIndexMethod, column_types_to_table_columns)
+from deepchecks_monitoring.utils.alerts import Frequency
+
+if t.TYPE_CHECKING:
+    from deepchecks_monitoring.schema_models.model_version import ModelVersion  # pylint: disable=unused-import
+
+__all__ = ["PARTITION_INTERVALS", "build_monitor_table", "partition_start", "get_monitor_partitions",
+           "create_monitor_partitions", "create_partitions_for_table", "drop_monitor_partitions_before",
+           "partition_monitor_table"]
+
+
+PARTITION_INTERVALS = (Frequency.DAY, Frequency.WEEK, Frequency.MONTH)
+
+
+def build_monitor_table(
+        name: str,
+        columns: t.Dict[str, ColumnType],
+        partition_interval: t.Optional[Frequency] = None,
+        indexed_columns: t.Optional[t.Collection[str]] = None,
+        time_index_method: MonitorIndexMethod = MonitorIndexMethod.BTREE
+) -> Table:
+    """Build the table object used to create a monitor table.
+
+    Unique constraints of a partitioned table must contain the partition key, therefore the primary key of a
+    partitioned monitor table is the sample id together with the sample timestamp.
+
+    Every index is updated by each insert, so besides the sample timestamp index only the ``indexed_columns``
+    are indexed. If not given, all the numeric and datetime columns are indexed, as in the tables of versions
+    created before the index policy.
+    """
+    if indexed_columns is None:
+        indexed_columns = {column for column, column_type in columns.items() if column_type.is_indexed()}
+    indexed_columns = set(indexed_columns)
+    indexes = []
+    if time_index_method == MonitorIndexMethod.BTREE:
+        indexed_columns.add(SAMPLE_TS_COL)
+    else:
+        indexed_columns.discard(SAMPLE_TS_COL)
+        indexes.append(Index(f"_{name}_time_brin_index", SAMPLE_TS_COL, postgresql_using="brin"))
+
+    if partition_interval is None:
+        columns = column_types_to_table_columns(columns, indexed_columns=indexed_columns)
+        partitioning = {}
+    else:
+        columns = [*column_types_to_table_columns(columns, primary_key=None, indexed_columns=indexed_columns),
+                   PrimaryKeyConstraint(SAMPLE_ID_COL, SAMPLE_TS_COL)]
+        partitioning = {"postgresql_partition_by": f"RANGE ({SAMPLE_TS_COL})"}
+    # using hash index in queries to get random order of samples, so adding index for it
+    return Table(
+        name,
+        MetaData(),
+        *columns,
+        *indexes,
+        Index(f"_{name}_hashtext_index", text(f"hashtext({SAMPLE_ID_COL})")),
+        **partitioning
+    )
+
+
+def partition_start(partition_interval: Frequency, column):
+    """Return sql expression of the start (in UTC) of the partition which holds the given timestamp."""
+    return func.date_trunc(partition_interval.value.lower(), func.timezone("UTC", column))
+
+
+def _partition_bounds(partition_interval: Frequency, start: datetime) -> t.Tuple["pdl.DateTime", "pdl.DateTime"]:
+    start = pdl.instance(start, tz="UTC").start_of(partition_interval.value.lower())
+    return start, start + partition_interval.to_pendulum_duration()
+
+
+def _partition_name(table_name: str, start: "pdl.DateTime") -> str:
+    return f"{table_name}_p{start.format('YYYYMMDD')}"
+
+
+async def get_monitor_partitions(session: AsyncSession, table_name: str) -> t.List[str]:
+    """Return names of the partitions of the monitor table in the current schema."""
+    return (await session.execute(
+        text("SELECT c.relname FROM pg_catalog.pg_inherits i "
+             "JOIN pg_catalog.pg_class c ON c.oid = i.inhrelid "
+             "WHERE i.inhparent = to_regclass(:table_name) "
+             "ORDER BY c.relname"),
+        {"table_name": f'"{table_name}"'}
+    )).scalars().all()
+
+
+async def create_monitor_partitions(
+        session: AsyncSession,
+        table_name: str,
+        partition_interval: Frequency,
+        starts: t.Iterable[datetime]
+):
+    """Create the missing partitions starting at the given times.
+
+    The partition following the latest one is created as well, so the partitions usually exist before data
+    for them is ingested, since creating a partition locks its parent table until the transaction ends.
+    """
+    bounds = {_partition_bounds(partition_interval, start) for start in starts}
+    if not bounds:
+        return
+    latest_end = max(end for _, end in bounds)
+    bounds.add(_partition_bounds(partition_interval, latest_end))
+
+    existing = set(await get_monitor_partitions(session, table_name))
+    missing = [(start, end) for start, end in sorted(bounds) if _partition_name(table_name, start) not in existing]
+    if not missing:
+        return
+
+    # Concurrent ingestions may try to create the same partitions
+    await session.execute(select(func.pg_advisory_xact_lock(func.hashtext(table_name))))
+    for start, end in missing:
+        await session.execute(text(
+            f'CREATE TABLE IF NOT EXISTS "{_partition_name(table_name, start)}" PARTITION OF "{table_name}" '
+            f"FOR VALUES FROM ('{start.to_iso8601_string()}') TO ('{end.to_iso8601_string()}')"
+        ))
+
+
+async def create_partitions_for_table(
+        session: AsyncSession,
+        table_name: str,
+        partition_interval: Frequency,
+        source: sa.Table
+):
+    """Create the partitions of the monitor table needed for the timestamps of the source table rows."""
+    starts = (await session.execute(
+        select(partition_start(partition_interval, source.c[SAMPLE_TS_COL])).distinct()
+    )).scalars().all()
+    await create_monitor_partitions(session, table_name, partition_interval, starts)
+
+
+async def drop_monitor_partitions_before(
+        session: AsyncSession,
+        table_name: str,
+        partition_interval: Frequency,
+        cutoff: datetime
+) -> t.List[str]:
+    """Drop the partitions of the monitor table which hold only samples older than the cutoff.
+
+    Returns names of the dropped partitions.
+    """
+    prefix = f"{table_name}_p"
+    dropped = []
+    for name in await get_monitor_partitions(session, table_name):
+        if not name.startswith(prefix):
+            continue
+        start = pdl.from_format(name[len(prefix):], "YYYYMMDD", tz="UTC")
+        _, end = _partition_bounds(partition_interval, start)
+        if end <= cutoff:
+            # Dropping a partition only removes its files, unlike deleting its rows
+            await session.execute(text(f'DROP TABLE "{name}"'))
+            dropped.append(name)
+    return dropped
+
+
+async def partition_monitor_table(
+        session: AsyncSession,
+        model_version: "ModelVersion",
+        partition_interval: Frequency
+):
+    """Convert the existing monitor table of the model version into a partitioned table.
+
+    The data is copied into the partitions within the session transaction, which holds an exclusive lock on
+    the monitor table, and indexes are built once the data is loaded.
+    """
+    table_name = model_version.get_monitor_table_name()
+    old_table_name = f"{table_name}_unpartitioned"
+    columns = {**model_version.meta_columns, **model_version.model_columns, **model_version.additional_data_columns,
+               **model_version.features_columns, **(model_version.private_columns or {})}
+    table = build_monitor_table(table_name, {name: ColumnType(it) for name, it in columns.items()},
+                                partition_interval, model_version.monitor_indexed_columns,
+                                model_version.monitor_time_index_method)
+    column_names = ", ".join(f'"{name}"' for name in columns)
+
+    await session.execute(text(f'LOCK TABLE "{table_name}" IN ACCESS EXCLUSIVE MODE'))
+    await session.execute(text(f'ALTER TABLE "{table_name}" RENAME TO "{old_table_name}"'))
+    # Indexes names are derived from the table name, so renaming the old ones before creating the new
+    old_indexes = (await session.execute(
+        text("SELECT indexname FROM pg_catalog.pg_indexes "
+             "WHERE schemaname = current_schema() AND tablename = :table_name"),
+        {"table_name": old_table_name}
+    )).scalars().all()
+    for index, index_name in enumerate(old_indexes):
+        await session.execute(text(f'ALTER INDEX "{index_name}" RENAME TO "{old_table_name}_index_{index}"'))
+
+    await session.execute(CreateTable(table))
+    old_table = sa.table(old_table_name, sa.column(SAMPLE_TS_COL))
+    await create_partitions_for_table(session, table_name, partition_interval, old_table)
+    await session.execute(text(
+        f'INSERT INTO "{table_name}" ({column_names}) SELECT {column_names} FROM "{old_table_name}"'
+    ))
+    await session.execute(text(f'DROP TABLE "{old_table_name}"'))
+    for index in table.indexes:
+        await session.execute(CreateIndex(index))
+    model_version.monitor_partition_interval = partition_interval
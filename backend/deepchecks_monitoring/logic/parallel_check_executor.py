@@ -8,13 +8,16 @@
 # along with Deepchecks.  If not, see <http://www.gnu.org/licenses/>.
 # ----------------------------------------------------------------------------
 """Module defining parallel check execution logic."""
+import asyncio
 import contextlib
 import logging
 import typing as t
 from collections import defaultdict
+from concurrent.futures import Executor
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
 import ray
 import sqlalchemy as sa
 from deepchecks.core import errors
@@ -25,13 +28,17 @@ from sqlalchemy.orm import Session, joinedload
 
 from deepchecks_monitoring.exceptions import NotFound
 from deepchecks_monitoring.logic.cache_functions import CacheFunctions
-from deepchecks_monitoring.logic.check_logic import MonitorOptions, create_execution_data_query, reduce_check_result
+from deepchecks_monitoring.logic.check_logic import (MonitorOptions, create_execution_data_query,
+                                                     create_windows_execution_data_query, reduce_check_result,
+                                                     run_check_per_window_in_range, split_windows_data)
 from deepchecks_monitoring.logic.model_logic import (dataframe_to_dataset_and_pred, get_model_versions_for_time_range,
                                                      get_top_features_or_from_conf, initialize_check)
+from deepchecks_monitoring.logic.windows_batches import balance_windows_batches, estimate_windows_samples
 from deepchecks_monitoring.monitoring_utils import MonitorCheckConfSchema, configure_logger, fetch_or_404
 from deepchecks_monitoring.public_models.organization import Organization
 from deepchecks_monitoring.schema_models.check import Check
 from deepchecks_monitoring.schema_models.model import Model, TaskType
+from deepchecks_monitoring.schema_models.model_version import ModelVersion
 from deepchecks_monitoring.utils.database import SessionParameter
 
 if t.TYPE_CHECKING:
@@ -41,6 +48,13 @@ if t.TYPE_CHECKING:
 __all__ = ['execute_check_per_window', 'CheckPerWindowExecutor']
 
 
+# Number of queries whose data is prefetched at the same time by the server process
+PREFETCH_CONCURRENCY = 2
+_prefetch_semaphore = asyncio.Semaphore(PREFETCH_CONCURRENCY)
+
+TPrefetched = t.TypeVar('TPrefetched')
+
+
 class WindowResult(t.TypedDict):
     index: int
     result: t.Any
@@ -53,7 +67,8 @@ class WindowExecutionArgs(t.TypedDict):
     window_index: int
     start: 'pdl.datetime.DateTime'
     end: 'pdl.datetime.DateTime'
-    samples_query: 'sa.sql.Selectable'
+    samples_query: 'sa.sql.Selectable | None'  # None if fetched by the model version windows query
+    samples_data: 'ray.ObjectRef | None'  # Data of the window, if it was fetched by the caller
 
 
 class CheckPerWindowExecutionArgs(t.TypedDict):
@@ -66,6 +81,8 @@ class CheckPerWindowExecutionArgs(t.TypedDict):
     balance_classes: dict[int, bool]                  # dict[model-version-id, bool]
     feature_columns: dict[int, dict[str, str]]        # dict[model-version-id, columns]
     references_queries: dict[int, 'sa.sql.Selectable']  # dict[model-version-id, window-query]
+    windows_queries: dict[int, 'sa.sql.Selectable']     # dict[model-version-id, windows-query]
+    references_data: dict[int, 'ray.ObjectRef']         # dict[model-version-id, reference-data]
     task_type: TaskType
     top_features: list[str]
     feature_importance: dict[str, float] | None
@@ -81,8 +98,29 @@ async def execute_check_per_window(
     monitor_id: t.Optional[int] = None,
     cache_funcs: t.Optional[CacheFunctions] = None,
     n_of_windows_per_worker: int = 10,
+    single_scan: bool = False,
+    prefetch_data: bool = False,
+    n_of_workers: t.Optional[int] = None,
+    inline_max_samples: int = 0,
+    executor: t.Optional[Executor] = None,
 ):
-    """Execute check."""
+    """Execute check.
+
+    The cost of each window is estimated by its number of samples, counted from the samples reservoir of the
+    model. Runs whose windows without cached results in total do not exceed 'inline_max_samples' are not sent
+    to the workers, as their overhead exceeds their gain, and are executed by 'executor' as when there are no
+    workers. Otherwise, the windows are balanced by their costs between batches, twice the number of workers
+    so estimation errors are evened out, and the most expensive batches are sent first. Without 'n_of_workers'
+    the windows are batched by 'n_of_windows_per_worker'. The results are cached as each batch finishes.
+
+    With 'single_scan' the data of the windows of a model version which are executed by the same worker
+    is fetched by a single query, so each batch is a run of consecutive windows, to not scan the whole time
+    range by each of the workers.
+
+    With 'prefetch_data' the reference and windows data of each model version is fetched once by the caller
+    and put in the ray object store by a thread (see '_prefetch'), the workers read it from there instead of
+    querying the database. The windows without data are not sent to the workers at all.
+    """
     check = await fetch_or_404(
         session=session,
         model=Check,
@@ -106,6 +144,40 @@ async def execute_check_per_window(
     if len(model_versions) == 0:
         raise NotFound('No relevant model versions found')
 
+    fit_model_versions = [it for it in model_versions if it.is_filter_fit(monitor_options.filter)]
+
+    cached_results: dict[tuple[int, int], t.Any] = {}
+    if monitor_id and cache_funcs:
+        for model_version in fit_model_versions:
+            for window_index, window_end in enumerate(all_windows):
+                cached_result = cache_funcs.get_monitor_cache(
+                    organization_id,
+                    model_version.id,
+                    monitor_id,
+                    window_end - aggregation_window,
+                    window_end
+                )
+                if cached_result.found:
+                    cached_results[(model_version.id, window_index)] = cached_result.value
+
+    windows_samples = await estimate_windows_samples(
+        session,
+        fit_model_versions,
+        [(index, window_end - aggregation_window, window_end) for index, window_end in enumerate(all_windows)]
+    )
+    # Cached windows are not executed at all
+    if sum(count for key, count in windows_samples.items() if key not in cached_results) <= inline_max_samples:
+        return await run_check_per_window_in_range(
+            check_id,
+            session,
+            monitor_options,
+            monitor_id=monitor_id,
+            cache_funcs=cache_funcs,
+            organization_id=organization_id,
+            single_scan=single_scan,
+            executor=executor
+        )
+
     top_feat, feat_imp = get_top_features_or_from_conf(model_versions[0], monitor_options.additional_kwargs)
     model_columns = list(model_versions[0].model_columns.keys())
     columns = top_feat + model_columns
@@ -114,18 +186,19 @@ async def execute_check_per_window(
     windows_to_calculate: list[WindowExecutionArgs] = []
 
     model_versions_names: dict[int, str] = {}
+    model_versions_by_id: dict[int, ModelVersion] = {}
     references_queries: dict[int, 'sa.sql.Selectable'] = {}
+    references_data: dict[int, 'ray.ObjectRef'] = {}
     features_per_model_version: dict[int, dict[str, str]] = {}
     balance_classes_per_model_version: dict[int, bool] = {}
     classes_per_model_version: dict[int, t.Optional[list[str | int]]] = {}
 
-    for model_version in model_versions:
-        if not model_version.is_filter_fit(monitor_options.filter):
-            continue
-
+    for model_version in fit_model_versions:
         model_version_id = t.cast(int, model_version.id)
         model_versions_names[model_version_id] = t.cast(str, model_version.name)
+        model_versions_by_id[model_version_id] = model_version
         create_reference_query = False
+        model_version_windows: list[WindowExecutionArgs] = []
 
         for window_index, window_end in enumerate(all_windows):
             window_start = window_end - aggregation_window
@@ -137,17 +210,9 @@ async def execute_check_per_window(
                 'result': None  # will be filled later
             }
 
-            if monitor_id and cache_funcs:
-                cached_result = cache_funcs.get_monitor_cache(
-                    organization_id,
-                    model_version_id,
-                    monitor_id,
-                    window_start,
-                    window_end
-                )
-                if cached_result.found:
-                    results[model_version_id][window_index]['result'] = cached_result.value
-                    continue
+            if (model_version_id, window_index) in cached_results:
+                results[model_version_id][window_index]['result'] = cached_results[(model_version_id, window_index)]
+                continue
 
             if not model_version.is_in_range(window_start, window_end):
                 continue
@@ -159,7 +224,7 @@ async def execute_check_per_window(
             create_reference_query = True
             period = window_end - window_start
 
-            samples_query = create_execution_data_query(
+            samples_query = None if single_scan or prefetch_data else create_execution_data_query(
                 model_version,
                 monitor_options,
                 period=period,
@@ -168,16 +233,17 @@ async def execute_check_per_window(
                 filter_labels_exist=t.cast(bool, check.is_label_required),
                 is_ref=False
             )
-            windows_to_calculate.append({
+            model_version_windows.append({
                 'window_index': window_index,
                 'model_version_id': model_version_id,
                 'samples_query': samples_query,
+                'samples_data': None,
                 'start': window_start,
                 'end': window_end,
             })
 
         if check.is_reference_required and create_reference_query:
-            references_queries[model_version_id] = create_execution_data_query(
+            reference_query = create_execution_data_query(
                 model_version,
                 monitor_options,
                 columns=columns,
@@ -185,8 +251,49 @@ async def execute_check_per_window(
                 filter_labels_exist=t.cast(bool, check.is_label_required),
                 is_ref=True
             )
+            if not prefetch_data:
+                references_queries[model_version_id] = reference_query
+            else:
+                reference_data = await _prefetch(session, reference_query, _put_non_empty_dataframe)
+                if reference_data is None:
+                    # Train test checks can't run without reference, the results of the windows remain None
+                    continue
+                references_data[model_version_id] = reference_data
 
-    # TODO: do not use actors pool if you have small number of windows
+        if prefetch_data and model_version_windows:
+            windows_query = create_windows_execution_data_query(
+                model_version,
+                monitor_options,
+                windows=[(it['window_index'], it['start'], it['end']) for it in model_version_windows],
+                columns=columns,
+                with_labels=t.cast(bool, check.is_label_required),
+                filter_labels_exist=t.cast(bool, check.is_label_required),
+            )
+            windows_data = await _prefetch(session, windows_query, _put_windows_dataframes)
+            model_version_windows = [
+                {**it, 'samples_data': windows_data[it['window_index']]}
+                for it in model_version_windows
+                if it['window_index'] in windows_data
+            ]
+
+        windows_to_calculate.extend(model_version_windows)
+
+    def create_windows_queries(batch: list[WindowExecutionArgs]) -> dict[int, 'sa.sql.Selectable']:
+        windows_per_model_version = defaultdict(list)
+        for window in batch:
+            if window['samples_query'] is None and window['samples_data'] is None:
+                windows_per_model_version[window['model_version_id']].append(window)
+        return {
+            model_version_id: create_windows_execution_data_query(
+                model_versions_by_id[model_version_id],
+                monitor_options,
+                windows=[(it['window_index'], it['start'], it['end']) for it in windows],
+                columns=columns,
+                with_labels=t.cast(bool, check.is_label_required),
+                filter_labels_exist=t.cast(bool, check.is_label_required),
+            )
+            for model_version_id, windows in windows_per_model_version.items()
+        }
 
     task_factory = lambda pool, batch: pool.execute.remote(CheckPerWindowExecutionArgs(
         check_config=t.cast('dict[t.Any, t.Any]', check.config),
@@ -195,41 +302,53 @@ async def execute_check_per_window(
         task_type=t.cast(TaskType, model.task_type),
         organization_id=organization_id,
         references_queries=references_queries,
+        windows_queries=create_windows_queries(batch),
+        references_data=references_data,
         feature_importance=dict(feat_imp) if feat_imp is not None else None,
         top_features=top_feat,
         balance_classes=balance_classes_per_model_version,
         feature_columns=features_per_model_version,
         classes=classes_per_model_version
     ))
-    windows_batches = (
-        windows_to_calculate[i:i + n_of_windows_per_worker]
-        for i in range(0, len(windows_to_calculate), n_of_windows_per_worker)
-    )
-    calculated_check_results = (
-        result
-        for batch_results in actor_pool.map_unordered(task_factory, windows_batches)
-        for result in batch_results
-    )
 
-    for result in calculated_check_results:
-        value = result['result']
-        window_index = result['window_index']
-        model_version_id = result['model_version_id']
-        start = results[model_version_id][window_index]['start']
-        end = results[model_version_id][window_index]['end']
-
-        # TODO: consider caching results not only when a 'monitor_id' is provided
-        if cache_funcs and monitor_id:
-            cache_funcs.set_monitor_cache(
-                organization_id,
-                result['model_version_id'],
-                monitor_id,
-                start,
-                end,
-                value
-            )
+    if n_of_workers:
+        windows_batches = balance_windows_batches(
+            windows_to_calculate,
+            costs=[windows_samples[(it['model_version_id'], it['window_index'])] for it in windows_to_calculate],
+            n_of_batches=2 * n_of_workers,
+            contiguous=single_scan and not prefetch_data
+        )
+    else:
+        windows_batches = [
+            windows_to_calculate[i:i + n_of_windows_per_worker]
+            for i in range(0, len(windows_to_calculate), n_of_windows_per_worker)
+        ]
+
+    for batch in windows_batches:
+        actor_pool.submit(task_factory, batch)
+
+    while actor_pool.has_next():
+        # Waiting for the next batch in a thread, to not block the event loop
+        batch_results = await asyncio.to_thread(actor_pool.get_next_unordered)
+        for result in batch_results:
+            value = result['result']
+            window_index = result['window_index']
+            model_version_id = result['model_version_id']
+            start = results[model_version_id][window_index]['start']
+            end = results[model_version_id][window_index]['end']
+
+            # TODO: consider caching results not only when a 'monitor_id' is provided
+            if cache_funcs and monitor_id:
+                cache_funcs.set_monitor_cache(
+                    organization_id,
+                    result['model_version_id'],
+                    monitor_id,
+                    start,
+                    end,
+                    value
+                )
 
-        results[model_version_id][window_index]['result'] = value
+            results[model_version_id][window_index]['result'] = value
 
     output = {}
 
@@ -246,13 +365,67 @@ async def execute_check_per_window(
     }
 
 
+async def _prefetch(
+    session: AsyncSession,
+    query: 'sa.sql.Selectable',
+    put: t.Callable[[pd.DataFrame], TPrefetched]
+) -> TPrefetched:
+    """Fetch the data of the query and put it in the object store with 'put'.
+
+    The dataframe is created and put in the object store by a thread, to not block the event loop with the
+    conversion of the data. The number of queries prefetched at the same time by the process is bounded, as their
+    data is held by the process until it is put in the object store.
+    """
+    async with _prefetch_semaphore:
+        query_result = await session.execute(query)
+        rows, columns = query_result.all(), [str(key) for key in query_result.keys()]
+        return await asyncio.to_thread(lambda: put(pd.DataFrame(rows, columns=columns)))
+
+
+def _put_non_empty_dataframe(df: pd.DataFrame) -> 'ray.ObjectRef | None':
+    return None if df.empty else _put_dataframe(df)
+
+
+def _put_windows_dataframes(df: pd.DataFrame) -> dict[int, 'ray.ObjectRef']:
+    """Put the data of each window of a 'create_windows_execution_data_query' result in the object store."""
+    return {window_index: _put_dataframe(window_df) for window_index, window_df in split_windows_data(df).items()}
+
+
+def _put_dataframe(df: pd.DataFrame) -> 'ray.ObjectRef':
+    """Put the dataframe in the object store as an arrow table, which the workers read without copying it.
+
+    Dataframes with values arrow can't convert (e.g. object columns of mixed types) are put as is.
+    """
+    try:
+        return ray.put(pa.Table.from_pandas(df, preserve_index=False))
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        return ray.put(df)
+
+
+def _get_dataframe(ref: 'ray.ObjectRef') -> pd.DataFrame:
+    data = ray.get(ref)
+    return data.to_pandas() if isinstance(data, pa.Table) else data
+
+
+def _requires_session(args: CheckPerWindowExecutionArgs) -> bool:
+    """Whether any of the data of the windows has to be queried, or was all fetched by the caller."""
+    return (
+        bool(args['references_queries'])
+        or bool(args['windows_queries'])
+        or any(window['samples_query'] is not None for window in args['windows'])
+    )
+
+
 def _execute_check_per_window(
-    session: Session,
+    session: Session | None,
     args: CheckPerWindowExecutionArgs,
     logger: logging.Logger | None = None
 ) -> t.List[WindowResult]:
     logger = logger or configure_logger('check-executor')
     references_queries = args['references_queries']
+    windows_queries = args['windows_queries']
+    references_data = args['references_data']
+    windows_dataframes: dict[int, dict[int, pd.DataFrame]] = {}  # dict[model-version-id, dict[window-index, df]]
 
     references_dataframes: dict[int, tuple[
         pd.DataFrame,
@@ -288,13 +461,16 @@ def _execute_check_per_window(
             reference_data = references_dataframes[window['model_version_id']]
             reference_df, reference_dataset, reference_pred, reference_proba = reference_data
 
-        elif window['model_version_id'] in references_queries:
-            query = references_queries[window['model_version_id']]
-            query_result = session.execute(query)
-            reference_df = pd.DataFrame(
-                query_result.all(),
-                columns=[str(key) for key in query_result.keys()]
-            )
+        elif window['model_version_id'] in references_queries or window['model_version_id'] in references_data:
+            if window['model_version_id'] in references_data:
+                reference_df = _get_dataframe(references_data[window['model_version_id']])
+            else:
+                query = references_queries[window['model_version_id']]
+                query_result = session.execute(query)
+                reference_df = pd.DataFrame(
+                    query_result.all(),
+                    columns=[str(key) for key in query_result.keys()]
+                )
             reference_dataset, reference_pred, reference_proba = dataframe_to_dataset_and_pred(
                 reference_df,
                 features_columns=features_columns,
@@ -312,8 +488,19 @@ def _execute_check_per_window(
         if reference_df is not None and reference_df.empty:
             continue
 
-        window_data = session.execute(window['samples_query'])
-        window_df = pd.DataFrame(window_data.all(), columns=[str(key) for key in window_data.keys()])
+        if window['samples_data'] is not None:
+            window_df = _get_dataframe(window['samples_data'])
+        elif window['samples_query'] is not None:
+            window_data = session.execute(window['samples_query'])
+            window_df = pd.DataFrame(window_data.all(), columns=[str(key) for key in window_data.keys()])
+        else:
+            if window['model_version_id'] not in windows_dataframes:
+                windows_data = session.execute(windows_queries[window['model_version_id']])
+                windows_dataframes[window['model_version_id']] = split_windows_data(pd.DataFrame(
+                    windows_data.all(),
+                    columns=[str(key) for key in windows_data.keys()]
+                ))
+            window_df = windows_dataframes[window['model_version_id']].get(window['window_index'], pd.DataFrame())
 
         if window_df.empty:
             continue
@@ -449,7 +636,9 @@ class CheckPerWindowExecutor:
 
     def execute(self, args: CheckPerWindowExecutionArgs):
         try:
-            with self._session(args['organization_id']) as s:
+            # Data which was fetched by the caller does not require a database session
+            session = self._session(args['organization_id']) if _requires_session(args) else contextlib.nullcontext()
+            with session as s:
                 return _execute_check_per_window(
                     session=s,
                     args=args,
@@ -0,0 +1,270 @@
+# ----------------------------------------------------------------------------
+# Copyright (C) 2021-2022 Deepchecks (https://www.deepchecks.com)
+#
+# This file is part of Deepchecks.
+# Deepchecks is distributed under the terms of the GNU Affero General
+# Public License (version 3 or later).
+# You should have received a copy of the GNU Affero General Public License
+# along with Deepchecks.  If not, see <http://www.gnu.org/licenses/>.
+# ----------------------------------------------------------------------------
+"""Incremental decoding of samples streamed as newline delimited json or as a sequence of msgpack maps.
+
+The decoders are fed with the request body chunks as they arrive and hold at most a single partial sample,
+so the memory used does not depend on the size of the upload.
+"""
+import codecs
+import json
+import typing as t
+
+import msgpack
+import orjson
+
+from deepchecks_monitoring.exceptions import BadRequest
+
+__all__ = ["NDJSON_MEDIA_TYPE", "MSGPACK_MEDIA_TYPE", "StreamDecoder", "SplitJsonDecoder", "create_stream_decoder"]
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+MSGPACK_MEDIA_TYPE = "application/x-msgpack"
+# Maximal number of decoding errors kept for the report, the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+
+class StreamDecoder:
+    """Base class of the stream decoders."""
+
+    def __init__(self, max_sample_bytes: int):
+        self.max_sample_bytes = max_sample_bytes
+        self.samples_count = 0
+        self.errors_count = 0
+        self.errors: t.List[t.Dict[str, t.Any]] = []
+
+    def feed(self, chunk: bytes) -> t.List[t.Any]:
+        """Feed the next chunk of the stream, and return the samples which were completed by it."""
+        raise NotImplementedError()
+
+    def close(self) -> t.List[t.Any]:
+        """Return the last sample of a stream which does not end with a delimiter."""
+        return []
+
+    def _add_error(self, error: str):
+        self.errors_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            # Samples are numbered from 1, like the lines of a file
+            self.errors.append({"sample": self.samples_count + self.errors_count, "error": error})
+
+
+class NdjsonDecoder(StreamDecoder):
+    """Decoder of newline delimited json, a json object per line."""
+
+    def __init__(self, max_sample_bytes: int):
+        super().__init__(max_sample_bytes)
+        self._buffer = bytearray()
+        # Whether the rest of the current line is dropped, after it exceeded the maximal size
+        self._skip_line = False
+
+    def feed(self, chunk: bytes) -> t.List[t.Any]:
+        samples = []
+        lines = chunk.split(b"\n")
+        for line in lines[:-1]:
+            if self._skip_line:
+                self._skip_line = False
+            else:
+                self._buffer += line
+                samples.extend(self._decode_line())
+        if not self._skip_line:
+            self._buffer += lines[-1]
+            if len(self._buffer) > self.max_sample_bytes:
+                self._buffer.clear()
+                self._skip_line = True
+                self._add_error(f"Sample exceeds the maximal size of {self.max_sample_bytes} bytes")
+        return samples
+
+    def close(self) -> t.List[t.Any]:
+        return [] if self._skip_line else self._decode_line()
+
+    def _decode_line(self) -> t.List[t.Any]:
+        line, self._buffer = bytes(self._buffer), bytearray()
+        if not line.strip():
+            return []
+        try:
+            sample = orjson.loads(line)
+        except orjson.JSONDecodeError as e:
+            self._add_error(f"Invalid json: {e}")
+            return []
+        self.samples_count += 1
+        return [sample]
+
+
+class MsgpackDecoder(StreamDecoder):
+    """Decoder of a sequence of msgpack maps.
+
+    Msgpack values are self delimiting, so the maps are sent one after the other without a length prefix.
+    Once the stream is malformed the position of the next sample can't be found, so the rest is dropped.
+    """
+
+    def __init__(self, max_sample_bytes: int):
+        super().__init__(max_sample_bytes)
+        self._unpacker = msgpack.Unpacker(max_buffer_size=max_sample_bytes)
+        self._failed = False
+
+    def feed(self, chunk: bytes) -> t.List[t.Any]:
+        if self._failed:
+            return []
+        samples = []
+        try:
+            # Feeding in parts of the buffer size, so a chunk larger than a sample does not overflow it
+            for start in range(0, len(chunk), self.max_sample_bytes):
+                self._unpacker.feed(chunk[start:start + self.max_sample_bytes])
+                samples.extend(self._unpacker)
+        except msgpack.BufferFull:
+            self._fail(f"Sample exceeds the maximal size of {self.max_sample_bytes} bytes")
+        except (msgpack.UnpackException, ValueError) as e:
+            self._fail(f"Invalid msgpack: {e}")
+        self.samples_count += len(samples)
+        return samples
+
+    def _fail(self, error: str):
+        self._failed = True
+        self._add_error(f"{error}, the rest of the stream was dropped")
+
+
+# States of the split json decoder, named by what is expected next
+_OBJECT_START = "object start"
+_FIRST_KEY = "first key"
+_KEY = "key"
+_COLON = "colon"
+_VALUE = "value"
+_FIRST_ROW = "first row"
+_ROW = "row"
+_ROWS_DELIMITER = "rows delimiter"
+_VALUES_DELIMITER = "values delimiter"
+_END = "end"
+_INCOMPLETE = object()
+
+
+class SplitJsonDecoder:
+    """Incremental decoder of a json object of the pandas 'split' orientation, {"columns": [...], "data": [...]}.
+
+    The rows of the data array are decoded one by one while the chunks are fed, so only a single partial row
+    is held instead of the whole upload. The columns must precede the data, as in the output of
+    'DataFrame.to_json(orient="split")', the values of any other key (like the index) are ignored.
+    Malformed json raises ValueError.
+    """
+
+    def __init__(self):
+        self.columns: t.Optional[t.List[str]] = None
+        self.rows_count = 0
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json_decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._position = 0
+        self._state = _OBJECT_START
+        self._key = None
+        self._has_data = False
+        self._closed = False
+
+    def feed(self, chunk: bytes) -> t.List[t.Any]:
+        """Feed the next chunk of the json, and return the rows which were completed by it."""
+        self._buffer = self._buffer[self._position:] + self._text_decoder.decode(chunk)
+        self._position = 0
+        return self._decode()
+
+    def close(self) -> t.List[t.Any]:
+        """Return the rows left at the end of the json, and validate it is complete."""
+        self._closed = True
+        rows = self.feed(b"")
+        if self._state != _END:
+            raise ValueError("Unexpected end of the json")
+        if self.columns is None or not self._has_data:
+            raise ValueError("The json must contain both 'columns' and 'data'")
+        return rows
+
+    def _decode(self) -> t.List[t.Any]:
+        rows = []
+        while True:
+            while self._position < len(self._buffer) and self._buffer[self._position].isspace():
+                self._position += 1
+            if self._position == len(self._buffer):
+                return rows
+            char = self._buffer[self._position]
+
+            if self._state == _OBJECT_START:
+                self._expect(char, "{", _FIRST_KEY)
+            elif self._state in (_FIRST_KEY, _KEY):
+                if self._state == _FIRST_KEY and char == "}":
+                    self._expect(char, "}", _END)
+                    continue
+                key = self._decode_value()
+                if key is _INCOMPLETE:
+                    return rows
+                if not isinstance(key, str):
+                    raise ValueError(f"Expected a key, got {key!r}")
+                self._key = key
+                self._state = _COLON
+            elif self._state == _COLON:
+                self._expect(char, ":", _VALUE)
+            elif self._state == _VALUE:
+                if self._key == "data":
+                    if self.columns is None:
+                        raise ValueError("The 'columns' must precede the 'data'")
+                    self._has_data = True
+                    self._expect(char, "[", _FIRST_ROW)
+                    continue
+                value = self._decode_value()
+                if value is _INCOMPLETE:
+                    return rows
+                if self._key == "columns":
+                    self.columns = value
+                self._state = _VALUES_DELIMITER
+            elif self._state in (_FIRST_ROW, _ROW):
+                if self._state == _FIRST_ROW and char == "]":
+                    self._expect(char, "]", _VALUES_DELIMITER)
+                    continue
+                row = self._decode_value()
+                if row is _INCOMPLETE:
+                    return rows
+                rows.append(row)
+                self.rows_count += 1
+                self._state = _ROWS_DELIMITER
+            elif self._state == _ROWS_DELIMITER:
+                if char == ",":
+                    self._expect(char, ",", _ROW)
+                else:
+                    self._expect(char, "]", _VALUES_DELIMITER)
+            elif self._state == _VALUES_DELIMITER:
+                if char == ",":
+                    self._expect(char, ",", _KEY)
+                else:
+                    self._expect(char, "}", _END)
+            else:
+                raise ValueError("Unexpected data after the end of the json")
+
+    def _expect(self, char: str, expected: str, next_state: str):
+        if char != expected:
+            raise ValueError(f"Expected '{expected}', got '{char}'")
+        self._position += 1
+        self._state = next_state
+
+    def _decode_value(self):
+        try:
+            value, end = self._json_decoder.raw_decode(self._buffer, self._position)
+        except json.JSONDecodeError:
+            if self._closed:
+                raise
+            return _INCOMPLETE
+        # A value at the end of the buffer, like a number, might continue in the next chunk
+        if end == len(self._buffer) and not self._closed:
+            return _INCOMPLETE
+        self._position = end
+        return value
+
+
+def create_stream_decoder(media_type: str, max_sample_bytes: int) -> StreamDecoder:
+    """Create the decoder of the given stream media type."""
+    if media_type == NDJSON_MEDIA_TYPE:
+        return NdjsonDecoder(max_sample_bytes)
+    if media_type == MSGPACK_MEDIA_TYPE:
+        return MsgpackDecoder(max_sample_bytes)
+    raise BadRequest(f"Unsupported content type '{media_type}', "
+                     f"expected one of: {NDJSON_MEDIA_TYPE}, {MSGPACK_MEDIA_TYPE}")
@@ -0,0 +1,127 @@
+# ----------------------------------------------------------------------------
+# Copyright (C) 2021-2022 Deepchecks (https://www.deepchecks.com)
+#
+# This file is part of Deepchecks.
+# Deepchecks is distributed under the terms of the GNU Affero General
+# Public License (version 3 or later).
+# You should have received a copy of the GNU Affero General Public License
+# along with Deepchecks.  If not, see <http://www.gnu.org/licenses/>.
+# ----------------------------------------------------------------------------
+"""Estimation of the costs of the windows of a check run, and their split to batches executed by the workers."""
+import bisect
+import heapq
+import typing as t
+from collections import defaultdict
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from deepchecks_monitoring.logic.model_logic import DEFAULT_N_SAMPLES
+from deepchecks_monitoring.schema_models.model import SAMPLES_MAP_HOUR_COL
+from deepchecks_monitoring.schema_models.model_version import ModelVersion
+
+if t.TYPE_CHECKING:
+    # pylint: disable=unused-import
+    import pendulum as pdl
+
+__all__ = ['estimate_windows_samples', 'balance_windows_batches']
+
+
+TWindow = t.TypeVar('TWindow')
+
+
+async def estimate_windows_samples(
+    session: AsyncSession,
+    model_versions: list[ModelVersion],
+    windows: list[tuple[int, 'pdl.DateTime', 'pdl.DateTime']],
+    n_samples: int = DEFAULT_N_SAMPLES
+) -> dict[tuple[int, int], int]:
+    """Estimate the number of samples each window of the model versions is executed on.
+
+    The reservoir holds up to its size of samples per hour, which is not smaller than the number of samples read
+    per window, therefore the count of the window samples in the reservoir, limited to 'n_samples', is the number
+    of samples read without the data filters.
+
+    Returns
+    -------
+    dict[tuple[int, int], int]
+        Number of samples by model version id and window index.
+    """
+    if not model_versions or not windows:
+        return {}
+    reservoir = model_versions[0].get_samples_reservoir_table()
+    sample_hour = reservoir.c[SAMPLES_MAP_HOUR_COL]
+    rows = (await session.execute(
+        sa.select(reservoir.c.version_id, sample_hour, sa.func.count())
+        .where(
+            reservoir.c.version_id.in_([it.id for it in model_versions]),
+            sample_hour >= min(start for _, start, _ in windows),
+            sample_hour < max(end for _, _, end in windows)
+        )
+        .group_by(reservoir.c.version_id, sample_hour)
+        .order_by(reservoir.c.version_id, sample_hour)
+    )).all()
+
+    hours_per_version = defaultdict(list)
+    cumulative_counts_per_version = defaultdict(lambda: [0])
+    for version_id, hour, count in rows:
+        hours_per_version[version_id].append(hour)
+        cumulative_counts_per_version[version_id].append(cumulative_counts_per_version[version_id][-1] + count)
+
+    windows_samples = {}
+    for model_version in model_versions:
+        hours = hours_per_version[model_version.id]
+        cumulative_counts = cumulative_counts_per_version[model_version.id]
+        for index, start, end in windows:
+            start_index, end_index = bisect.bisect_left(hours, start), bisect.bisect_left(hours, end)
+            count = cumulative_counts[end_index] - cumulative_counts[start_index]
+            windows_samples[(model_version.id, index)] = min(count, n_samples)
+    return windows_samples
+
+
+def balance_windows_batches(
+    windows: list[TWindow],
+    costs: list[int],
+    n_of_batches: int,
+    contiguous: bool = False
+) -> list[list[TWindow]]:
+    """Split the windows to batches of similar costs, ordered from the most expensive batch.
+
+    The windows are assigned from the most expensive one to the batch with the lowest cost so far. With
+    'contiguous' each batch is a run of consecutive windows instead, for batches whose windows data is fetched
+    by a single query per model version, which scans the time range from the first window to the last one.
+    """
+    # Windows without samples still have the overhead of their execution
+    costs = [max(cost, 1) for cost in costs]
+    n_of_batches = min(n_of_batches, len(windows))
+    if contiguous:
+        return _split_contiguous_batches(windows, costs, n_of_batches)
+    batches: list[list[TWindow]] = [[] for _ in range(n_of_batches)]
+    batches_costs = [(0, index) for index in range(len(batches))]
+    for cost, window in sorted(zip(costs, windows), key=lambda it: it[0], reverse=True):
+        batch_cost, index = heapq.heappop(batches_costs)
+        batches[index].append(window)
+        heapq.heappush(batches_costs, (batch_cost + cost, index))
+    return [batches[index] for _, index in sorted(batches_costs, reverse=True)]
+
+
+def _split_contiguous_batches(
+    windows: list[TWindow],
+    costs: list[int],
+    n_of_batches: int
+) -> list[list[TWindow]]:
+    # Each window goes to the batch its cost midpoint falls in, when the total cost is cut to equal parts
+    total_cost = sum(costs)
+    batches: list[list[TWindow]] = [[] for _ in range(n_of_batches)]
+    batches_costs = [0] * n_of_batches
+    preceding_cost = 0
+    for window, cost in zip(windows, costs):
+        index = min(int((preceding_cost + cost / 2) * n_of_batches / total_cost), n_of_batches - 1)
+        batches[index].append(window)
+        batches_costs[index] += cost
+        preceding_cost += cost
+    return [
+        batches[index]
+        for index in sorted(range(n_of_batches), key=lambda it: batches_costs[it], reverse=True)
+        if batches[index]
+    ]
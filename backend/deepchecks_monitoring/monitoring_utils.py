@@ -461,10 +461,12 @@ def fetch_unused_monitoring_tables(session: Session) -> t.List[str]:
         active_monitoring_tables.add(version.get_monitor_table_name())
         active_monitoring_tables.add(version.get_reference_table_name())
 
+    # Partitions of the monitor tables are dropped together with their parent table
     existing_tables = session.scalars(sa.text(
-        "SELECT DISTINCT tablename "
-        "FROM pg_catalog.pg_tables "
-        "WHERE tablename LIKE 'model_%_monitor_data_%' OR tablename LIKE 'model_%_ref_data_%'"
+        "SELECT DISTINCT relname "
+        "FROM pg_catalog.pg_class "
+        "WHERE relkind IN ('r', 'p') AND NOT relispartition "
+        "AND (relname LIKE 'model_%_monitor_data_%' OR relname LIKE 'model_%_ref_data_%')"
     )).all()
 
     return list(set(existing_tables).difference(active_monitoring_tables))
@@ -9,6 +9,7 @@
 # ----------------------------------------------------------------------------
 # pylint: disable=unnecessary-ellipsis
 """Module with resources instantiation logic."""
+import asyncio
 import logging
 import typing as t
 from contextlib import asynccontextmanager, contextmanager
@@ -41,6 +42,10 @@ from deepchecks_monitoring.utils.mixpanel import BaseEvent as BaseMixpanelEvent
 from deepchecks_monitoring.utils.mixpanel import MixpanelEventReporter
 from deepchecks_monitoring.utils.redis_util import create_settings_dict
 
+if t.TYPE_CHECKING:
+    # pylint: disable=unused-import
+    from deepchecks_monitoring.logic.check_processes_pool import CheckProcessesPool  # noqa
+
 __all__ = ["ResourcesProvider"]
 
 logger: logging.Logger = configure_logger("server")
@@ -84,11 +89,14 @@ class ResourcesProvider(BaseResourcesProvider):
         self._database_engine: t.Optional[Engine] = None
         self._async_database_engine: t.Optional[AsyncEngine] = None
         self._kafka_admin: t.Optional[KafkaAdminClient] = None
+        self._kafka_producer: t.Optional[AIOKafkaProducer] = None
+        self._kafka_producer_lock = asyncio.Lock()
         self._redis_client: t.Optional[Redis] = None
         self._cache_funcs: t.Optional[CacheFunctions] = None
         self._email_sender: t.Optional[EmailSender] = None
         self._oauth_client: t.Optional[OAuth] = None
         self._parallel_check_executors = None
+        self._check_processes_pool: t.Optional["CheckProcessesPool"] = None
         self._mixpanel_event_reporter: MixpanelEventReporter | None = None
 
     @property
@@ -155,6 +163,7 @@ class ResourcesProvider(BaseResourcesProvider):
         """Dispose async resources."""
         if self._async_database_engine is not None:
             await self._async_database_engine.dispose()
+        await self.close_kafka_producer()
 
     @property
     def database_engine(self) -> Engine:
@@ -265,16 +274,31 @@ class ResourcesProvider(BaseResourcesProvider):
 
     @asynccontextmanager
     async def get_kafka_producer(self) -> t.AsyncGenerator[AIOKafkaProducer, None]:
-        """Return kafka producer."""
+        """Return kafka producer.
+
+        The producer is shared by the whole process and is started on first use, it must not be stopped by
+        the caller. Use `close_kafka_producer` in order to stop it.
+        """
         settings = self.kafka_settings
         if settings.kafka_host is None:
             raise ValueError("No kafka host configured")
-        kafka_producer = AIOKafkaProducer(**settings.kafka_params)
-        try:
-            await kafka_producer.start()
-            yield kafka_producer
-        finally:
-            await kafka_producer.stop()
+        async with self._kafka_producer_lock:
+            if self._kafka_producer is None:
+                kafka_producer = AIOKafkaProducer(**settings.kafka_producer_params)
+                try:
+                    await kafka_producer.start()
+                except Exception:
+                    await kafka_producer.stop()
+                    raise
+                self._kafka_producer = kafka_producer
+        yield self._kafka_producer
+
+    async def close_kafka_producer(self):
+        """Stop the shared kafka producer, if it was started."""
+        async with self._kafka_producer_lock:
+            if self._kafka_producer is not None:
+                kafka_producer, self._kafka_producer = self._kafka_producer, None
+                await kafka_producer.stop()
 
     @contextmanager
     def get_kafka_admin(self) -> t.Generator[KafkaAdminClient, None, None]:
@@ -392,6 +416,27 @@ class ResourcesProvider(BaseResourcesProvider):
         import ray  # noqa
         ray.shutdown()
 
+    @property
+    def check_processes_pool(self) -> t.Optional["CheckProcessesPool"]:
+        """Return pool of processes which run the checks when ray is not available, None if it is disabled."""
+        if self.settings.check_processes_pool_size <= 0:
+            return
+        # A broken pool rejects any further work, so it is replaced by a new one
+        if self._check_processes_pool is not None and self._check_processes_pool.broken:
+            logger.warning({"message": "Check processes pool is broken, recreating it"})
+            self.shutdown_check_processes_pool()
+        if self._check_processes_pool is None:
+            # pylint: disable=import-outside-toplevel
+            from deepchecks_monitoring.logic.check_processes_pool import create_check_processes_pool
+            self._check_processes_pool = create_check_processes_pool(self.settings.check_processes_pool_size)
+        return self._check_processes_pool
+
+    def shutdown_check_processes_pool(self):
+        """Shutdown the check processes pool, cancelling the checks which did not start yet."""
+        if self._check_processes_pool is not None:
+            self._check_processes_pool.shutdown(wait=False, cancel_futures=True)
+            self._check_processes_pool = None
+
     @tenacity.retry(
         stop=tenacity.stop_after_attempt(3),
         wait=tenacity.wait_fixed(1),
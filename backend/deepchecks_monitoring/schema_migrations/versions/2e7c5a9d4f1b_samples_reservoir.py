@@ -0,0 +1,64 @@
+# ----------------------------------------------------------------------------
+# Copyright (C) 2021-2022 Deepchecks (https://www.deepchecks.com)
+#
+# This file is part of Deepchecks.
+# Deepchecks is distributed under the terms of the GNU Affero General
+# Public License (version 3 or later).
+# You should have received a copy of the GNU Affero General Public License
+# along with Deepchecks.  If not, see <http://www.gnu.org/licenses/>.
+# ----------------------------------------------------------------------------
+"""samples reservoir
+
+The reservoirs of the existing versions are filled from their monitor tables, with the samples of each hour
+which have the smallest ids hashes.
+
+Revision ID: 2e7c5a9d4f1b
+Revises: 9a4c2f7e1b3d
+Create Date: 2026-10-17 16:21:44.563190
+
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import text
+
+# revision identifiers, used by Alembic.
+revision = '2e7c5a9d4f1b'
+down_revision = '9a4c2f7e1b3d'
+branch_labels = None
+depends_on = None
+
+# Same as 'SAMPLES_RESERVOIR_SIZE', copied so the migration does not change with the code
+RESERVOIR_SIZE = 5000
+
+
+def upgrade() -> None:
+    models = op.get_bind().execute(text('SELECT id FROM models')).fetchall()
+    model_versions = op.get_bind().execute(text('SELECT id, model_id FROM model_versions')).fetchall()
+    for model in models:
+        op.create_table(
+            f'model_{model["id"]}_samples_reservoir',
+            sa.Column('version_id', sa.Integer()),
+            sa.Column('sample_hour', sa.DateTime(timezone=True)),
+            sa.Column('sample_hash', sa.Integer()),
+            sa.Column('_dc_sample_id', sa.Text()),
+            sa.PrimaryKeyConstraint('version_id', 'sample_hour', 'sample_hash', '_dc_sample_id'),
+        )
+
+    for version in model_versions:
+        reservoir = f'model_{version["model_id"]}_samples_reservoir'
+        monitor_table = f'model_{version["model_id"]}_monitor_data_{version["id"]}'
+        op.execute(text(
+            f'INSERT INTO {reservoir} (version_id, sample_hour, sample_hash, _dc_sample_id) '
+            f'SELECT {version["id"]}, sample_hour, sample_hash, _dc_sample_id FROM ('
+            f'SELECT date_trunc(\'hour\', _dc_time) AS sample_hour, hashtext(_dc_sample_id) AS sample_hash, '
+            f'_dc_sample_id, row_number() OVER (PARTITION BY date_trunc(\'hour\', _dc_time) '
+            f'ORDER BY hashtext(_dc_sample_id), _dc_sample_id) AS rank '
+            f'FROM {monitor_table}) AS ranked '
+            f'WHERE rank <= {RESERVOIR_SIZE}'
+        ))
+
+
+def downgrade() -> None:
+    models = op.get_bind().execute(text('SELECT id FROM models')).fetchall()
+    for model in models:
+        op.drop_table(f'model_{model["id"]}_samples_reservoir')
@@ -0,0 +1,36 @@
+# ----------------------------------------------------------------------------
+# Copyright (C) 2021-2022 Deepchecks (https://www.deepchecks.com)
+#
+# This file is part of Deepchecks.
+# Deepchecks is distributed under the terms of the GNU Affero General
+# Public License (version 3 or later).
+# You should have received a copy of the GNU Affero General Public License
+# along with Deepchecks.  If not, see <http://www.gnu.org/licenses/>.
+# ----------------------------------------------------------------------------
+"""models data retention
+
+Revision ID: 3f6a9c2e8b5d
+Revises: 8e2c7d4b9a1f
+Create Date: 2026-10-17 14:21:52.617340
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '3f6a9c2e8b5d'
+down_revision = '8e2c7d4b9a1f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('models', sa.Column('data_retention_days', sa.Integer(), nullable=True))
+    op.add_column('models', sa.Column('data_retention_last_run_time', sa.DateTime(timezone=True), nullable=True))
+    op.create_check_constraint('data_retention_days_is_positive', 'models', 'data_retention_days > 0')
+
+
+def downgrade() -> None:
+    op.drop_constraint('data_retention_days_is_positive', 'models')
+    op.drop_column('models', 'data_retention_last_run_time')
+    op.drop_column('models', 'data_retention_days')
@@ -0,0 +1,59 @@
+# ----------------------------------------------------------------------------
+# Copyright (C) 2021-2022 Deepchecks (https://www.deepchecks.com)
+#
+# This file is part of Deepchecks.
+# Deepchecks is distributed under the terms of the GNU Affero General
+# Public License (version 3 or later).
+# You should have received a copy of the GNU Affero General Public License
+# along with Deepchecks.  If not, see <http://www.gnu.org/licenses/>.
+# ----------------------------------------------------------------------------
+"""samples versions map sample hour
+
+Revision ID: 5b9e3f1a6c2d
+Revises: c4d1e8a2f7b3
+Create Date: 2026-10-17 12:55:03.418206
+
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import text
+
+# revision identifiers, used by Alembic.
+revision = '5b9e3f1a6c2d'
+down_revision = 'c4d1e8a2f7b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    model_versions = op.get_bind().execute(text('SELECT id, model_id FROM model_versions')).fetchall()
+    models = op.get_bind().execute(text('SELECT id FROM models')).fetchall()
+    for model in models:
+        versions_map = f'model_{model["id"]}_samples_versions_map'
+        op.add_column(versions_map, sa.Column('sample_hour', sa.DateTime(timezone=True)))
+
+    # Fill the hour of the already logged samples from the monitor tables
+    for version in model_versions:
+        versions_map = f'model_{version["model_id"]}_samples_versions_map'
+        monitor_table = f'model_{version["model_id"]}_monitor_data_{version["id"]}'
+        op.execute(text(
+            f'UPDATE {versions_map} SET sample_hour = date_trunc(\'hour\', {monitor_table}._dc_time) '
+            f'FROM {monitor_table} WHERE {versions_map}._dc_sample_id = {monitor_table}._dc_sample_id '
+            f'AND {versions_map}.version_id = {version["id"]}'
+        ))
+
+    for model in models:
+        versions_map = f'model_{model["id"]}_samples_versions_map'
+        op.create_index(f'{versions_map}_sample_id_covering_idx', versions_map, ['_dc_sample_id'],
+                        postgresql_include=['version_id', 'sample_hour'])
+        op.create_index(f'{versions_map}_hour_covering_idx', versions_map, ['sample_hour'],
+                        postgresql_include=['_dc_sample_id'])
+
+
+def downgrade() -> None:
+    models = op.get_bind().execute(text('SELECT id FROM models')).fetchall()
+    for model in models:
+        versions_map = f'model_{model["id"]}_samples_versions_map'
+        op.drop_index(f'{versions_map}_sample_id_covering_idx', table_name=versions_map)
+        op.drop_index(f'{versions_map}_hour_covering_idx', table_name=versions_map)
+        op.drop_column(versions_map, 'sample_hour')
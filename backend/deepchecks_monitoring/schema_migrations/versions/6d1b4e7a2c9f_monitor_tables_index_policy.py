@@ -0,0 +1,42 @@
+# ----------------------------------------------------------------------------
+# Copyright (C) 2021-2022 Deepchecks (https://www.deepchecks.com)
+#
+# This file is part of Deepchecks.
+# Deepchecks is distributed under the terms of the GNU Affero General
+# Public License (version 3 or later).
+# You should have received a copy of the GNU Affero General Public License
+# along with Deepchecks.  If not, see <http://www.gnu.org/licenses/>.
+# ----------------------------------------------------------------------------
+"""monitor tables index policy
+
+Existing versions keep a null indexed columns list, meaning every numeric and datetime column is indexed,
+as their monitor tables were created.
+
+Revision ID: 6d1b4e7a2c9f
+Revises: 3f6a9c2e8b5d
+Create Date: 2026-10-17 15:08:11.402736
+
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '6d1b4e7a2c9f'
+down_revision = '3f6a9c2e8b5d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE TYPE monitorindexmethod AS ENUM('BTREE', 'BRIN')")
+    index_method = postgresql.ENUM('BTREE', 'BRIN', name='monitorindexmethod', create_type=False)
+    op.add_column('model_versions', sa.Column('monitor_indexed_columns', sa.ARRAY(sa.String()), nullable=True))
+    op.add_column('model_versions', sa.Column('monitor_time_index_method', index_method, nullable=False,
+                                              server_default='BTREE'))
+
+
+def downgrade() -> None:
+    op.drop_column('model_versions', 'monitor_time_index_method')
+    op.drop_column('model_versions', 'monitor_indexed_columns')
+    op.execute("DROP TYPE monitorindexmethod")
@@ -0,0 +1,39 @@
+# ----------------------------------------------------------------------------
+# Copyright (C) 2021-2022 Deepchecks (https://www.deepchecks.com)
+#
+# This file is part of Deepchecks.
+# Deepchecks is distributed under the terms of the GNU Affero General
+# Public License (version 3 or later).
+# You should have received a copy of the GNU Affero General Public License
+# along with Deepchecks.  If not, see <http://www.gnu.org/licenses/>.
+# ----------------------------------------------------------------------------
+"""monitor tables partitioning
+
+Existing monitor tables are left as they are, they are converted into partitioned tables with
+the "partition-monitor-tables" cli command.
+
+Revision ID: 8e2c7d4b9a1f
+Revises: 5b9e3f1a6c2d
+Create Date: 2026-10-17 13:40:27.903154
+
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '8e2c7d4b9a1f'
+down_revision = '5b9e3f1a6c2d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    frequency = postgresql.ENUM('HOUR', 'DAY', 'WEEK', 'MONTH', name='frequency', create_type=False)
+    op.add_column('models', sa.Column('monitor_partition_interval', frequency, nullable=True))
+    op.add_column('model_versions', sa.Column('monitor_partition_interval', frequency, nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('model_versions', 'monitor_partition_interval')
+    op.drop_column('models', 'monitor_partition_interval')
@@ -0,0 +1,35 @@
+# ----------------------------------------------------------------------------
+# Copyright (C) 2021-2022 Deepchecks (https://www.deepchecks.com)
+#
+# This file is part of Deepchecks.
+# Deepchecks is distributed under the terms of the GNU Affero General
+# Public License (version 3 or later).
+# You should have received a copy of the GNU Affero General Public License
+# along with Deepchecks.  If not, see <http://www.gnu.org/licenses/>.
+# ----------------------------------------------------------------------------
+"""reference label counts
+
+The counts of existing versions are computed by their next reference upload.
+
+Revision ID: 9a4c2f7e1b3d
+Revises: 6d1b4e7a2c9f
+Create Date: 2026-10-17 15:47:30.118204
+
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '9a4c2f7e1b3d'
+down_revision = '6d1b4e7a2c9f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('model_versions', sa.Column('reference_label_counts', postgresql.JSONB(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('model_versions', 'reference_label_counts')
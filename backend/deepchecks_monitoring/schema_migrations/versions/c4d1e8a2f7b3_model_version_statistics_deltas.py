@@ -0,0 +1,44 @@
+# ----------------------------------------------------------------------------
+# Copyright (C) 2021-2022 Deepchecks (https://www.deepchecks.com)
+#
+# This file is part of Deepchecks.
+# Deepchecks is distributed under the terms of the GNU Affero General
+# Public License (version 3 or later).
+# You should have received a copy of the GNU Affero General Public License
+# along with Deepchecks.  If not, see <http://www.gnu.org/licenses/>.
+# ----------------------------------------------------------------------------
+"""model_version_statistics_deltas
+
+Revision ID: c4d1e8a2f7b3
+Revises: 99feb5aaeab6
+Create Date: 2026-10-17 10:12:41.203518
+
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'c4d1e8a2f7b3'
+down_revision = '99feb5aaeab6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('model_version_statistics_deltas',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('model_version_id', sa.Integer(), nullable=False),
+    sa.Column('statistics', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('start_time', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('end_time', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['model_version_id'], ['model_versions.id'], onupdate='RESTRICT', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_model_version_statistics_deltas_model_version_id'), 'model_version_statistics_deltas', ['model_version_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_model_version_statistics_deltas_model_version_id'), table_name='model_version_statistics_deltas')
+    op.drop_table('model_version_statistics_deltas')
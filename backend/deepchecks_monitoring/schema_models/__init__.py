@@ -24,6 +24,7 @@ from .model_memeber import ModelMember
 from .model_version import ModelVersion
 from .monitor import Monitor
 from .slack import SlackInstallation, SlackInstallationState
+from .statistics_delta import StatisticsDelta
 
 __all__ = [
     'Base',
@@ -47,4 +48,5 @@ __all__ = [
     'ModelMember',
     'DataSource',
     'DataIngestionAlertRule',
+    'StatisticsDelta',
 ]
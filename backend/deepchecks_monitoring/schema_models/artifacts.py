@@ -0,0 +1,123 @@
+# ----------------------------------------------------------------------------
+# Copyright (C) 2021-2022 Deepchecks (https://www.deepchecks.com)
+#
+# This file is part of Deepchecks.
+# Deepchecks is distributed under the terms of the GNU Affero General
+# Public License (version 3 or later).
+# You should have received a copy of the GNU Affero General Public License
+# along with Deepchecks.  If not, see <http://www.gnu.org/licenses/>.
+# ----------------------------------------------------------------------------
+"""Module defining the process-wide registry of the models and model versions derived artifacts."""
+import hashlib
+import json
+import threading
+import typing as t
+from collections import OrderedDict
+
+from sqlalchemy import Table
+
+from deepchecks_monitoring.logic.batch_validation import BatchValidator
+
+__all__ = [
+    "ArtifactsRegistry",
+    "ModelArtifacts",
+    "ModelVersionArtifacts",
+    "artifacts_registry",
+    "schema_hash",
+    "invalidate_model_artifacts",
+    "invalidate_model_version_artifacts",
+]
+
+
+TArtifacts = t.TypeVar("TArtifacts")
+
+
+class ModelVersionArtifacts(t.NamedTuple):
+    """Artifacts derived from the model version schema."""
+
+    monitor_table: Table
+    reference_table: Table
+    monitor_validator: t.Optional[BatchValidator]
+    reference_validator: t.Optional[BatchValidator]
+    optional_fields: t.List[str]
+    datetime_columns: t.List[str]
+    samples_reservoir_table: Table
+
+
+class ModelArtifacts(t.NamedTuple):
+    """Artifacts derived from the model schema."""
+
+    sample_labels_table: Table
+    samples_versions_map_table: Table
+    samples_reservoir_table: Table
+    sample_labels_validator: BatchValidator
+
+
+def schema_hash(*schemas: t.Any) -> str:
+    """Return a stable hash of the given json serializable schemas."""
+    return hashlib.md5(json.dumps(schemas, sort_keys=True).encode()).hexdigest()
+
+
+class ArtifactsRegistry:
+    """Bounded LRU registry of artifacts, keyed by (kind, entity id, schema hash).
+
+    Entity ids are unique only within an organization schema, the schema hash makes sure
+    that entities of different organizations never share artifacts which differ.
+
+    Parameters
+    ----------
+    max_size : int
+        maximal number of artifacts to hold, least recently used artifacts are removed first
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._items: "OrderedDict[t.Tuple[str, int, str], t.Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_create(
+            self,
+            kind: str,
+            entity_id: int,
+            entity_schema_hash: str,
+            factory: t.Callable[[], TArtifacts]
+    ) -> TArtifacts:
+        """Return the artifacts of the given key, creating them with the factory if missing."""
+        key = (kind, entity_id, entity_schema_hash)
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return self._items[key]
+        artifacts = factory()
+        with self._lock:
+            self._items[key] = artifacts
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+        return artifacts
+
+    def invalidate(self, kind: str, entity_id: int):
+        """Remove all the artifacts of the given entity."""
+        with self._lock:
+            for key in [key for key in self._items if key[0] == kind and key[1] == entity_id]:
+                del self._items[key]
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+
+artifacts_registry = ArtifactsRegistry()
+
+
+def invalidate_model_version_artifacts(model_version_id: int):
+    """Remove the cached artifacts of a model version, must be called when the version is updated or deleted."""
+    artifacts_registry.invalidate("model-version", model_version_id)
+
+
+def invalidate_model_artifacts(model_id: int):
+    """Remove the cached artifacts of a model, must be called when the model is updated or deleted."""
+    artifacts_registry.invalidate("model", model_id)
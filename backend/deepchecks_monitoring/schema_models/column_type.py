@@ -19,7 +19,7 @@ __all__ = [
     "SAMPLE_ID_COL", "SAMPLE_TS_COL",
     "SAMPLE_LABEL_COL", "SAMPLE_PRED_PROBA_COL",
     "SAMPLE_PRED_COL", "SAMPLE_LOGGED_TIME_COL",
-    "REFERENCE_SAMPLE_ID_COL", "ColumnType",
+    "REFERENCE_SAMPLE_ID_COL", "ColumnType", "MonitorIndexMethod",
     "get_predictions_columns_by_type", "column_types_to_table_columns",
     "get_label_column_type"
 ]
@@ -103,6 +103,15 @@ class ColumnType(str, enum.Enum):
         return types_map[self]
 
 
+class MonitorIndexMethod(str, enum.Enum):
+    """Enum containing the possible index methods of the sample timestamp column of the monitor tables."""
+
+    BTREE = "btree"
+    # Block range index, a few pages in size. Fits the timestamp column since samples are mostly logged in time
+    # order, and is cheaper to maintain on inserts than a btree index
+    BRIN = "brin"
+
+
 def get_predictions_columns_by_type(task_type: "TaskType", have_classes: bool) \
         -> t.Tuple[t.Dict[str, ColumnType], t.List]:
     """Get deepchecks' saved columns to be used in json schema based on given task type.
@@ -154,16 +163,21 @@ def get_label_column_type(task_type: "TaskType") -> ColumnType:
         raise Exception(f"Not supported task type {task_type}")
 
 
-def column_types_to_table_columns(column_types: t.Dict[str, ColumnType], primary_key=SAMPLE_ID_COL) \
-        -> t.List[sa.Column]:
+def column_types_to_table_columns(
+        column_types: t.Dict[str, ColumnType],
+        primary_key=SAMPLE_ID_COL,
+        indexed_columns: t.Optional[t.Collection[str]] = None
+) -> t.List[sa.Column]:
     """Get sqlalchemy columns from columns types sent from the user (out of ColumnDataType).
 
-    All columns also have index defined on them for faster querying
+    By default all the numeric and datetime columns have index defined on them for faster querying
 
     Parameters
     ----------
     column_types
     primary_key
+    indexed_columns
+        Names of the columns to define index on, instead of the numeric and datetime columns
 
     Returns
     -------
@@ -173,7 +187,7 @@ def column_types_to_table_columns(column_types: t.Dict[str, ColumnType], primary
         sa.Column(
             name,
             data_type.to_sqlalchemy_type(),
-            index=data_type.is_indexed(),
+            index=data_type.is_indexed() if indexed_columns is None else name in indexed_columns,
             primary_key=(name == primary_key)
         )
         for name, data_type in column_types.items()
@@ -19,13 +19,16 @@ from sqlalchemy import MetaData, PrimaryKeyConstraint, Table, func, update
 from sqlalchemy.ext.asyncio import AsyncSession, async_object_session
 from sqlalchemy.orm import Mapped, Query, relationship
 
+from deepchecks_monitoring.logic.batch_validation import BatchValidator
 from deepchecks_monitoring.monitoring_utils import MetadataMixin
+from deepchecks_monitoring.schema_models.artifacts import ModelArtifacts, artifacts_registry, schema_hash
 from deepchecks_monitoring.schema_models.base import Base
 from deepchecks_monitoring.schema_models.column_type import (SAMPLE_ID_COL, SAMPLE_LABEL_COL, SAMPLE_PRED_COL,
                                                              ColumnType, column_types_to_table_columns,
                                                              get_label_column_type)
 from deepchecks_monitoring.schema_models.permission_mixin import PermissionMixin
 from deepchecks_monitoring.schema_models.task_type import TaskType
+from deepchecks_monitoring.utils.alerts import Frequency
 
 if t.TYPE_CHECKING:
     # pylint: disable=unused-import
@@ -36,7 +39,34 @@ if t.TYPE_CHECKING:
     from deepchecks_monitoring.schema_models.model_version import ModelVersion
 
 
-__all__ = ["Model", "ModelNote"]
+__all__ = ["Model", "ModelNote", "SAMPLES_MAP_HOUR_COL", "SAMPLES_RESERVOIR_HASH_COL", "SAMPLES_RESERVOIR_SIZE",
+           "build_samples_reservoir_table"]
+
+# Column of the samples versions map holding the hour bucket of the sample timestamp
+SAMPLES_MAP_HOUR_COL = "sample_hour"
+# Column of the samples reservoir holding the hash of the sample id, the samples of a window are ordered by it
+SAMPLES_RESERVOIR_HASH_COL = "sample_hash"
+# Number of samples kept in the reservoir per version and hour, windows of up to this number of samples
+# can be read from the reservoir
+SAMPLES_RESERVOIR_SIZE = 5000
+
+
+def build_samples_reservoir_table(model_id: int) -> Table:
+    """Build table object of the samples reservoir of the model.
+
+    The reservoir holds, per version and hour, the samples with the smallest ids hashes, which are the samples
+    selected from the hour by the checks. The primary key orders the samples of each version and hour by their
+    hash, for index only scans of the windows reads and of the trimming of the hours to the reservoir size.
+    """
+    return Table(
+        f"model_{model_id}_samples_reservoir",
+        MetaData(),
+        sa.Column("version_id", sa.Integer),
+        sa.Column(SAMPLES_MAP_HOUR_COL, sa.DateTime(timezone=True)),
+        sa.Column(SAMPLES_RESERVOIR_HASH_COL, sa.Integer),
+        sa.Column(SAMPLE_ID_COL, sa.Text),
+        PrimaryKeyConstraint("version_id", SAMPLES_MAP_HOUR_COL, SAMPLES_RESERVOIR_HASH_COL, SAMPLE_ID_COL),
+    )
 
 
 class Model(Base, MetadataMixin, PermissionMixin):
@@ -52,6 +82,10 @@ class Model(Base, MetadataMixin, PermissionMixin):
             "alerts_delay_seconds >= 0",
             name="alerts_delay_seconds_is_positive"
         ),
+        sa.CheckConstraint(
+            "data_retention_days > 0",
+            name="data_retention_days_is_positive"
+        ),
     )
 
     id = sa.Column(sa.Integer, primary_key=True)
@@ -74,6 +108,11 @@ class Model(Base, MetadataMixin, PermissionMixin):
     obj_store_last_scan_time = sa.Column(sa.DateTime(timezone=True), nullable=True)
     obj_store_path = sa.Column(sa.String, nullable=True)
     latest_labels_file_time = sa.Column(sa.DateTime(timezone=True), nullable=True)
+    # Interval of the time range partitions of the monitor tables of new versions, None for not partitioned tables
+    monitor_partition_interval = sa.Column(sa.Enum(Frequency), nullable=True)
+    # Samples older than the retention period are removed, None to keep the data forever
+    data_retention_days = sa.Column(sa.Integer, nullable=True)
+    data_retention_last_run_time = sa.Column(sa.DateTime(timezone=True), nullable=True)
 
     members: Mapped[t.List["ModelMember"]] = relationship(
         "ModelMember",
@@ -150,11 +189,55 @@ class Model(Base, MetadataMixin, PermissionMixin):
         """Get table name of the sample labels table."""
         return f"model_{self.id}_sample_labels"
 
-    def get_sample_labels_table(self, connection=None) -> Table:
-        """Get table object of the sample labels table."""
-        metadata = MetaData(bind=connection)
-        columns_sqlalchemy = column_types_to_table_columns(self.get_sample_labels_columns())
-        return Table(self.get_sample_labels_table_name(), metadata, *columns_sqlalchemy)
+    @property
+    def artifacts(self) -> ModelArtifacts:
+        """Artifacts derived from the model schema, shared by all the instances of the same model."""
+        return artifacts_registry.get_or_create("model", self.id, schema_hash(self.task_type), self._create_artifacts)
+
+    def _create_artifacts(self) -> ModelArtifacts:
+        labels_columns = self.get_sample_labels_columns()
+        labels_json_schema = {
+            "type": "object",
+            "properties": {
+                name: data_type.to_json_schema_type(nullable=name != SAMPLE_ID_COL)
+                for name, data_type in labels_columns.items()
+            },
+            "required": list(labels_columns.keys()),
+            "additionalProperties": False
+        }
+        samples_versions_map_name = self.get_samples_versions_map_table_name()
+        samples_versions_map_table = Table(
+            samples_versions_map_name,
+            MetaData(),
+            sa.Column(SAMPLE_ID_COL, sa.Text),
+            sa.Column("version_id", sa.Integer),
+            sa.Column(SAMPLES_MAP_HOUR_COL, sa.DateTime(timezone=True)),
+            PrimaryKeyConstraint(SAMPLE_ID_COL, "version_id"),
+            # Covering indexes, labels ingestion resolves the versions and hours of the labeled samples, and the
+            # ingestion counts scan a time range, with index only scans
+            sa.Index(f"{samples_versions_map_name}_sample_id_covering_idx", SAMPLE_ID_COL,
+                     postgresql_include=["version_id", SAMPLES_MAP_HOUR_COL]),
+            sa.Index(f"{samples_versions_map_name}_hour_covering_idx", SAMPLES_MAP_HOUR_COL,
+                     postgresql_include=[SAMPLE_ID_COL])
+        )
+        return ModelArtifacts(
+            sample_labels_table=Table(self.get_sample_labels_table_name(), MetaData(),
+                                      *column_types_to_table_columns(labels_columns)),
+            samples_versions_map_table=samples_versions_map_table,
+            samples_reservoir_table=build_samples_reservoir_table(self.id),
+            sample_labels_validator=BatchValidator(labels_json_schema)
+        )
+
+    def get_sample_labels_table(self, connection=None) -> Table:  # pylint: disable=unused-argument
+        """Get table object of the sample labels table.
+
+        The table object is shared by all the instances of the model, and must not be modified.
+        """
+        return self.artifacts.sample_labels_table
+
+    def get_sample_labels_validator(self) -> BatchValidator:
+        """Get the batch validator of the sample labels."""
+        return self.artifacts.sample_labels_validator
 
     def get_sample_labels_columns(self):
         return {
@@ -166,13 +249,23 @@ class Model(Base, MetadataMixin, PermissionMixin):
         """Get table name of the versions mapping table."""
         return f"model_{self.id}_samples_versions_map"
 
-    def get_samples_versions_map_table(self, connection=None) -> Table:
-        """Get table object of the versions mapping table."""
-        metadata = MetaData(bind=connection)
-        columns = (sa.Column(SAMPLE_ID_COL, sa.Text),
-                   sa.Column("version_id", sa.Integer))
-        pk_constraint = PrimaryKeyConstraint(SAMPLE_ID_COL, "version_id")
-        return Table(self.get_samples_versions_map_table_name(), metadata, *columns, pk_constraint)
+    def get_samples_versions_map_table(self, connection=None) -> Table:  # pylint: disable=unused-argument
+        """Get table object of the versions mapping table.
+
+        The table object is shared by all the instances of the model, and must not be modified.
+        """
+        return self.artifacts.samples_versions_map_table
+
+    def get_samples_reservoir_table_name(self):
+        """Get table name of the samples reservoir table."""
+        return self.get_samples_reservoir_table().name
+
+    def get_samples_reservoir_table(self, connection=None) -> Table:  # pylint: disable=unused-argument
+        """Get table object of the samples reservoir table.
+
+        The table object is shared by all the instances of the model, and must not be modified.
+        """
+        return self.artifacts.samples_reservoir_table
 
     def filter_labels_exist(self, query: Query, data_table, filter_not_null=True) -> Query:
         """Filter query to include only samples that have labels."""
@@ -23,18 +23,30 @@ from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.asyncio import async_object_session
 from sqlalchemy.orm import Mapped, relationship
 
+from deepchecks_monitoring.logic.batch_validation import BatchValidator
 from deepchecks_monitoring.monitoring_utils import DataFilterList, MetadataMixin
+from deepchecks_monitoring.schema_models.artifacts import ModelVersionArtifacts, artifacts_registry, schema_hash
 from deepchecks_monitoring.schema_models.base import Base
-from deepchecks_monitoring.schema_models.column_type import ColumnType, column_types_to_table_columns
+from deepchecks_monitoring.schema_models.column_type import (ColumnType, MonitorIndexMethod,
+                                                             column_types_to_table_columns)
+from deepchecks_monitoring.schema_models.model import build_samples_reservoir_table
 from deepchecks_monitoring.schema_models.permission_mixin import PermissionMixin
+from deepchecks_monitoring.schema_models.statistics_delta import StatisticsDelta
+from deepchecks_monitoring.utils.alerts import Frequency
 
 if t.TYPE_CHECKING:
     from deepchecks_monitoring.schema_models import Model  # pylint: disable=unused-import
     from deepchecks_monitoring.schema_models.ingestion_errors import IngestionError  # pylint: disable=unused-import
 
-__all__ = ["ModelVersion", "ColumnMetadata", "update_statistics_from_sample", "get_monitor_table_name"]
+__all__ = ["ModelVersion", "ModelVersionState", "ColumnMetadata", "update_statistics_from_sample",
+           "statistics_from_batch", "get_monitor_table_name"]
 
 CATEGORICAL_STATISTICS_VALUES_LIMIT = 200
+# Attributes from which the version artifacts are derived
+ARTIFACTS_SCHEMA_ATTRIBUTES = (
+    "model_id", "features_columns", "additional_data_columns", "model_columns", "meta_columns",
+    "private_columns", "private_reference_columns", "monitor_json_schema", "reference_json_schema"
+)
 
 
 class ColumnStatistics(BaseModel):
@@ -52,6 +64,15 @@ class ColumnMetadata(BaseModel):
     stats: ColumnStatistics
 
 
+class ModelVersionState(t.NamedTuple):
+    """Statistics and timestamps of a model version, including the statistics deltas which were not folded yet."""
+
+    statistics: t.Dict[str, t.Any]
+    start_time: datetime
+    end_time: datetime
+    last_update_time: datetime
+
+
 class ModelVersion(Base, MetadataMixin, PermissionMixin):
     """ORM model for the model version."""
 
@@ -91,6 +112,15 @@ class ModelVersion(Base, MetadataMixin, PermissionMixin):
     # Indicates the total offset in the topic. The lag of messages is `topic_end_offset - ingestion_offset`
     topic_end_offset = Column(BigInteger, default=-1)
     balance_classes = Column(Boolean, nullable=False, default=False)
+    # Number of reference samples of each label, None until counted by the first reference upload
+    reference_label_counts = Column(JSONB, nullable=True)
+    # Interval of the time range partitions of the monitor table, None if the table is not partitioned
+    monitor_partition_interval = Column(sa.Enum(Frequency), nullable=True)
+    # Columns of the monitor table which have a btree index, None for versions created before the index policy,
+    # in which every numeric and datetime column has an index
+    monitor_indexed_columns = Column(ARRAY(String), nullable=True)
+    monitor_time_index_method = Column(sa.Enum(MonitorIndexMethod), nullable=False, default=MonitorIndexMethod.BTREE,
+                                       server_default=MonitorIndexMethod.BTREE.name)
 
     # For object storage ingestion
     latest_file_time = Column(DateTime(timezone=True), nullable=True)
@@ -113,15 +143,70 @@ class ModelVersion(Base, MetadataMixin, PermissionMixin):
         passive_updates=True,
     )
 
-    _optional_fields: t.List[str] = None
+    @property
+    def artifacts(self) -> ModelVersionArtifacts:
+        """Artifacts derived from the version schema, shared by all the instances of the same version.
+
+        The schema hash is memoized on the instance, and is reset whenever one of the schema attributes is set
+        or the instance is refreshed.
+        """
+        entity_schema_hash = self.__dict__.get("_artifacts_schema_hash")
+        if entity_schema_hash is None:
+            entity_schema_hash = schema_hash(*(getattr(self, name) for name in ARTIFACTS_SCHEMA_ATTRIBUTES))
+            self.__dict__["_artifacts_schema_hash"] = entity_schema_hash
+        return artifacts_registry.get_or_create("model-version", self.id, entity_schema_hash, self._create_artifacts)
+
+    def _create_artifacts(self) -> ModelVersionArtifacts:
+        # Private columns have defaults which are set only on insert
+        monitor_columns = {**self.features_columns, **self.additional_data_columns, **self.model_columns,
+                           **self.meta_columns, **(self.private_columns or {})}
+        reference_columns = {**self.features_columns, **self.additional_data_columns, **self.model_columns,
+                             **(self.private_reference_columns or {})}
+        monitor_table = Table(
+            self.get_monitor_table_name(),
+            MetaData(),
+            *column_types_to_table_columns({name: ColumnType(it) for name, it in monitor_columns.items()})
+        )
+        reference_table = Table(
+            self.get_reference_table_name(),
+            MetaData(),
+            *column_types_to_table_columns({name: ColumnType(it) for name, it in reference_columns.items()})
+        )
+        return ModelVersionArtifacts(
+            monitor_table=monitor_table,
+            reference_table=reference_table,
+            monitor_validator=BatchValidator(self.monitor_json_schema) if self.monitor_json_schema else None,
+            reference_validator=BatchValidator(self.reference_json_schema) if self.reference_json_schema else None,
+            optional_fields=list(set((self.monitor_json_schema or {}).get("properties", {}).keys()) -
+                                 set((self.monitor_json_schema or {}).get("required", []))),
+            datetime_columns=[name for name, it in monitor_columns.items() if it == ColumnType.DATETIME],
+            samples_reservoir_table=build_samples_reservoir_table(self.model_id)
+        )
 
     @property
     def optional_fields(self) -> t.List[str]:
         """Fields of monitor schema with are optional."""
-        if self._optional_fields is None:
-            self._optional_fields = list(set(self.monitor_json_schema["properties"].keys()) -
-                                         set(self.monitor_json_schema["required"]))
-        return self._optional_fields
+        return self.artifacts.optional_fields
+
+    @property
+    def datetime_columns(self) -> t.List[str]:
+        """Columns of the monitor table of datetime type."""
+        return self.artifacts.datetime_columns
+
+    def get_samples_reservoir_table(self) -> Table:
+        """Get table object of the samples reservoir of the model, which does not require loading the model.
+
+        The table object is shared by all the instances of the version, and must not be modified.
+        """
+        return self.artifacts.samples_reservoir_table
+
+    def get_monitor_validator(self) -> BatchValidator:
+        """Get the batch validator of the monitor schema."""
+        return self.artifacts.monitor_validator
+
+    def get_reference_validator(self) -> BatchValidator:
+        """Get the batch validator of the reference schema."""
+        return self.artifacts.reference_validator
 
     @classmethod
     async def has_object_permissions(cls, session, obj_id, user):
@@ -139,14 +224,12 @@ class ModelVersion(Base, MetadataMixin, PermissionMixin):
         """Get name of monitor table."""
         return get_monitor_table_name(self.model_id, self.id)
 
-    def get_monitor_table(self, connection=None) -> Table:
-        """Get table object of the monitor table."""
-        metadata = MetaData(bind=connection)
-        columns = {**self.features_columns, **self.additional_data_columns, **self.model_columns, **self.meta_columns,
-                   **self.private_columns}
-        columns = {name: ColumnType(col_type) for name, col_type in columns.items()}
-        columns_sqlalchemy = column_types_to_table_columns(columns)
-        return Table(self.get_monitor_table_name(), metadata, *columns_sqlalchemy)
+    def get_monitor_table(self) -> Table:
+        """Get table object of the monitor table.
+
+        The table object is shared by all the instances of the version, and must not be modified.
+        """
+        return self.artifacts.monitor_table
 
     def get_reference_table_name(self) -> str:
         """Get name of reference table."""
@@ -161,18 +244,12 @@ class ModelVersion(Base, MetadataMixin, PermissionMixin):
             return [feat[0] for feat in most_important_features], pd.Series(dict(most_important_features))
         return list(sorted(self.features_columns.keys()))[:n_top], None
 
-    def get_reference_table(self, connection=None) -> Table:
-        """Get table object of the reference table."""
-        metadata = MetaData(bind=connection)
-        columns_in_ref = {
-            **self.features_columns,
-            **self.additional_data_columns,
-            **self.model_columns,
-            **self.private_reference_columns
-        }
-        columns = {name: ColumnType(col_type) for name, col_type in columns_in_ref.items()}
-        columns_sqlalchemy = column_types_to_table_columns(columns)
-        return Table(self.get_reference_table_name(), metadata, *columns_sqlalchemy)
+    def get_reference_table(self) -> Table:
+        """Get table object of the reference table.
+
+        The table object is shared by all the instances of the version, and must not be modified.
+        """
+        return self.artifacts.reference_table
 
     async def update_timestamps(self, min_timestamp: datetime, max_timestamp: datetime):
         """Update start and end date if needed based on given timestamps."""
@@ -187,19 +264,25 @@ class ModelVersion(Base, MetadataMixin, PermissionMixin):
                                                      .where(ModelVersion.id == self.id)
                                                      .values(updates))
 
-    async def update_statistics(self, new_statistics: dict):
-        """Update the statistics with a lock on the row."""
-        # Locking the row before updating to prevent race condition, since we are updating json column.
-        # after a commit the row will be unlocked
-        locked_model_version_query = (await async_object_session(self)
-                                      .execute(select(ModelVersion)
-                                               .filter(ModelVersion.id == self.id)
-                                               .with_for_update()))
-        locked_model_version = locked_model_version_query.scalar()
-        # Statistics might have changed by another concurrent insert, so unify the latest statistics from the db
-        # with the updated statistics
-        # NOTE: in order to update json column with ORM the `unify_statistics` must return a new dict instance
-        locked_model_version.statistics = unify_statistics(locked_model_version.statistics, new_statistics)
+    async def get_state_with_pending_deltas(self) -> "ModelVersionState":
+        """Return the statistics and timestamps merged with the statistics deltas which were not folded yet.
+
+        Statistics unification is idempotent, so a delta which was folded concurrently is not counted twice.
+        """
+        pending = (await async_object_session(self).execute(
+            select(StatisticsDelta.statistics, StatisticsDelta.start_time, StatisticsDelta.end_time,
+                   StatisticsDelta.created_at)
+            .where(StatisticsDelta.model_version_id == self.id)
+        )).all()
+        statistics = self.statistics
+        for delta in pending:
+            statistics = unify_statistics(statistics, delta.statistics)
+        return ModelVersionState(
+            statistics=statistics,
+            start_time=min([self.start_time, *(it.start_time for it in pending if it.start_time is not None)]),
+            end_time=max([self.end_time, *(it.end_time for it in pending if it.end_time is not None)]),
+            last_update_time=max([self.last_update_time, *(it.created_at for it in pending)])
+        )
 
     def fill_optional_fields(self, sample: dict):
         """Add to given sample all the optional fields which are missing, with value of None. Used to enable multi \
@@ -251,26 +334,72 @@ def update_statistics_from_sample(statistics: dict, sample: dict):
             _add_col_value(stats_info["values"], col_value)
 
 
+def _to_statistics_value(value):
+    if isinstance(value, datetime):
+        return value.timestamp()
+    # Numpy scalars are converted to python values in order to be json serializable
+    return value.item() if hasattr(value, "item") else value
+
+
+def statistics_from_batch(statistics: dict, samples: pd.DataFrame) -> dict:
+    """Compute the statistics of a batch of samples, column by column, in the structure of the given statistics.
+
+    The result is meant to be merged into the existing statistics with `unify_statistics`.
+    """
+    batch_statistics = {}
+    for col, stats_info in statistics.items():
+        col_stats = {key: None for key in ("min", "max") if key in stats_info}
+        if "values" in stats_info:
+            col_stats["values"] = []
+        batch_statistics[col] = col_stats
+        if col not in samples.columns:
+            continue
+        col_values = samples[col].dropna()
+        if col_values.empty:
+            continue
+        if "min" in col_stats:
+            col_stats["min"] = _to_statistics_value(col_values.min())
+        if "max" in col_stats:
+            col_stats["max"] = _to_statistics_value(col_values.max())
+        if "values" in col_stats:
+            unique_values = pd.unique(col_values.to_numpy())[:CATEGORICAL_STATISTICS_VALUES_LIMIT]
+            col_stats["values"] = [_to_statistics_value(it) for it in unique_values]
+    return batch_statistics
+
+
 def unify_statistics(original_statistics: dict, added_statistics: dict):
     cols = set(original_statistics.keys()).union(added_statistics.keys())
     unified_dict = defaultdict(dict)
     for col in cols:
-        col_stats = [original_statistics[col], added_statistics[col]]
+        # Statistics deltas may contain only part of the columns (e.g. labels deltas)
+        col_stats = [original_statistics.get(col, {}), added_statistics.get(col, {})]
         if any(("max" in v for v in col_stats)):
-            max_values = [v["max"] for v in col_stats if v["max"] is not None]
+            max_values = [v["max"] for v in col_stats if v.get("max") is not None]
             unified_dict[col]["max"] = max(max_values) if max_values else None
         if any(("min" in v for v in col_stats)):
-            min_values = [v["min"] for v in col_stats if v["min"] is not None]
+            min_values = [v["min"] for v in col_stats if v.get("min") is not None]
             unified_dict[col]["min"] = min(min_values) if min_values else None
         if any(("values" in v for v in col_stats)):
-            if len(original_statistics[col]["values"]) < CATEGORICAL_STATISTICS_VALUES_LIMIT:
-                values = list(set(chain(*(v["values"] for v in col_stats))))[:CATEGORICAL_STATISTICS_VALUES_LIMIT]
+            if len(col_stats[0].get("values", [])) < CATEGORICAL_STATISTICS_VALUES_LIMIT:
+                values = list(set(chain(*(v.get("values", []) for v in col_stats))))
+                values = values[:CATEGORICAL_STATISTICS_VALUES_LIMIT]
             else:
-                values = original_statistics[col]["values"]
+                values = col_stats[0]["values"]
             unified_dict[col]["values"] = values
     return unified_dict
 
 
+def _reset_artifacts_schema_hash(target: ModelVersion, *args):  # pylint: disable=unused-argument
+    target.__dict__.pop("_artifacts_schema_hash", None)
+
+
+# The json columns are not mutation tracked, so the schema attributes change only by being set or loaded
+for _attribute in ARTIFACTS_SCHEMA_ATTRIBUTES:
+    sa.event.listen(getattr(ModelVersion, _attribute), "set", _reset_artifacts_schema_hash)
+sa.event.listen(ModelVersion, "refresh", _reset_artifacts_schema_hash)
+sa.event.listen(ModelVersion, "expire", _reset_artifacts_schema_hash)
+
+
 def get_monitor_table_name(model_id, model_version_id):
     return f"model_{model_id}_monitor_data_{model_version_id}"
 
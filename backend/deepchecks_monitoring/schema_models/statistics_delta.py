@@ -0,0 +1,38 @@
+# ----------------------------------------------------------------------------
+# Copyright (C) 2021-2022 Deepchecks (https://www.deepchecks.com)
+#
+# This file is part of Deepchecks.
+# Deepchecks is distributed under the terms of the GNU Affero General
+# Public License (version 3 or later).
+# You should have received a copy of the GNU Affero General Public License
+# along with Deepchecks.  If not, see <http://www.gnu.org/licenses/>.
+# ----------------------------------------------------------------------------
+"""Module defining the model version statistics delta ORM model."""
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+from deepchecks_monitoring.schema_models.base import Base
+
+__all__ = ["StatisticsDelta"]
+
+
+class StatisticsDelta(Base):
+    """ORM model for statistics and timestamps of an ingested batch, not yet folded into its model version.
+
+    Ingestion only appends rows to this table instead of updating the model version row, the rows are
+    later folded into the model version (and its model) by a background worker.
+    """
+
+    __tablename__ = "model_version_statistics_deltas"
+
+    id = sa.Column(sa.BigInteger, primary_key=True)
+    model_version_id = sa.Column(
+        sa.Integer,
+        sa.ForeignKey("model_versions.id", ondelete="CASCADE", onupdate="RESTRICT"),
+        nullable=False,
+        index=True
+    )
+    statistics = sa.Column(JSONB, nullable=False)
+    start_time = sa.Column(sa.DateTime(timezone=True), nullable=True)
+    end_time = sa.Column(sa.DateTime(timezone=True), nullable=True)
+    created_at = sa.Column(sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now())
@@ -16,7 +16,7 @@ from sqlalchemy.schema import CreateSchema, DDLElement
 from deepchecks_monitoring.monitoring_utils import configure_logger
 
 __all__ = ["SchemaBuilder", "attach_schema_switcher_listener", "attach_schema_switcher",
-           "sqlalchemy_exception_to_asyncpg_exception"]
+           "sqlalchemy_exception_to_asyncpg_exception", "get_asyncpg_connection", "copy_records_to_table"]
 
 
 class SessionParameter(DDLElement):
@@ -215,3 +215,45 @@ def sqlalchemy_exception_to_asyncpg_exception(exception: sa.exc.SQLAlchemyError)
         code = exception.orig.pgcode
         return asyncpg.exceptions.PostgresError.get_message_class_for_sqlstate(code)()
     return exception
+
+
+async def get_asyncpg_connection(session: AsyncSession) -> asyncpg.Connection:
+    """Return the asyncpg connection that is used by the session's current transaction.
+
+    NOTE:
+    the asyncpg dialect begins the driver transaction lazily, on the first executed
+    statement, therefore a caller must execute at least one statement with the session
+    before using the returned connection, otherwise the work will not be a part of
+    the session transaction.
+    """
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    return raw_connection.driver_connection
+
+
+async def copy_records_to_table(
+        session: AsyncSession,
+        table: sa.Table,
+        records: t.Iterable[t.Sequence[t.Any]],
+        columns: t.Optional[t.Sequence[str]] = None
+):
+    """Stream records into a table with the postgres binary COPY protocol.
+
+    Parameters
+    ----------
+    session : AsyncSession
+        session within which transaction the records will be copied
+    table : sa.Table
+        target table
+    records : Iterable[Sequence[Any]]
+        rows to copy, values order must match the columns order
+    columns : Optional[Sequence[str]], default None
+        names of the columns to copy, by default all the table columns
+    """
+    driver_connection = await get_asyncpg_connection(session)
+    await driver_connection.copy_records_to_table(
+        table.name,
+        records=records,
+        columns=list(columns or (c.name for c in table.columns)),
+        schema_name=table.schema
+    )
@@ -2,16 +2,14 @@
 import typing as t
 from ssl import SSLContext
 
-import pendulum as pdl
 from aiokafka import __version__ as aiokafka_version
 from aiokafka.admin import AIOKafkaAdminClient
 from aiokafka.client import AIOKafkaClient
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 
 from deepchecks_monitoring.public_models import Organization, User, UserOAuthDTO
-from deepchecks_monitoring.schema_models.model_version import ModelVersion
 
-__all__ = ['generate_random_user', 'generate_test_user', 'datetime_sample_formatter']
+__all__ = ['generate_random_user', 'generate_test_user']
 
 
 class ExtendedAIOKafkaAdminClient(AIOKafkaAdminClient):  # pylint: disable=missing-class-docstring
@@ -99,12 +97,3 @@ async def generate_test_user(session: AsyncSession, auth_jwt_secret: str, with_o
     await session.commit()
     await session.refresh(u)
     return u
-
-
-def datetime_sample_formatter(sample: t.Dict, model_version: ModelVersion):
-    model_columns = model_version.monitor_json_schema['properties']
-    for col_name, val in sample.items():
-        if val is None or col_name not in model_columns:
-            continue
-        if model_columns[col_name].get('format') == 'date-time':
-            sample[col_name] = pdl.parse(val)
@@ -9,16 +9,18 @@
 # ----------------------------------------------------------------------------
 import typing as t
 
+import orjson
 import pendulum as pdl
+import pyarrow as pa
 import pytest
 from deepdiff import DeepDiff
 from fastapi.testclient import TestClient
-from sqlalchemy import func, select
+from sqlalchemy import func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from deepchecks_monitoring.config import Settings
 from deepchecks_monitoring.public_models import User
-from deepchecks_monitoring.schema_models import IngestionError, ModelVersion
+from deepchecks_monitoring.schema_models import IngestionError, Model, ModelVersion, TaskType
 from tests.common import Payload, TestAPI, generate_user
 from tests.conftest import ROWS_PER_MINUTE_LIMIT
 
@@ -48,6 +50,127 @@ async def test_log_data(
     await assert_ingestion_errors_count(0, async_session)
 
 
+@pytest.mark.asyncio
+async def test_log_data_stream(
+    client: TestClient,
+    classification_model_version: Payload,
+    async_session: AsyncSession
+):
+    # Arrange
+    samples = [{
+        "_dc_sample_id": str(i),
+        "_dc_time": pdl.datetime(2020, 1, 1, 0, 0, 0).isoformat(),
+        "_dc_prediction_probabilities": [0.1, 0.3, 0.6],
+        "_dc_prediction": "2",
+        "a": 11.1,
+        "b": "ppppp",
+    } for i in range(3)]
+    lines = [orjson.dumps(samples[0]), b"{not json", orjson.dumps(samples[1]), orjson.dumps(samples[2])]
+
+    # Act
+    response = client.post(
+        f"/api/v1/model-versions/{classification_model_version['id']}/data/stream",
+        content=(line + b"\n" for line in lines),
+        headers={"content-type": "application/x-ndjson"}
+    )
+
+    # Assert
+    assert response.status_code == 200
+    report = response.json()
+    assert report["num_received"] == 3
+    assert report["num_saved"] == 3
+    assert report["num_decoding_errors"] == 1
+    assert report["decoding_errors"][0]["sample"] == 2
+    assert report["rate_limited"] is False
+    await assert_ingestion_errors_count(0, async_session)
+
+
+def _arrow_stream(table: pa.Table) -> bytes:
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _classification_arrow_table(a: pa.Array) -> pa.Table:
+    n_rows = len(a)
+    return pa.table({
+        "_dc_sample_id": [str(i) for i in range(n_rows)],
+        "_dc_time": pa.array([pdl.datetime(2020, 1, 1)] * n_rows, type=pa.timestamp("us", tz="UTC")),
+        "_dc_prediction_probabilities": [[0.1, 0.3, 0.6]] * n_rows,
+        "_dc_prediction": ["2"] * n_rows,
+        "a": a,
+        "b": ["ppppp"] * n_rows,
+    })
+
+
+@pytest.mark.asyncio
+async def test_log_columnar_data(
+    client: TestClient,
+    classification_model_version: Payload,
+    async_session: AsyncSession
+):
+    # Arrange
+    table = _classification_arrow_table(pa.array([11.1, 12.2, 13.3]))
+
+    # Act
+    response = client.post(
+        f"/api/v1/model-versions/{classification_model_version['id']}/data/columnar",
+        content=_arrow_stream(table),
+        headers={"content-type": "application/vnd.apache.arrow.stream"}
+    )
+
+    # Assert
+    assert response.status_code == 200
+    await assert_ingestion_errors_count(0, async_session)
+    model_version = await async_session.get(ModelVersion, classification_model_version["id"])
+    monitor_table = model_version.get_monitor_table()
+    count = await async_session.scalar(select(func.count()).select_from(monitor_table))
+    assert count == 3
+
+
+@pytest.mark.asyncio
+async def test_log_columnar_data_with_inexact_integer(
+    client: TestClient,
+    classification_model_version: Payload,
+    async_session: AsyncSession
+):
+    # Arrange, the second value can't be stored exactly in the numeric column
+    table = _classification_arrow_table(pa.array([1, 2 ** 53 + 1], type=pa.int64()))
+
+    # Act
+    response = client.post(
+        f"/api/v1/model-versions/{classification_model_version['id']}/data/columnar",
+        content=_arrow_stream(table),
+        headers={"content-type": "application/vnd.apache.arrow.stream"}
+    )
+
+    # Assert
+    assert response.status_code == 200
+    await assert_ingestion_errors_count(1, async_session)
+
+
+@pytest.mark.asyncio
+async def test_log_columnar_data_with_incompatible_column(
+    client: TestClient,
+    classification_model_version: Payload,
+    async_session: AsyncSession
+):
+    # Arrange
+    table = _classification_arrow_table(pa.array(["11.1", "12.2"]))
+
+    # Act
+    response = client.post(
+        f"/api/v1/model-versions/{classification_model_version['id']}/data/columnar",
+        content=_arrow_stream(table),
+        headers={"content-type": "application/vnd.apache.arrow.stream"}
+    )
+
+    # Assert
+    assert response.status_code == 400
+    await assert_ingestion_errors_count(0, async_session)
+
+
 @pytest.mark.asyncio
 async def test_log_data_without_index(
     test_api: TestAPI,
@@ -214,6 +337,44 @@ async def test_log_labels(
     await assert_ingestion_errors_count(0, async_session)
 
 
+
+@pytest.mark.asyncio
+async def test_log_labels_of_unknown_classes_to_binary_model(
+    test_api: TestAPI,
+    async_session: AsyncSession
+):
+    # Arrange
+    model = t.cast(Payload, test_api.create_model(model={"task_type": TaskType.BINARY.value}))
+    version = t.cast(Payload, test_api.create_model_version(
+        model_id=model["id"],
+        model_version={"name": "v1", "features": {"a": "numeric"}, "classes": ["0", "1"]}
+    ))
+    test_api.upload_samples(
+        model_version_id=version["id"],
+        samples=[{
+            "_dc_sample_id": sample_id,
+            "_dc_time": pdl.datetime(2020, 1, 1, 0, 0, 0).isoformat(),
+            "_dc_prediction": prediction,
+            "a": 11.1,
+        } for sample_id, prediction in (("a000", "0"), ("a001", "1"), ("a002", "1"))]
+    )
+
+    # Act
+    test_api.upload_labels(
+        model_id=model["id"],
+        data=[
+            {"_dc_sample_id": "a000", "_dc_label": "0"},
+            {"_dc_sample_id": "a001", "_dc_label": "1"},
+            {"_dc_sample_id": "a002", "_dc_label": "2"},
+        ]
+    )
+
+    # Assert - only the label of the unknown class is rejected
+    await assert_ingestion_errors_count(1, async_session)
+    labels_table = (await async_session.get(Model, model["id"])).get_sample_labels_table(async_session)
+    labels = (await async_session.execute(select(labels_table.c["_dc_sample_id"], labels_table.c["_dc_label"]))).all()
+    assert sorted(map(tuple, labels)) == [("a000", "0"), ("a001", "1")]
+
 @pytest.mark.asyncio
 async def test_log_labels_non_existing_samples(
     test_api: TestAPI,
@@ -299,6 +460,98 @@ def test_send_reference_balance_classes(
     assert model_version["balance_classes"] is True
 
 
+@pytest.mark.asyncio
+async def test_send_reference_label_counts(
+    test_api: TestAPI,
+    classification_model_version: Payload,
+    async_session: AsyncSession
+):
+    # Arrange
+    sample = {"a": 11.1, "b": "ppppp", "_dc_prediction": "1", "_dc_prediction_probabilities": [0.1, 0.3, 0.6]}
+    version_id = classification_model_version["id"]
+
+    # Act
+    test_api.upload_reference(model_version_id=version_id, data=[{**sample, "_dc_label": "2"}] * 3)
+    test_api.upload_reference(
+        model_version_id=version_id,
+        data=[{**sample, "_dc_label": "0"}] * 2 + [{**sample, "_dc_label": None}]
+    )
+
+    # Assert
+    label_counts = await async_session.scalar(
+        select(ModelVersion.reference_label_counts).where(ModelVersion.id == version_id)
+    )
+    assert label_counts == {"2": 3, "0": 2}
+
+
+@pytest.mark.asyncio
+async def test_send_reference_label_counts_of_existing_reference(
+    test_api: TestAPI,
+    classification_model_version: Payload,
+    async_session: AsyncSession
+):
+    # Arrange - reference uploaded before the label counts were kept on the version
+    sample = {"a": 11.1, "b": "ppppp", "_dc_prediction": "1", "_dc_prediction_probabilities": [0.1, 0.3, 0.6]}
+    version_id = classification_model_version["id"]
+    test_api.upload_reference(model_version_id=version_id, data=[{**sample, "_dc_label": "1"}] * 99)
+    await async_session.execute(
+        update(ModelVersion).where(ModelVersion.id == version_id).values(reference_label_counts=None)
+    )
+    await async_session.commit()
+
+    # Act
+    test_api.upload_reference(model_version_id=version_id, data=[{**sample, "_dc_label": "0"}])
+
+    # Assert
+    label_counts = await async_session.scalar(
+        select(ModelVersion.reference_label_counts).where(ModelVersion.id == version_id)
+    )
+    assert label_counts == {"1": 99, "0": 1}
+    assert test_api.fetch_model_version(version_id)["balance_classes"] is True
+
+
+@pytest.mark.parametrize("labels", [["0"] * 50 + ["1"] * 50, ["0"] * 98 + ["1", "2"]])
+def test_send_reference_balance_classes_not_set(
+    test_api: TestAPI,
+    classification_model_version: Payload,
+    labels: t.List[str]
+):
+    # Act - balanced binary labels, and imbalanced labels which are not binary
+    test_api.upload_reference(
+        model_version_id=classification_model_version["id"],
+        data=[{
+            "_dc_label": label,
+            "a": 11.1,
+            "b": "ppppp",
+            "_dc_prediction": "1",
+            "_dc_prediction_probabilities": [0.1, 0.3, 0.6]
+        } for label in labels]
+    )
+    # Assert
+    model_version = test_api.fetch_model_version(classification_model_version["id"])
+    assert model_version["balance_classes"] is False
+
+
+@pytest.mark.parametrize("content", [
+    b'{"columns": ["a", "b", "_dc_prediction"], "data": [[11.1, "ppppp", "1"]',
+    b'{"data": [[11.1, "ppppp", "1"]], "columns": ["a", "b", "_dc_prediction"]}',
+    b'[[11.1, "ppppp", "1"]]',
+])
+def test_send_reference_malformed_json(
+    client: TestClient,
+    classification_model_version: Payload,
+    content: bytes
+):
+    # Act
+    response = client.post(
+        f"/api/v1/model-versions/{classification_model_version['id']}/reference",
+        files={"batch": ("data.json", content)}
+    )
+    # Assert
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Failed to read the reference data")
+
+
 def test_send_reference_features_and_additional_data(
     test_api: TestAPI,
     classification_model_version: Payload
@@ -437,7 +690,7 @@ async def test_log_data_exceeding_rate(
     }
 
     model_version = await async_session.get(ModelVersion, classification_model_version["id"])
-    monitor_table = model_version.get_monitor_table(async_session)
+    monitor_table = model_version.get_monitor_table()
     count = await async_session.scalar(select(func.count()).select_from(monitor_table))
 
     assert count == ROWS_PER_MINUTE_LIMIT
@@ -13,10 +13,12 @@ import typing as t
 import httpx
 import pendulum as pdl
 import pytest
-from sqlalchemy import inspect
+from sqlalchemy import inspect, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from deepchecks_monitoring.schema_models import ModelVersion, TaskType
+from deepchecks_monitoring.bgtasks.delete_db_table_task import DeleteDbTableTask
+from deepchecks_monitoring.public_models import Task
+from deepchecks_monitoring.schema_models import Model, ModelVersion, TaskType
 from tests.common import Payload, TestAPI, upload_classification_data
 
 
@@ -293,6 +295,41 @@ async def test_model_version_removal(
     assert ref_table_name not in tables
 
 
+@pytest.mark.asyncio
+async def test_model_version_removal_deletes_its_samples_map_rows(
+    test_api: TestAPI,
+    classification_model: Payload,
+    classification_model_version: Payload,
+    async_session: AsyncSession
+):
+    # Arrange
+    version_props = {"features": {"a": "numeric", "b": "categorical"}, "additional_data": {"c": "numeric"},
+                     "classes": ["0", "1", "2"]}
+    other_version = t.cast(Payload, test_api.create_model_version(
+        model_id=classification_model["id"],
+        model_version={"name": "other", **version_props}
+    ))
+    upload_classification_data(test_api, classification_model_version["id"], model_id=classification_model["id"])
+    upload_classification_data(test_api, other_version["id"], model_id=classification_model["id"])
+    model = await async_session.get(Model, classification_model["id"])
+    versions_map = model.get_samples_versions_map_table(async_session)
+    reservoir = model.get_samples_reservoir_table(async_session)
+
+    # Act - the rows are deleted by the background task, not by the request
+    test_api.delete_model_version(classification_model_version["id"])
+    tasks = (await async_session.scalars(
+        select(Task).where(Task.bg_worker_task == DeleteDbTableTask.queue_name())
+    )).all()
+    for task in tasks:
+        await DeleteDbTableTask().run(task, async_session, resources_provider=None, lock=None)
+    await async_session.commit()
+
+    # Assert
+    for table in (versions_map, reservoir):
+        version_ids = (await async_session.execute(select(table.c.version_id).distinct())).scalars().all()
+        assert version_ids == [other_version["id"]]
+
+
 def test_model_version_schema_retrieval(
     test_api: TestAPI,
     classification_model_version: Payload
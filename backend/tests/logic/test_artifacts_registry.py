@@ -0,0 +1,120 @@
+import pytest
+from hamcrest import assert_that, contains_exactly, equal_to, is_, is_not
+
+from deepchecks_monitoring.schema_models import ModelVersion
+from deepchecks_monitoring.schema_models import model_version as model_version_module
+from deepchecks_monitoring.schema_models.artifacts import (ArtifactsRegistry, artifacts_registry,
+                                                           invalidate_model_version_artifacts)
+from deepchecks_monitoring.schema_models.column_type import ColumnType
+
+
+def _model_version(**kwargs):
+    schema = {
+        "type": "object",
+        "properties": {
+            "_dc_sample_id": ColumnType.TEXT.to_json_schema_type(),
+            "_dc_time": ColumnType.DATETIME.to_json_schema_type(),
+            "a": ColumnType.NUMERIC.to_json_schema_type(nullable=True),
+        },
+        "required": ["_dc_sample_id", "_dc_time"],
+        "additionalProperties": False
+    }
+    return ModelVersion(**{
+        "id": 1,
+        "model_id": 1,
+        "monitor_json_schema": schema,
+        "reference_json_schema": schema,
+        "features_columns": {"a": "numeric"},
+        "additional_data_columns": {},
+        "model_columns": {},
+        "meta_columns": {"_dc_sample_id": "text", "_dc_time": "datetime"},
+        "private_columns": {"_dc_logged_time": "datetime"},
+        "private_reference_columns": {},
+        **kwargs
+    })
+
+
+@pytest.mark.asyncio
+async def test_registry_evicts_least_recently_used():
+    # Arrange
+    registry = ArtifactsRegistry(max_size=2)
+    registry.get_or_create("model", 1, "hash", lambda: "first")
+    registry.get_or_create("model", 2, "hash", lambda: "second")
+
+    # Act
+    registry.get_or_create("model", 1, "hash", lambda: "not-created")
+    registry.get_or_create("model", 3, "hash", lambda: "third")
+
+    # Assert
+    assert_that(len(registry), equal_to(2))
+    assert_that(registry.get_or_create("model", 1, "hash", lambda: "recreated"), equal_to("first"))
+    assert_that(registry.get_or_create("model", 2, "hash", lambda: "recreated"), equal_to("recreated"))
+
+
+@pytest.mark.asyncio
+async def test_model_version_artifacts_are_shared():
+    # Arrange
+    artifacts_registry.clear()
+    first, second = _model_version(), _model_version()
+
+    # Act & Assert
+    assert_that(first.get_monitor_table(), is_(second.get_monitor_table()))
+    assert_that(first.get_monitor_validator(), is_(second.get_monitor_validator()))
+    assert_that(first.optional_fields, contains_exactly("a"))
+    assert_that(first.datetime_columns, contains_exactly("_dc_time", "_dc_logged_time"))
+
+
+@pytest.mark.asyncio
+async def test_model_version_artifacts_change_with_schema():
+    # Arrange
+    artifacts_registry.clear()
+    first = _model_version()
+    second = _model_version(features_columns={"a": "numeric", "b": "categorical"})
+
+    # Act & Assert
+    assert_that(first.get_monitor_table(), is_not(second.get_monitor_table()))
+    assert_that("b" in second.get_monitor_table().c, equal_to(True))
+
+
+@pytest.mark.asyncio
+async def test_model_version_artifacts_invalidation():
+    # Arrange
+    artifacts_registry.clear()
+    monitor_table = _model_version().get_monitor_table()
+
+    # Act
+    invalidate_model_version_artifacts(1)
+
+    # Assert
+    assert_that(_model_version().get_monitor_table(), is_not(monitor_table))
+
+
+@pytest.mark.asyncio
+async def test_model_version_schema_hash_is_reset_on_schema_change():
+    # Arrange
+    artifacts_registry.clear()
+    model_version = _model_version()
+    monitor_table = model_version.get_monitor_table()
+
+    # Act
+    model_version.features_columns = {"a": "numeric", "b": "categorical"}
+
+    # Assert
+    assert_that(model_version.get_monitor_table(), is_not(monitor_table))
+    assert_that("b" in model_version.get_monitor_table().c, equal_to(True))
+
+
+@pytest.mark.asyncio
+async def test_model_version_schema_hash_is_memoized(monkeypatch):
+    # Arrange
+    calls = []
+    model_version = _model_version()
+    model_version.get_monitor_table()
+    monkeypatch.setattr(model_version_module, "schema_hash", lambda *args: calls.append(args))
+
+    # Act
+    model_version.get_monitor_table()
+    model_version.get_monitor_validator()
+
+    # Assert
+    assert_that(calls, equal_to([]))
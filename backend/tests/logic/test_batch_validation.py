@@ -0,0 +1,133 @@
+import fastjsonschema
+import numpy as np
+import pandas as pd
+import pendulum as pdl
+import pytest
+from hamcrest import assert_that, contains_exactly, equal_to, has_length
+
+from deepchecks_monitoring.logic.batch_validation import BatchValidator, parse_date_time
+from deepchecks_monitoring.schema_models.column_type import ColumnType
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "_dc_sample_id": ColumnType.TEXT.to_json_schema_type(),
+        "_dc_time": ColumnType.DATETIME.to_json_schema_type(),
+        "_dc_prediction_probabilities": ColumnType.ARRAY_FLOAT.to_json_schema_type(
+            nullable=True, min_items=2, max_items=2),
+        "a": ColumnType.NUMERIC.to_json_schema_type(),
+        "b": ColumnType.INTEGER.to_json_schema_type(nullable=True),
+        "c": ColumnType.CATEGORICAL.to_json_schema_type(nullable=True),
+        "d": ColumnType.BOOLEAN.to_json_schema_type(nullable=True),
+        "e": ColumnType.ARRAY_FLOAT_2D.to_json_schema_type(nullable=True),
+        "f": ColumnType.DATETIME.to_json_schema_type(nullable=True),
+    },
+    "required": ["_dc_sample_id", "_dc_time", "a", "b"],
+    "additionalProperties": False
+}
+
+VALID_SAMPLE = {"_dc_sample_id": "1", "_dc_time": "2023-01-01T10:05:00Z", "a": 1.5, "b": 2}
+
+SAMPLES = [
+    VALID_SAMPLE,
+    {**VALID_SAMPLE, "a": True},
+    {**VALID_SAMPLE, "a": "1"},
+    {**VALID_SAMPLE, "b": 1.0},
+    {**VALID_SAMPLE, "b": 1.5},
+    {**VALID_SAMPLE, "b": None},
+    {**VALID_SAMPLE, "b": 2 ** 31},
+    {**VALID_SAMPLE, "b": -2 ** 31 - 1},
+    {**VALID_SAMPLE, "c": 1},
+    {**VALID_SAMPLE, "c": None, "d": 1},
+    {**VALID_SAMPLE, "_dc_prediction_probabilities": [0.1]},
+    {**VALID_SAMPLE, "_dc_prediction_probabilities": [0.1, 0.2, 0.7]},
+    {**VALID_SAMPLE, "_dc_prediction_probabilities": [0.1, "x"]},
+    {**VALID_SAMPLE, "_dc_prediction_probabilities": "x"},
+    {**VALID_SAMPLE, "e": [[1, 2], "x"]},
+    {**VALID_SAMPLE, "e": [[1, 2], [3, None]]},
+    {**VALID_SAMPLE, "e": []},
+    {**VALID_SAMPLE, "_dc_time": "2023-01-01"},
+    {**VALID_SAMPLE, "_dc_time": "2023-01-01 10:05:00Z"},
+    {**VALID_SAMPLE, "_dc_time": 1},
+    {**VALID_SAMPLE, "f": "2023-01-01t10:05:00.123+0200"},
+    {"_dc_sample_id": "1", "a": 1},
+    {},
+    {**VALID_SAMPLE, "z": 1},
+    {**VALID_SAMPLE, "a": "x", "z": 1},
+    [1, 2],
+]
+
+
+def _fastjsonschema_error(validator, sample):
+    try:
+        validator(sample)
+    except fastjsonschema.JsonSchemaValueException as e:
+        return str(e)
+
+
+@pytest.mark.asyncio
+async def test_batch_validation_errors_same_as_fastjsonschema():
+    # Arrange
+    validator = fastjsonschema.compile(SCHEMA)
+    expected_errors = [_fastjsonschema_error(validator, sample) for sample in SAMPLES]
+
+    # Act
+    batch = BatchValidator(SCHEMA)(SAMPLES)
+
+    # Assert
+    assert_that(batch.errors.tolist(), contains_exactly(*expected_errors))
+
+
+@pytest.mark.asyncio
+async def test_batch_validation_samples():
+    # Arrange
+    samples = [
+        {**VALID_SAMPLE, "b": 1.0, "f": "2023-01-01T12:05:00+02:00"},
+        {**VALID_SAMPLE, "_dc_sample_id": "2", "c": "x"},
+        {**VALID_SAMPLE, "_dc_time": "2023-13-01T10:05:00Z"},
+    ]
+
+    # Act
+    batch = BatchValidator(SCHEMA)(samples)
+
+    # Assert
+    assert_that(batch.errors.tolist(), contains_exactly(None, None, "data._dc_time must be date-time"))
+    valid = batch.valid_samples
+    assert_that(valid, has_length(2))
+    assert_that(list(valid.columns), equal_to(list(SCHEMA["properties"].keys())))
+    assert_that(valid["b"].tolist(), contains_exactly(1, 2))
+    assert_that(type(valid["b"].iloc[0]), equal_to(int))
+    assert_that(valid["c"].tolist(), contains_exactly(None, "x"))
+    assert_that(valid["f"].iloc[0], equal_to(pd.Timestamp(pdl.datetime(2023, 1, 1, 10, 5))))
+
+
+@pytest.mark.asyncio
+async def test_batch_validation_of_dataframe():
+    # Arrange
+    samples = pd.DataFrame([VALID_SAMPLE, {**VALID_SAMPLE, "a": "x"}, {**VALID_SAMPLE, "b": 2 ** 31}])
+
+    # Act
+    batch = BatchValidator(SCHEMA)(samples)
+
+    # Assert
+    assert_that(batch.errors.tolist(), contains_exactly(
+        None, "data.a must be number", "data.b must be smaller than or equal to 2147483647"
+    ))
+
+
+@pytest.mark.asyncio
+async def test_parse_date_time():
+    # Arrange, including a value out of the nanoseconds range which pandas can't parse
+    values = np.array(["2023-01-01T12:05:00+02:00", "2023-01-01t10:05:00z", "3000-01-01T00:00:00Z", "x", 5],
+                      dtype=object)
+
+    # Act
+    parsed, failed = parse_date_time(values)
+
+    # Assert
+    assert_that(parsed[:3].tolist(), contains_exactly(
+        pd.Timestamp(pdl.datetime(2023, 1, 1, 10, 5)),
+        pd.Timestamp(pdl.datetime(2023, 1, 1, 10, 5)),
+        pd.Timestamp(pdl.datetime(3000, 1, 1)),
+    ))
+    assert_that(failed.tolist(), contains_exactly(False, False, False, True, False))
@@ -0,0 +1,132 @@
+import os
+import threading
+from concurrent.futures import Executor, Future
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+import pendulum as pdl
+import pytest
+from hamcrest import assert_that, contains_exactly, equal_to, has_length, instance_of, is_not, same_instance
+
+from deepchecks_monitoring.config import Settings
+from deepchecks_monitoring.logic import model_logic
+from deepchecks_monitoring.logic.check_logic import reduce_check_result
+from deepchecks_monitoring.logic.check_processes_pool import (create_check_processes_pool, dataframe_to_ipc,
+                                                              ipc_to_dataframe)
+from deepchecks_monitoring.resources import ResourcesProvider
+from deepchecks_monitoring.schema_models import Check, Model, ModelVersion
+from deepchecks_monitoring.schema_models.model import TaskType
+
+
+@pytest.mark.asyncio
+async def test_dataframe_ipc_round_trip():
+    # Arrange
+    df = pd.DataFrame({
+        "_dc_sample_id": ["1", "2"],
+        "_dc_time": [pdl.datetime(2023, 1, 1), pdl.datetime(2023, 1, 2)],
+        "a": [1.0, None],
+        "_dc_prediction_probabilities": [[0.1, 0.9], [0.6, 0.4]],
+    })
+
+    # Act
+    data = dataframe_to_ipc(df)
+    result = ipc_to_dataframe(data)
+
+    # Assert
+    assert_that(data, instance_of(bytes))
+    assert_that(result.columns.tolist(), equal_to(df.columns.tolist()))
+    assert_that(result["_dc_time"].tolist(), equal_to(df["_dc_time"].tolist()))
+    assert_that(result["a"].isna().tolist(), contains_exactly(False, True))
+    assert_that(np.array(result["_dc_prediction_probabilities"].to_list()).shape, equal_to((2, 2)))
+
+
+@pytest.mark.asyncio
+async def test_dataframe_ipc_keeps_unconvertible_dataframe():
+    # Arrange, arrow can't convert a column of mixed types
+    df = pd.DataFrame({"a": [1, "a"]})
+
+    # Act & Assert
+    assert_that(dataframe_to_ipc(df), same_instance(df))
+    assert_that(ipc_to_dataframe(df), same_instance(df))
+    assert_that(ipc_to_dataframe(None), equal_to(None))
+
+
+@pytest.mark.asyncio
+async def test_reduced_result_is_returned_as_is():
+    # Arrange, results of the pool processes are already reduced
+    result = {"a": 0.5}
+
+    # Act & Assert
+    assert_that(reduce_check_result(result, None), same_instance(result))
+
+
+class _BrokenPoolExecutor(Executor):
+    """Executor whose executions fail like those of a pool whose process was killed."""
+
+    def submit(self, fn, /, *args, **kwargs):
+        future = Future()
+        future.set_exception(BrokenProcessPool("A process in the process pool was terminated abruptly"))
+        return future
+
+
+@pytest.mark.asyncio
+async def test_windows_of_broken_pool_run_in_server(monkeypatch):
+    # Arrange
+    run_check_threads = []
+    monkeypatch.setattr(model_logic, "run_check",
+                        lambda *args: run_check_threads.append(threading.get_ident()) or {"a": 0.5})
+    model = Model(id=1, task_type=TaskType.BINARY)
+    model_version = ModelVersion(id=1, features_columns={"a": "numeric"}, balance_classes=False)
+    check = Check(id=1, name="check", config={"module_name": "deepchecks.tabular.checks", "class_name": "X"},
+                  is_reference_required=False)
+    windows = [{"start": 1, "data": pd.DataFrame({"a": [1.0]})}, {"start": 2, "data": pd.DataFrame({"a": [2.0]})}]
+
+    # Act
+    results = await model_logic.get_results_for_model_versions_per_window(
+        {model_version.id: {"windows": windows}}, [model_version], model, check, None,
+        executor=_BrokenPoolExecutor())
+
+    # Assert
+    assert_that([result["result"] for result in results[model_version]], contains_exactly({"a": 0.5}, {"a": 0.5}))
+    assert_that(run_check_threads, has_length(2))
+    # The checks run in threads, not blocking the event loop
+    assert_that(threading.get_ident() in run_check_threads, equal_to(False))
+
+
+@pytest.mark.asyncio
+async def test_check_processes_pool_tracks_being_broken():
+    # Arrange
+    pool = create_check_processes_pool(1)
+
+    try:
+        # Act & Assert
+        assert_that(pool.submit(abs, -1).result(), equal_to(1))
+        assert_that(pool.broken, equal_to(False))
+        with pytest.raises(BrokenProcessPool):
+            pool.submit(os._exit, 1).result()
+        assert_that(pool.broken, equal_to(True))
+    finally:
+        pool.shutdown(wait=False)
+
+
+@pytest.mark.asyncio
+async def test_broken_check_processes_pool_is_recreated():
+    # Arrange
+    resources_provider = ResourcesProvider(Settings.construct(check_processes_pool_size=1))
+    pool = resources_provider.check_processes_pool
+    with pytest.raises(BrokenProcessPool):
+        pool.submit(os._exit, 1).result()
+    # The broken pool rejects any further work
+    with pytest.raises(BrokenProcessPool):
+        pool.submit(abs, -1).result()
+
+    # Act
+    new_pool = resources_provider.check_processes_pool
+
+    # Assert
+    try:
+        assert_that(new_pool, is_not(same_instance(pool)))
+        assert_that(new_pool.submit(abs, -1).result(), equal_to(1))
+    finally:
+        resources_provider.shutdown_check_processes_pool()
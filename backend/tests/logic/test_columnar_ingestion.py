@@ -0,0 +1,120 @@
+# ----------------------------------------------------------------------------
+# Copyright (C) 2021-2022 Deepchecks (https://www.deepchecks.com)
+#
+# This file is part of Deepchecks.
+# Deepchecks is distributed under the terms of the GNU Affero General
+# Public License (version 3 or later).
+# You should have received a copy of the GNU Affero General Public License
+# along with Deepchecks.  If not, see <http://www.gnu.org/licenses/>.
+# ----------------------------------------------------------------------------
+import pendulum as pdl
+import pyarrow as pa
+from hamcrest import assert_that, calling, contains_exactly, contains_string, equal_to, has_length, raises
+
+from deepchecks_monitoring.exceptions import BadRequest
+from deepchecks_monitoring.logic.columnar_ingestion import prepare_arrow_table, table_to_json_records
+from deepchecks_monitoring.schema_models import Model, ModelVersion
+from deepchecks_monitoring.schema_models.column_type import ColumnType
+
+
+def _model_version():
+    columns = {
+        "_dc_sample_id": ColumnType.TEXT,
+        "_dc_time": ColumnType.DATETIME,
+        "a": ColumnType.NUMERIC,
+        "b": ColumnType.INTEGER,
+        "c": ColumnType.BIGINT,
+    }
+    schema = {
+        "type": "object",
+        "properties": {
+            name: column_type.to_json_schema_type(nullable=name not in ("_dc_sample_id", "_dc_time"))
+            for name, column_type in columns.items()
+        },
+        "required": ["_dc_sample_id", "_dc_time", "a"],
+        "additionalProperties": False
+    }
+    return ModelVersion(
+        id=1,
+        model_id=1,
+        model=Model(id=1, task_type="regression"),
+        monitor_json_schema=schema,
+        reference_json_schema=schema,
+        features_columns={"a": "numeric", "b": "integer", "c": "bigint"},
+        additional_data_columns={},
+        model_columns={},
+        meta_columns={"_dc_sample_id": "text", "_dc_time": "datetime"},
+        private_columns={"_dc_logged_time": "datetime"},
+        private_reference_columns={},
+    )
+
+
+def _table(**columns):
+    n_rows = len(next(iter(columns.values())))
+    return pa.table({
+        "_dc_sample_id": [str(i) for i in range(n_rows)],
+        "_dc_time": pa.array([pdl.datetime(2023, 1, 1)] * n_rows, type=pa.timestamp("us", tz="UTC")),
+        **columns
+    })
+
+
+def test_prepare_arrow_table_reports_invalid_samples():
+    # Arrange, integers beyond 2^53 are not exactly representable in the float numeric column
+    table = _table(
+        a=pa.array([1, 2 ** 53 + 1, -(2 ** 53) - 1, None], type=pa.int64()),
+        b=pa.array([1, 2, 3, 2 ** 31], type=pa.int64()),
+    )
+
+    # Act
+    prepared, errors = prepare_arrow_table(_model_version(), table, pdl.now())
+
+    # Assert
+    assert_that(prepared.column("_dc_sample_id").to_pylist(), contains_exactly("0"))
+    assert_that(prepared.column("a").type, equal_to(pa.float64()))
+    assert_that([it["error"] for it in errors], contains_exactly(
+        contains_string("data.a must be within the float precision range"),
+        contains_string("data.a must be within the float precision range"),
+        contains_string("data.a must not be null"),
+    ))
+
+
+def test_prepare_arrow_table_reports_unsigned_bigint_overflow():
+    # Arrange
+    table = _table(a=pa.array([1.0, 2.0]), c=pa.array([1, 2 ** 63], type=pa.uint64()))
+
+    # Act
+    prepared, errors = prepare_arrow_table(_model_version(), table, pdl.now())
+
+    # Assert
+    assert_that(prepared.column("c").to_pylist(), contains_exactly(1))
+    assert_that(errors, has_length(1))
+    assert_that(errors[0]["error"], contains_string("data.c must be within int64 range"))
+
+
+def test_prepare_arrow_table_rejects_incompatible_column():
+    # Arrange
+    table = _table(a=pa.array(["1", "2"]))
+
+    # Act & Assert
+    assert_that(calling(prepare_arrow_table).with_args(_model_version(), table, pdl.now()),
+                raises(BadRequest, "incompatible types"))
+
+
+def test_table_to_json_records_keeps_microseconds():
+    # Arrange
+    table = pa.table({
+        "_dc_sample_id": ["1", "2"],
+        "_dc_time": pa.array([pdl.datetime(2023, 1, 1, 10, 30, 15, 123456), pdl.datetime(2023, 1, 1, 10, 30, 15)],
+                             pa.timestamp("ns", tz="UTC")),
+        "naive_time": pa.array([pdl.naive(2023, 1, 1, 10, 30, 15, 5), None], pa.timestamp("us")),
+    })
+
+    # Act
+    records = table_to_json_records(table)
+
+    # Assert
+    assert_that([record["_dc_time"] for record in records],
+                contains_exactly("2023-01-01T10:30:15.123456+0000", "2023-01-01T10:30:15.000000+0000"))
+    assert_that(pdl.parse(records[0]["_dc_time"]), equal_to(pdl.datetime(2023, 1, 1, 10, 30, 15, 123456)))
+    assert_that([record["naive_time"] for record in records],
+                contains_exactly("2023-01-01T10:30:15.000005+0000", None))
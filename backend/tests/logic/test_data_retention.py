@@ -0,0 +1,55 @@
+# ----------------------------------------------------------------------------
+# Copyright (C) 2021-2022 Deepchecks (https://www.deepchecks.com)
+#
+# This file is part of Deepchecks.
+# Deepchecks is distributed under the terms of the GNU Affero General
+# Public License (version 3 or later).
+# You should have received a copy of the GNU Affero General Public License
+# along with Deepchecks.  If not, see <http://www.gnu.org/licenses/>.
+# ----------------------------------------------------------------------------
+import fakeredis
+import pendulum as pdl
+from hamcrest import assert_that, contains_inanyorder, equal_to
+
+from deepchecks_monitoring.bgtasks.data_retention import DataRetentionWorker
+from deepchecks_monitoring.logic.keys import build_monitor_cache_key, get_invalidation_set_key, parse_monitor_cache_key
+
+
+def test_parse_monitor_cache_key():
+    # Arrange
+    start_time, end_time = pdl.datetime(2023, 1, 1), pdl.datetime(2023, 1, 2)
+    key = build_monitor_cache_key(1, 2, 3, start_time, end_time)
+
+    # Act & Assert
+    expected = (1, 2, 3, start_time.int_timestamp, end_time.int_timestamp)
+    assert_that(parse_monitor_cache_key(key), equal_to(expected))
+    assert_that(parse_monitor_cache_key(key.encode()), equal_to(expected))
+
+
+def test_trim_redis_cache():
+    # Arrange
+    redis = fakeredis.FakeStrictRedis()
+    cutoff = pdl.datetime(2023, 1, 10)
+    days = [cutoff.subtract(days=2), cutoff.subtract(days=1), cutoff, cutoff.add(days=1)]
+    for model_version_id in (1, 2, 3):
+        for start_time, end_time in zip(days, days[1:]):
+            redis.set(build_monitor_cache_key(1, model_version_id, 1, start_time, end_time), "value")
+        redis.zadd(get_invalidation_set_key(1, model_version_id), {str(day.int_timestamp): 0 for day in days})
+    # Same model version id of another organization
+    redis.set(build_monitor_cache_key(2, 1, 1, days[0], days[1]), "value")
+
+    # Act
+    DataRetentionWorker()._trim_redis_cache(redis, 1, [1, 2], cutoff)  # pylint: disable=protected-access
+
+    # Assert - the windows ended up to the cutoff are removed from the trimmed versions only
+    remaining_keys = [key.decode() for key in redis.scan_iter(match=build_monitor_cache_key(None, None, None,
+                                                                                            None, None))]
+    assert_that(remaining_keys, contains_inanyorder(
+        build_monitor_cache_key(1, 1, 1, days[2], days[3]),
+        build_monitor_cache_key(1, 2, 1, days[2], days[3]),
+        *(build_monitor_cache_key(1, 3, 1, start_time, end_time) for start_time, end_time in zip(days, days[1:])),
+        build_monitor_cache_key(2, 1, 1, days[0], days[1]),
+    ))
+    for model_version_id, remaining_days in ((1, days[2:]), (2, days[2:]), (3, days)):
+        timestamps = redis.zrange(get_invalidation_set_key(1, model_version_id), start=0, end=-1)
+        assert_that([int(ts) for ts in timestamps], contains_inanyorder(*(day.int_timestamp for day in remaining_days)))
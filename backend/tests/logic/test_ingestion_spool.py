@@ -0,0 +1,148 @@
+import pytest
+
+from deepchecks_monitoring.logic import ingestion_spool
+from deepchecks_monitoring.logic.ingestion_spool import (IngestionSpool, SpoolInUseError, open_process_spool,
+                                                         open_unused_spools)
+
+
+@pytest.mark.asyncio
+async def test_appended_messages_are_read_until_committed(tmp_path):
+    # Arrange
+    spool = IngestionSpool(tmp_path, segment_max_bytes=1024, fsync_ms=1)
+    await spool.append("topic", [b"a", b"b"])
+    await spool.append("topic", [b"c"])
+
+    # Act
+    first_read = await spool.read("topic", max_records=2)
+    spool.commit("topic", first_read[-1].offset)
+    second_read = await spool.read("topic", max_records=2)
+
+    # Assert
+    assert [(it.offset, it.value) for it in first_read] == [(0, b"a"), (1, b"b")]
+    assert [(it.offset, it.value) for it in second_read] == [(2, b"c")]
+    assert spool.end_offset("topic") == 2
+    spool.close()
+
+
+@pytest.mark.asyncio
+async def test_spool_is_recovered_after_restart(tmp_path):
+    # Arrange
+    spool = IngestionSpool(tmp_path, segment_max_bytes=1024, fsync_ms=1)
+    await spool.append("topic", [b"a", b"b"])
+    spool.commit("topic", 0)
+    spool.close()
+    # A record which was partially written before a crash
+    segment = next((tmp_path / "topic").glob("*.log"))
+    with open(segment, "ab") as file:
+        file.write(b"\x00\x00\x00\x10abc")
+
+    # Act
+    spool = IngestionSpool(tmp_path, segment_max_bytes=1024, fsync_ms=1)
+    existed = spool.ensure_topic("topic")
+    await spool.append("topic", [b"c"])
+    records = await spool.read("topic", max_records=10)
+
+    # Assert
+    assert existed is True
+    assert [(it.offset, it.value) for it in records] == [(1, b"b"), (2, b"c")]
+    spool.close()
+
+
+@pytest.mark.asyncio
+async def test_committed_segments_are_deleted(tmp_path):
+    # Arrange, every segment holds a single record
+    spool = IngestionSpool(tmp_path, segment_max_bytes=1, fsync_ms=1)
+    for value in (b"a", b"b", b"c"):
+        await spool.append("topic", [value])
+
+    # Act
+    spool.commit("topic", 1)
+    records = await spool.read("topic", max_records=10)
+
+    # Assert
+    assert sorted(it.name for it in (tmp_path / "topic").glob("*.log")) == [f"{2:020d}.log"]
+    assert [(it.offset, it.value) for it in records] == [(2, b"c")]
+    spool.close()
+
+
+def test_spool_directory_is_used_by_single_process(tmp_path):
+    # Arrange
+    spool = IngestionSpool(tmp_path, segment_max_bytes=1024, fsync_ms=1)
+
+    # Act & Assert
+    with pytest.raises(SpoolInUseError):
+        IngestionSpool(tmp_path, segment_max_bytes=1024, fsync_ms=1)
+    spool.close()
+
+
+def test_each_process_opens_spool_of_its_own(tmp_path):
+    # Act, every uvicorn worker opens the spool of the first sub-directory which is not used
+    spools = [open_process_spool(tmp_path, segment_max_bytes=1024, fsync_ms=1) for _ in range(4)]
+
+    # Assert
+    assert [it.directory.name for it in spools] == ["worker-0", "worker-1", "worker-2", "worker-3"]
+    for spool in spools:
+        spool.close()
+
+
+@pytest.mark.asyncio
+async def test_unused_spools_are_opened_until_drained(tmp_path):
+    # Arrange, the process of the second spool was removed before it was drained
+    used = open_process_spool(tmp_path, segment_max_bytes=1024, fsync_ms=1)
+    removed = open_process_spool(tmp_path, segment_max_bytes=1024, fsync_ms=1)
+    await removed.append("topic", [b"a"])
+    removed.close()
+
+    # Act
+    unused = open_unused_spools(tmp_path, segment_max_bytes=1024, fsync_ms=1)
+
+    # Assert
+    assert [it.directory.name for it in unused] == ["worker-1"]
+    assert unused[0].is_drained() is False
+    records = await unused[0].read("topic", max_records=10)
+    unused[0].commit("topic", records[-1].offset)
+    assert unused[0].is_drained() is True
+    unused[0].close()
+    used.close()
+
+
+@pytest.mark.asyncio
+async def test_reads_start_at_the_committed_position(tmp_path, monkeypatch):
+    # Arrange
+    spool = IngestionSpool(tmp_path, segment_max_bytes=1024, fsync_ms=1)
+    await spool.append("topic", [b"a", b"b", b"c"])
+    spool.commit("topic", (await spool.read("topic", max_records=2))[-1].offset)
+    scanned = []
+    iter_records = ingestion_spool._iter_records  # pylint: disable=protected-access
+
+    def recording_iter_records(buffer, position=0):
+        for end, value in iter_records(buffer, position):
+            scanned.append(value)
+            yield end, value
+
+    monkeypatch.setattr(ingestion_spool, "_iter_records", recording_iter_records)
+
+    # Act
+    records = await spool.read("topic", max_records=10)
+
+    # Assert, the committed records are not read again
+    assert [(it.offset, it.value) for it in records] == [(2, b"c")]
+    assert scanned == [b"c"]
+    spool.close()
+
+
+@pytest.mark.asyncio
+async def test_reads_without_commit_are_repeated(tmp_path):
+    # Arrange
+    spool = IngestionSpool(tmp_path, segment_max_bytes=1024, fsync_ms=1)
+    await spool.append("topic", [b"a", b"b", b"c"])
+    spool.commit("topic", (await spool.read("topic", max_records=1))[-1].offset)
+
+    # Act, the records read are not committed, e.g. on a database connection error
+    first_read = await spool.read("topic", max_records=1)
+    second_read = await spool.read("topic", max_records=10)
+
+    # Assert
+    assert [(it.offset, it.value) for it in first_read] == [(1, b"b")]
+    assert [(it.offset, it.value) for it in second_read] == [(1, b"b"), (2, b"c")]
+    spool.close()
@@ -0,0 +1,133 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from aiokafka import TopicPartition
+
+from deepchecks_monitoring.config import KafkaSettings
+from deepchecks_monitoring.logic import kafka_consumer
+from deepchecks_monitoring.logic.kafka_consumer import consume_from_kafka
+
+
+class _FakeConsumer:
+    """Consumer returning the given batches of each partition, one batch per poll of an unpaused partition."""
+
+    def __init__(self, batches, events):
+        self.batches = {tp: list(tp_batches) for tp, tp_batches in batches.items()}
+        self.events = events
+        self.paused = set()
+        self.committed = {}
+
+    def __call__(self, **kwargs):
+        return self
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    def subscribe(self, pattern, listener):
+        pass
+
+    def assignment(self):
+        return set(self.batches)
+
+    def pause(self, tp):
+        self.paused.add(tp)
+
+    def resume(self, tp):
+        self.paused.discard(tp)
+
+    async def getmany(self, timeout_ms):
+        result = {tp: tp_batches.pop(0) for tp, tp_batches in self.batches.items()
+                  if tp_batches and tp not in self.paused}
+        if not result:
+            await asyncio.sleep(0.01)
+        return result
+
+    async def commit(self, offsets):
+        for tp, offset in offsets.items():
+            self.events.append(("commit", tp.partition, offset))
+            self.committed[tp] = offset
+
+
+def _messages(*offsets):
+    return [SimpleNamespace(offset=offset) for offset in offsets]
+
+
+async def _consume_until(consumer, handle_func, condition, monkeypatch, concurrency=8):
+    monkeypatch.setattr(kafka_consumer, "AIOKafkaConsumer", consumer)
+    settings = KafkaSettings(kafka_host="localhost:9092", kafka_consumer_concurrency=concurrency)
+    task = asyncio.create_task(consume_from_kafka(settings, handle_func, "^data-.*$", logger=None))
+    try:
+        for _ in range(500):
+            if condition() or task.done():
+                break
+            await asyncio.sleep(0.01)
+        if task.done():
+            task.result()
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_partitions_messages_are_handled_in_order_and_committed_after_handled(monkeypatch):
+    # Arrange
+    first, second = TopicPartition("data-1", 0), TopicPartition("data-1", 1)
+    events = []
+    consumer = _FakeConsumer({first: [_messages(0, 1), _messages(2, 3)], second: [_messages(0)]}, events)
+
+    async def handle(_, tp, messages):
+        events.append(("start", tp.partition, messages[-1].offset))
+        assert tp in consumer.paused
+        await asyncio.sleep(0.05 if tp == first else 0)
+        events.append(("end", tp.partition, messages[-1].offset))
+        return True
+
+    # Act
+    await _consume_until(consumer, handle, lambda: consumer.committed == {first: 4, second: 1}, monkeypatch)
+
+    # Assert
+    first_events = [event for event in events if event[1] == 0]
+    assert first_events == [("start", 0, 1), ("end", 0, 1), ("commit", 0, 2),
+                            ("start", 0, 3), ("end", 0, 3), ("commit", 0, 4)]
+    # The second partition is not blocked by the slow first partition
+    assert events.index(("commit", 1, 1)) < events.index(("end", 0, 1))
+    assert consumer.paused == set()
+
+
+@pytest.mark.asyncio
+async def test_messages_not_to_commit_are_not_committed(monkeypatch):
+    # Arrange
+    tp = TopicPartition("data-1", 0)
+    handled = []
+    consumer = _FakeConsumer({tp: [_messages(0), _messages(1)]}, events=[])
+
+    async def handle(_, tp, messages):
+        handled.append(messages[-1].offset)
+        return False
+
+    # Act
+    await _consume_until(consumer, handle, lambda: len(handled) == 2 and not consumer.paused, monkeypatch)
+
+    # Assert
+    assert handled == [0, 1]
+    assert consumer.committed == {}
+    assert consumer.paused == set()
+
+
+@pytest.mark.asyncio
+async def test_handler_error_is_raised(monkeypatch):
+    # Arrange
+    tp = TopicPartition("data-1", 0)
+    consumer = _FakeConsumer({tp: [_messages(0), _messages(1)]}, events=[])
+
+    async def handle(*_):
+        raise ValueError("handler failed")
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="handler failed"):
+        await _consume_until(consumer, handle, lambda: False, monkeypatch)
+    assert consumer.committed == {}
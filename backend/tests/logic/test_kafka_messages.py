@@ -0,0 +1,104 @@
+import json
+from types import SimpleNamespace
+
+import msgpack
+import pytest
+from aiokafka.structs import ConsumerRecord
+
+from deepchecks_monitoring.config import KafkaSettings
+from deepchecks_monitoring.logic.data_ingestion import BATCH_MESSAGE_HEADERS, DataIngestionBackend, _decode_data_message
+
+
+def _backend(**kafka_settings):
+    resources_provider = SimpleNamespace(kafka_settings=KafkaSettings(kafka_host="localhost:9092", **kafka_settings),
+                                         settings=None)
+    return DataIngestionBackend(resources_provider, logger=object())
+
+
+def _record(offset, value, headers=()):
+    return ConsumerRecord(topic="topic", partition=0, offset=offset, timestamp=0, timestamp_type=0, key=None,
+                          value=value, checksum=None, serialized_key_size=0, serialized_value_size=len(value),
+                          headers=tuple(headers))
+
+
+def _samples(n, size=10):
+    return [{"_dc_sample_id": str(i), "text": "x" * size} for i in range(n)]
+
+
+@pytest.mark.asyncio
+async def test_batch_message_is_decoded():
+    # Arrange
+    samples = _samples(3)
+    _, value, headers = _backend()._encode_batch_messages(samples, log_time="2023-01-01T00:00:00+00:00")[0]
+
+    # Act
+    decoded, log_time = _decode_data_message(_record(0, value, headers))
+
+    # Assert
+    assert decoded == samples
+    assert log_time == "2023-01-01T00:00:00+00:00"
+
+
+@pytest.mark.asyncio
+async def test_legacy_json_message_is_decoded():
+    # Arrange, messages of the older format carry a single sample encoded as json
+    sample = {"_dc_sample_id": "1", "a": 1.5}
+    value = json.dumps({"data": sample, "log_time": "2023-01-01T00:00:00+00:00"}).encode()
+
+    # Act
+    decoded, log_time = _decode_data_message(_record(0, value))
+
+    # Assert
+    assert decoded == [sample]
+    assert log_time == "2023-01-01T00:00:00+00:00"
+
+
+@pytest.mark.asyncio
+async def test_legacy_json_message_without_log_time_is_decoded():
+    # Arrange, labels messages have no log time
+    value = json.dumps({"data": {"_dc_sample_id": "1", "_dc_label": "a"}}).encode()
+
+    # Act
+    decoded, log_time = _decode_data_message(_record(0, value))
+
+    # Assert
+    assert decoded == [{"_dc_sample_id": "1", "_dc_label": "a"}]
+    assert log_time is None
+
+
+@pytest.mark.asyncio
+async def test_batch_messages_are_split_by_samples_count():
+    # Act
+    messages = _backend(kafka_max_samples_per_message=2)._encode_batch_messages(_samples(5))
+
+    # Assert
+    assert [len(msgpack.unpackb(value)["data"]) for _, value, _ in messages] == [2, 2, 1]
+    assert all(headers == BATCH_MESSAGE_HEADERS for *_, headers in messages)
+
+
+@pytest.mark.asyncio
+async def test_batch_messages_are_split_by_encoded_size():
+    # Arrange, 100 samples of about 10KB each do not fit in a single request
+    samples = _samples(100, size=10_000)
+    max_request_size = 64 * 1024
+
+    # Act
+    messages = _backend(kafka_producer_max_request_size=max_request_size)._encode_batch_messages(samples)
+
+    # Assert
+    assert len(messages) > 1
+    assert all(len(value) <= max_request_size for _, value, _ in messages)
+    assert [it for _, value, _ in messages for it in msgpack.unpackb(value)["data"]] == samples
+
+
+@pytest.mark.asyncio
+async def test_sample_larger_than_request_size_is_sent_alone():
+    # Arrange
+    samples = [*_samples(2), {"_dc_sample_id": "large", "text": "x" * 10_000}]
+
+    # Act
+    messages = _backend(kafka_producer_max_request_size=4096)._encode_batch_messages(samples)
+
+    # Assert
+    assert [[it["_dc_sample_id"] for it in msgpack.unpackb(value)["data"]] for _, value, _ in messages] == \
+        [["0"], ["1"], ["large"]]
@@ -0,0 +1,141 @@
+# ----------------------------------------------------------------------------
+# Copyright (C) 2021-2022 Deepchecks (https://www.deepchecks.com)
+#
+# This file is part of Deepchecks.
+# Deepchecks is distributed under the terms of the GNU Affero General
+# Public License (version 3 or later).
+# You should have received a copy of the GNU Affero General Public License
+# along with Deepchecks.  If not, see <http://www.gnu.org/licenses/>.
+# ----------------------------------------------------------------------------
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from aiokafka.errors import KafkaTimeoutError
+from hamcrest import assert_that, contains_exactly, equal_to, has_entries, has_length, same_instance
+
+from deepchecks_monitoring import resources
+from deepchecks_monitoring.config import KafkaSettings, Settings
+from deepchecks_monitoring.logic.data_ingestion import DataIngestionBackend
+from deepchecks_monitoring.resources import ResourcesProvider
+
+
+class _FakeProducer:
+    """Producer recording its lifecycle and the messages sent.
+
+    Deliveries complete on 'deliver', or right away with 'auto_deliver'.
+    """
+
+    instances = []
+
+    def __init__(self, auto_deliver=False, **params):
+        self.params = params
+        self.auto_deliver = auto_deliver
+        self.started = self.stopped = 0
+        self.sent = []
+        self.pending_deliveries = []
+        self.failing_keys = set()
+        _FakeProducer.instances.append(self)
+
+    async def start(self):
+        self.started += 1
+
+    async def stop(self):
+        self.stopped += 1
+
+    async def send(self, topic, value=None, key=None, headers=None):
+        self.sent.append(key)
+        delivery = asyncio.get_running_loop().create_future()
+        if key in self.failing_keys:
+            self.failing_keys.discard(key)
+            delivery.set_exception(KafkaTimeoutError())
+        elif self.auto_deliver:
+            delivery.set_result(None)
+        else:
+            self.pending_deliveries.append(delivery)
+        return delivery
+
+    def deliver(self):
+        for delivery in self.pending_deliveries:
+            delivery.set_result(None)
+        self.pending_deliveries = []
+
+
+class _Logger:
+
+    def __init__(self):
+        self.errors = []
+
+    def warning(self, message):
+        pass
+
+    def error(self, message):
+        self.errors.append(message)
+
+
+@pytest.mark.asyncio
+async def test_kafka_producer_is_shared_by_process(monkeypatch):
+    # Arrange
+    _FakeProducer.instances = []
+    monkeypatch.setattr(resources, "AIOKafkaProducer", _FakeProducer)
+    settings = Settings.construct(kafka_host="localhost:9092", kafka_producer_linger_ms=10,
+                                  kafka_producer_max_batch_size=1024, kafka_producer_compression_type="lz4")
+    resources_provider = ResourcesProvider(settings)
+
+    # Act
+    async with resources_provider.get_kafka_producer() as first_producer:
+        pass
+    async with resources_provider.get_kafka_producer() as second_producer:
+        pass
+
+    # Assert - a single producer is started with the producer settings, and is not stopped by its users
+    assert_that(_FakeProducer.instances, has_length(1))
+    assert_that(second_producer, same_instance(first_producer))
+    assert_that((first_producer.started, first_producer.stopped), equal_to((1, 0)))
+    assert_that(first_producer.params, has_entries(bootstrap_servers="localhost:9092", linger_ms=10,
+                                                   max_batch_size=1024, compression_type="lz4"))
+
+    # Act & Assert - the producer is stopped on close, and a new one is started on the next use
+    await resources_provider.close_kafka_producer()
+    assert_that(first_producer.stopped, equal_to(1))
+    async with resources_provider.get_kafka_producer() as third_producer:
+        assert_that(_FakeProducer.instances, has_length(2))
+        assert_that(third_producer.started, equal_to(1))
+
+
+@pytest.mark.asyncio
+async def test_messages_are_sent_before_waiting_for_delivery():
+    # Arrange
+    producer = _FakeProducer()
+    resources_provider = SimpleNamespace(kafka_settings=KafkaSettings(kafka_host="localhost:9092"), settings=None)
+    backend = DataIngestionBackend(resources_provider, logger=_Logger())
+    messages = [(str(i).encode(), b"value", []) for i in range(3)]
+
+    # Act
+    sending = asyncio.create_task(backend._send_with_retry(producer, "topic", messages, len(messages)))
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+    # Assert - all the messages are sent while none of them was delivered yet
+    assert_that(producer.sent, contains_exactly(b"0", b"1", b"2"))
+    assert_that(sending.done(), equal_to(False))
+    producer.deliver()
+    await sending
+    assert_that(backend.logger.errors, has_length(0))
+
+
+@pytest.mark.asyncio
+async def test_failed_messages_are_sent_again():
+    # Arrange
+    producer = _FakeProducer(auto_deliver=True)
+    producer.failing_keys = {b"1"}
+    resources_provider = SimpleNamespace(kafka_settings=KafkaSettings(kafka_host="localhost:9092"), settings=None)
+    backend = DataIngestionBackend(resources_provider, logger=_Logger())
+    messages = [(str(i).encode(), b"value", []) for i in range(3)]
+
+    # Act
+    await backend._send_with_retry(producer, "topic", messages, len(messages))
+
+    # Assert - only the failed message is sent again
+    assert_that(producer.sent, contains_exactly(b"0", b"1", b"2", b"1"))
+    assert_that(backend.logger.errors, has_length(0))
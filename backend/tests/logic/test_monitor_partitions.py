@@ -0,0 +1,101 @@
+import pendulum as pdl
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
+
+from deepchecks_monitoring.logic.monitor_partitions import (build_monitor_table, create_monitor_partitions,
+                                                            drop_monitor_partitions_before)
+from deepchecks_monitoring.schema_models.column_type import ColumnType, MonitorIndexMethod
+from deepchecks_monitoring.utils.alerts import Frequency
+
+COLUMNS = {"_dc_sample_id": ColumnType.TEXT, "_dc_time": ColumnType.DATETIME, "a": ColumnType.NUMERIC}
+
+
+class _RecordingSession:
+    def __init__(self, existing_partitions):
+        self.existing_partitions = existing_partitions
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        self.statements.append(str(statement))
+        existing_partitions = self.existing_partitions
+
+        class _Result:
+            def scalars(self):
+                class _Scalars:
+                    def all(self):
+                        return existing_partitions
+                return _Scalars()
+        return _Result()
+
+
+def test_partitioned_monitor_table_definition():
+    # Act
+    table = build_monitor_table("model_1_monitor_data_1", COLUMNS, Frequency.DAY)
+    ddl = str(CreateTable(table).compile(dialect=postgresql.dialect()))
+
+    # Assert
+    assert [column.name for column in table.primary_key.columns] == ["_dc_sample_id", "_dc_time"]
+    assert "PARTITION BY RANGE (_dc_time)" in ddl
+
+
+def test_not_partitioned_monitor_table_definition():
+    # Act
+    table = build_monitor_table("model_1_monitor_data_1", COLUMNS)
+    ddl = str(CreateTable(table).compile(dialect=postgresql.dialect()))
+
+    # Assert
+    assert [column.name for column in table.primary_key.columns] == ["_dc_sample_id"]
+    assert "PARTITION BY" not in ddl
+
+
+def _indexes(table):
+    # Column of each index (None for the hashtext expression index) and its method
+    return {(next((column.name for column in index.columns), None),
+             index.dialect_options["postgresql"]["using"] or "btree")
+            for index in table.indexes}
+
+
+def test_monitor_table_indexes_policy():
+    # Act
+    legacy_table = build_monitor_table("model_1_monitor_data_1", COLUMNS)
+    table = build_monitor_table("model_1_monitor_data_1", COLUMNS, indexed_columns=[])
+    brin_table = build_monitor_table("model_1_monitor_data_1", COLUMNS, indexed_columns=["a"],
+                                     time_index_method=MonitorIndexMethod.BRIN)
+
+    # Assert
+    assert _indexes(legacy_table) == {("_dc_time", "btree"), ("a", "btree"), (None, "btree")}
+    assert _indexes(table) == {("_dc_time", "btree"), (None, "btree")}
+    assert _indexes(brin_table) == {("_dc_time", "brin"), ("a", "btree"), (None, "btree")}
+
+
+@pytest.mark.asyncio
+async def test_only_missing_partitions_are_created():
+    # Arrange
+    session = _RecordingSession(existing_partitions=["model_1_monitor_data_1_p20230101"])
+    starts = [pdl.datetime(2023, 1, 1, 5), pdl.datetime(2023, 1, 15)]
+
+    # Act
+    await create_monitor_partitions(session, "model_1_monitor_data_1", Frequency.MONTH, starts)
+
+    # Assert
+    created = [statement for statement in session.statements if statement.startswith("CREATE TABLE")]
+    assert created == [
+        'CREATE TABLE IF NOT EXISTS "model_1_monitor_data_1_p20230201" PARTITION OF "model_1_monitor_data_1" '
+        "FOR VALUES FROM ('2023-02-01T00:00:00Z') TO ('2023-03-01T00:00:00Z')"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_only_partitions_before_cutoff_are_dropped():
+    # Arrange
+    session = _RecordingSession(existing_partitions=[
+        "model_1_monitor_data_1_p20230102", "model_1_monitor_data_1_p20230109", "model_1_monitor_data_1_p20230116"
+    ])
+
+    # Act
+    dropped = await drop_monitor_partitions_before(session, "model_1_monitor_data_1", Frequency.WEEK,
+                                                   pdl.datetime(2023, 1, 16, 12))
+
+    # Assert
+    assert dropped == ["model_1_monitor_data_1_p20230102", "model_1_monitor_data_1_p20230109"]
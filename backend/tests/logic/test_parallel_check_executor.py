@@ -0,0 +1,170 @@
+# ----------------------------------------------------------------------------
+# Copyright (C) 2021-2022 Deepchecks (https://www.deepchecks.com)
+#
+# This file is part of Deepchecks.
+# Deepchecks is distributed under the terms of the GNU Affero General
+# Public License (version 3 or later).
+# You should have received a copy of the GNU Affero General Public License
+# along with Deepchecks.  If not, see <http://www.gnu.org/licenses/>.
+# ----------------------------------------------------------------------------
+# pylint: disable=protected-access
+import threading
+
+import pandas as pd
+import pendulum as pdl
+import pytest
+from hamcrest import assert_that, contains_exactly, equal_to, has_length, instance_of, is_not
+
+ray = pytest.importorskip("ray")
+
+# pylint: disable=wrong-import-position
+from deepchecks_monitoring.logic import parallel_check_executor  # noqa: E402
+from deepchecks_monitoring.logic.check_logic import WINDOW_INDEX_COL  # noqa: E402
+from deepchecks_monitoring.schema_models.model import TaskType  # noqa: E402
+
+START = pdl.datetime(2023, 1, 1)
+CHECK_CONFIG = {"module_name": "deepchecks.tabular.checks", "class_name": "PercentOfNulls", "params": {}}
+
+
+@pytest.fixture(scope="module", autouse=True)
+def ray_instance():
+    ray.init(num_cpus=1, include_dashboard=False)
+    yield
+    ray.shutdown()
+
+
+class _FakeResult:
+
+    def __init__(self, df):
+        self.df = df
+
+    def all(self):
+        return list(self.df.itertuples(index=False, name=None))
+
+    def keys(self):
+        return list(self.df.columns)
+
+
+class _FakeSession:
+    """Session returning the data of each query, the queries are any objects identifying them."""
+
+    def __init__(self, queries_data):
+        self.queries_data = queries_data
+        self.queries = []
+
+    def execute(self, query):
+        self.queries.append(query)
+        return _FakeResult(self.queries_data[query])
+
+
+class _FakeAsyncSession(_FakeSession):
+
+    async def execute(self, query):
+        return super().execute(query)
+
+
+def _window_data(window_index):
+    # Only the data of the first window has nulls, so the windows results differ
+    return pd.DataFrame({
+        "_dc_sample_id": [f"{window_index}_{i}" for i in range(4)],
+        "_dc_time": pd.date_range(START.add(days=window_index), periods=4, freq="H"),
+        "a": [1.0, None, 3.0, 4.0] if window_index == 0 else [1.0, 2.0, 3.0, 4.0],
+        "b": ["x", "y", None, "x"] if window_index == 0 else ["x", "y", "y", "x"],
+        "_dc_prediction": ["1", "2", "1", "1"],
+    })
+
+
+def _windows_query_data(windows_indexes):
+    return pd.concat([_window_data(index).assign(**{WINDOW_INDEX_COL: index}) for index in windows_indexes],
+                     ignore_index=True)
+
+
+def _window(window_index, samples_query=None, samples_data=None):
+    return {"model_version_id": 1, "window_index": window_index, "start": START.add(days=window_index),
+            "end": START.add(days=window_index + 1), "samples_query": samples_query, "samples_data": samples_data}
+
+
+def _args(windows, windows_queries=None):
+    return parallel_check_executor.CheckPerWindowExecutionArgs(
+        check_config=CHECK_CONFIG,
+        additional_check_kwargs=None,
+        windows=windows,
+        classes={1: None},
+        balance_classes={1: False},
+        feature_columns={1: {"a": "numeric", "b": "categorical"}},
+        references_queries={},
+        windows_queries=windows_queries or {},
+        references_data={},
+        task_type=TaskType.MULTICLASS,
+        top_features=["a", "b"],
+        feature_importance=None,
+        organization_id=1
+    )
+
+
+def test_windows_results_of_queried_and_prefetched_data():
+    # Arrange - the last window has no data
+    session = _FakeSession({
+        "window 0": _window_data(0),
+        "window 1": _window_data(1),
+        "window 2": _window_data(0).iloc[:0],
+        "windows": _windows_query_data([0, 1]),
+    })
+    prefetched_data = parallel_check_executor._put_windows_dataframes(_windows_query_data([0, 1]))
+
+    # Act
+    per_window_results = parallel_check_executor._execute_check_per_window(
+        session, _args([_window(index, samples_query=f"window {index}") for index in range(3)]))
+    single_scan_results = parallel_check_executor._execute_check_per_window(
+        session, _args([_window(index) for index in range(3)], windows_queries={1: "windows"}))
+    # Windows without data are not sent to the workers when the data is prefetched
+    prefetched_results = parallel_check_executor._execute_check_per_window(
+        None, _args([_window(index, samples_data=data) for index, data in prefetched_data.items()]))
+
+    # Assert
+    assert_that(session.queries, contains_exactly("window 0", "window 1", "window 2", "windows"))
+    assert_that([it["window_index"] for it in per_window_results], contains_exactly(0, 1, 2))
+    first_result, second_result, empty_window_result = (it["result"] for it in per_window_results)
+    assert_that(first_result, instance_of(dict))
+    assert_that(second_result, instance_of(dict))
+    assert_that(first_result, is_not(equal_to(second_result)))
+    assert_that(empty_window_result, equal_to(None))
+    assert_that(single_scan_results, equal_to(per_window_results))
+    assert_that(prefetched_results, equal_to(per_window_results[:2]))
+
+
+@pytest.mark.asyncio
+async def test_prefetched_windows_data_is_put_by_thread(monkeypatch):
+    # Arrange
+    put_threads = []
+    put_dataframe = parallel_check_executor._put_dataframe
+    monkeypatch.setattr(parallel_check_executor, "_put_dataframe",
+                        lambda df: put_threads.append(threading.get_ident()) or put_dataframe(df))
+    session = _FakeAsyncSession({"windows": _windows_query_data([0, 2]), "reference": _window_data(1)})
+
+    # Act
+    windows_data = await parallel_check_executor._prefetch(session, "windows",
+                                                           parallel_check_executor._put_windows_dataframes)
+    reference_data = await parallel_check_executor._prefetch(session, "reference",
+                                                             parallel_check_executor._put_non_empty_dataframe)
+
+    # Assert - only the windows with data are put
+    assert_that(sorted(windows_data), contains_exactly(0, 2))
+    for window_index, data in windows_data.items():
+        expected = _window_data(window_index)
+        pd.testing.assert_frame_equal(parallel_check_executor._get_dataframe(data), expected, check_dtype=False)
+    pd.testing.assert_frame_equal(parallel_check_executor._get_dataframe(reference_data), _window_data(1),
+                                  check_dtype=False)
+    assert_that(put_threads, has_length(3))
+    assert_that(threading.get_ident() in put_threads, equal_to(False))
+
+
+@pytest.mark.asyncio
+async def test_empty_prefetched_reference_is_not_put():
+    # Arrange
+    session = _FakeAsyncSession({"reference": _window_data(1).iloc[:0]})
+
+    # Act & Assert
+    assert_that(await parallel_check_executor._prefetch(session, "reference",
+                                                        parallel_check_executor._put_non_empty_dataframe),
+                equal_to(None))
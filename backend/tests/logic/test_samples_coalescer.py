@@ -0,0 +1,84 @@
+import asyncio
+
+import pendulum as pdl
+import pytest
+
+from deepchecks_monitoring.logic.data_ingestion import SamplesCoalescer
+
+
+class _RecordingCoalescer(SamplesCoalescer):
+    def __init__(self, linger_ms, max_samples, logged=lambda samples: range(len(samples))):
+        super().__init__(resources_provider=None, logger=None, linger_ms=linger_ms, max_samples=max_samples)
+        self.logged = logged
+        self.writes = []
+
+    async def _log_samples(self, organization_id, model_version_id, pending):
+        self.writes.append((organization_id, model_version_id, list(pending.samples)))
+        return list(self.logged(pending.samples))
+
+
+def _samples(*ids):
+    return [{"_dc_sample_id": sample_id} for sample_id in ids]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_batches_are_written_together():
+    # Arrange
+    coalescer = _RecordingCoalescer(linger_ms=10, max_samples=100)
+    now = pdl.now()
+
+    # Act
+    results = await asyncio.gather(
+        coalescer.log(1, 1, _samples("1", "2"), now),
+        coalescer.log(1, 1, _samples("3"), now),
+        coalescer.log(1, 2, _samples("4"), now),
+    )
+
+    # Assert
+    assert results == [{"1", "2"}, {"3"}, {"4"}]
+    assert sorted(coalescer.writes) == [(1, 1, _samples("1", "2", "3")), (1, 2, _samples("4"))]
+
+
+@pytest.mark.asyncio
+async def test_each_caller_gets_only_its_logged_samples():
+    # Arrange, the second sample with id "1" is a duplicate which is not logged
+    coalescer = _RecordingCoalescer(linger_ms=10, max_samples=100, logged=lambda samples: [0, 2])
+    now = pdl.now()
+
+    # Act
+    results = await asyncio.gather(
+        coalescer.log(1, 1, _samples("1"), now),
+        coalescer.log(1, 1, _samples("1", "2"), now),
+    )
+
+    # Assert
+    assert results == [{"1"}, {"2"}]
+
+
+@pytest.mark.asyncio
+async def test_full_buffer_is_written_without_waiting():
+    # Arrange
+    coalescer = _RecordingCoalescer(linger_ms=60_000, max_samples=2)
+
+    # Act
+    result = await asyncio.wait_for(coalescer.log(1, 1, _samples("1", "2"), pdl.now()), timeout=1)
+
+    # Assert
+    assert result == {"1", "2"}
+
+
+@pytest.mark.asyncio
+async def test_write_error_is_raised_to_all_callers():
+    # Arrange
+    coalescer = _RecordingCoalescer(linger_ms=10, max_samples=100, logged=lambda samples: 1 / 0)
+    now = pdl.now()
+
+    # Act
+    results = await asyncio.gather(
+        coalescer.log(1, 1, _samples("1"), now),
+        coalescer.log(1, 1, _samples("2"), now),
+        return_exceptions=True
+    )
+
+    # Assert
+    assert all(isinstance(result, ZeroDivisionError) for result in results)
@@ -0,0 +1,134 @@
+import pandas as pd
+import pendulum as pdl
+import pytest
+from hamcrest import assert_that, equal_to, has_length
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from deepchecks_monitoring.logic.check_logic import (TableFiltersSchema, create_execution_data_query,
+                                                     create_windows_execution_data_query, split_windows_data)
+from deepchecks_monitoring.schema_models import ModelVersion
+from tests.common import Payload, TestAPI, upload_classification_data
+
+
+async def _read_windows_samples(session, model_version, options, windows, n_samples, filter_labels_exist=True):
+    windows_query = create_windows_execution_data_query(model_version, options, windows, n_samples=n_samples,
+                                                        with_labels=True, filter_labels_exist=filter_labels_exist)
+    result = await session.execute(windows_query)
+    windows_data = split_windows_data(pd.DataFrame(result.all(), columns=list(result.keys())))
+    return {index: sorted(data["_dc_sample_id"]) for index, data in windows_data.items()}
+
+
+async def _read_window_samples(session, model_version, options, start, end, n_samples, filter_labels_exist=True):
+    query = create_execution_data_query(model_version, options, period=end - start, n_samples=n_samples,
+                                        with_labels=True, filter_labels_exist=filter_labels_exist)
+    return sorted(row[0] for row in await session.execute(select(query.subquery().c["_dc_sample_id"])))
+
+
+async def _smallest_hashes(session, sample_ids, n_samples):
+    hashes = {sample_id: await session.scalar(select(func.hashtext(sample_id))) for sample_id in sample_ids}
+    return sorted(sorted(sample_ids, key=lambda sample_id: (hashes[sample_id], sample_id))[:n_samples])
+
+
+@pytest.mark.asyncio
+async def test_windows_query_selects_labeled_samples_before_limit(
+    test_api: TestAPI,
+    classification_model: Payload,
+    classification_model_version: Payload,
+    async_session: AsyncSession
+):
+    # Arrange - 10 samples an hour, of which only the even ones are labeled
+    start = pdl.datetime(2023, 1, 1)
+    upload_classification_data(test_api, classification_model_version["id"], is_labeled=False, samples_per_date=10,
+                               daterange=[start.add(hours=hours) for hours in range(6)])
+    test_api.upload_labels(model_id=classification_model["id"], data=[
+        {"_dc_sample_id": f"{i}_{j}", "_dc_label": "1"} for i in range(6) for j in range(0, 10, 2)
+    ])
+    model_version = await async_session.get(ModelVersion, classification_model_version["id"],
+                                            options=[joinedload(ModelVersion.model)])
+    # Overlapping windows which are not of whole hours, so the monitor table is scanned
+    windows = [(0, start.add(minutes=30), start.add(hours=3, minutes=30)),
+               (1, start.add(hours=2, minutes=30), start.add(hours=6))]
+    options = TableFiltersSchema()
+
+    # Act
+    windows_samples = await _read_windows_samples(async_session, model_version, options, windows, n_samples=5)
+
+    # Assert - each window gets the labeled samples of smallest hashes
+    for index, window_start, window_end in windows:
+        labeled_samples = await _read_window_samples(async_session, model_version, options, window_start,
+                                                     window_end, n_samples=1000)
+        assert_that(all(int(sample_id.split("_")[1]) % 2 == 0 for sample_id in labeled_samples), equal_to(True))
+        assert_that(windows_samples[index], has_length(5))
+        assert_that(windows_samples[index], equal_to(await _smallest_hashes(async_session, labeled_samples, 5)))
+
+
+@pytest.mark.asyncio
+async def test_window_query_filters_labeled_samples_after_limit(
+    test_api: TestAPI,
+    classification_model: Payload,
+    classification_model_version: Payload,
+    async_session: AsyncSession
+):
+    # Arrange - 10 samples an hour, of which only the even ones are labeled
+    start = pdl.datetime(2023, 1, 1)
+    upload_classification_data(test_api, classification_model_version["id"], is_labeled=False, samples_per_date=10,
+                               daterange=[start.add(hours=hours) for hours in range(3)])
+    test_api.upload_labels(model_id=classification_model["id"], data=[
+        {"_dc_sample_id": f"{i}_{j}", "_dc_label": "1"} for i in range(3) for j in range(0, 10, 2)
+    ])
+    model_version = await async_session.get(ModelVersion, classification_model_version["id"],
+                                            options=[joinedload(ModelVersion.model)])
+    window_start, window_end = start.add(minutes=30), start.add(hours=3)
+    options = TableFiltersSchema()
+
+    # Act
+    samples = await _read_window_samples(async_session, model_version, options, window_start, window_end,
+                                         n_samples=5, filter_labels_exist=False)
+    labeled_samples = await _read_window_samples(async_session, model_version, options, window_start, window_end,
+                                                 n_samples=5)
+
+    # Assert - the per window query keeps the labeled samples of the limited samples
+    assert_that(samples, has_length(5))
+    assert_that(labeled_samples, equal_to([it for it in samples if int(it.split("_")[1]) % 2 == 0]))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("filter_labels_exist", [False, True])
+async def test_samples_reservoir_and_monitor_table_queries_select_same_samples(
+    test_api: TestAPI,
+    classification_model: Payload,
+    classification_model_version: Payload,
+    async_session: AsyncSession,
+    filter_labels_exist: bool
+):
+    # Arrange - 10 samples an hour, of which only the even ones are labeled
+    start = pdl.datetime(2023, 1, 1)
+    upload_classification_data(test_api, classification_model_version["id"], is_labeled=False, samples_per_date=10,
+                               daterange=[start.add(hours=hours) for hours in range(6)])
+    test_api.upload_labels(model_id=classification_model["id"], data=[
+        {"_dc_sample_id": f"{i}_{j}", "_dc_label": "1"} for i in range(6) for j in range(0, 10, 2)
+    ])
+    model_version = await async_session.get(ModelVersion, classification_model_version["id"],
+                                            options=[joinedload(ModelVersion.model)])
+    # Windows of whole hours, which are read from the reservoir unless filtered. The data filter holds for all
+    # the samples, and only forces the monitor table scan
+    windows = [(0, start, start.add(hours=3)), (1, start.add(hours=2), start.add(hours=6))]
+    options = TableFiltersSchema()
+    scan_options = TableFiltersSchema(filter={"filters": [{"column": "a", "operator": "greater_than", "value": 0}]})
+
+    # Act
+    samples = await _read_windows_samples(async_session, model_version, options, windows, n_samples=5,
+                                          filter_labels_exist=filter_labels_exist)
+    scanned_samples = await _read_windows_samples(async_session, model_version, scan_options, windows, n_samples=5,
+                                                  filter_labels_exist=filter_labels_exist)
+
+    # Assert
+    assert_that(samples, equal_to(scanned_samples))
+    for index, window_start, window_end in windows:
+        assert_that(samples[index], has_length(5))
+        if not filter_labels_exist:
+            window_samples = await _read_window_samples(async_session, model_version, options, window_start,
+                                                        window_end, n_samples=5, filter_labels_exist=False)
+            assert_that(window_samples, equal_to(samples[index]))
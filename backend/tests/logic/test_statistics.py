@@ -1,7 +1,13 @@
+import copy
+
+import pandas as pd
+import pendulum as pdl
 import pytest
-from hamcrest import assert_that, contains_exactly
+from hamcrest import assert_that, contains_exactly, equal_to
 
 from deepchecks_monitoring.logic.statistics import _add_scaled_bins_names
+from deepchecks_monitoring.schema_models.model_version import (statistics_from_batch, unify_statistics,
+                                                               update_statistics_from_sample)
 
 
 @pytest.mark.asyncio
@@ -49,3 +55,33 @@ async def test_statistics_bin_names_with_none():
     assert_that(names, contains_exactly('[3.24e-05, 0.05)', '[0.05, 0.2)', '[0.2, 10.00001)', '[10.00001, 10.00002)',
                                         '[10.00002, 13)', '[13, 13.00004)', '[13.00004, 13.001)', '[13.001, 20.12)',
                                         '[20.12, 22]', 'Null'))
+
+
+@pytest.mark.asyncio
+async def test_statistics_from_batch_same_as_from_samples():
+    # Arrange
+    statistics = {
+        'a': {'min': None, 'max': None},
+        'b': {'values': []},
+        'c': {'min': None, 'max': None},
+        'd': {'values': ['x']},
+    }
+    samples = [
+        {'a': 1, 'b': 'x', 'c': pdl.datetime(2023, 1, 1), 'd': None},
+        {'a': 2.5, 'b': None, 'c': pdl.datetime(2023, 1, 2), 'd': 'y'},
+        {'a': None, 'b': 'z', 'c': None, 'd': 'y'},
+    ]
+    expected_statistics = copy.deepcopy(statistics)
+    for sample in samples:
+        update_statistics_from_sample(expected_statistics, sample)
+
+    # Act
+    batch = pd.DataFrame(samples, dtype=object).assign(c=lambda df: pd.to_datetime(df['c'], utc=True))
+    unified_statistics = unify_statistics(statistics, statistics_from_batch(statistics, batch))
+
+    # Assert
+    for stats in (expected_statistics, unified_statistics):
+        for column_stats in stats.values():
+            if 'values' in column_stats:
+                column_stats['values'] = sorted(column_stats['values'])
+    assert_that(dict(unified_statistics), equal_to(expected_statistics))
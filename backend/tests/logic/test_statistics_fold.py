@@ -0,0 +1,103 @@
+import pandas as pd
+import pendulum as pdl
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from deepchecks_monitoring.bgtasks.model_version_statistics_fold import (DEFERRED_FOLDS_KEY, QUEUE_NAME,
+                                                                         add_statistics_delta,
+                                                                         defer_statistics_deltas_fold,
+                                                                         fold_deferred_statistics_deltas,
+                                                                         fold_statistics_deltas)
+from deepchecks_monitoring.public_models import Task, User
+from deepchecks_monitoring.schema_models import Model, ModelVersion, StatisticsDelta
+from deepchecks_monitoring.schema_models.model_version import statistics_from_batch
+from tests.common import Payload
+
+
+@pytest.mark.asyncio
+async def test_statistics_deltas_merged_on_read_and_folded(
+    classification_model_version: Payload,
+    async_session: AsyncSession
+):
+    # Arrange
+    model_version = await async_session.get(ModelVersion, classification_model_version["id"])
+    start_time, end_time = pdl.datetime(2020, 1, 1), pdl.datetime(2020, 1, 3)
+    for a, b in ((1, "cat"), (5, "dog")):
+        batch = pd.DataFrame({"a": [a], "b": [b]})
+        await add_statistics_delta(async_session, model_version.id,
+                                   statistics_from_batch(model_version.statistics, batch),
+                                   start_time=start_time, end_time=end_time)
+
+    # Act & Assert - pending deltas are merged on read
+    state = await model_version.get_state_with_pending_deltas()
+    assert state.statistics["a"] == {"min": 1, "max": 5}
+    assert set(state.statistics["b"]["values"]) == {"cat", "dog"}
+    assert (state.start_time, state.end_time) == (start_time, end_time)
+    assert state.last_update_time >= model_version.last_update_time
+
+    # Act & Assert - deltas are folded into the model version and model
+    assert await fold_statistics_deltas(async_session, model_version.id) is True
+    await async_session.commit()
+    model_version = await async_session.scalar(select(ModelVersion)
+                                               .where(ModelVersion.id == model_version.id)
+                                               .execution_options(populate_existing=True))
+    model = await async_session.scalar(select(Model)
+                                       .where(Model.id == model_version.model_id)
+                                       .execution_options(populate_existing=True))
+    assert model_version.statistics["a"] == {"min": 1, "max": 5}
+    assert set(model_version.statistics["b"]["values"]) == {"cat", "dog"}
+    assert (model_version.start_time, model_version.end_time) == (start_time, end_time)
+    assert (model.start_time, model.end_time) == (start_time, end_time)
+    assert await async_session.scalar(select(func.count()).select_from(StatisticsDelta)) == 0
+
+
+@pytest.mark.asyncio
+async def test_deferred_statistics_deltas_folded_after_commit(
+    classification_model_version: Payload,
+    async_session: AsyncSession,
+    user: User
+):
+    # Arrange
+    model_version = await async_session.get(ModelVersion, classification_model_version["id"])
+    batch = pd.DataFrame({"a": [3], "b": ["cat"]})
+    await add_statistics_delta(async_session, model_version.id,
+                               statistics_from_batch(model_version.statistics, batch))
+    await defer_statistics_deltas_fold(async_session, user.organization_id, model_version.id)
+    await async_session.commit()
+
+    # Act
+    await fold_deferred_statistics_deltas(async_session)
+
+    # Assert
+    model_version = await async_session.scalar(select(ModelVersion)
+                                               .where(ModelVersion.id == model_version.id)
+                                               .execution_options(populate_existing=True))
+    assert model_version.statistics["a"] == {"min": 3, "max": 3}
+    assert await async_session.scalar(select(func.count()).select_from(StatisticsDelta)) == 0
+    assert DEFERRED_FOLDS_KEY not in async_session.info
+
+
+@pytest.mark.asyncio
+async def test_deferred_statistics_deltas_fold_task_inserted_with_deltas(
+    classification_model_version: Payload,
+    async_session: AsyncSession,
+    user: User
+):
+    # Arrange
+    model_version = await async_session.get(ModelVersion, classification_model_version["id"])
+    for a in (3, 7):
+        batch = pd.DataFrame({"a": [a], "b": ["cat"]})
+        await add_statistics_delta(async_session, model_version.id,
+                                   statistics_from_batch(model_version.statistics, batch))
+        await defer_statistics_deltas_fold(async_session, user.organization_id, model_version.id)
+
+    # Act - the process dies between the commit and the fold
+    await async_session.commit()
+    async_session.info.pop(DEFERRED_FOLDS_KEY)
+
+    # Assert - a single fold task was committed with the deltas
+    tasks = (await async_session.scalars(select(Task).where(Task.bg_worker_task == QUEUE_NAME))).all()
+    assert len(tasks) == 1
+    assert tasks[0].params == {"organization_id": user.organization_id, "model_version_id": model_version.id}
+    assert await async_session.scalar(select(func.count()).select_from(StatisticsDelta)) == 2
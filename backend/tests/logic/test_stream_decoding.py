@@ -0,0 +1,126 @@
+import msgpack
+import pandas as pd
+import pytest
+
+from deepchecks_monitoring.exceptions import BadRequest
+from deepchecks_monitoring.logic.stream_decoding import (MSGPACK_MEDIA_TYPE, NDJSON_MEDIA_TYPE, SplitJsonDecoder,
+                                                         create_stream_decoder)
+
+
+def _decode(decoder, chunks):
+    samples = []
+    for chunk in chunks:
+        samples.extend(decoder.feed(chunk))
+    samples.extend(decoder.close())
+    return samples
+
+
+def test_ndjson_samples_split_between_chunks():
+    # Arrange
+    decoder = create_stream_decoder(NDJSON_MEDIA_TYPE, max_sample_bytes=1024)
+
+    # Act
+    samples = _decode(decoder, [b'{"a": 1}\n{"a"', b': 2}\n\n{"a": 3}'])
+
+    # Assert
+    assert samples == [{"a": 1}, {"a": 2}, {"a": 3}]
+    assert decoder.samples_count == 3
+    assert decoder.errors == []
+
+
+def test_ndjson_invalid_and_too_large_lines_are_reported():
+    # Arrange
+    decoder = create_stream_decoder(NDJSON_MEDIA_TYPE, max_sample_bytes=16)
+
+    # Act
+    samples = _decode(decoder, [b'{"a": 1}\n{"a": \n{"a": "', b'x' * 20, b'x' * 20, b'"}\n{"a": 4}\n'])
+
+    # Assert
+    assert samples == [{"a": 1}, {"a": 4}]
+    assert [error["sample"] for error in decoder.errors] == [2, 3]
+    assert decoder.errors_count == 2
+
+
+def test_msgpack_samples_split_between_chunks():
+    # Arrange
+    decoder = create_stream_decoder(MSGPACK_MEDIA_TYPE, max_sample_bytes=1024)
+    stream = b"".join(msgpack.packb({"a": i}) for i in range(3))
+
+    # Act
+    samples = _decode(decoder, [stream[:5], stream[5:]])
+
+    # Assert
+    assert samples == [{"a": 0}, {"a": 1}, {"a": 2}]
+
+
+def test_msgpack_too_large_sample_drops_rest_of_stream():
+    # Arrange
+    decoder = create_stream_decoder(MSGPACK_MEDIA_TYPE, max_sample_bytes=16)
+    stream = msgpack.packb({"a": 1}) + msgpack.packb({"a": "x" * 40}) + msgpack.packb({"a": 3})
+
+    # Act
+    samples = _decode(decoder, [stream])
+
+    # Assert
+    assert samples == [{"a": 1}]
+    assert decoder.errors_count == 1
+
+
+def test_unsupported_media_type():
+    with pytest.raises(BadRequest):
+        create_stream_decoder("application/json", max_sample_bytes=16)
+
+
+def _decode_split_json(content, chunk_size):
+    decoder = SplitJsonDecoder()
+    rows = []
+    for start in range(0, len(content), chunk_size):
+        rows.extend(decoder.feed(content[start:start + chunk_size]))
+    rows.extend(decoder.close())
+    return decoder, rows
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 1024])
+def test_split_json_rows_split_between_chunks(chunk_size):
+    # Arrange
+    frame = pd.DataFrame({"a": [1, 22, None], "b": ["x", "ü ,]", None], "c": [[0.1, 0.9], [1.5e-3, 1], None]})
+    content = frame.to_json(orient="split", index=False).encode()
+
+    # Act
+    decoder, rows = _decode_split_json(content, chunk_size)
+
+    # Assert
+    assert decoder.columns == ["a", "b", "c"]
+    assert rows == [[1.0, "x", [0.1, 0.9]], [22.0, "ü ,]", [1.5e-3, 1]], [None, None, None]]
+    assert decoder.rows_count == 3
+
+
+def test_split_json_ignores_other_keys():
+    # Act
+    decoder, rows = _decode_split_json(b'{"columns": ["a"], "index": [0, 1], "data": [[10], [20]]}', 5)
+
+    # Assert
+    assert decoder.columns == ["a"]
+    assert rows == [[10], [20]]
+
+
+def test_split_json_empty_data():
+    # Act
+    decoder, rows = _decode_split_json(b'{"columns":["a"],"data":[]}', 4)
+
+    # Assert
+    assert decoder.columns == ["a"]
+    assert rows == []
+
+
+@pytest.mark.parametrize("content", [
+    b'{"columns": ["a"], "data": [[1], [2]',
+    b'{"columns": ["a"], "data": [[1] [2]]}',
+    b'{"data": [[1]], "columns": ["a"]}',
+    b'{"columns": ["a"]}',
+    b'{"columns": ["a"], "data": [[1]]} {}',
+    b'[["a"], [[1]]]',
+])
+def test_split_json_malformed(content):
+    with pytest.raises(ValueError):
+        _decode_split_json(content, 4)
@@ -0,0 +1,119 @@
+import pendulum as pdl
+import pytest
+from hamcrest import assert_that, contains_exactly, equal_to, has_length
+
+from deepchecks_monitoring.logic.windows_batches import balance_windows_batches, estimate_windows_samples
+from deepchecks_monitoring.schema_models import Model, ModelVersion
+from deepchecks_monitoring.schema_models.column_type import ColumnType
+
+
+def _model_version(version_id):
+    schema = {
+        "type": "object",
+        "properties": {
+            "_dc_sample_id": ColumnType.TEXT.to_json_schema_type(),
+            "_dc_time": ColumnType.DATETIME.to_json_schema_type(),
+        },
+        "required": ["_dc_sample_id", "_dc_time"],
+        "additionalProperties": False
+    }
+    return ModelVersion(
+        id=version_id,
+        model_id=1,
+        model=Model(id=1, task_type="binary"),
+        monitor_json_schema=schema,
+        reference_json_schema=schema,
+        features_columns={},
+        additional_data_columns={},
+        model_columns={},
+        meta_columns={"_dc_sample_id": "text", "_dc_time": "datetime"},
+        private_columns={"_dc_logged_time": "datetime"},
+        private_reference_columns={},
+    )
+
+
+class _FakeResult:
+
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
+
+
+class _FakeSession:
+    """Session returning the given rows of the reservoir samples count per version and hour."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    async def execute(self, query):
+        self.queries.append(query)
+        return _FakeResult(self.rows)
+
+
+@pytest.mark.asyncio
+async def test_estimate_windows_samples():
+    # Arrange
+    start = pdl.datetime(2023, 1, 1)
+    session = _FakeSession([
+        (1, start, 10), (1, start.add(hours=1), 20), (1, start.add(hours=5), 40),
+        (2, start.add(hours=2), 7),
+    ])
+    windows = [(0, start, start.add(hours=2)), (1, start.add(hours=1), start.add(hours=6))]
+
+    # Act
+    windows_samples = await estimate_windows_samples(session, [_model_version(1), _model_version(2)], windows,
+                                                     n_samples=50)
+
+    # Assert
+    assert_that(windows_samples, equal_to({(1, 0): 30, (1, 1): 50, (2, 0): 0, (2, 1): 7}))
+    assert_that(session.queries, has_length(1))
+
+
+@pytest.mark.asyncio
+async def test_estimate_windows_samples_without_windows():
+    # Arrange
+    session = _FakeSession([])
+
+    # Act & Assert
+    assert_that(await estimate_windows_samples(session, [_model_version(1)], []), equal_to({}))
+    assert_that(session.queries, has_length(0))
+
+
+def test_balance_windows_batches():
+    # Act
+    batches = balance_windows_batches(["a", "b", "c", "d", "e"], costs=[1, 8, 3, 5, 0], n_of_batches=2)
+
+    # Assert - the windows without samples still have a cost, so both batches cost 9
+    assert_that(batches, contains_exactly(["d", "c", "e"], ["b", "a"]))
+
+
+def test_balance_windows_batches_more_batches_than_windows():
+    # Act
+    batches = balance_windows_batches(["a", "b"], costs=[1, 2], n_of_batches=4)
+
+    # Assert
+    assert_that(batches, contains_exactly(["b"], ["a"]))
+
+
+def test_balance_contiguous_windows_batches():
+    # Arrange
+    windows = list(range(8))
+
+    # Act
+    batches = balance_windows_batches(windows, costs=[10, 10, 10, 10, 40, 0, 0, 0], n_of_batches=3,
+                                      contiguous=True)
+
+    # Assert - each batch is a run of consecutive windows, most expensive batch first
+    assert_that(batches, contains_exactly([4, 5, 6, 7], [0, 1, 2], [3]))
+    assert_that(sorted(window for batch in batches for window in batch), equal_to(windows))
+
+
+def test_balance_contiguous_windows_batches_of_equal_costs():
+    # Act
+    batches = balance_windows_batches(list(range(6)), costs=[5] * 6, n_of_batches=3, contiguous=True)
+
+    # Assert
+    assert_that(batches, contains_exactly([0, 1], [2, 3], [4, 5]))
@@ -0,0 +1,166 @@
+import pandas as pd
+import pendulum as pdl
+import pytest
+from hamcrest import assert_that, contains_exactly, contains_string, equal_to, is_not
+from sqlalchemy.dialects import postgresql
+
+from deepchecks_monitoring.logic.check_logic import (WINDOW_INDEX_COL, TableFiltersSchema, can_read_samples_reservoir,
+                                                     create_execution_data_query, create_windows_execution_data_query,
+                                                     split_windows_data)
+from deepchecks_monitoring.schema_models import Model, ModelVersion
+from deepchecks_monitoring.schema_models.column_type import ColumnType
+
+
+def _model_version():
+    schema = {
+        "type": "object",
+        "properties": {
+            "_dc_sample_id": ColumnType.TEXT.to_json_schema_type(),
+            "_dc_time": ColumnType.DATETIME.to_json_schema_type(),
+            "a": ColumnType.NUMERIC.to_json_schema_type(nullable=True),
+        },
+        "required": ["_dc_sample_id", "_dc_time"],
+        "additionalProperties": False
+    }
+    return ModelVersion(
+        id=1,
+        model_id=1,
+        model=Model(id=1, task_type="binary"),
+        monitor_json_schema=schema,
+        reference_json_schema=schema,
+        features_columns={"a": "numeric"},
+        additional_data_columns={},
+        model_columns={},
+        meta_columns={"_dc_sample_id": "text", "_dc_time": "datetime"},
+        private_columns={"_dc_logged_time": "datetime"},
+        private_reference_columns={},
+    )
+
+
+@pytest.mark.asyncio
+async def test_windows_query_ranks_samples_per_window():
+    # Arrange, overlapping windows as of an aggregation window of 2 days
+    end = pdl.datetime(2023, 1, 3)
+    windows = [(0, end.subtract(days=3), end.subtract(days=1)), (1, end.subtract(days=2), end)]
+    options = TableFiltersSchema(filter={"filters": [{"column": "a", "operator": "greater_than", "value": 1}]})
+
+    # Act
+    query = create_windows_execution_data_query(_model_version(), options, windows, columns=["a"],
+                                                 n_samples=100, with_labels=True, filter_labels_exist=True)
+    compiled = query.compile(dialect=postgresql.dialect())
+
+    # Assert
+    sql = str(compiled)
+    assert_that(sql, contains_string("row_number() OVER (PARTITION BY windows._dc_window_index "
+                                     "ORDER BY hashtext(model_1_monitor_data_1._dc_sample_id))"))
+    assert_that(sql, contains_string("LEFT OUTER JOIN model_1_sample_labels"))
+    # The samples without labels are filtered before the samples are ranked
+    assert_that(sql, contains_string("model_1_sample_labels._dc_label IS NOT NULL) AS anon_1"))
+    assert_that(sql.count("FROM model_1_monitor_data_1"), equal_to(1))
+    assert_that([column.name for column in query.selected_columns],
+                contains_exactly("_dc_sample_id", "_dc_time", "a", WINDOW_INDEX_COL, "_dc_label"))
+    assert_that(sql, is_not(contains_string("model_1_samples_reservoir")))
+    # The scanned range covers all the windows
+    assert_that(sorted(value for value in compiled.params.values() if isinstance(value, pdl.DateTime))[0],
+                equal_to(end.subtract(days=3)))
+
+
+@pytest.mark.asyncio
+async def test_windows_query_of_whole_hours_ranks_the_reservoir():
+    # Arrange
+    end = pdl.datetime(2023, 1, 3)
+    windows = [(0, end.subtract(days=2), end.subtract(days=1)), (1, end.subtract(days=1), end)]
+
+    # Act
+    query = create_windows_execution_data_query(_model_version(), TableFiltersSchema(), windows, columns=["a"],
+                                                 with_labels=True)
+
+    # Assert
+    sql = str(query.compile(dialect=postgresql.dialect()))
+    assert_that(sql, contains_string("row_number() OVER (PARTITION BY windows._dc_window_index ORDER BY "
+                                     "model_1_samples_reservoir.sample_hash, model_1_samples_reservoir._dc_sample_id)"))
+    assert_that(sql, contains_string("JOIN model_1_monitor_data_1 ON "
+                                     "model_1_monitor_data_1._dc_sample_id = anon_1._dc_sample_id"))
+    assert_that([column.name for column in query.selected_columns],
+                contains_exactly("_dc_sample_id", "_dc_time", "a", WINDOW_INDEX_COL, "_dc_label"))
+
+
+@pytest.mark.asyncio
+async def test_windows_query_of_labeled_samples_scans_the_monitor_table():
+    # Arrange
+    end = pdl.datetime(2023, 1, 3)
+    windows = [(0, end.subtract(days=2), end.subtract(days=1)), (1, end.subtract(days=1), end)]
+
+    # Act
+    query = create_windows_execution_data_query(_model_version(), TableFiltersSchema(), windows, columns=["a"],
+                                                 with_labels=True, filter_labels_exist=True)
+
+    # Assert
+    sql = str(query.compile(dialect=postgresql.dialect()))
+    assert_that(sql, is_not(contains_string("model_1_samples_reservoir")))
+    assert_that(sql, contains_string("ORDER BY hashtext(model_1_monitor_data_1._dc_sample_id)"))
+
+
+@pytest.mark.asyncio
+async def test_window_query_reads_the_reservoir():
+    # Arrange
+    end = pdl.datetime(2023, 1, 3)
+
+    # Act
+    query = create_execution_data_query(_model_version(), TableFiltersSchema(), period=end - end.subtract(days=1),
+                                        columns=["a"])
+
+    # Assert
+    sql = str(query.compile(dialect=postgresql.dialect()))
+    assert_that(sql, contains_string("model_1_monitor_data_1._dc_sample_id IN (SELECT "
+                                     "model_1_samples_reservoir._dc_sample_id"))
+    assert_that(sql, contains_string("ORDER BY hashtext(model_1_monitor_data_1._dc_sample_id)"))
+
+
+@pytest.mark.asyncio
+async def test_can_read_samples_reservoir():
+    # Arrange
+    end = pdl.datetime(2023, 1, 3)
+    options = TableFiltersSchema()
+    filtered_options = TableFiltersSchema(filter={"filters": [{"column": "a", "operator": "greater_than", "value": 1}]})
+
+    # Act & Assert
+    assert_that(can_read_samples_reservoir(options, [(end.subtract(days=1), end)], 5000), equal_to(True))
+    assert_that(can_read_samples_reservoir(options, [(end.in_timezone("Asia/Jerusalem").subtract(days=1), end)],
+                                           5000), equal_to(True))
+    assert_that(can_read_samples_reservoir(options, [(end.subtract(minutes=30), end)], 5000), equal_to(False))
+    assert_that(can_read_samples_reservoir(options, [(pdl.datetime(2023, 1, 2, tz="Asia/Kolkata"), end)], 5000),
+                equal_to(False))
+    assert_that(can_read_samples_reservoir(options, [(end.subtract(days=1), end)], 5001), equal_to(False))
+    assert_that(can_read_samples_reservoir(filtered_options, [(end.subtract(days=1), end)], 5000), equal_to(False))
+    assert_that(can_read_samples_reservoir(options, [(end.subtract(days=1), end)], 5000, filter_labels_exist=True),
+                equal_to(False))
+
+
+@pytest.mark.asyncio
+async def test_split_windows_data():
+    # Arrange, the sample "2" is in both windows
+    data = pd.DataFrame({
+        "_dc_sample_id": ["1", "2", "2", "3"],
+        "a": [1.0, 2.0, 2.0, 3.0],
+        WINDOW_INDEX_COL: [0, 0, 2, 2],
+    })
+
+    # Act
+    windows_data = split_windows_data(data)
+
+    # Assert
+    assert_that(sorted(windows_data), contains_exactly(0, 2))
+    assert_that(windows_data[2]["_dc_sample_id"].tolist(), contains_exactly("2", "3"))
+    assert_that(windows_data[2].columns.tolist(), contains_exactly("_dc_sample_id", "a"))
+    assert_that(windows_data[2].index.tolist(), contains_exactly(0, 1))
+
+
+@pytest.mark.asyncio
+async def test_split_empty_windows_data():
+    # Act
+    windows_data = split_windows_data(pd.DataFrame(columns=["_dc_sample_id", WINDOW_INDEX_COL]))
+
+    # Assert
+    assert_that(windows_data, equal_to({}))
+
@@ -14,7 +14,7 @@ import pandas as pd
 import pendulum as pdl
 import pytest
 from deepchecks_client import DeepchecksClient, TaskType
-from deepchecks_client.tabular.client import DeepchecksModelClient, DeepchecksModelVersionClient
+from deepchecks_client.tabular.client import DeepchecksModelClient, DeepchecksModelVersionClient, process_batch_columnar
 from hamcrest import assert_that, calling, raises
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -267,6 +267,44 @@ async def test_classification_batch_log(
     assert stats['c'] == {'max': 1, 'min': -1}
 
 
+@pytest.mark.asyncio
+async def test_classification_batch_log_columnar(
+    multiclass_model_version_client: DeepchecksModelVersionClient,
+    async_session: AsyncSession
+):
+    multiclass_model_version_client.log_batch_columnar(
+        sample_ids=np.array(['1', '2', '3']),
+        data=pd.DataFrame.from_records([
+            {'a': 2, 'b': '2', 'c': 1},
+            {'a': 3, 'b': '4', 'c': -1},
+            {'a': 2, 'b': '0', 'c': 0},
+        ]),
+        timestamps=np.array([
+            pdl.now().int_timestamp,
+            pdl.now().int_timestamp,
+            pdl.now().int_timestamp
+        ]),
+        predictions=np.array(['2', '1', '0']),
+        prediction_probas=np.array([
+            [0.1, 0.3, 0.6],
+            [0.1, 0.6, 0.1],
+            [0.1, 0.6, 0.1]
+        ]),
+        samples_per_send=2
+    )
+
+    model_version = await async_session.get(
+        ModelVersion,
+        multiclass_model_version_client.model_version_id
+    )
+
+    stats = model_version.statistics
+    assert set(stats['_dc_prediction']['values']) == {'0', '1', '2'}
+    assert set(stats['b']['values']) == {'4', '0', '2'}
+    assert stats['a'] == {'max': 3, 'min': 2}
+    assert stats['c'] == {'max': 1, 'min': -1}
+
+
 @pytest.mark.asyncio
 async def test_regression_batch_log(
     regression_model_version_client: DeepchecksModelVersionClient,
@@ -411,6 +449,54 @@ def test_batch_log_with_parameters_of_different_length(
         )
 
 
+def test_process_batch_columnar():
+    batch = process_batch_columnar(
+        task_type=TaskType.MULTICLASS,
+        data_columns={'a': 'numeric', 'b': 'categorical'},
+        sample_ids=np.array([1, 2]),
+        data=pd.DataFrame({'a': [1, None], 'b': ['2', None], 'c': [0, 0]}),
+        timestamps=np.array([pdl.now().int_timestamp, pdl.now().int_timestamp]),
+        predictions=np.array([0, 1]),
+        model_classes=['0', '1'],
+        prediction_probas=np.array([[0.9, 0.1], [0.2, 0.8]]),
+    )
+
+    assert list(batch['_dc_sample_id']) == ['1', '2']
+    assert list(batch['_dc_prediction']) == ['0', '1']
+    assert list(batch['b']) == ['2', None]
+    assert 'c' not in batch.columns
+
+
+def test_process_batch_columnar_with_parameters_of_different_length():
+    assert_that(
+        calling(process_batch_columnar).with_args(
+            task_type=TaskType.REGRESSION,
+            data_columns={'a': 'numeric'},
+            sample_ids=np.array(['1', '2', '3']),
+            data=pd.DataFrame({'a': [1, 2, 3]}),
+            timestamps=np.array([pdl.now().int_timestamp] * 3),
+            predictions=np.array([1, 2]),
+        ),
+        raises(ValueError, '"predictions" and "sample_ids" must contain same number of items')
+    )
+
+
+def test_process_batch_columnar_with_probas_of_wrong_shape():
+    assert_that(
+        calling(process_batch_columnar).with_args(
+            task_type=TaskType.BINARY,
+            data_columns={'a': 'numeric'},
+            sample_ids=np.array(['1', '2']),
+            data=pd.DataFrame({'a': [1, 2]}),
+            timestamps=np.array([pdl.now().int_timestamp] * 2),
+            predictions=np.array(['0', '1']),
+            model_classes=['0', '1'],
+            prediction_probas=np.array([[0.1, 0.2, 0.7], [0.1, 0.2, 0.7]]),
+        ),
+        raises(ValueError, 'Number of classes in prediction_probas does not match')
+    )
+
+
 def test_classification_log_pass_probas_without_classes(
     deepchecks_sdk: DeepchecksClient,
     test_api: TestAPI
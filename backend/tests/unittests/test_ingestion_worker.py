@@ -0,0 +1,95 @@
+# ----------------------------------------------------------------------------
+# Copyright (C) 2021-2022 Deepchecks (https://www.deepchecks.com)
+#
+# This file is part of Deepchecks.
+# Deepchecks is distributed under the terms of the GNU Affero General
+# Public License (version 3 or later).
+# You should have received a copy of the GNU Affero General Public License
+# along with Deepchecks.  If not, see <http://www.gnu.org/licenses/>.
+# ----------------------------------------------------------------------------
+# pylint: disable=missing-class-docstring,unused-argument
+import asyncio
+import os
+import signal
+from types import SimpleNamespace
+
+import pytest
+
+from deepchecks_monitoring.bgtasks import ingestion_worker
+from deepchecks_monitoring.bgtasks.ingestion_worker import run_ingestion_worker
+
+
+class FakeResourcesProvider:
+    instances = []
+
+    def __init__(self, settings):
+        self.settings = settings
+        self.closed = False
+        FakeResourcesProvider.instances.append(self)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        self.closed = True
+
+
+class FakeIngestionBackend:
+    started: asyncio.Event = None
+    error = None
+
+    def __init__(self, resources_provider, logger):
+        self.resources_provider = resources_provider
+
+    async def run_data_consumer(self):
+        FakeIngestionBackend.started.set()
+        if FakeIngestionBackend.error is not None:
+            raise FakeIngestionBackend.error
+        await asyncio.Event().wait()
+
+
+def _settings(kafka_host='localhost:9092'):
+    return SimpleNamespace(kafka_host=kafka_host, loglevel='INFO', logfile=None, logfile_backup_count=3)
+
+
+@pytest.fixture
+def fakes(monkeypatch):
+    FakeResourcesProvider.instances = []
+    FakeIngestionBackend.started = asyncio.Event()
+    FakeIngestionBackend.error = None
+    monkeypatch.setattr(ingestion_worker, 'ResourcesProvider', FakeResourcesProvider)
+    monkeypatch.setattr(ingestion_worker, 'DataIngestionBackend', FakeIngestionBackend)
+
+
+@pytest.mark.asyncio
+async def test_worker_requires_kafka(fakes):
+    with pytest.raises(RuntimeError, match='kafka_host'):
+        await run_ingestion_worker(_settings(kafka_host=None))
+    assert FakeResourcesProvider.instances == []
+
+
+@pytest.mark.asyncio
+async def test_worker_stops_on_sigterm(fakes):
+    # Arrange
+    worker = asyncio.create_task(run_ingestion_worker(_settings()))
+    await asyncio.wait_for(FakeIngestionBackend.started.wait(), timeout=5)
+
+    # Act
+    os.kill(os.getpid(), signal.SIGTERM)
+    await asyncio.wait_for(worker, timeout=5)
+
+    # Assert
+    assert FakeResourcesProvider.instances[0].closed
+    # The signal handlers are removed once the worker stopped
+    assert asyncio.get_running_loop().remove_signal_handler(signal.SIGTERM) is False
+
+
+@pytest.mark.asyncio
+async def test_worker_raises_consumer_error(fakes):
+    # Arrange
+    FakeIngestionBackend.error = ValueError('consumer failed')
+
+    # Act & Assert
+    with pytest.raises(ValueError, match='consumer failed'):
+        await run_ingestion_worker(_settings())
+    assert FakeResourcesProvider.instances[0].closed
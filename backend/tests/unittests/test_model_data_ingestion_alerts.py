@@ -122,3 +122,40 @@ async def test_data_ingestion_scheduling(
     assert len(resp_json) == 2
     assert resp_json[0]["value"] == 0.6666666666666666
     assert resp_json[1]["value"] == 0.6666666666666666
+
+
+@pytest.mark.asyncio
+async def test_data_ingestion_alert_window_boundaries(
+    async_session: AsyncSession,
+    classification_model: dict,
+    resources_provider: ResourcesProvider,
+    test_api: TestAPI,
+    client,
+    user
+):
+    # Arrange
+    start = pdl.now("utc").set(minute=0, second=0, microsecond=0) - pdl.duration(hours=5)
+    alert_rule = test_api.create_data_ingestion_alert_rule(classification_model["id"],
+                                                           dict(name="ahh",
+                                                                alert_type=AlertRuleType.SAMPLE_COUNT,
+                                                                frequency=Frequency.HOUR,
+                                                                condition={"operator": "greater_than", "value": 0}))
+    version = test_api.create_model_version(classification_model["id"], dict(name="v1", classes=["0", "1", "2"]))
+    daterange = [start, start.add(minutes=30), start.add(hours=1), start.add(hours=1, minutes=30)]
+    upload_classification_data(test_api, version["id"], daterange=daterange, model_id=classification_model["id"])
+    task = Task(name="boundaries", bg_worker_task=ModelDataIngestionAlerter.queue_name(),
+                params={"alert_rule_id": alert_rule["id"], "organization_id": user.organization_id,
+                        "start_time": start.to_iso8601_string(),
+                        "end_time": start.add(hours=1).to_iso8601_string()})
+    async_session.add(task)
+    await async_session.commit()
+
+    # Act
+    await ModelDataIngestionAlerter().run(task, async_session, resources_provider, lock=None)
+
+    # Assert - the window counts the sample at its start, and the sample at its end is left to the next window
+    resp_json = client.get(f"api/v1/data-ingestion-alert-rules/{alert_rule['id']}/alerts").json()
+    assert len(resp_json) == 1
+    assert resp_json[0]["value"] == 2
+    assert pdl.parse(resp_json[0]["start_time"]) == start
+    assert pdl.parse(resp_json[0]["end_time"]) == start.add(hours=1)
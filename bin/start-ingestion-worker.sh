@@ -0,0 +1,6 @@
+#!/bin/bash
+RUN="python -m deepchecks_monitoring.bgtasks.ingestion_worker"
+if [[ -v DD_ENV ]]; then
+  RUN="ddtrace-run ${RUN}"
+fi
+eval "${RUN}"